@@ -0,0 +1,28 @@
+"""add server last pulled timestamp
+
+Revision ID: n7o8p9q0r1s2
+Revises: m6n7o8p9q0r1
+Create Date: 2026-10-18 00:00:00.000000
+
+High-water mark of the remote event timestamps seen by the last successful
+pull, used by the `update` pull technique.
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "n7o8p9q0r1s2"
+down_revision = "m6n7o8p9q0r1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "servers", sa.Column("last_pulled_timestamp", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column("servers", "last_pulled_timestamp")
@@ -0,0 +1,28 @@
+"""add server last pushed timestamp
+
+Revision ID: o8p9q0r1s2t3
+Revises: n7o8p9q0r1s2
+Create Date: 2026-10-18 00:00:00.000000
+
+Push cursor of the `update` push technique: newest local event timestamp
+covered by the last successful push.
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "o8p9q0r1s2t3"
+down_revision = "n7o8p9q0r1s2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "servers", sa.Column("last_pushed_timestamp", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column("servers", "last_pushed_timestamp")
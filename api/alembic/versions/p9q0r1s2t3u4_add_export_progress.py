@@ -0,0 +1,42 @@
+"""add export progress
+
+Revision ID: p9q0r1s2t3u4
+Revises: o8p9q0r1s2t3
+Create Date: 2026-10-18 00:00:00.000000
+
+Live progress of running exports (documents read / documents matched) and
+a 64-bit file size now that exports are streamed without a record cap.
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "p9q0r1s2t3u4"
+down_revision = "o8p9q0r1s2t3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("exports", sa.Column("progress_done", sa.Integer(), nullable=True))
+    op.add_column("exports", sa.Column("progress_total", sa.Integer(), nullable=True))
+    op.alter_column(
+        "exports",
+        "file_size",
+        existing_type=sa.Integer(),
+        type_=sa.BigInteger(),
+        existing_nullable=True,
+    )
+
+
+def downgrade():
+    op.alter_column(
+        "exports",
+        "file_size",
+        existing_type=sa.BigInteger(),
+        type_=sa.Integer(),
+        existing_nullable=True,
+    )
+    op.drop_column("exports", "progress_total")
+    op.drop_column("exports", "progress_done")
@@ -13,16 +13,68 @@ DEFAULT_SETTINGS = {
             "domain|ip",
         ],
         "opensearchFlushBulkSize": 100,
+        "msearchBlockSize": 100,
+        "msearchConcurrency": 2,
+        "notificationBatchSize": 500,
+    },
+    "exports": {
+        # Maximum number of documents written by a json / ndjson / csv export.
+        # Set to 0 to export every match.
+        "maxRecords": 0,
+        # Parallel sliced scrolls reading the matches of large exports.
+        "scrollSlices": 4,
+        # Processes converting STIX 2.1 chunks (0 = up to 2, fewer on smaller hosts).
+        "stixWorkers": 0,
+    },
+    "feeds": {
+        # MISP feeds: events per fetch task, parallel downloads per task
+        # and retries of throttled / failed event downloads.
+        "eventsBatchSize": 100,
+        "fetchConcurrency": 8,
+        "fetchRetries": 3,
     },
     "notifications": {
         # Maximum number of notification emails sent per user per hour.
         # Set to 0 to disable the limit.
         "email_max_per_hour": 10,
+        # Seconds notification emails are collected before being sent as a
+        # single digest per user.
+        "email_digest_interval": 60,
+    },
+    "opensearch": {
+        # Refresh policy of index writes: "true", "wait_for" or "false".
+        # Background (Celery) writes refresh once at the end of each task.
+        # Overrides are keyed by call site, e.g. "attributes.create_attribute".
+        "refresh": {
+            "interactive": "wait_for",
+            "background": "false",
+            "overrides": {},
+        },
+        # Redis read-through cache of event documents (events:cache:*),
+        # invalidated on every write to the event; ttl in seconds.
+        "eventCache": {
+            "enabled": True,
+            "ttl": 300,
+        },
     },
     "retention": {
         "enabled": False,
         "period_days": 365,
         "warning_days": 30,
         "exempt_tags": ["retention:exempt"],
+        # Expired events purged per round of delete_by_query tasks, and the
+        # documents per second each task may delete (0 = unthrottled).
+        "purge_page_size": 500,
+        "purge_requests_per_second": 0,
+    },
+    "servers": {
+        # Server pulls: events per remote restSearch page and pages
+        # downloaded in parallel over the shared session.
+        "pullPageSize": 50,
+        "pullConcurrency": 4,
+        # Update pushes: events pushed in parallel and pushes started per
+        # second (0 disables the rate limit).
+        "pushConcurrency": 4,
+        "pushRateLimit": 10,
     },
 }
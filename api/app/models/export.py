@@ -1,5 +1,6 @@
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     Column,
     DateTime,
@@ -35,8 +36,12 @@ class Export(Base):
     distribution = Column(Integer, nullable=True)
     status = Column(String(50), nullable=False, default="queued")
     storage_key = Column(String(512), nullable=True)
-    file_size = Column(Integer, nullable=True)
+    file_size = Column(BigInteger, nullable=True)
     record_count = Column(Integer, nullable=True)
+    # Documents read so far out of the documents matching the query, updated
+    # while the export runs.
+    progress_done = Column(Integer, nullable=True)
+    progress_total = Column(Integer, nullable=True)
     error = Column(Text, nullable=True)
     celery_task_id = Column(String(128), nullable=True)
     # Recurring exports: when ``schedule`` is set the job is registered with the
@@ -16,7 +16,9 @@ class Server(Base):
     push_galaxy_clusters = Column(Boolean, nullable=False, default=False)
     pull_galaxy_clusters = Column(Boolean, nullable=False, default=False)
     last_pulled_id = Column(Integer, nullable=True)
+    last_pulled_timestamp = Column(Integer, nullable=True)
     last_pushed_id = Column(Integer, nullable=True)
+    last_pushed_timestamp = Column(Integer, nullable=True)
     organisation = Column(String)
     remote_org_id = Column(Integer, nullable=False)
     publish_without_email = Column(Boolean, nullable=False, default=False)
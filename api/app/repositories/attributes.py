@@ -1,10 +1,11 @@
 import math
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Iterable, Optional
 from uuid import UUID, uuid4
 from app.models.event import DistributionLevel
 from app.services.opensearch import get_opensearch_client
+from app.services.opensearch_refresh import get_refresh
 from app.models import tag as tag_models
 from app.models import user as user_models
 from app.schemas import tag as tag_schemas
@@ -17,7 +18,16 @@ from fastapi_pagination import Page, Params
 from pymisp import MISPAttribute, MISPTag
 from sqlalchemy.orm import Session
 from collections import defaultdict
+from opensearchpy import helpers as opensearch_helpers
 from opensearchpy.exceptions import NotFoundError
+import logging
+
+logger = logging.getLogger(__name__)
+
+ATTRIBUTES_BULK_SIZE = 1000
+ATTRIBUTES_MSEARCH_BLOCK_SIZE = 100
+# ignore_above of value.keyword in the misp-attributes mapping
+VALUE_KEYWORD_IGNORE_ABOVE = 256
 
 
 def enrich_attributes_page_with_correlations(
@@ -118,19 +128,119 @@ def get_attribute_from_opensearch(
     return attribute_schemas.Attribute.model_validate(source)
 
 
+def get_attributes_from_opensearch_by_uuids(
+    attribute_uuids: list,
+) -> list[attribute_schemas.Attribute]:
+    client = get_opensearch_client()
+
+    if not attribute_uuids:
+        return []
+
+    attributes = []
+    for start in range(0, len(attribute_uuids), ATTRIBUTES_BULK_SIZE):
+        response = client.mget(
+            index="misp-attributes",
+            body={
+                "ids": [
+                    str(uuid)
+                    for uuid in attribute_uuids[start : start + ATTRIBUTES_BULK_SIZE]
+                ]
+            },
+        )
+        attributes.extend(
+            attribute_schemas.Attribute.model_validate(doc["_source"])
+            for doc in response["docs"]
+            if doc.get("found")
+        )
+
+    return attributes
+
+
+def _value_query(value: str) -> dict:
+    """Exact match on ``value``; ``value.keyword`` does not index values
+    longer than ``VALUE_KEYWORD_IGNORE_ABOVE`` characters (UTF-16 units), so
+    those fall back to a phrase match on the analyzed field."""
+    if len(value.encode("utf-16-le")) // 2 <= VALUE_KEYWORD_IGNORE_ABOVE:
+        return {"term": {"value.keyword": value}}
+    return {"match_phrase": {"value": value}}
+
+
+def get_attributes_by_values(
+    values: Iterable[str], max_per_value: int = 1000
+) -> dict[str, list[dict]]:
+    """Return the non-deleted attribute hits matching each of ``values``.
+
+    Values are resolved in msearch blocks of ``ATTRIBUTES_MSEARCH_BLOCK_SIZE``
+    with one search per value sized to ``max_per_value``, so a popular value
+    never pulls more hits than it keeps.
+    """
+    values = list(dict.fromkeys(str(value) for value in values))
+    if not values:
+        return {}
+
+    client = get_opensearch_client()
+    matches: dict[str, list[dict]] = {}
+    for start in range(0, len(values), ATTRIBUTES_MSEARCH_BLOCK_SIZE):
+        block = values[start : start + ATTRIBUTES_MSEARCH_BLOCK_SIZE]
+        body = []
+        for value in block:
+            body.append({"index": "misp-attributes"})
+            body.append(
+                {
+                    "query": {
+                        "bool": {
+                            "filter": [
+                                _value_query(value),
+                                {"term": {"deleted": False}},
+                            ]
+                        }
+                    },
+                    "_source": ["uuid", "type", "value", "event_uuid", "object_uuid"],
+                    "size": max_per_value + 1,
+                }
+            )
+
+        responses = client.msearch(body=body)["responses"]
+        for value, response in zip(block, responses):
+            if "error" in response:
+                logger.error(
+                    "Failed to look up attributes for value=%s: %s",
+                    value,
+                    response["error"],
+                )
+                continue
+            hits = [
+                hit
+                for hit in response["hits"]["hits"]
+                if hit["_source"]["value"] == value
+            ]
+            if len(hits) > max_per_value:
+                logger.warning(
+                    "Too many attributes found for value=%s, only the first %s will be processed.",
+                    value,
+                    max_per_value,
+                )
+            if hits:
+                matches[value] = hits[:max_per_value]
+
+    return matches
+
+
 def get_attribute_by_uuid(
     db: Session, attribute_uuid: UUID
 ) -> Optional[attribute_schemas.Attribute]:
     return get_attribute_from_opensearch(attribute_uuid)
 
 
-def create_attribute(
-    db: Session, attribute: attribute_schemas.AttributeCreate
-) -> attribute_schemas.Attribute:
-    client = get_opensearch_client()
-    attribute_uuid = str(attribute.uuid or uuid4())
-    now = int(time.time())
+def get_indexed_at() -> str:
+    """Local time of an attribute write, unlike ``@timestamp`` which holds the
+    (possibly remote) attribute timestamp; incremental correlation runs pick
+    up the attributes written since the previous run by this field."""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
 
+
+def build_attribute_doc(attribute: attribute_schemas.AttributeCreate, now: int) -> dict:
+    attribute_uuid = str(attribute.uuid or uuid4())
     event_uuid = str(attribute.event_uuid) if attribute.event_uuid else None
 
     dist = attribute.distribution
@@ -156,21 +266,90 @@ def create_attribute(
         "data": "",
         "tags": [],
         "@timestamp": datetime.fromtimestamp(attribute.timestamp or now).isoformat(),
+        "indexed_at": get_indexed_at(),
     }
 
-    client.index(index="misp-attributes", id=attribute_uuid, body=attr_doc, refresh=True)
+    return attr_doc
 
-    tasks.handle_created_attribute.delay(attribute_uuid, attr_doc["object_uuid"], event_uuid)
+
+def create_attribute(
+    db: Session, attribute: attribute_schemas.AttributeCreate
+) -> attribute_schemas.Attribute:
+    client = get_opensearch_client()
+
+    attr_doc = build_attribute_doc(attribute, int(time.time()))
+    attribute_uuid = attr_doc["uuid"]
+
+    client.index(index="misp-attributes", id=attribute_uuid, body=attr_doc, refresh=get_refresh("attributes.create_attribute", index="misp-attributes"))
+
+    tasks.handle_created_attribute.delay(attribute_uuid, attr_doc["object_uuid"], attr_doc["event_uuid"])
 
     return attribute_schemas.Attribute.model_validate(attr_doc)
 
 
-def create_attribute_from_pulled_attribute(
+def create_attributes_bulk(
     db: Session,
-    pulled_attribute: MISPAttribute,
-    event_uuid: str,
-    user: user_models.User,
-) -> attribute_schemas.Attribute:
+    attributes: Iterable[attribute_schemas.AttributeCreate],
+    chunk_size: int = ATTRIBUTES_BULK_SIZE,
+) -> list[attribute_schemas.Attribute]:
+    """Index a batch of attributes with the bulk API and a single refresh.
+
+    Instead of one ``handle_created_attribute`` task per attribute, one
+    ``handle_created_attributes`` task is enqueued per event and
+    ``chunk_size`` attributes, which also bumps the event ``attribute_count``
+    once.
+
+    Returns the attributes that were indexed; failed documents are logged
+    and left out.
+    """
+    client = get_opensearch_client()
+    now = int(time.time())
+
+    docs = {}
+    for attribute in attributes:
+        attr_doc = build_attribute_doc(attribute, now)
+        docs[attr_doc["uuid"]] = attr_doc
+
+    if not docs:
+        return []
+
+    actions = (
+        {"_index": "misp-attributes", "_id": attribute_uuid, "_source": attr_doc}
+        for attribute_uuid, attr_doc in docs.items()
+    )
+
+    created = []
+    for ok, item in opensearch_helpers.streaming_bulk(
+        client, actions, chunk_size=chunk_size, raise_on_error=False
+    ):
+        result = item.get("index", {})
+        if ok:
+            created.append(docs[result["_id"]])
+        else:
+            logger.error(
+                "Failed to index attribute uuid=%s: %s",
+                result.get("_id"),
+                result.get("error"),
+            )
+
+    client.indices.refresh(index="misp-attributes")
+
+    created_by_event = defaultdict(list)
+    for attr_doc in created:
+        created_by_event[attr_doc["event_uuid"]].append(attr_doc["uuid"])
+
+    for event_uuid, attribute_uuids in created_by_event.items():
+        for start in range(0, len(attribute_uuids), chunk_size):
+            tasks.handle_created_attributes.delay(
+                attribute_uuids[start : start + chunk_size], event_uuid
+            )
+
+    return [attribute_schemas.Attribute.model_validate(attr_doc) for attr_doc in created]
+
+
+def build_attribute_from_pulled_attribute(
+    pulled_attribute: MISPAttribute, event_uuid: str
+) -> attribute_schemas.AttributeCreate:
     # TODO: process sharing group // captureSG
     # TODO: enforce warninglist
 
@@ -211,8 +390,15 @@ def create_attribute_from_pulled_attribute(
         event_uuid=event_uuid,
     )
 
-    local_attribute = create_attribute(db, attr_create)
+    return attr_create
 
+
+def capture_pulled_attribute_extras(
+    db: Session,
+    pulled_attribute: MISPAttribute,
+    user: user_models.User,
+    attribute_uuid: str,
+) -> None:
     if pulled_attribute.data is not None:
         attachments_repository.store_attachment(
             str(pulled_attribute.uuid), pulled_attribute.data.getvalue()
@@ -221,11 +407,50 @@ def create_attribute_from_pulled_attribute(
     # TODO: process sightings
     # TODO: process galaxies
 
-    capture_attribute_tags(db, getattr(pulled_attribute, "tags", []) or [], user, str(local_attribute.uuid))
+    capture_attribute_tags(db, getattr(pulled_attribute, "tags", []) or [], user, attribute_uuid)
+
+
+def create_attribute_from_pulled_attribute(
+    db: Session,
+    pulled_attribute: MISPAttribute,
+    event_uuid: str,
+    user: user_models.User,
+) -> attribute_schemas.Attribute:
+    local_attribute = create_attribute(
+        db, build_attribute_from_pulled_attribute(pulled_attribute, event_uuid)
+    )
+
+    capture_pulled_attribute_extras(
+        db, pulled_attribute, user, str(local_attribute.uuid)
+    )
 
     return local_attribute
 
 
+def create_attributes_from_pulled_attributes(
+    db: Session,
+    pulled_attributes: list[MISPAttribute],
+    event_uuid: str,
+    user: user_models.User,
+) -> list[attribute_schemas.Attribute]:
+    created = create_attributes_bulk(
+        db,
+        [
+            build_attribute_from_pulled_attribute(pulled_attribute, event_uuid)
+            for pulled_attribute in pulled_attributes
+        ],
+    )
+
+    created_uuids = {str(attribute.uuid) for attribute in created}
+    for pulled_attribute in pulled_attributes:
+        if str(pulled_attribute.uuid) in created_uuids:
+            capture_pulled_attribute_extras(
+                db, pulled_attribute, user, str(pulled_attribute.uuid)
+            )
+
+    return created
+
+
 def update_attribute_from_pulled_attribute(
     db: Session,
     local_attribute: attribute_schemas.Attribute,
@@ -292,8 +517,9 @@ def update_attribute(
     for k, v in list(patch.items()):
         if hasattr(v, "value"):
             patch[k] = v.value
+    patch["indexed_at"] = get_indexed_at()
 
-    client.update(index="misp-attributes", id=str(os_attr.uuid), body={"doc": patch}, refresh=True)
+    client.update(index="misp-attributes", id=str(os_attr.uuid), body={"doc": patch}, refresh=get_refresh("attributes.update_attribute", index="misp-attributes"))
 
     tasks.handle_updated_attribute.delay(str(os_attr.uuid), os_attr.object_uuid, str(os_attr.event_uuid) if os_attr.event_uuid else None)
 
@@ -312,12 +538,60 @@ def delete_attribute(db: Session, attribute_uuid: UUID) -> None:
         index="misp-attributes",
         id=str(os_attr.uuid),
         body={"doc": {"deleted": True}},
-        refresh=True,
+        refresh=get_refresh("attributes.delete_attribute", index="misp-attributes"),
     )
 
     tasks.handle_deleted_attribute.delay(str(os_attr.uuid), os_attr.object_uuid, str(os_attr.event_uuid) if os_attr.event_uuid else None)
 
 
+def delete_attributes_bulk(
+    db: Session,
+    attribute_uuids: list,
+    event_uuid: str,
+    chunk_size: int = ATTRIBUTES_BULK_SIZE,
+) -> list[str]:
+    """Soft-delete a batch of attributes of one event with a single refresh.
+
+    Post-delete handling is queued per ``chunk_size`` attributes through
+    ``handle_deleted_attributes``. Returns the uuids that were deleted.
+    """
+    client = get_opensearch_client()
+
+    if not attribute_uuids:
+        return []
+
+    actions = (
+        {
+            "_op_type": "update",
+            "_index": "misp-attributes",
+            "_id": str(attribute_uuid),
+            "doc": {"deleted": True},
+        }
+        for attribute_uuid in attribute_uuids
+    )
+
+    deleted = []
+    for ok, item in opensearch_helpers.streaming_bulk(
+        client, actions, chunk_size=chunk_size, raise_on_error=False
+    ):
+        result = item.get("update", {})
+        if ok:
+            deleted.append(result["_id"])
+        else:
+            logger.error(
+                "Failed to delete attribute uuid=%s: %s",
+                result.get("_id"),
+                result.get("error"),
+            )
+
+    client.indices.refresh(index="misp-attributes")
+
+    for start in range(0, len(deleted), chunk_size):
+        tasks.handle_deleted_attributes.delay(deleted[start : start + chunk_size], event_uuid)
+
+    return deleted
+
+
 def capture_attribute_tags(
     db: Session,
     tags: list[MISPTag],
@@ -365,7 +639,9 @@ def capture_attribute_tags(
             index="misp-attributes",
             id=attribute_uuid,
             body={"doc": {"tags": tag_dicts}},
-            refresh=True,
+            refresh=get_refresh(
+                "attributes.capture_attribute_tags", index="misp-attributes"
+            ),
         )
 
 
@@ -1,12 +1,16 @@
 from app.services.opensearch import get_opensearch_client
+from app.services.opensearch_refresh import get_refresh
 from app.schemas import correlation as correlation_schemas
 from fastapi import HTTPException, status
 from opensearchpy import helpers as opensearch_helpers
 from opensearchpy.exceptions import NotFoundError
+from app.services.redis import get_redis_client
 from app.services.runtime_settings import RuntimeSettings
 from app.worker import tasks
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import datetime
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +27,23 @@ POSSIBLE_CIDR_ATTRIBUTES_TYPES = [
 ]
 BULK_BUFFER = []
 BULK_SIZE = 100
+CREATED_CORRELATIONS_BUFFER = []
+CREATED_CORRELATIONS_BATCH_SIZE = 500
+MSEARCH_BLOCK_SIZE = 100
+MSEARCH_CONCURRENCY = 2
+TERM_AGGREGATION_MATCH_TYPE = "term_aggregation"
+TERM_AGGREGATION_PAGE_SIZE = 500
+# Match types whose relation holds both ways, so an incrementally correlated
+# attribute can also be stored as the target of the attributes it matched.
+SYMMETRIC_MATCH_TYPES = ["term", "fuzzy"]
+# Attributes whose own search can match the cidr/prefix of another one,
+# found through these fields instead of the changed attribute's hits.
+ASYMMETRIC_MATCH_TYPES = ["cidr", "prefix"]
+CIDR_RANGE_ATTRIBUTE_TYPES = ["ip-src", "ip-dst"]
+HIGH_WATER_MARK_KEY = "correlations:high_water_mark"
+# attributes written in the last seconds may not be searchable yet, they are
+# left to the next incremental run
+INCREMENTAL_CORRELATIONS_LAG = 60
 
 
 def get_correlations(params: correlation_schemas.CorrelationQueryParams, page: int = 0, from_value: int = 0, size: int = 100):
@@ -86,6 +107,15 @@ def get_attributes(filters: dict = {}):
         query["query"]["bool"]["must"].append(
             {"term": {"event_uuid": filters["event_uuid"]}}
         )
+    if filters.get("since") or filters.get("until"):
+        timestamp_range = {}
+        if filters.get("since"):
+            timestamp_range["gt"] = filters["since"]
+        if filters.get("until"):
+            timestamp_range["lte"] = filters["until"]
+        query["query"]["bool"]["must"].append(
+            {"range": {"indexed_at": timestamp_range}}
+        )
 
     scroll = opensearch_helpers.scan(
         client=OpenSearchClient,
@@ -181,7 +211,7 @@ def build_cidr_query(uuid, event_uuid, doc):
     }
 
 
-def flush_bulk_correlations():
+def index_bulk_correlations():
     global BULK_BUFFER
 
     OpenSearchClient = get_opensearch_client()
@@ -193,6 +223,23 @@ def flush_bulk_correlations():
     BULK_BUFFER = []
 
 
+def flush_bulk_correlations():
+    index_bulk_correlations()
+
+    # Notify only once the correlations are indexed.
+    flush_created_correlations()
+
+
+def flush_created_correlations():
+    global CREATED_CORRELATIONS_BUFFER
+
+    if not CREATED_CORRELATIONS_BUFFER:
+        return
+
+    tasks.handle_created_correlations.delay(CREATED_CORRELATIONS_BUFFER)
+    CREATED_CORRELATIONS_BUFFER = []
+
+
 def store_correlations_bulk(
     attribute_uuid, event_uuid, hits, match_type, runtimeSettings: RuntimeSettings
 ):
@@ -219,38 +266,45 @@ def store_correlations_bulk(
 
         BULK_BUFFER.append(correlation_doc)
 
-        tasks.handle_created_correlation.delay(
-            attribute_uuid,
-            correlation_doc["_source"]["source_event_uuid"],
-            correlation_doc["_source"]["target_event_uuid"],
-            correlation_doc["_source"]["target_attribute_uuid"],
-            correlation_doc["_source"]["target_attribute_type"],
-            correlation_doc["_source"]["target_attribute_value"],
+        CREATED_CORRELATIONS_BUFFER.append(
+            {
+                "source_attribute_uuid": attribute_uuid,
+                "source_event_uuid": correlation_doc["_source"]["source_event_uuid"],
+                "target_event_uuid": correlation_doc["_source"]["target_event_uuid"],
+                "target_attribute_uuid": correlation_doc["_source"]["target_attribute_uuid"],
+                "target_attribute_type": correlation_doc["_source"]["target_attribute_type"],
+                "target_attribute_value": correlation_doc["_source"]["target_attribute_value"],
+            }
         )
 
         if len(BULK_BUFFER) >= runtimeSettings.get_value(
             "correlations.opensearchFlushBulkSize", BULK_SIZE
         ):
-            flush_bulk_correlations()
+            index_bulk_correlations()
 
+        if len(CREATED_CORRELATIONS_BUFFER) >= runtimeSettings.get_value(
+            "correlations.notificationBatchSize", CREATED_CORRELATIONS_BATCH_SIZE
+        ):
+            flush_bulk_correlations()
 
-def correlate_document(doc, runtimeSettings: RuntimeSettings):
-    OpenSearchClient = get_opensearch_client()
 
+def build_document_queries(doc, runtimeSettings: RuntimeSettings, match_types=None):
     value = doc["_source"].get("value")
     event_uuid = doc["_source"].get("event_uuid")
 
     if not value:
-        return
+        return []
 
     if not event_uuid:
         logger.warning(
             f"correlate_document: skipping attribute {doc['_id']} - event_uuid is None"
         )
-        return
+        return []
 
-    match_types = runtimeSettings.get_value("correlations.matchTypes", ["term", "cidr"])
+    if match_types is None:
+        match_types = get_document_match_types(runtimeSettings)
 
+    queries = []
     for match_type in match_types:
         if match_type == "cidr":
             if (
@@ -276,25 +330,506 @@ def correlate_document(doc, runtimeSettings: RuntimeSettings):
                 logger.error(f"correlate_document: {str(e)}")
                 continue
 
-        res = OpenSearchClient.search(
-            index="misp-attributes",
-            body=query,
-            size=runtimeSettings.get_value(
-                "correlations.maxCorrelationsPerDoc",
-                runtimeSettings.get_value(
-                    "correlations.opensearchFlushBulkSize", MAX_CORRELATIONS_PER_DOC
-                ),
-            ),
+        queries.append((match_type, query))
+
+    return queries
+
+
+def get_document_match_types(runtimeSettings: RuntimeSettings):
+    # Outside of a full run the value-grouped mode has no index-wide view,
+    # so it falls back to the per-document term lookup.
+    match_types = []
+    for match_type in runtimeSettings.get_value(
+        "correlations.matchTypes", ["term", "cidr"]
+    ):
+        if match_type == TERM_AGGREGATION_MATCH_TYPE:
+            match_type = "term"
+        if match_type not in match_types:
+            match_types.append(match_type)
+    return match_types
+
+
+def build_msearch_block(docs, runtimeSettings: RuntimeSettings, match_types=None):
+    size = runtimeSettings.get_value(
+        "correlations.maxCorrelationsPerDoc",
+        runtimeSettings.get_value(
+            "correlations.opensearchFlushBulkSize", MAX_CORRELATIONS_PER_DOC
+        ),
+    )
+
+    searches = []
+    body = []
+    for doc in docs:
+        for match_type, query in build_document_queries(
+            doc, runtimeSettings, match_types
+        ):
+            searches.append((doc, match_type))
+            body.append({"index": "misp-attributes"})
+            body.append({**query, "size": size})
+
+    return searches, body
+
+
+def msearch_block(body):
+    OpenSearchClient = get_opensearch_client()
+
+    return OpenSearchClient.msearch(body=body)["responses"]
+
+
+def store_reverse_correlations(doc, hits, match_type, runtimeSettings: RuntimeSettings):
+    source_hit = {"_id": doc["_id"], "_source": doc["_source"]}
+
+    for hit in hits:
+        if hit["_source"].get("disable_correlation") or not hit["_source"].get(
+            "event_uuid"
+        ):
+            continue
+
+        store_correlations_bulk(
+            hit["_id"],
+            hit["_source"]["event_uuid"],
+            [{**source_hit, "_score": hit["_score"]}],
+            match_type,
+            runtimeSettings,
         )
 
+
+def store_msearch_block(
+    searches, responses, runtimeSettings: RuntimeSettings, reverse: bool = False
+):
+    for (doc, match_type), response in zip(searches, responses):
+        if "error" in response:
+            logger.error(
+                f"correlate_document: {match_type} search failed for attribute {doc['_id']}: {response['error']}"
+            )
+            continue
+
         store_correlations_bulk(
             doc["_id"],
             doc["_source"]["event_uuid"],
-            res["hits"]["hits"],
+            response["hits"]["hits"],
             match_type,
             runtimeSettings,
         )
 
+        if reverse and match_type in SYMMETRIC_MATCH_TYPES:
+            store_reverse_correlations(
+                doc, response["hits"]["hits"], match_type, runtimeSettings
+            )
+
+
+def correlate_documents(docs, runtimeSettings: RuntimeSettings, reverse: bool = False):
+    searches, body = build_msearch_block(docs, runtimeSettings)
+
+    if not searches:
+        return
+
+    store_msearch_block(searches, msearch_block(body), runtimeSettings, reverse)
+
+
+def correlate_document(doc, runtimeSettings: RuntimeSettings):
+    correlate_documents([doc], runtimeSettings)
+
+
+def get_duplicated_values():
+    OpenSearchClient = get_opensearch_client()
+
+    # Composite aggregations do not support min_doc_count, so single-use
+    # values are dropped here instead.
+    query = {
+        "size": 0,
+        "aggs": {
+            "values": {
+                "composite": {
+                    "size": TERM_AGGREGATION_PAGE_SIZE,
+                    "sources": [{"value": {"terms": {"field": "value.keyword"}}}],
+                }
+            }
+        },
+    }
+
+    while True:
+        response = OpenSearchClient.search(index="misp-attributes", body=query)
+        aggregation = response["aggregations"]["values"]
+
+        values = [
+            bucket["key"]["value"]
+            for bucket in aggregation["buckets"]
+            if bucket["doc_count"] >= 2
+        ]
+        if values:
+            yield values
+
+        if "after_key" not in aggregation or not aggregation["buckets"]:
+            break
+        query["aggs"]["values"]["composite"]["after"] = aggregation["after_key"]
+
+
+def get_attributes_by_values(values: list):
+    OpenSearchClient = get_opensearch_client()
+
+    scroll = opensearch_helpers.scan(
+        client=OpenSearchClient,
+        index="misp-attributes",
+        query={
+            "query": {"terms": {"value.keyword": values}},
+            "_source": ["type", "value", "event_uuid", "disable_correlation"],
+        },
+        scroll="2m",
+        size=500,
+    )
+
+    groups = {}
+    for doc in scroll:
+        groups.setdefault(doc["_source"]["value"], []).append(doc)
+
+    return groups
+
+
+def correlate_value_group(docs, runtimeSettings: RuntimeSettings):
+    size = runtimeSettings.get_value(
+        "correlations.maxCorrelationsPerDoc",
+        runtimeSettings.get_value(
+            "correlations.opensearchFlushBulkSize", MAX_CORRELATIONS_PER_DOC
+        ),
+    )
+
+    for doc in docs:
+        event_uuid = doc["_source"].get("event_uuid")
+        if doc["_source"].get("disable_correlation") or not event_uuid:
+            continue
+
+        hits = [
+            {"_id": target["_id"], "_score": 1.0, "_source": target["_source"]}
+            for target in docs
+            if target["_id"] != doc["_id"]
+            and target["_source"].get("event_uuid") != event_uuid
+        ][:size]
+
+        store_correlations_bulk(doc["_id"], event_uuid, hits, "term", runtimeSettings)
+
+
+def run_term_aggregation_correlations(runtimeSettings: RuntimeSettings):
+    values_correlated = 0
+
+    for values in get_duplicated_values():
+        for docs in get_attributes_by_values(values).values():
+            correlate_value_group(docs, runtimeSettings)
+        values_correlated += len(values)
+
+    flush_bulk_correlations()
+
+    logger.info(
+        "run_term_aggregation_correlations: %s duplicated values correlated",
+        values_correlated,
+    )
+
+    return values_correlated
+
+
+def iter_document_blocks(docs, block_size: int):
+    block = []
+    for doc in docs:
+        block.append(doc)
+        if len(block) >= block_size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def delete_attributes_correlations(attribute_uuids: list):
+    OpenSearchClient = get_opensearch_client()
+
+    query = {
+        "query": {
+            "bool": {
+                "should": [
+                    {"terms": {"source_attribute_uuid.keyword": attribute_uuids}},
+                    {"terms": {"target_attribute_uuid.keyword": attribute_uuids}},
+                ]
+            }
+        }
+    }
+
+    OpenSearchClient.delete_by_query(
+        index="misp-attribute-correlations",
+        body=query,
+        refresh=get_refresh(
+            "correlations.delete_attributes_correlations",
+            index="misp-attribute-correlations",
+            by_query=True,
+        ),
+        ignore=[404],
+    )
+
+
+def build_counterpart_query(doc, match_type, runtimeSettings: RuntimeSettings):
+    """Query for the attributes whose own ``match_type`` search may match
+    ``doc``; their searches are then re-run restricted to ``doc``."""
+    source = doc["_source"]
+    value = source.get("value")
+    if not value or not source.get("event_uuid"):
+        return None
+
+    if match_type == "cidr":
+        # cidr searches match single IPs through expanded.ip
+        ip = (source.get("expanded") or {}).get("ip")
+        if not ip:
+            return None
+        should = [
+            {"term": {"expanded.ip_range": ip}},
+            {
+                "bool": {
+                    "filter": [
+                        {
+                            "terms": {
+                                "type": [
+                                    type_
+                                    for type_ in runtimeSettings.get_value(
+                                        "correlations.possibleCdirAttributeTypes",
+                                        POSSIBLE_CIDR_ATTRIBUTES_TYPES,
+                                    )
+                                    if type_ not in CIDR_RANGE_ATTRIBUTE_TYPES
+                                ]
+                            }
+                        },
+                        {"wildcard": {"value.keyword": "*/*"}},
+                    ]
+                }
+            },
+        ]
+    elif match_type == "prefix":
+        length = runtimeSettings.get_value(
+            "correlations.prefixLength", CORRELATION_PREFIX_LENGTH
+        )
+        # same leading characters, or a shorter value that is a prefix
+        should = [
+            {"prefix": {"value.keyword": value[:length]}},
+            {
+                "terms": {
+                    "value.keyword": [
+                        value[:i] for i in range(1, min(length - 1, len(value)) + 1)
+                    ]
+                }
+            },
+        ]
+    else:
+        return None
+
+    return {
+        "query": {
+            "bool": {
+                "filter": [{"term": {"disable_correlation": False}}],
+                "should": should,
+                "minimum_should_match": 1,
+                "must_not": [
+                    {"term": {"uuid.keyword": doc["_id"]}},
+                    {"term": {"event_uuid": source["event_uuid"]}},
+                ],
+            }
+        }
+    }
+
+
+def correlate_counterparts(docs, runtimeSettings: RuntimeSettings):
+    """Store the cidr/prefix correlations other attributes have towards
+    ``docs``, as a full run correlating those attributes would."""
+    match_types = [
+        match_type
+        for match_type in get_document_match_types(runtimeSettings)
+        if match_type in ASYMMETRIC_MATCH_TYPES
+    ]
+    if not match_types:
+        return
+
+    size = runtimeSettings.get_value(
+        "correlations.maxCorrelationsPerDoc",
+        runtimeSettings.get_value(
+            "correlations.opensearchFlushBulkSize", MAX_CORRELATIONS_PER_DOC
+        ),
+    )
+
+    lookups = []
+    body = []
+    for doc in docs:
+        for match_type in match_types:
+            query = build_counterpart_query(doc, match_type, runtimeSettings)
+            if query is not None:
+                lookups.append((doc, match_type))
+                body.append({"index": "misp-attributes"})
+                body.append({**query, "size": size})
+    if not lookups:
+        return
+
+    # counterpart attribute and match type -> candidate targets
+    counterparts = {}
+    for (doc, match_type), response in zip(lookups, msearch_block(body)):
+        if "error" in response:
+            logger.error(
+                f"correlate_counterparts: {match_type} lookup failed for attribute {doc['_id']}: {response['error']}"
+            )
+            continue
+        for hit in response["hits"]["hits"]:
+            _, targets = counterparts.setdefault(
+                (hit["_id"], match_type), (hit, set())
+            )
+            targets.add(doc["_id"])
+
+    searches = []
+    body = []
+    for (_, lookup_type), (hit, targets) in counterparts.items():
+        for match_type, query in build_document_queries(
+            hit, runtimeSettings, [lookup_type]
+        ):
+            query["query"]["bool"]["filter"] = [
+                {"terms": {"uuid.keyword": sorted(targets)}}
+            ]
+            searches.append((hit, match_type))
+            body.append({"index": "misp-attributes"})
+            body.append({**query, "size": size})
+
+    block_size = max(
+        1,
+        runtimeSettings.get_value("correlations.msearchBlockSize", MSEARCH_BLOCK_SIZE),
+    )
+    for start in range(0, len(searches), block_size):
+        store_msearch_block(
+            searches[start : start + block_size],
+            msearch_block(body[start * 2 : (start + block_size) * 2]),
+            runtimeSettings,
+        )
+
+
+def correlate_attributes_incrementally(docs, runtimeSettings: RuntimeSettings):
+    """Replace the correlations of the given attribute docs in place.
+
+    Existing correlations pointing from or to these attributes are dropped,
+    then each attribute is correlated again. Matches of symmetric match types
+    are also stored in the other direction, which a full run would have
+    produced when correlating the other attribute; cidr and prefix matches
+    towards these attributes are recomputed from the attributes that make
+    them.
+    """
+    if not docs:
+        return
+
+    delete_attributes_correlations([doc["_id"] for doc in docs])
+
+    correlate_documents(
+        [doc for doc in docs if not doc["_source"].get("disable_correlation")],
+        runtimeSettings,
+        reverse=True,
+    )
+    correlate_counterparts(docs, runtimeSettings)
+    flush_bulk_correlations()
+
+
+def correlate_attribute(runtimeSettings: RuntimeSettings, attribute_uuid: str):
+    OpenSearchClient = get_opensearch_client()
+
+    try:
+        doc = OpenSearchClient.get(index="misp-attributes", id=str(attribute_uuid))
+    except NotFoundError:
+        logger.warning(
+            f"correlate_attribute: attribute {attribute_uuid} not found in index"
+        )
+        return False
+
+    correlate_attributes_incrementally([doc], runtimeSettings)
+
+    return True
+
+
+def correlate_attributes(runtimeSettings: RuntimeSettings, attribute_uuids: list):
+    OpenSearchClient = get_opensearch_client()
+
+    block_size = max(
+        1,
+        runtimeSettings.get_value("correlations.msearchBlockSize", MSEARCH_BLOCK_SIZE),
+    )
+
+    for start in range(0, len(attribute_uuids), block_size):
+        response = OpenSearchClient.mget(
+            index="misp-attributes",
+            body={"ids": [str(uuid) for uuid in attribute_uuids[start : start + block_size]]},
+        )
+        correlate_attributes_incrementally(
+            [doc for doc in response["docs"] if doc.get("found")], runtimeSettings
+        )
+
+    return True
+
+
+def get_high_water_mark():
+    value = get_redis_client().get(HIGH_WATER_MARK_KEY)
+    if value is None:
+        return None
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def set_high_water_mark(value: str):
+    if value is None:
+        return
+    get_redis_client().set(HIGH_WATER_MARK_KEY, value)
+
+
+def get_indexed_cutoff():
+    """Write time up to which attributes are visible to searches.
+
+    Attributes are selected by ``indexed_at``, the local write time, as
+    ``@timestamp`` holds the remote timestamp of pulled and feed attributes.
+    """
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+        seconds=INCREMENTAL_CORRELATIONS_LAG
+    )
+    return cutoff.isoformat(timespec="milliseconds")
+
+
+def run_full_correlations(runtimeSettings: RuntimeSettings):
+    high_water_mark = get_indexed_cutoff()
+
+    delete_correlations()
+    run_correlations(runtimeSettings)
+
+    set_high_water_mark(high_water_mark)
+
+    return True
+
+
+def run_incremental_correlations(runtimeSettings: RuntimeSettings):
+    """Correlate only the attributes indexed since the last recorded run.
+
+    Falls back to a full run when no high-water mark has been stored yet.
+    """
+    since = get_high_water_mark()
+    if since is None:
+        return run_full_correlations(runtimeSettings)
+
+    high_water_mark = get_indexed_cutoff()
+
+    block_size = max(
+        1,
+        runtimeSettings.get_value("correlations.msearchBlockSize", MSEARCH_BLOCK_SIZE),
+    )
+
+    processed = 0
+    for block in iter_document_blocks(
+        get_attributes({"since": since, "until": high_water_mark}), block_size
+    ):
+        correlate_attributes_incrementally(block, runtimeSettings)
+        processed += len(block)
+
+    set_high_water_mark(high_water_mark)
+
+    logger.info(
+        "run_incremental_correlations: %s attributes correlated since %s",
+        processed,
+        since,
+    )
+
+    return True
+
 
 def search_correlations(
     query: str = None,
@@ -403,13 +938,74 @@ def get_top_correlated_events(source_event_uuid: str):
     )
 
 
-def run_correlations(runtimeSettings: RuntimeSettings, filters: dict = {}):
+def run_document_correlations(
+    runtimeSettings: RuntimeSettings, filters: dict = {}, match_types=None
+):
+    block_size = max(
+        1,
+        runtimeSettings.get_value("correlations.msearchBlockSize", MSEARCH_BLOCK_SIZE),
+    )
+    concurrency = max(
+        1,
+        runtimeSettings.get_value(
+            "correlations.msearchConcurrency", MSEARCH_CONCURRENCY
+        ),
+    )
 
-    for doc in get_attributes(filters):
-        correlate_document(doc, runtimeSettings)
+    processed = 0
+
+    # Searches run on a small thread pool, but hits are always stored from
+    # this thread so BULK_BUFFER is never shared between workers. At most
+    # `concurrency` blocks are in flight to keep memory bounded.
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {}
+        for block in iter_document_blocks(get_attributes(filters), block_size):
+            searches, body = build_msearch_block(block, runtimeSettings, match_types)
+            processed += len(block)
+            if not searches:
+                continue
+
+            pending[executor.submit(msearch_block, body)] = searches
+
+            if len(pending) >= concurrency:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    store_msearch_block(
+                        pending.pop(future), future.result(), runtimeSettings
+                    )
+
+        for future in list(pending):
+            store_msearch_block(pending.pop(future), future.result(), runtimeSettings)
 
     flush_bulk_correlations()
 
+    return processed
+
+
+def run_correlations(runtimeSettings: RuntimeSettings, filters: dict = {}):
+    started = time.monotonic()
+
+    match_types = get_document_match_types(runtimeSettings)
+    if not filters and TERM_AGGREGATION_MATCH_TYPE in runtimeSettings.get_value(
+        "correlations.matchTypes", []
+    ):
+        run_term_aggregation_correlations(runtimeSettings)
+        match_types = [
+            match_type for match_type in match_types if match_type != "term"
+        ]
+
+    processed = 0
+    if match_types:
+        processed = run_document_correlations(runtimeSettings, filters, match_types)
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        "run_correlations: %s attributes correlated in %.2fs (%.1f attributes/s)",
+        processed,
+        elapsed,
+        processed / elapsed if elapsed > 0 else 0,
+    )
+
     return True
 
 
@@ -541,7 +1137,11 @@ def delete_event_correlations(event_uuid: str):
         OpenSearchClient.delete_by_query(
             index="misp-attribute-correlations",
             body=query,
-            refresh=True,
+            refresh=get_refresh(
+                "correlations.delete_event_correlations",
+                index="misp-attribute-correlations",
+                by_query=True,
+            ),
         )
     except Exception as e:
         raise HTTPException(
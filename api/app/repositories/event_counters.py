@@ -0,0 +1,282 @@
+"""
+Aggregated event ``attribute_count`` / ``object_count`` updates.
+
+Creating or deleting an attribute or an object no longer updates its event
+document directly: the delta is added to a Redis hash (``HINCRBY`` on
+``events:counters``, one field per event and counter) and a flush is
+scheduled. The flush applies the pending deltas with one scripted update per
+event in a single bulk request, so a large import results in a few updates
+of the event instead of one conflicting update per attribute.
+
+Counts that drifted (e.g. deltas lost with a worker) are recomputed from the
+attributes and objects of the events by ``repair_event_counters``.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Iterable, Iterator, Optional
+
+from app.services import event_cache
+from app.services.opensearch import get_opensearch_client
+from app.services.opensearch_refresh import get_refresh
+from app.services.redis import get_redis_client
+from opensearchpy import helpers as opensearch_helpers
+
+logger = logging.getLogger(__name__)
+
+EVENT_COUNTERS_KEY = "events:counters"
+EVENT_COUNTERS_SCHEDULED_KEY = "events:counters:scheduled"
+EVENT_COUNTERS_LOCK_KEY = "events:counters:lock"
+EVENT_COUNTERS_LOCK_TIMEOUT = 300
+EVENT_COUNTERS_DELAY = 5
+EVENT_COUNTERS_PAGE_SIZE = 500
+
+COUNTERS = ("attribute_count", "object_count")
+
+# counters never go below zero, matching the former per-write scripts
+APPLY_DELTAS_SCRIPT = """
+for (entry in params.deltas.entrySet()) {
+    def current = ctx._source[entry.getKey()];
+    long count = (current == null ? 0L : ((Number) current).longValue()) + entry.getValue();
+    ctx._source[entry.getKey()] = count > 0 ? count : 0;
+}
+"""
+
+
+def add_event_counter_deltas(
+    event_uuid: str, attribute_count: int = 0, object_count: int = 0
+) -> None:
+    """Queue changes of the counters of an event and schedule a flush."""
+    from app.worker.tasks import flush_event_counters as flush_task  # noqa: PLC0415
+
+    deltas = {"attribute_count": attribute_count, "object_count": object_count}
+    deltas = {counter: delta for counter, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    RedisClient = get_redis_client()
+    pipeline = RedisClient.pipeline()
+    for counter, delta in deltas.items():
+        pipeline.hincrby(EVENT_COUNTERS_KEY, f"{event_uuid}:{counter}", delta)
+    pipeline.execute()
+
+    # the marker expires on its own in case the scheduled flush is lost
+    if RedisClient.set(
+        EVENT_COUNTERS_SCHEDULED_KEY, 1, nx=True, ex=EVENT_COUNTERS_DELAY + 60
+    ):
+        flush_task.apply_async(countdown=EVENT_COUNTERS_DELAY)
+
+
+def _parse_deltas(fields: dict) -> dict[str, dict[str, int]]:
+    deltas = defaultdict(dict)
+    for field, delta in fields.items():
+        field = field.decode() if isinstance(field, bytes) else field
+        event_uuid, _, counter = field.rpartition(":")
+        if counter in COUNTERS and int(delta):
+            deltas[event_uuid][counter] = int(delta)
+    return dict(deltas)
+
+
+def _requeue(RedisClient, deltas: dict[str, dict[str, int]]) -> None:
+    pipeline = RedisClient.pipeline()
+    for event_uuid, counters in deltas.items():
+        for counter, delta in counters.items():
+            pipeline.hincrby(EVENT_COUNTERS_KEY, f"{event_uuid}:{counter}", delta)
+    pipeline.execute()
+
+
+def _update_action(event_uuid: str, counters: dict[str, int]) -> dict:
+    return {
+        "_op_type": "update",
+        "_index": "misp-events",
+        "_id": event_uuid,
+        "retry_on_conflict": 5,
+        "script": {
+            "source": APPLY_DELTAS_SCRIPT,
+            "lang": "painless",
+            "params": {"deltas": counters},
+        },
+    }
+
+
+def flush_event_counters() -> dict:
+    """
+    Apply the pending counter deltas with one bulk scripted update per event.
+
+    Deltas of updates that failed are queued again; those of events that no
+    longer exist are dropped.
+    """
+    from app.worker.tasks import flush_event_counters as flush_task  # noqa: PLC0415
+
+    RedisClient = get_redis_client()
+    if not RedisClient.set(
+        EVENT_COUNTERS_LOCK_KEY, 1, nx=True, ex=EVENT_COUNTERS_LOCK_TIMEOUT
+    ):
+        # deltas queued meanwhile are picked up by the next flush
+        flush_task.apply_async(countdown=EVENT_COUNTERS_DELAY)
+        return {"status": "skipped"}
+
+    try:
+        RedisClient.delete(EVENT_COUNTERS_SCHEDULED_KEY)
+
+        pipeline = RedisClient.pipeline()
+        pipeline.hgetall(EVENT_COUNTERS_KEY)
+        pipeline.delete(EVENT_COUNTERS_KEY)
+        fields, _ = pipeline.execute()
+        deltas = _parse_deltas(fields)
+        if not deltas:
+            return {"events": 0, "failed": 0}
+
+        try:
+            _, errors = opensearch_helpers.bulk(
+                get_opensearch_client(),
+                (_update_action(uuid, counters) for uuid, counters in deltas.items()),
+                chunk_size=EVENT_COUNTERS_PAGE_SIZE,
+                raise_on_error=False,
+                refresh=get_refresh(
+                    "event_counters.flush_event_counters", index="misp-events"
+                ),
+            )
+        except Exception:
+            _requeue(RedisClient, deltas)
+            raise
+
+        failed = {}
+        for error in errors:
+            item = error.get("update", {})
+            if item.get("status") != 404:
+                failed[item["_id"]] = deltas[item["_id"]]
+        if failed:
+            logger.error(
+                "Failed to update the counters of %s events: %s", len(failed), errors
+            )
+            _requeue(RedisClient, failed)
+
+        event_cache.invalidate_events(deltas)
+        return {"events": len(deltas) - len(failed), "failed": len(failed)}
+    finally:
+        RedisClient.delete(EVENT_COUNTERS_LOCK_KEY)
+
+
+def _iter_event_pages(
+    client, event_uuids: Optional[Iterable[str]], page_size: int
+) -> Iterator[list[dict]]:
+    """Yield pages of event documents sorted by UUID."""
+    query = {"term": {"deleted": False}}
+    if event_uuids is not None:
+        query = {
+            "bool": {
+                "must": [query, {"terms": {"uuid.keyword": list(event_uuids)}}]
+            }
+        }
+
+    search_after = None
+    while True:
+        body = {
+            "query": query,
+            "_source": ["uuid", *COUNTERS],
+            "size": page_size,
+            "sort": [{"uuid.keyword": "asc"}],
+        }
+        if search_after:
+            body["search_after"] = search_after
+        hits = client.search(index="misp-events", body=body)["hits"]["hits"]
+        if not hits:
+            return
+        yield [hit["_source"] for hit in hits]
+        if len(hits) < page_size:
+            return
+        search_after = hits[-1]["sort"]
+
+
+def _count_by_event(
+    client, index: str, event_uuids: list[str], must_not: list
+) -> dict[str, int]:
+    response = client.search(
+        index=index,
+        body={
+            "size": 0,
+            "query": {
+                "bool": {
+                    "filter": [{"terms": {"event_uuid": event_uuids}}],
+                    "must_not": [{"term": {"deleted": True}}, *must_not],
+                }
+            },
+            "aggs": {
+                "events": {"terms": {"field": "event_uuid", "size": len(event_uuids)}}
+            },
+        },
+    )
+    return {
+        bucket["key"]: bucket["doc_count"]
+        for bucket in response["aggregations"]["events"]["buckets"]
+    }
+
+
+def repair_event_counters(
+    event_uuids: Optional[Iterable[str]] = None,
+    page_size: int = EVENT_COUNTERS_PAGE_SIZE,
+) -> dict:
+    """
+    Recompute ``attribute_count`` (attributes outside objects) and
+    ``object_count`` of events and fix the ones that drifted.
+
+    All non-deleted events are checked unless ``event_uuids`` is given.
+    Events with pending deltas are left to the next flush.
+    """
+    client = get_opensearch_client()
+    RedisClient = get_redis_client()
+    client.indices.refresh(
+        index=["misp-attributes", "misp-objects"], ignore_unavailable=True
+    )
+
+    checked = 0
+    repaired = []
+    for events in _iter_event_pages(client, event_uuids, page_size):
+        uuids = [event["uuid"] for event in events]
+        checked += len(uuids)
+        attributes = _count_by_event(
+            client,
+            "misp-attributes",
+            uuids,
+            [{"exists": {"field": "object_uuid"}}],
+        )
+        objects = _count_by_event(client, "misp-objects", uuids, [])
+        pending = RedisClient.hmget(
+            EVENT_COUNTERS_KEY,
+            [f"{uuid}:{counter}" for uuid in uuids for counter in COUNTERS],
+        )
+
+        actions = []
+        for i, event in enumerate(events):
+            if any(pending[i * len(COUNTERS) : (i + 1) * len(COUNTERS)]):
+                continue
+            counts = {
+                "attribute_count": attributes.get(event["uuid"], 0),
+                "object_count": objects.get(event["uuid"], 0),
+            }
+            if any(event.get(counter) != count for counter, count in counts.items()):
+                actions.append(
+                    {
+                        "_op_type": "update",
+                        "_index": "misp-events",
+                        "_id": event["uuid"],
+                        "doc": counts,
+                    }
+                )
+
+        if actions:
+            opensearch_helpers.bulk(
+                client,
+                actions,
+                refresh=get_refresh(
+                    "event_counters.repair_event_counters", index="misp-events"
+                ),
+            )
+            page_repaired = [action["_id"] for action in actions]
+            event_cache.invalidate_events(page_repaired)
+            repaired.extend(page_repaired)
+
+    if repaired:
+        logger.warning("repaired the counters of %s drifted events", len(repaired))
+    return {"checked": checked, "repaired": len(repaired)}
@@ -3,9 +3,11 @@ import math
 import time
 from datetime import datetime
 from uuid import UUID, uuid4
-from typing import Optional, Iterable
+from typing import Optional, Iterable, Iterator
 from app.worker import tasks
+from app.services import event_cache
 from app.services.opensearch import get_opensearch_client
+from app.services.opensearch_refresh import get_refresh
 from app.services.vulnerability_lookup import lookup as vulnerability_lookup
 from app.services.rulezet import lookup as rulezet_lookup
 from app.models import feed as feed_models
@@ -13,6 +15,8 @@ from app.models import tag as tag_models
 from app.models import organisation as org_models
 from app.repositories import tags as tags_repository
 from app.repositories import attributes as attributes_repository
+from app.repositories import event_counters as event_counters_repository
+from app.repositories import retention as retention_repository
 from app.schemas import event as event_schemas
 from app.schemas import user as user_schemas
 from app.schemas import organisations as org_schemas
@@ -65,73 +69,139 @@ def get_events_from_opensearch(
     return Page(items=items, total=total, page=params.page, size=params.size, pages=pages)
 
 
-def get_event_from_opensearch(
-    event_uuid: UUID, full: bool = False
-) -> Optional[event_schemas.Event]:
+# documents fetched per page when loading the content of a full event
+EVENT_CONTENT_PAGE_SIZE = 1000
+EVENT_CONTENT_PIT_KEEP_ALIVE = "2m"
+
+
+def iter_event_content_pages(
+    index: str,
+    query: dict,
+    source: Optional[list[str]] = None,
+    page_size: int = EVENT_CONTENT_PAGE_SIZE,
+    exclude_deleted: bool = False,
+) -> Iterator[list[dict]]:
+    """Yield pages of ``_source`` matching ``query`` in ``index``.
+
+    Pages are read with ``search_after`` over a point in time, so the whole
+    match is returned regardless of the 10k result window and is not
+    affected by concurrent writes. ``source`` projects the returned fields
+    and ``exclude_deleted`` drops soft-deleted documents.
+    """
+    if exclude_deleted:
+        query = {"bool": {"must": [query], "must_not": [{"term": {"deleted": True}}]}}
     client = get_opensearch_client()
+    pit_id = client.create_pit(
+        index=index, keep_alive=EVENT_CONTENT_PIT_KEEP_ALIVE
+    )["pit_id"]
+    try:
+        search_after = None
+        while True:
+            body = {
+                "pit": {"id": pit_id, "keep_alive": EVENT_CONTENT_PIT_KEEP_ALIVE},
+                "query": query,
+                "size": page_size,
+                "sort": [{"uuid.keyword": "asc"}],
+                "track_total_hits": False,
+            }
+            if source is not None:
+                body["_source"] = source
+            if search_after:
+                body["search_after"] = search_after
+            response = client.search(body=body)
+            pit_id = response.get("pit_id", pit_id)
+            hits = response["hits"]["hits"]
+            if not hits:
+                return
+            yield [hit["_source"] for hit in hits]
+            if len(hits) < page_size:
+                return
+            search_after = hits[-1]["sort"]
+    finally:
+        try:
+            client.delete_pit(body={"pit_id": [pit_id]})
+        except Exception as e:
+            logger.warning("Failed to delete point in time: %s", e)
+
+
+def iter_event_attribute_pages(
+    event_uuid,
+    source: Optional[list[str]] = None,
+    page_size: int = EVENT_CONTENT_PAGE_SIZE,
+    standalone: bool = False,
+    exclude_deleted: bool = False,
+) -> Iterator[list[dict]]:
+    """Yield pages of the attributes of an event, object attributes included
+    unless ``standalone`` is set and soft-deleted ones dropped when
+    ``exclude_deleted`` is set."""
+    query = {"bool": {"must": [{"term": {"event_uuid": str(event_uuid)}}]}}
+    if standalone:
+        query["bool"]["must_not"] = [{"exists": {"field": "object_uuid"}}]
+    return iter_event_content_pages(
+        "misp-attributes", query, source, page_size, exclude_deleted=exclude_deleted
+    )
+
 
+def iter_event_object_pages(
+    event_uuid,
+    source: Optional[list[str]] = None,
+    page_size: int = EVENT_CONTENT_PAGE_SIZE,
+) -> Iterator[list[dict]]:
+    """Yield pages of the objects of an event."""
+    return iter_event_content_pages(
+        "misp-objects", {"term": {"event_uuid": str(event_uuid)}}, source, page_size
+    )
+
+
+def _load_event_doc(event_uuid) -> Optional[dict]:
+    client = get_opensearch_client()
     try:
         doc = client.get(index="misp-events", id=str(event_uuid))
-        source = doc["_source"]
     except NotFoundError:
         return None
+    return {
+        "_source": doc["_source"],
+        "_seq_no": doc.get("_seq_no"),
+        "_primary_term": doc.get("_primary_term"),
+    }
+
 
+def get_event_from_opensearch(
+    event_uuid: UUID, full: bool = False, page_size: int = EVENT_CONTENT_PAGE_SIZE
+) -> Optional[event_schemas.Event]:
+    # full events are assembled from fresh reads, the event metadata alone is
+    # served through the event cache
     if full:
-        uuid_str = str(event_uuid)
-
-        # Fetch standalone attributes (no parent object)
-        attr_resp = client.search(
-            index="misp-attributes",
-            body={
-                "query": {
-                    "bool": {
-                        "must": [{"term": {"event_uuid": uuid_str}}],
-                        "must_not": [{"exists": {"field": "object_uuid"}}],
-                    }
-                },
-                "size": 10000,
-            },
-        )
-        source["attributes"] = [
-            h["_source"] for h in attr_resp["hits"]["hits"]
-        ]
-
-        # Fetch objects
-        obj_resp = client.search(
-            index="misp-objects",
-            body={
-                "query": {"term": {"event_uuid": uuid_str}},
-                "size": 10000,
-            },
+        doc = _load_event_doc(event_uuid)
+    else:
+        doc = event_cache.get_event_doc(
+            str(event_uuid), lambda: _load_event_doc(event_uuid)
         )
-        obj_hits = obj_resp["hits"]["hits"]
-
-        if obj_hits:
-            # Batch-fetch attributes belonging to these objects
-            object_uuids = [str(h["_source"]["uuid"]) for h in obj_hits]
-            obj_attr_resp = client.search(
-                index="misp-attributes",
-                body={
-                    "query": {"terms": {"object_uuid": object_uuids}},
-                    "size": 10000,
-                },
-            )
-            attrs_by_obj = {}
-            for h in obj_attr_resp["hits"]["hits"]:
-                src = h["_source"]
-                key = src.get("object_uuid")
-                if key:
-                    attrs_by_obj.setdefault(key, []).append(src)
-
-            for hit in obj_hits:
-                obj_src = hit["_source"]
-                obj_uuid = str(obj_src.get("uuid", ""))
-                obj_src["attributes"] = attrs_by_obj.get(obj_uuid, [])
-                obj_src.setdefault("object_references", [])
+    if doc is None:
+        return None
+    source = doc["_source"]
 
-            source["objects"] = [h["_source"] for h in obj_hits]
-        else:
-            source["objects"] = []
+    if full:
+        objects = {}
+        for page in iter_event_object_pages(event_uuid, page_size=page_size):
+            for obj_src in page:
+                obj_src["attributes"] = []
+                obj_src.setdefault("object_references", [])
+                objects[str(obj_src.get("uuid", ""))] = obj_src
+
+        # one pass over the attributes of the event, object attributes are
+        # attached to their object
+        attributes = []
+        for page in iter_event_attribute_pages(event_uuid, page_size=page_size):
+            for attr_src in page:
+                object_uuid = attr_src.get("object_uuid")
+                if not object_uuid:
+                    attributes.append(attr_src)
+                elif str(object_uuid) in objects:
+                    objects[str(object_uuid)]["attributes"].append(attr_src)
+
+        source["attributes"] = attributes
+        source["objects"] = list(objects.values())
     else:
         source.setdefault("attributes", [])
         source.setdefault("objects", [])
@@ -294,25 +364,35 @@ def get_event_uuids_from_opensearch() -> list[str]:
     return uuids
 
 
+def iter_events_from_opensearch(
+    query: dict, fields: list[str], page_size: int = 500
+) -> Iterator[list[dict]]:
+    """Yield pages of event ``_source`` matching ``query``, without the 10k window."""
+    client = get_opensearch_client()
+    search_after = None
+    while True:
+        body = {
+            "query": query,
+            "_source": fields,
+            "size": page_size,
+            "sort": [{"uuid.keyword": "asc"}],
+        }
+        if search_after:
+            body["search_after"] = search_after
+        response = client.search(index="misp-events", body=body)
+        hits = response["hits"]["hits"]
+        if not hits:
+            break
+        yield [hit["_source"] for hit in hits]
+        if len(hits) < page_size:
+            break
+        search_after = hits[-1]["sort"]
+
+
 def count_events_for_retention(period_days: int, exempt_tags: list[str]) -> dict:
     client = get_opensearch_client()
     cutoff = int(time.time()) - period_days * 86400
-    must_not = (
-        [{"match_phrase": {"tags.name": tag}} for tag in exempt_tags]
-        if exempt_tags
-        else []
-    )
-    body = {
-        "query": {
-            "bool": {
-                "must": [
-                    {"range": {"timestamp": {"lt": cutoff}}},
-                    {"term": {"deleted": False}},
-                ],
-                "must_not": must_not,
-            }
-        }
-    }
+    body = {"query": retention_repository.expired_events_query(cutoff, exempt_tags)}
     response = client.count(index="misp-events", body=body)
     return {"count": response["count"], "period_days": period_days}
 
@@ -336,6 +416,22 @@ def get_events_by_uuids_from_opensearch(uuids) -> list[event_schemas.Event]:
     return events
 
 
+def get_event_timestamps_by_uuids(uuids) -> dict:
+    """Return ``{uuid: timestamp}`` for the given events found in OpenSearch."""
+    client = get_opensearch_client()
+    uuids = [str(u) for u in uuids]
+    if not uuids:
+        return {}
+    response = client.mget(
+        index="misp-events", body={"ids": uuids}, _source_includes=["timestamp"]
+    )
+    return {
+        doc["_id"]: doc["_source"].get("timestamp")
+        for doc in response["docs"]
+        if doc.get("found")
+    }
+
+
 def create_event(db: Session, event: event_schemas.EventCreate) -> event_schemas.Event:
     client = get_opensearch_client()
     event_uuid = str(event.uuid or uuid4())
@@ -376,7 +472,8 @@ def create_event(db: Session, event: event_schemas.EventCreate) -> event_schemas
         "@timestamp": datetime.fromtimestamp(ts).isoformat(),
     }
 
-    client.index(index="misp-events", id=event_uuid, body=event_doc, refresh=True)
+    client.index(index="misp-events", id=event_uuid, body=event_doc, refresh=get_refresh("events.create_event", index="misp-events"))
+    event_cache.invalidate_event(event_uuid)
     tasks.handle_created_event.delay(event_uuid)
 
     return event_schemas.Event.model_validate(event_doc)
@@ -417,7 +514,8 @@ def create_event_from_pulled_event(pulled_event: MISPEvent) -> event_schemas.Eve
         "@timestamp": datetime.fromtimestamp(ts).isoformat(),
     }
 
-    client.index(index="misp-events", id=event_uuid, body=event_doc, refresh=True)
+    client.index(index="misp-events", id=event_uuid, body=event_doc, refresh=get_refresh("events.create_event_from_pulled_event", index="misp-events"))
+    event_cache.invalidate_event(event_uuid)
     tasks.handle_created_event.delay(event_uuid)
 
     return event_schemas.Event.model_validate(event_doc)
@@ -446,7 +544,8 @@ def update_event_from_pulled_event(
         "@timestamp": datetime.fromtimestamp(ts).isoformat(),
     }
 
-    client.update(index="misp-events", id=event_uuid, body={"doc": patch}, refresh=True)
+    client.update(index="misp-events", id=event_uuid, body={"doc": patch}, refresh=get_refresh("events.update_event_from_pulled_event", index="misp-events"))
+    event_cache.invalidate_event(event_uuid)
     tasks.handle_updated_event.delay(event_uuid)
 
     return get_event_from_opensearch(UUID(event_uuid))
@@ -501,7 +600,8 @@ def create_event_from_fetched_event(
         "@timestamp": datetime.fromtimestamp(ts).isoformat(),
     }
 
-    client.index(index="misp-events", id=event_uuid, body=event_doc, refresh=True)
+    client.index(index="misp-events", id=event_uuid, body=event_doc, refresh=get_refresh("events.create_event_from_fetched_event", index="misp-events"))
+    event_cache.invalidate_event(event_uuid)
 
     # process tags into OS event doc
     for tag in fetched_event.tags:
@@ -565,7 +665,8 @@ def update_event_from_fetched_event(
         "@timestamp": datetime.fromtimestamp(ts).isoformat(),
     }
 
-    client.update(index="misp-events", id=event_uuid, body={"doc": patch}, refresh=True)
+    client.update(index="misp-events", id=event_uuid, body={"doc": patch}, refresh=get_refresh("events.update_event_from_fetched_event", index="misp-events"))
+    event_cache.invalidate_event(event_uuid)
 
     # process tags
     for tag in fetched_event.tags:
@@ -597,7 +698,8 @@ def update_event(db: Session, event_uuid: UUID, event: event_schemas.EventUpdate
         if hasattr(v, "value"):
             patch[k] = v.value
 
-    client.update(index="misp-events", id=str(os_event.uuid), body={"doc": patch}, refresh=True)
+    client.update(index="misp-events", id=str(os_event.uuid), body={"doc": patch}, refresh=get_refresh("events.update_event", index="misp-events"))
+    event_cache.invalidate_event(str(os_event.uuid))
     tasks.handle_updated_event.delay(str(os_event.uuid))
 
     return get_event_from_opensearch(os_event.uuid)
@@ -616,53 +718,24 @@ def delete_event(db: Session, event_uuid: UUID, force: bool = False) -> None:
         return
 
     # Soft delete: mark deleted=True in OS but keep the document so it remains searchable
-    client.update(index="misp-events", id=event_uuid, body={"doc": {"deleted": True}}, refresh=True)
+    client.update(index="misp-events", id=event_uuid, body={"doc": {"deleted": True}}, refresh=get_refresh("events.delete_event", index="misp-events"))
+    event_cache.invalidate_event(event_uuid)
 
 
 def increment_attribute_count(db: Session, event_uuid: str, attributes_count: int = 1) -> None:
-    client = get_opensearch_client()
-    client.update(
-        index="misp-events",
-        id=event_uuid,
-        body={"script": {"source": "ctx._source.attribute_count += params.count", "lang": "painless", "params": {"count": attributes_count}}},
-        retry_on_conflict=5,
-        refresh=True,
-    )
+    event_counters_repository.add_event_counter_deltas(event_uuid, attribute_count=attributes_count)
 
 
 def decrement_attribute_count(db: Session, event_uuid: str, attributes_count: int = 1) -> None:
-    client = get_opensearch_client()
-    client.update(
-        index="misp-events",
-        id=event_uuid,
-        body={"script": {"source": "if (ctx._source.attribute_count > 0) { ctx._source.attribute_count -= params.count; }", "lang": "painless", "params": {"count": attributes_count}}},
-        retry_on_conflict=5,
-        refresh=True,
-    )
+    event_counters_repository.add_event_counter_deltas(event_uuid, attribute_count=-attributes_count)
 
 
 def increment_object_count(db: Session, event_uuid: str, objects_count: int = 1) -> None:
-    client = get_opensearch_client()
-    client.update_by_query(
-        index="misp-events",
-        body={
-            "script": {"source": f"ctx._source.object_count += {objects_count}", "lang": "painless"},
-            "query": {"term": {"uuid.keyword": event_uuid}},
-        },
-        refresh=True,
-    )
+    event_counters_repository.add_event_counter_deltas(event_uuid, object_count=objects_count)
 
 
 def decrement_object_count(db: Session, event_uuid: str, objects_count: int = 1) -> None:
-    client = get_opensearch_client()
-    client.update_by_query(
-        index="misp-events",
-        body={
-            "script": {"source": "if (ctx._source.object_count > 0) { ctx._source.object_count -= 1; } else { ctx._source.object_count = 0; }", "lang": "painless"},
-            "query": {"term": {"uuid.keyword": event_uuid}},
-        },
-        refresh=True,
-    )
+    event_counters_repository.add_event_counter_deltas(event_uuid, object_count=-objects_count)
 
 
 def publish_event(event: event_schemas.Event) -> event_schemas.Event:
@@ -671,7 +744,8 @@ def publish_event(event: event_schemas.Event) -> event_schemas.Event:
         return event
 
     patch = {"published": True, "publish_timestamp": int(time.time())}
-    client.update(index="misp-events", id=str(event.uuid), body={"doc": patch}, refresh=True)
+    client.update(index="misp-events", id=str(event.uuid), body={"doc": patch}, refresh=get_refresh("events.publish_event", index="misp-events"))
+    event_cache.invalidate_event(str(event.uuid))
 
     tasks.handle_published_event.delay(str(event.uuid))
 
@@ -683,7 +757,8 @@ def unpublish_event(event: event_schemas.Event) -> event_schemas.Event:
     if not event.published:
         return event
 
-    client.update(index="misp-events", id=str(event.uuid), body={"doc": {"published": False}}, refresh=True)
+    client.update(index="misp-events", id=str(event.uuid), body={"doc": {"published": False}}, refresh=get_refresh("events.unpublish_event", index="misp-events"))
+    event_cache.invalidate_event(str(event.uuid))
 
     tasks.handle_unpublished_event.delay(str(event.uuid))
 
@@ -698,8 +773,9 @@ def toggle_event_correlation(event: event_schemas.Event) -> event_schemas.Event:
         index="misp-events",
         id=str(event.uuid),
         body={"doc": {"disable_correlation": new_val}},
-        refresh=True,
+        refresh=get_refresh("events.toggle_event_correlation", index="misp-events"),
     )
+    event_cache.invalidate_event(str(event.uuid))
 
     tasks.handle_toggled_event_correlation.delay(str(event.uuid), new_val)
 
@@ -714,21 +790,26 @@ def import_data(db: Session, event: event_schemas.Event, data: dict):
     if "attributes" in data:
         total_attributes = len(data["attributes"])
 
+        attributes = []
         for raw_attribute in data["attributes"]:
             try:
-                attribute = attribute_schemas.AttributeCreate(
-                    event_uuid=event.uuid,
-                    category=raw_attribute.get("category", "External analysis"),
-                    type=raw_attribute["type"],
-                    value=raw_attribute["value"],
-                    distribution=event_schemas.DistributionLevel.INHERIT_EVENT,
+                attributes.append(
+                    attribute_schemas.AttributeCreate(
+                        event_uuid=event.uuid,
+                        category=raw_attribute.get("category", "External analysis"),
+                        type=raw_attribute["type"],
+                        value=raw_attribute["value"],
+                        distribution=event_schemas.DistributionLevel.INHERIT_EVENT,
+                    )
                 )
-                attributes_repository.create_attribute(db, attribute)
-                total_imported_attributes += 1
             except Exception as e:
                 logger.error(f"Error importing attribute: {e}")
                 continue
 
+        total_imported_attributes = len(
+            attributes_repository.create_attributes_bulk(db, attributes)
+        )
+
     return {
         "message": f"Imported {total_imported_attributes} out of {total_attributes} attributes.",
         "imported_attributes": total_imported_attributes,
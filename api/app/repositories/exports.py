@@ -1,5 +1,10 @@
 import logging
+import queue
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional
 from uuid import uuid4
 
 from fastapi_pagination.ext.sqlalchemy import paginate
@@ -12,8 +17,9 @@ from app.schemas import export as export_schemas
 from app.services.exports import converters
 from app.services.exports_storage import \
     delete_export as delete_export_artifact
-from app.services.exports_storage import store_export
+from app.services.exports_storage import store_export, store_export_file
 from app.services.opensearch import get_opensearch_client
+from app.services.runtime_settings import RuntimeSettings
 
 logger = logging.getLogger(__name__)
 
@@ -79,9 +85,20 @@ INDEX_MAP = {
     "events": "misp-events",
 }
 
-# Safety cap so a broad query can't exhaust worker memory.
+# Safety cap so a broad query can't exhaust worker memory. Only applies to the
+# misp format, built in memory; json / ndjson / csv / stix are streamed and
+# capped by the "exports.maxRecords" runtime setting instead (0 = no cap).
 MAX_EXPORT_RECORDS = 100_000
 
+EXPORT_SCROLL_SIZE = 500
+# Exports smaller than this are read with a single scroll cursor; larger ones
+# are split into "exports.scrollSlices" sliced scrolls read in parallel.
+SLICED_SCROLL_MIN_RECORDS = 10_000
+# Records written between two progress updates of the export row.
+EXPORT_PROGRESS_INTERVAL = 10_000
+
+_SLICE_DONE = object()
+
 
 def get_exports(
     db: Session, user_id: int, params: export_schemas.ExportQueryParams = None
@@ -197,32 +214,141 @@ def delete_export(db: Session, export_id: int, user_id: int):
     return {"status": "success"}
 
 
-def _fetch_hits(index: str, query: str) -> list[dict]:
-    """Scan all documents matching the query_string, capped at MAX_EXPORT_RECORDS."""
+def _export_query(query: str) -> dict:
+    return {
+        "query": {
+            "bool": {
+                "must": [{"query_string": {"query": query}}],
+                # soft-deleted documents shouldn't appear in exports
+                "must_not": [{"term": {"deleted": True}}],
+            }
+        }
+    }
+
+
+def _count_hits(index: str, query: str) -> int:
+    client = get_opensearch_client()
+    return client.count(index=index, body=_export_query(query))["count"]
+
+
+def _put_until_stopped(out: queue.Queue, item, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _scan_slice(
+    client, index: str, body: dict, slice_id: int, slices: int, out, stop
+) -> None:
+    """Feed the documents of one scroll slice into ``out`` until exhausted or
+    until the consumer stops reading."""
+    try:
+        for doc in opensearch_helpers.scan(
+            client=client,
+            index=index,
+            query={**body, "slice": {"id": slice_id, "max": slices}},
+            scroll="2m",
+            size=EXPORT_SCROLL_SIZE,
+        ):
+            if not _put_until_stopped(out, doc, stop):
+                return
+    except Exception as e:
+        _put_until_stopped(out, e, stop)
+    finally:
+        _put_until_stopped(out, _SLICE_DONE, stop)
+
+
+def _scan_docs(index: str, body: dict, slices: int = 1) -> Iterator[dict]:
+    """Scan the documents matching ``body``, in parallel sliced scrolls when
+    ``slices`` > 1. Sliced documents are yielded in arrival order."""
     client = get_opensearch_client()
-    body = {"query": {"query_string": {"query": query}}}
-    hits: list[dict] = []
-    for doc in opensearch_helpers.scan(
-        client=client,
-        index=index,
-        query=body,
-        scroll="2m",
-        size=500,
-    ):
+    if slices <= 1:
+        yield from opensearch_helpers.scan(
+            client=client,
+            index=index,
+            query=body,
+            scroll="2m",
+            size=EXPORT_SCROLL_SIZE,
+        )
+        return
+
+    out = queue.Queue(maxsize=slices * EXPORT_SCROLL_SIZE)
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=slices) as executor:
+        for slice_id in range(slices):
+            executor.submit(
+                _scan_slice, client, index, body, slice_id, slices, out, stop
+            )
+        try:
+            running = slices
+            while running:
+                item = out.get()
+                if item is _SLICE_DONE:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            # unblocks the slices when the consumer stops early or fails
+            stop.set()
+
+
+def _iter_hits(
+    index: str, query: str, limit: Optional[int] = None, slices: int = 1
+) -> Iterator[dict]:
+    """Scan the documents matching the query_string, stopping after ``limit``."""
+    count = 0
+    for doc in _scan_docs(index, _export_query(query), slices):
         source = doc.get("_source")
         if source is None:
             continue
-        # Skip soft-deleted documents — they shouldn't appear in exports.
         if source.get("deleted"):
             continue
-        hits.append(source)
-        if len(hits) >= MAX_EXPORT_RECORDS:
+        if limit and count >= limit:
             logger.warning(
-                "Export hit the %s record cap; results truncated.",
-                MAX_EXPORT_RECORDS,
+                "Export hit the %s record cap; results truncated.", limit
             )
-            break
-    return hits
+            return
+        yield source
+        count += 1
+
+
+def _track_progress(
+    db: Session, db_export: export_models.Export, hits: Iterable[dict]
+) -> Iterator[dict]:
+    """Record on the export row how many documents have been read so far."""
+    done = 0
+    for hit in hits:
+        yield hit
+        done += 1
+        if done % EXPORT_PROGRESS_INTERVAL == 0:
+            db_export.progress_done = done
+            db.commit()
+    db_export.progress_done = done
+
+
+def _write_export(
+    db_export: export_models.Export, hits: Iterable[dict], **options
+) -> tuple[str, int, int]:
+    """Stream the documents of a json / ndjson / csv / stix export to storage
+    through a temporary file.
+
+    Returns:
+        Tuple of (stored key, file size, record count).
+    """
+    with tempfile.TemporaryFile() as spool:
+        record_count, extension, _content_type = converters.write(
+            db_export.format, hits, db_export.index_target, spool, **options
+        )
+        file_size = spool.tell()
+        stored_key = store_export_file(f"export-{db_export.id}.{extension}", spool)
+
+    return stored_key, file_size, record_count
 
 
 def _to_misp_json(
@@ -245,27 +371,31 @@ def _to_misp_json(
     from app.schemas import attribute as attribute_schemas
     from app.schemas import event as event_schemas
 
-    attributes: list = []
-    if index_target == "events":
-        # Pull the full events (with their attributes) and flatten them.
+    def _attribute_sources():
+        if index_target != "events":
+            yield from hits
+            return
+
+        # Page through every attribute of the matching events and flatten them.
         from app.repositories import events as events_repository
 
-        raw_uuids = [h.get("uuid") for h in hits]
-        ordered_uuids, seen = [], set()
-        for u in raw_uuids:
-            if u and u not in seen:
-                seen.add(u)
-                ordered_uuids.append(u)
-        for start in range(0, len(ordered_uuids), 1000):
-            chunk = ordered_uuids[start : start + 1000]
-            for event in events_repository.get_events_by_uuids(db, chunk):
-                attributes.extend(event.attributes)
-    else:
-        for source in hits:
-            try:
-                attributes.append(attribute_schemas.Attribute.model_validate(source))
-            except Exception as e:  # skip malformed rows
-                logger.warning("Skipping attribute in MISP export: %s", e)
+        seen = set()
+        for hit in hits:
+            event_uuid = hit.get("uuid")
+            if not event_uuid or event_uuid in seen:
+                continue
+            seen.add(event_uuid)
+            for page in events_repository.iter_event_attribute_pages(
+                event_uuid, exclude_deleted=True
+            ):
+                yield from page
+
+    attributes: list = []
+    for source in _attribute_sources():
+        try:
+            attributes.append(attribute_schemas.Attribute.model_validate(source))
+        except Exception as e:  # skip malformed rows
+            logger.warning("Skipping attribute in MISP export: %s", e)
 
     misp_event = event_schemas.Event(
         info=name,
@@ -346,33 +476,67 @@ def run_export(db: Session, export_id: int) -> None:
     db_export.status = "running"
     db_export.started_at = datetime.now(timezone.utc)
     db_export.error = None
+    db_export.progress_done = 0
+    db_export.progress_total = None
     db.commit()
 
     try:
         index = INDEX_MAP.get(db_export.index_target, "misp-attributes")
-        hits = _fetch_hits(index, db_export.query)
-
-        if db_export.format == "misp":
-            # MISP format merges all matches into one event via the server-push
-            # serializer; record_count reflects the attributes in that event.
-            content, extension, _content_type, record_count = _to_misp_json(
-                db,
-                hits,
-                db_export.index_target,
-                db_export.name,
-                db_export.distribution,
-            )
+        runtime_settings = RuntimeSettings(db)
+        streamed = db_export.format in converters.STREAMING_WRITERS
+        if streamed:
+            limit = int(runtime_settings.get_value("exports.maxRecords", 0) or 0)
         else:
-            content, extension, _content_type = converters.convert(
-                db_export.format, hits, db_export.index_target
+            limit = MAX_EXPORT_RECORDS
+
+        total = _count_hits(index, db_export.query)
+        if limit:
+            total = min(total, limit)
+        slices = 1
+        if total >= SLICED_SCROLL_MIN_RECORDS:
+            slices = max(1, int(runtime_settings.get_value("exports.scrollSlices", 4)))
+        db_export.progress_total = total
+        db.commit()
+
+        hits = _track_progress(
+            db, db_export, _iter_hits(index, db_export.query, limit or None, slices)
+        )
+
+        if streamed:
+            options = {}
+            if db_export.format == "stix":
+                options["workers"] = int(
+                    runtime_settings.get_value("exports.stixWorkers", 0) or 0
+                )
+            stored_key, file_size, record_count = _write_export(
+                db_export, hits, **options
             )
-            record_count = len(hits)
+        else:
+            hits = list(hits)
+
+            if db_export.format == "misp":
+                # MISP format merges all matches into one event via the
+                # server-push serializer; record_count reflects the attributes
+                # in that event.
+                content, extension, _content_type, record_count = _to_misp_json(
+                    db,
+                    hits,
+                    db_export.index_target,
+                    db_export.name,
+                    db_export.distribution,
+                )
+            else:
+                content, extension, _content_type = converters.convert(
+                    db_export.format, hits, db_export.index_target
+                )
+                record_count = len(hits)
 
-        storage_key = f"export-{db_export.id}.{extension}"
-        stored_key = store_export(storage_key, content)
+            storage_key = f"export-{db_export.id}.{extension}"
+            stored_key = store_export(storage_key, content)
+            file_size = len(content)
 
         db_export.storage_key = stored_key
-        db_export.file_size = len(content)
+        db_export.file_size = file_size
         db_export.record_count = record_count
         db_export.status = "completed"
         db_export.finished_at = datetime.now(timezone.utc)
@@ -382,7 +546,7 @@ def run_export(db: Session, export_id: int) -> None:
             "Export %s completed: %s records, %s bytes",
             export_id,
             record_count,
-            len(content),
+            file_size,
         )
     except Exception as e:
         logger.exception("Export %s failed", export_id)
@@ -1,13 +1,19 @@
+import hashlib
 import io
 import os
 import logging
 import tarfile
+import tempfile
+import time
 import uuid as uuid_lib
 import zipfile
 
+import httpx
+import ijson
 import requests
 from app.models import feed as feed_models
 from app.models import event as event_models
+from app.repositories import attributes as attributes_repository
 from app.repositories import sync as sync_repository
 from app.repositories import events as events_repository
 from app.repositories import organisations as organisations_repository
@@ -15,18 +21,42 @@ from app.schemas import feed as feed_schemas
 from app.schemas import user as user_schemas
 from app.schemas import attribute as attribute_schemas
 from app.schemas import event as event_schemas
-from app.services.attachments import get_attachment
+from app.services.opensearch import get_opensearch_client
+from app.services.runtime_settings import RuntimeSettings
+from app.services.redis import get_redis_client
+from app.services.attachments import (
+    get_attachment,
+    iter_attachment_lines,
+    open_attachment,
+)
 from app.worker import tasks
 from fastapi import HTTPException, UploadFile, status
+from opensearchpy import helpers as opensearch_helpers
 from pymisp import MISPEvent
 from sqlalchemy.orm import Session
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from itertools import islice
+from typing import Iterable, Iterator
 import csv
 import json
 
 logger = logging.getLogger(__name__)
 
 USER_AGENT = "misp-workbench/" + os.environ.get("APP_VERSION", "")
+FEED_STREAM_CHUNK_SIZE = 64 * 1024
+FEED_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+FEED_HTTP_CACHE_KEY = "feeds:http_cache:{feed_id}"
+FEED_HTTP_CACHE_STATS_KEY = "feeds:http_cache:stats"
+FEED_HTTP_CACHE_PENDING_KEY = "feeds:http_cache:{feed_id}:pending:{token}"
+FEED_HTTP_CACHE_PENDING_TTL = 24 * 60 * 60
+FEED_DELTA_KEY = "feeds:delta:{feed_id}:{event_uuid}"
+FEED_DELTA_WRITE_CHUNK_SIZE = 10000
+FEED_EVENTS_BATCH_SIZE = 100
+FEED_FETCH_CONCURRENCY = 8
+FEED_FETCH_RETRIES = 3
+FEED_FETCH_RETRY_STATUSES = {429, 500, 502, 503, 504}
+FEED_FETCH_TIMEOUT = 60.0
 
 LOCAL_FILE_PREFIX = "feed-uploads/"
 MAX_UPLOAD_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB
@@ -97,6 +127,10 @@ def update_feed(
     db.commit()
     db.refresh(db_feed)
 
+    # url, headers or parsing settings may have changed, so the next fetch
+    # must process the feed in full
+    clear_feed_http_cache(feed_id)
+
     return db_feed
 
 
@@ -111,6 +145,8 @@ def delete_feed(db: Session, feed_id: int) -> None:
     db.delete(db_feed)
     db.commit()
 
+    clear_feed_http_cache(feed_id)
+
 
 def build_feed_headers(feed) -> dict:
     headers = {"User-Agent": USER_AGENT}
@@ -119,6 +155,165 @@ def build_feed_headers(feed) -> dict:
     return headers
 
 
+def get_feed_http_cache(feed_id: int) -> dict:
+    return get_redis_client().hgetall(FEED_HTTP_CACHE_KEY.format(feed_id=feed_id))
+
+
+def store_feed_http_cache(feed_id: int, cache: dict, rows: int = None) -> None:
+    """Remember the validators of a fully processed feed download."""
+    mapping = {key: value for key, value in cache.items() if value is not None}
+    if rows is not None:
+        mapping["rows"] = rows
+
+    key = FEED_HTTP_CACHE_KEY.format(feed_id=feed_id)
+    pipe = get_redis_client().pipeline()
+    pipe.delete(key)
+    if mapping:
+        pipe.hset(key, mapping=mapping)
+    pipe.execute()
+
+
+def stage_feed_http_cache(feed_id: int, cache: dict, rows: int, batches: int) -> str:
+    """Hold the validators of a MISP feed manifest until all the event batches
+    enqueued for it are processed, see ``complete_feed_http_cache_batch``."""
+    token = uuid_lib.uuid4().hex
+    mapping = {key: value for key, value in cache.items() if value is not None}
+    mapping.update(rows=rows, batches=batches)
+
+    key = FEED_HTTP_CACHE_PENDING_KEY.format(feed_id=feed_id, token=token)
+    pipe = get_redis_client().pipeline()
+    pipe.hset(key, mapping=mapping)
+    # validators of a fetch whose batches never all complete are dropped
+    pipe.expire(key, FEED_HTTP_CACHE_PENDING_TTL)
+    pipe.execute()
+    return token
+
+
+def complete_feed_http_cache_batch(feed_id: int, token: str, failed: bool) -> None:
+    """Store the staged validators once the last batch of a fetch succeeded.
+
+    A failed batch discards them, so the next fetch processes the manifest
+    again instead of skipping it as unchanged.
+    """
+    if token is None:
+        return
+
+    RedisClient = get_redis_client()
+    key = FEED_HTTP_CACHE_PENDING_KEY.format(feed_id=feed_id, token=token)
+    if failed:
+        RedisClient.delete(key)
+        return
+
+    remaining = RedisClient.hincrby(key, "batches", -1)
+    if remaining > 0:
+        return
+
+    pending = RedisClient.hgetall(key)
+    RedisClient.delete(key)
+    # a negative count means the validators were discarded or expired
+    if remaining < 0 or "sha256" not in pending:
+        return
+
+    validators = {
+        field: pending.get(field)
+        for field in ("etag", "last_modified", "sha256", "bytes")
+    }
+    store_feed_http_cache(feed_id, validators, rows=pending.get("rows"))
+
+
+def clear_feed_http_cache(feed_id: int) -> None:
+    get_redis_client().delete(FEED_HTTP_CACHE_KEY.format(feed_id=feed_id))
+
+
+def build_conditional_headers(cache: dict) -> dict:
+    headers = {}
+    if cache.get("etag"):
+        headers["If-None-Match"] = cache["etag"]
+    if cache.get("last_modified"):
+        headers["If-Modified-Since"] = cache["last_modified"]
+    return headers
+
+
+def record_unchanged_feed(cache: dict, downloaded: bool = False) -> None:
+    pipe = get_redis_client().pipeline()
+    pipe.hincrby(FEED_HTTP_CACHE_STATS_KEY, "unchanged", 1)
+    pipe.hincrby(FEED_HTTP_CACHE_STATS_KEY, "rows_saved", int(cache.get("rows") or 0))
+    if not downloaded:
+        pipe.hincrby(FEED_HTTP_CACHE_STATS_KEY, "bytes_saved", int(cache.get("bytes") or 0))
+    pipe.execute()
+
+
+def get_feed_http_cache_stats() -> dict:
+    stats = get_redis_client().hgetall(FEED_HTTP_CACHE_STATS_KEY)
+    return {
+        key: int(stats.get(key) or 0)
+        for key in ("unchanged", "bytes_saved", "rows_saved")
+    }
+
+
+def _feed_cache_validators(response, content_hash: str, size: int) -> dict:
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "sha256": content_hash,
+        "bytes": size,
+    }
+
+
+def download_feed_content(feed) -> dict:
+    """Conditionally download a network feed into a spooled temporary file.
+
+    Sends the cached ``If-None-Match``/``If-Modified-Since`` validators and
+    hashes the body while spooling it, so a 304 or a byte-identical body
+    is reported as ``unchanged`` before any row is parsed.  On change the
+    caller processes ``content`` and then persists ``cache`` with
+    ``store_feed_http_cache``.
+    """
+    cache = get_feed_http_cache(feed.id)
+    headers = build_feed_headers(feed)
+    headers.update(build_conditional_headers(cache))
+
+    try:
+        response = requests.get(feed.url, headers=headers, stream=True)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to fetch feed: {str(e)}",
+        )
+
+    with response:
+        if response.status_code == 304:
+            record_unchanged_feed(cache)
+            return {"unchanged": True, "content": None, "cache": cache}
+
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Failed to fetch feed: {response.text}",
+            )
+
+        # let urllib3 undo any Content-Encoding while we read the raw body
+        response.raw.decode_content = True
+        content = tempfile.SpooledTemporaryFile(max_size=FEED_SPOOL_MAX_SIZE)
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in iter(lambda: response.raw.read(FEED_STREAM_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            content.write(chunk)
+            size += len(chunk)
+
+        validators = _feed_cache_validators(response, digest.hexdigest(), size)
+
+    if cache.get("sha256") == validators["sha256"]:
+        content.close()
+        record_unchanged_feed(cache, downloaded=True)
+        store_feed_http_cache(feed.id, validators, rows=cache.get("rows"))
+        return {"unchanged": True, "content": None, "cache": cache}
+
+    content.seek(0)
+    return {"unchanged": False, "content": content, "cache": validators}
+
+
 def store_feed_upload(file: UploadFile, source_format: str) -> dict:
     """Persist an uploaded feed file to storage.
 
@@ -243,12 +438,44 @@ def _normalize_misp_member_name(path: str):
     return None
 
 
+def filter_feed_lines(lines: Iterable) -> Iterator[str]:
+    """Decode raw feed lines, dropping blank lines and ``#`` comments."""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if line.strip() and not line.strip().startswith("#"):
+            yield line
+
+
+def _iter_stream_lines(stream) -> Iterator[bytes]:
+    """Split a binary stream into lines, reading it in fixed-size chunks."""
+    pending = b""
+    while True:
+        chunk = stream.read(FEED_STREAM_CHUNK_SIZE)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def iter_feed_content_lines(content) -> Iterator[str]:
+    yield from filter_feed_lines(
+        line.rstrip(b"\r") for line in _iter_stream_lines(content)
+    )
+
+
+def stream_csv_content_from_local(key: str) -> Iterator[str]:
+    yield from filter_feed_lines(
+        iter_attachment_lines(key, chunk_size=FEED_STREAM_CHUNK_SIZE)
+    )
+
+
 def fetch_csv_content_from_local(key: str) -> list:
     content = get_attachment(key).decode("utf-8")
-    lines = content.splitlines()
-    return [
-        line for line in lines if line.strip() and not line.strip().startswith("#")
-    ]
+    return list(filter_feed_lines(content.splitlines()))
 
 
 def fetch_json_content_from_local(key: str) -> str:
@@ -278,20 +505,149 @@ def fetch_feed_event_by_uuid(feed, event_uuid):
         )
 
 
+def build_feed_http_client(feed, concurrency: int) -> httpx.Client:
+    """Keep-alive client shared by the event downloads of a feed fetch.
+
+    The transport does not retry, ``download_feed_event`` retries failed
+    connections and throttled responses with a backoff.
+    """
+    return httpx.Client(
+        headers=build_feed_headers(feed),
+        limits=httpx.Limits(
+            max_connections=concurrency, max_keepalive_connections=concurrency
+        ),
+        timeout=FEED_FETCH_TIMEOUT,
+        follow_redirects=True,
+    )
+
+
+def download_feed_event(client: httpx.Client, feed, event_uuid: str, retries: int):
+    url = f"{feed.url}/{event_uuid}.json"
+
+    for attempt in range(retries + 1):
+        try:
+            response = client.get(url)
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+        else:
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code not in FEED_FETCH_RETRY_STATUSES or attempt == retries:
+                raise HTTPException(
+                    status_code=response.status_code,
+                    detail=f"Failed to fetch event {event_uuid}: {response.text}",
+                )
+        time.sleep(min(2**attempt, 30))
+
+
+def iter_feed_events(
+    feed, event_uuids: list, concurrency: int, retries: int
+) -> Iterator[tuple]:
+    """Yield ``(event_uuid, event_raw, error)`` as feed events are downloaded.
+
+    Network feeds are downloaded on a thread pool sharing one pooled
+    client; at most ``concurrency`` downloads are in flight so memory stays
+    bounded by the events waiting to be processed.
+    """
+    if getattr(feed, "input_source", "network") == "local":
+        for event_uuid in event_uuids:
+            try:
+                yield event_uuid, get_local_misp_event(feed.url, event_uuid), None
+            except Exception as e:
+                yield event_uuid, None, e
+        return
+
+    with build_feed_http_client(feed, concurrency) as client, ThreadPoolExecutor(
+        max_workers=concurrency
+    ) as executor:
+        pending = {}
+        for event_uuid in event_uuids:
+            pending[
+                executor.submit(download_feed_event, client, feed, event_uuid, retries)
+            ] = event_uuid
+
+            if len(pending) >= concurrency:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield (pending.pop(future), *_feed_event_result(future))
+
+        for future in list(pending):
+            yield (pending.pop(future), *_feed_event_result(future))
+
+
+def _feed_event_result(future) -> tuple:
+    try:
+        return future.result(), None
+    except Exception as e:
+        return None, e
+
+
+def process_feed_events(
+    db: Session,
+    event_uuids: list,
+    feed: feed_models.Feed,
+    user: user_schemas.User,
+    runtimeSettings: RuntimeSettings = None,
+) -> dict:
+    """Download a batch of feed events concurrently and ingest them in turn."""
+    runtimeSettings = runtimeSettings or RuntimeSettings(db)
+    concurrency = max(
+        1, runtimeSettings.get_value("feeds.fetchConcurrency", FEED_FETCH_CONCURRENCY)
+    )
+    retries = max(0, runtimeSettings.get_value("feeds.fetchRetries", FEED_FETCH_RETRIES))
+
+    orgc_cache = {}
+    processed = 0
+    failed = 0
+    for event_uuid, event_raw, error in iter_feed_events(
+        feed, event_uuids, concurrency, retries
+    ):
+        if error is None:
+            try:
+                process_feed_event(
+                    db, event_uuid, feed, user, event_raw=event_raw, orgc_cache=orgc_cache
+                )
+                processed += 1
+                continue
+            except Exception as e:
+                db.rollback()
+                error = e
+
+        failed += 1
+        logger.error("Failed to fetch feed id=%s event uuid=%s: %s", feed.id, event_uuid, error)
+
+    return {
+        "result": "success",
+        "message": "%s feed events processed, %s failed." % (processed, failed),
+        "processed": processed,
+        "failed": failed,
+    }
+
+
 def process_feed_event(
     db: Session,
     event_uuid: str,
     feed: feed_models.Feed,
     user: user_schemas.User,
+    event_raw: dict = None,
+    orgc_cache: dict = None,
 ):
-    logging.info(f"Fetching event {feed.url}/{event_uuid}")
-    event_raw = fetch_feed_event_by_uuid(feed, event_uuid)
+    if event_raw is None:
+        logging.info(f"Fetching event {feed.url}/{event_uuid}")
+        event_raw = fetch_feed_event_by_uuid(feed, event_uuid)
     event = MISPEvent()
     event.load(event_raw)
 
-    orgc = organisations_repository.get_or_create_organisation_from_feed(
-        db, event.Orgc, user=user
-    )
+    orgc_uuid = event.Orgc["uuid"]
+    if orgc_cache is not None and orgc_uuid in orgc_cache:
+        orgc = orgc_cache[orgc_uuid]
+    else:
+        orgc = organisations_repository.get_or_create_organisation_from_feed(
+            db, event.Orgc, user=user
+        )
+        if orgc_cache is not None:
+            orgc_cache[orgc_uuid] = orgc
 
     local_event = events_repository.get_event_by_uuid(db, event_uuid)
 
@@ -347,10 +703,13 @@ def process_feed_event(
     return {"result": "success", "message": "Event processed"}
 
 
-def get_feed_manifest(feed):
+def get_feed_manifest(feed, extra_headers: dict = None):
     if getattr(feed, "input_source", "network") == "local":
         return _LocalManifestResponse(get_local_misp_manifest(feed.url))
-    return requests.get(f"{feed.url}/manifest.json", headers=build_feed_headers(feed))
+    headers = build_feed_headers(feed)
+    if extra_headers:
+        headers.update(extra_headers)
+    return requests.get(f"{feed.url}/manifest.json", headers=headers)
 
 
 class _LocalManifestResponse:
@@ -365,6 +724,15 @@ class _LocalManifestResponse:
         return self._manifest
 
 
+def unchanged_feed_result(db_feed: feed_models.Feed) -> dict:
+    logger.info("feed id=%s unchanged since last fetch, skipped", db_feed.id)
+    return {
+        "result": "success",
+        "unchanged": True,
+        "message": "Feed=%s unchanged since last fetch, skipped." % db_feed.name,
+    }
+
+
 def fetch_feed(db: Session, feed_id: int, user: user_schemas.User):
     logger.info("fetch feed id=%s job started", feed_id)
 
@@ -384,15 +752,26 @@ def fetch_feed(db: Session, feed_id: int, user: user_schemas.User):
     logger.info(f"Fetching feed {db_feed.id} {db_feed.name}")
 
     if db_feed.source_format == "misp":
-        # TODO: check feed etag in redis cache
-        req = get_feed_manifest(db_feed)
+        use_http_cache = db_feed.input_source != "local"
+        cache = get_feed_http_cache(db_feed.id) if use_http_cache else {}
+        req = get_feed_manifest(db_feed, build_conditional_headers(cache))
+
+        if use_http_cache and req.status_code == 304:
+            record_unchanged_feed(cache)
+            return unchanged_feed_result(db_feed)
 
         if req.status_code == 200:
             manifest = req.json()
 
-            # TODO: cache etag value in redis
-            # etag = req.headers.get("etag")
-            # logger.info(f"Fetching feed UUID {db_feed.uuid} ETag: {etag}")
+            if use_http_cache:
+                validators = _feed_cache_validators(
+                    req, hashlib.sha256(req.content).hexdigest(), len(req.content)
+                )
+                if cache.get("sha256") == validators["sha256"]:
+                    record_unchanged_feed(cache, downloaded=True)
+                    store_feed_http_cache(db_feed.id, validators, rows=cache.get("rows"))
+                    return unchanged_feed_result(db_feed)
+            rows = len(manifest)
 
             # filter feed events to fetch based on rules
             manifest = filter_feed_by_rules(db_feed.rules, manifest)
@@ -416,13 +795,34 @@ def fetch_feed(db: Session, feed_id: int, user: user_schemas.User):
 
             # TODO: check if event is blocked by blocklist or feed rules (tags, orgs)
 
-            # fetch events in parallel http requests
-
             if not feed_events_uuids:
+                if use_http_cache:
+                    store_feed_http_cache(db_feed.id, validators, rows=rows)
                 return {"result": "success", "message": "No new events to fetch"}
 
-            for event_uuid in feed_events_uuids:
-                tasks.fetch_feed_event.delay(str(event_uuid), db_feed.id, user.id)
+            # events are downloaded concurrently within each batch task
+            batch_size = max(
+                1,
+                RuntimeSettings(db).get_value(
+                    "feeds.eventsBatchSize", FEED_EVENTS_BATCH_SIZE
+                ),
+            )
+            feed_events_uuids = [str(uuid) for uuid in feed_events_uuids]
+            batches = range(0, len(feed_events_uuids), batch_size)
+
+            # the manifest is only known as processed once every batch succeeded
+            cache_token = (
+                stage_feed_http_cache(db_feed.id, validators, rows, len(batches))
+                if use_http_cache
+                else None
+            )
+            for start in batches:
+                tasks.fetch_feed_events.delay(
+                    feed_events_uuids[start : start + batch_size],
+                    db_feed.id,
+                    user.id,
+                    cache_token,
+                )
 
     if db_feed.source_format == "csv":
         tasks.fetch_csv_feed.delay(db_feed.id, user.id)
@@ -827,31 +1227,48 @@ def process_csv_feed_row(row: list, settings: dict):
         raise ValueError(f"Unsupported CSV mode: {settings['csvConfig']['mode']}")
 
 
-def fetch_csv_content_from_network(url: str, extra_headers: dict = None) -> list:
+def stream_csv_content_from_network(
+    url: str, extra_headers: dict = None
+) -> Iterator[str]:
+    """Stream a CSV/freetext feed line by line.
+
+    The HTTP request is issued on first iteration and the body is read in
+    ``FEED_STREAM_CHUNK_SIZE`` chunks, so memory stays bounded by the
+    longest line instead of the size of the feed.
+    """
     headers = {"User-Agent": USER_AGENT}
     if extra_headers:
         headers.update(extra_headers)
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            content = response.content.decode("utf-8")
-            lines = content.splitlines()
-            return [
-                line
-                for line in lines
-                if line.strip() and not line.strip().startswith("#")
-            ]
-        else:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Failed to fetch CSV feed: {response.text}",
-            )
+        response = requests.get(url, headers=headers, stream=True)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to fetch CSV feed: {str(e)}",
         )
 
+    with response:
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Failed to fetch CSV feed: {response.text}",
+            )
+        try:
+            yield from filter_feed_lines(
+                response.iter_lines(chunk_size=FEED_STREAM_CHUNK_SIZE)
+            )
+        except requests.RequestException as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Failed to fetch CSV feed: {str(e)}",
+            )
+
+
+def fetch_csv_content_from_network(
+    url: str, extra_headers: dict = None, limit: int = None
+) -> list:
+    return list(islice(stream_csv_content_from_network(url, extra_headers), limit))
+
 
 def preview_csv_feed(settings: dict = None, limit: int = 5):
     if not settings or "csvConfig" not in (settings.get("settings") or {}):
@@ -860,7 +1277,7 @@ def preview_csv_feed(settings: dict = None, limit: int = 5):
             detail="Missing CSV configuration in preview request",
         )
     if settings["input_source"] == "network":
-        lines = fetch_csv_content_from_network(settings["url"])
+        lines = fetch_csv_content_from_network(settings["url"], limit=limit)
     elif settings["input_source"] == "local":
         if not settings.get("url"):
             raise HTTPException(
@@ -889,13 +1306,17 @@ def preview_csv_feed(settings: dict = None, limit: int = 5):
     }
 
 
-def parse_csv_feed_lines(settings, preview_lines):
+def iter_csv_feed_rows(settings, lines: Iterable[str]) -> Iterator[list]:
     csv_reader = csv.reader(
-        preview_lines,
+        lines,
         delimiter=settings["csvConfig"]["delimiter"],
     )
-    parsed_preview = [[cell.strip() for cell in row] for row in csv_reader]
-    return parsed_preview
+    for row in csv_reader:
+        yield [cell.strip() for cell in row]
+
+
+def parse_csv_feed_lines(settings, preview_lines):
+    return list(iter_csv_feed_rows(settings, preview_lines))
 
 
 def _feed_import_label(db_feed: feed_models.Feed) -> str:
@@ -950,6 +1371,120 @@ def _create_feed_event(db, db_feed, user, label: str):
     )
 
 
+def uses_feed_delta_merge(db_feed: feed_models.Feed) -> bool:
+    return bool(db_feed.fixed_event and db_feed.delta_merge)
+
+
+def feed_attribute_fingerprint(attr_type: str, value: str) -> str:
+    return hashlib.sha1(f"{attr_type}\x1f{value}".encode("utf-8")).hexdigest()
+
+
+def _load_feed_event_fingerprints(event_uuid: str) -> dict:
+    client = get_opensearch_client()
+
+    query = {
+        "query": {
+            "bool": {
+                "must": [
+                    {"term": {"event_uuid": event_uuid}},
+                    {"term": {"deleted": False}},
+                ],
+                "must_not": [{"exists": {"field": "object_uuid"}}],
+            }
+        },
+        "_source": ["uuid", "type", "value"],
+    }
+
+    return {
+        feed_attribute_fingerprint(hit["_source"]["type"], hit["_source"]["value"]): hit[
+            "_source"
+        ]["uuid"]
+        for hit in opensearch_helpers.scan(
+            client, index="misp-attributes", query=query, size=1000
+        )
+    }
+
+
+def start_feed_delta(db_feed: feed_models.Feed, event_uuid: str) -> dict:
+    """Load the fingerprints (type, value -> attribute uuid) of the previous
+    run of a delta-merge feed.
+
+    The set is persisted in Redis per feed and fixed event; when it is
+    missing it is rebuilt from the live attributes of the fixed event.
+    """
+    key = FEED_DELTA_KEY.format(feed_id=db_feed.id, event_uuid=event_uuid)
+    previous = get_redis_client().hgetall(key)
+    persisted = bool(previous)
+    if not persisted:
+        previous = _load_feed_event_fingerprints(event_uuid)
+
+    return {
+        "key": key,
+        "event_uuid": event_uuid,
+        "previous": previous,
+        "persisted": persisted,
+        "seen": set(),
+        "added": {},
+    }
+
+
+def is_new_feed_attribute(delta: dict, attribute: attribute_schemas.AttributeCreate) -> bool:
+    """Mark the attribute as present in this run, True if it must be created."""
+    fingerprint = feed_attribute_fingerprint(attribute.type, attribute.value)
+    if fingerprint in delta["seen"]:
+        return False
+    delta["seen"].add(fingerprint)
+    return fingerprint not in delta["previous"]
+
+
+def record_feed_delta_created(delta: dict, attributes: list) -> None:
+    for attribute in attributes:
+        fingerprint = feed_attribute_fingerprint(attribute.type, attribute.value)
+        delta["added"][fingerprint] = str(attribute.uuid)
+
+
+def finish_feed_delta(db: Session, delta: dict) -> int:
+    """Soft-delete the attributes that disappeared from the feed and persist
+    the new fingerprint set. Returns the number of deleted attributes."""
+    removed = {
+        fingerprint: attribute_uuid
+        for fingerprint, attribute_uuid in delta["previous"].items()
+        if fingerprint not in delta["seen"]
+    }
+    deleted = set(
+        attributes_repository.delete_attributes_bulk(
+            db, list(removed.values()), delta["event_uuid"]
+        )
+    )
+    removed = [
+        fingerprint
+        for fingerprint, attribute_uuid in removed.items()
+        if attribute_uuid in deleted
+    ]
+
+    if delta["persisted"]:
+        upserts = delta["added"]
+    else:
+        upserts = {
+            fingerprint: attribute_uuid
+            for fingerprint, attribute_uuid in delta["previous"].items()
+            if attribute_uuid not in deleted
+        }
+        upserts.update(delta["added"])
+
+    pipe = get_redis_client().pipeline()
+    for start in range(0, len(removed), FEED_DELTA_WRITE_CHUNK_SIZE):
+        pipe.hdel(delta["key"], *removed[start : start + FEED_DELTA_WRITE_CHUNK_SIZE])
+    items = list(upserts.items())
+    for start in range(0, len(items), FEED_DELTA_WRITE_CHUNK_SIZE):
+        pipe.hset(
+            delta["key"], mapping=dict(items[start : start + FEED_DELTA_WRITE_CHUNK_SIZE])
+        )
+    pipe.execute()
+
+    return len(deleted)
+
+
 def get_json_path(obj, path: str):
     """Traverse a dot-notation path on a nested dict, returning None if any key is missing."""
     if not path:
@@ -1031,6 +1566,99 @@ def parse_json_feed_items(content: str, json_cfg: dict) -> list:
         )
 
 
+def _iter_ndjson_items(stream) -> Iterator[dict]:
+    for line in filter_feed_lines(_iter_stream_lines(stream)):
+        try:
+            obj = json.loads(line)
+        except (json.JSONDecodeError, ValueError):
+            continue
+        if isinstance(obj, dict):
+            yield obj
+
+
+def _iter_json_items_at_path(stream, items_path: str) -> Iterator:
+    """Yield the items found at ``items_path`` from parser events.
+
+    Mirrors ``parse_json_feed_items``: an array yields its elements and an
+    object is yielded on its own. Only the item currently being built is
+    held in memory.
+    """
+    builder = None
+    in_array = False
+    found = False
+
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if not builder.containers:
+                yield builder.value
+                builder = None
+                if not in_array:
+                    return
+            continue
+
+        if in_array:
+            if prefix == items_path and event == "end_array":
+                return
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            if not builder.containers:
+                yield builder.value
+                builder = None
+            continue
+
+        if found or prefix != items_path or event == "map_key":
+            continue
+
+        found = True
+        if event == "start_array":
+            in_array = True
+        elif event == "start_map":
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+        elif event == "null":
+            found = False
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Expected array or object at path '{items_path}', got {type(value).__name__}",
+            )
+
+    if not found:
+        path_desc = f" at path '{items_path}'" if items_path else ""
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No data found{path_desc}",
+        )
+
+
+def iter_json_feed_items(stream, json_cfg: dict) -> Iterator:
+    """Incrementally parse a binary JSON/NDJSON stream into feed items.
+
+    Streaming counterpart of ``parse_json_feed_items`` with the same
+    ``format`` and ``items_path`` semantics.
+    """
+    if json_cfg.get("format", "array") == "ndjson":
+        yield from _iter_ndjson_items(stream)
+        return
+
+    try:
+        yield from _iter_json_items_at_path(stream, json_cfg.get("items_path") or "")
+    except ijson.JSONError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to parse JSON: {e}",
+        )
+
+
+def stream_json_feed_items_from_local(key: str, json_cfg: dict) -> Iterator:
+    stream = open_attachment(key)
+    try:
+        yield from iter_json_feed_items(stream, json_cfg)
+    finally:
+        stream.close()
+
+
 def process_json_item_to_attribute(item, settings: dict):
     cfg = settings["jsonConfig"]["attribute"]
     value_path = cfg.get("value") or ""
@@ -52,7 +52,9 @@ def detect_type(value: str) -> Optional[str]:
 def preview_freetext_feed(settings: dict, limit: int = 10):
     input_source = (settings or {}).get("input_source")
     if input_source == "network":
-        lines = feeds_repository.fetch_csv_content_from_network(settings["url"])
+        lines = feeds_repository.fetch_csv_content_from_network(
+            settings["url"], limit=limit
+        )
     elif input_source == "local":
         if not settings.get("url"):
             raise HTTPException(
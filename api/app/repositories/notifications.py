@@ -1,3 +1,4 @@
+import logging
 from typing import Union
 import uuid
 from app.models import user as user_models
@@ -5,16 +6,24 @@ from app.models import hunt as hunt_models
 from app.models import notification as notification_models
 from app.models import organisation as organisation_models
 from app.repositories import user_settings as user_settings_repository
-from sqlalchemy import select, update, text
+from app.services import follow_index
+from app.services import mail
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from fastapi_pagination.ext.sqlalchemy import paginate
 from datetime import datetime, timezone
 from app.services.redis import get_redis_client
 from app.settings import get_settings
-import json
 import copy
+import json
+
+logger = logging.getLogger(__name__)
 
-CACHE_TTL = 60
+NOTIFICATION_DIGEST_KEY = "notifications:email_digest:{user_id}"
+NOTIFICATION_DIGEST_PENDING_KEY = "notifications:email_digest:pending"
+NOTIFICATION_DIGEST_SCHEDULED_KEY = "notifications:email_digest:scheduled"
+NOTIFICATION_DIGEST_INTERVAL = 60
+NOTIFICATION_DIGEST_MAX_ITEMS = 500
 
 def get_user_notifications(db: Session, user_id: int, params: dict = {}):
     query = select(notification_models.Notification)
@@ -102,8 +111,6 @@ def unfollow_notification(db: Session, notification_id: int, user_id: int):
     else:
         return {"status": "error", "message": "Unsupported notification type"}
 
-    invalidate_follow_cache(follow_key, uuid)
-
     unfollow_notifications(
         db,
         follow_key=follow_key,
@@ -130,38 +137,26 @@ def get_followers_for(db, follow_key: str, uuid: str):
     Returns:
         List of user ids.
     """
+    return follow_index.get_followers(db, [(follow_key, uuid)]).get(
+        (follow_key, str(uuid)), []
+    )
 
-    cache_key = f"notifications:followers:{follow_key}:{uuid}"
-    RedisClient = get_redis_client()
-    cached = RedisClient.get(cache_key)
-    if cached:
-        user_ids = json.loads(cached)
-    else:
-        stmt = text(
-            f"""
-            SELECT user_id
-            FROM user_settings
-            WHERE namespace = 'notifications'
-            AND (value -> 'follow' -> :key) @> :uuid_array
-            """
-        )
-        result = db.execute(
-            stmt,
-            {
-                "key": follow_key,
-                "uuid_array": json.dumps([str(uuid)]),
-            },
-        )
 
-        user_ids = [row.user_id for row in result]
-        
+def get_followers_for_many(db, follow_key: str, uuids) -> dict[str, list[int]]:
+    """
+    Get the users following each of several organisations, events, objects or
+    attributes in a single lookup.
+
+    Args:
+        db: Database session.
+        follow_key: 'organisations', 'events', 'objects' or 'attributes'.
+        uuids: The UUIDs to resolve.
 
-        RedisClient.setex(cache_key, CACHE_TTL, json.dumps(user_ids))
-    
-    if not user_ids:
-        return []
-    
-    return user_ids
+    Returns:
+        Dict of uuid -> list of user ids, only for uuids that have followers.
+    """
+    followers = follow_index.get_followers(db, [(follow_key, uuid) for uuid in uuids])
+    return {uuid: user_ids for (_, uuid), user_ids in followers.items()}
 
 
 def build_event_notification(
@@ -198,8 +193,12 @@ def create_event_notifications(db: Session, type: str, event):
 
     notifications = []
 
+    followers = follow_index.get_followers(
+        db, [("organisations", organisation.uuid), ("events", event.uuid)]
+    )
+
     # Followers of the organisation
-    org_followers = get_followers_for(db, "organisations", organisation.uuid)
+    org_followers = followers.get(("organisations", str(organisation.uuid)), [])
     notifications += [
         build_event_notification(
             follower,
@@ -211,7 +210,7 @@ def create_event_notifications(db: Session, type: str, event):
     ]
 
     # Followers of the specific event
-    event_followers = get_followers_for(db, "events", event.uuid)
+    event_followers = followers.get(("events", str(event.uuid)), [])
     notifications += [
         build_event_notification(
             follower, f"event.{type}", event=event, organisation=organisation
@@ -299,27 +298,84 @@ def create_attribute_notifications(
     if not event:
         return []
 
-    notifications = []
+    followers = follow_index.get_followers(
+        db, [("attributes", attribute.uuid), ("events", event.uuid)]
+    )
+    notifications = _build_attribute_notifications(type, attribute, event, followers)
+
+    if notifications:
+        db.add_all(notifications)
+        db.commit()
+        _enqueue_notification_emails(db, notifications)
+
+    return notifications
 
+
+def _build_attribute_notifications(
+    type: str, attribute, event, followers: dict
+) -> list[notification_models.Notification]:
     # Followers of the specific attribute
-    attr_followers = get_followers_for(db, "attributes", attribute.uuid)
-    notifications += [
+    notifications = [
         build_attribute_notification(
             follower,
             f"attribute.{type}",
             attribute=attribute,
             event=event,
         )
-        for follower in attr_followers
+        for follower in followers.get(("attributes", str(attribute.uuid)), [])
     ]
 
     # Followers of the event
-    event_followers = get_followers_for(db, "events", event.uuid)
     notifications += [
         build_attribute_notification(
             follower, f"event.attribute.{type}", attribute=attribute, event=event
         )
-        for follower in event_followers
+        for follower in followers.get(("events", str(event.uuid)), [])
+    ]
+
+    return notifications
+
+
+def create_attributes_notifications(db: Session, type: str, attributes: list):
+    """Create notifications for a batch of attributes at once.
+
+    Events are loaded once each, followers of every attribute and event are
+    resolved in a single lookup and all notifications are inserted in a
+    single commit.
+    """
+    from app.repositories import events as events_repository_local
+    from uuid import UUID as _UUID
+
+    events = {}
+    for event_uuid in {
+        str(attribute.event_uuid)
+        for attribute in attributes
+        if getattr(attribute, "event_uuid", None)
+    }:
+        event = events_repository_local.get_event_from_opensearch(_UUID(event_uuid))
+        if event:
+            events[event_uuid] = event
+
+    attributes = [
+        attribute
+        for attribute in attributes
+        if str(getattr(attribute, "event_uuid", None)) in events
+    ]
+    if not attributes:
+        return []
+
+    followers = follow_index.get_followers(
+        db,
+        [("attributes", attribute.uuid) for attribute in attributes]
+        + [("events", event_uuid) for event_uuid in events],
+    )
+
+    notifications = [
+        notification
+        for attribute in attributes
+        for notification in _build_attribute_notifications(
+            type, attribute, events[str(attribute.event_uuid)], followers
+        )
     ]
 
     if notifications:
@@ -363,8 +419,12 @@ def create_object_notifications(db: Session, type: str, object):
 
     notifications = []
 
+    followers = follow_index.get_followers(
+        db, [("events", event.uuid), ("objects", object.uuid)]
+    )
+
     # Followers of the event
-    event_followers = get_followers_for(db, "events", event.uuid)
+    event_followers = followers.get(("events", str(event.uuid)), [])
     notifications += [
         build_object_notification(
             follower, f"event.object.{type}", object=object, event=event
@@ -373,7 +433,7 @@ def create_object_notifications(db: Session, type: str, object):
     ]
 
     # Followers of the specific object
-    obj_followers = get_followers_for(db, "objects", object.uuid)
+    obj_followers = followers.get(("objects", str(object.uuid)), [])
     notifications += [
         build_object_notification(
             follower,
@@ -392,37 +452,75 @@ def create_object_notifications(db: Session, type: str, object):
     return notifications
 
 
+def build_sighting_notification(
+    user_id: int, type: str, attribute: dict, sighting: dict
+) -> notification_models.Notification:
+    return notification_models.Notification(
+        user_id=user_id,
+        type=f"attribute.sighting.{type}",
+        entity_type="attribute",
+        entity_uuid=attribute["_source"]["uuid"],
+        read=False,
+        payload={
+            "sighting_value": sighting["value"],
+            "sighting_type": sighting.get("type", "positive"),
+            "organisation": sighting["observer"]["organisation"],
+            "timestamp": sighting.get("timestamp", datetime.now().timestamp()),
+            "attribute_type": attribute["_source"]["type"],
+            "attribute_uuid": attribute["_source"]["uuid"],
+        },
+        created_at=datetime.now(),
+    )
+
+
 def create_sighting_notifications(
     db: Session, type: str, attribute: dict, sighting: dict
 ):
     """Create sighting notifications for users following an attribute."""
-    if not attribute or not sighting:
+    if not attribute:
         return []
 
-    # Get followers of the attribute
-    attribute_followers = get_followers_for(
-        db, "attributes", attribute["_source"]["uuid"]
+    return create_sightings_notifications(db, type, [attribute], sighting)
+
+
+def create_sightings_notifications(
+    db: Session, type: str, attributes: list[dict], sighting: dict
+):
+    """Create sighting notifications for the followers of several attributes."""
+    if not attributes or not sighting:
+        return []
+
+    return create_sightings_batch_notifications(db, type, [(sighting, attributes)])
+
+
+def create_sightings_batch_notifications(
+    db: Session, type: str, matches: list[tuple[dict, list[dict]]]
+):
+    """Create notifications for a batch of sightings and their matched attributes.
+
+    Followers of every matched attribute are resolved with one lookup and all
+    notifications are inserted in a single commit.
+    """
+    matches = [(sighting, attributes) for sighting, attributes in matches if attributes]
+    if not matches:
+        return []
+
+    followers = get_followers_for_many(
+        db,
+        "attributes",
+        {
+            attribute["_source"]["uuid"]
+            for _, attributes in matches
+            for attribute in attributes
+        },
     )
 
-    notifications = []
-    for follower in attribute_followers:
-        notification = notification_models.Notification(
-            user_id=follower,
-            type=f"attribute.sighting.{type}",
-            entity_type="attribute",
-            entity_uuid=attribute["_source"]["uuid"],
-            read=False,
-            payload={
-                "sighting_value": sighting["value"],
-                "sighting_type": sighting.get("type", "positive"),
-                "organisation": sighting["observer"]["organisation"],
-                "timestamp": sighting.get("timestamp", datetime.now().timestamp()),
-                "attribute_type": attribute["_source"]["type"],
-                "attribute_uuid": attribute["_source"]["uuid"],
-            },
-            created_at=datetime.now(),
-        )
-        notifications.append(notification)
+    notifications = [
+        build_sighting_notification(follower, type, attribute, sighting)
+        for sighting, attributes in matches
+        for attribute in attributes
+        for follower in followers.get(str(attribute["_source"]["uuid"]), [])
+    ]
 
     if notifications:
         db.add_all(notifications)
@@ -432,6 +530,26 @@ def create_sighting_notifications(
     return notifications
 
 
+def build_correlation_notification(
+    user_id: int, type: str, correlation: dict
+) -> notification_models.Notification:
+    return notification_models.Notification(
+        user_id=user_id,
+        type=f"attribute.correlation.{type}",
+        entity_type="attribute",
+        entity_uuid=correlation["source_attribute_uuid"],
+        read=False,
+        payload={
+            "source_event_uuid": correlation["source_event_uuid"],
+            "target_event_uuid": correlation["target_event_uuid"],
+            "target_attribute_uuid": correlation["target_attribute_uuid"],
+            "target_attribute_type": correlation["target_attribute_type"],
+            "target_attribute_value": correlation["target_attribute_value"],
+        },
+        created_at=datetime.now(),
+    )
+
+
 def create_correlation_notifications(db: Session, type: str, correlation: dict):
     """Create correlation notifications for users following an attribute."""
     if not correlation:
@@ -442,24 +560,39 @@ def create_correlation_notifications(db: Session, type: str, correlation: dict):
         db, "attributes", correlation["source_attribute_uuid"]
     )
 
-    notifications = []
-    for follower in attribute_followers:
-        notification = notification_models.Notification(
-            user_id=follower,
-            type=f"attribute.correlation.{type}",
-            entity_type="attribute",
-            entity_uuid=correlation["source_attribute_uuid"],
-            read=False,
-            payload={
-                "source_event_uuid": correlation["source_event_uuid"],
-                "target_event_uuid": correlation["target_event_uuid"],
-                "target_attribute_uuid": correlation["target_attribute_uuid"],
-                "target_attribute_type": correlation["target_attribute_type"],
-                "target_attribute_value": correlation["target_attribute_value"],
-            },
-            created_at=datetime.now(),
-        )
-        notifications.append(notification)
+    notifications = [
+        build_correlation_notification(follower, type, correlation)
+        for follower in attribute_followers
+    ]
+
+    if notifications:
+        db.add_all(notifications)
+        db.commit()
+        _enqueue_notification_emails(db, notifications)
+
+    return notifications
+
+
+def create_correlations_notifications(db: Session, type: str, correlations: list[dict]):
+    """Create correlation notifications for a batch of correlations at once.
+
+    Followers of every source attribute are resolved with one query and all
+    notifications are inserted in a single commit.
+    """
+    if not correlations:
+        return []
+
+    followers = get_followers_for_many(
+        db,
+        "attributes",
+        [correlation["source_attribute_uuid"] for correlation in correlations],
+    )
+
+    notifications = [
+        build_correlation_notification(follower, type, correlation)
+        for correlation in correlations
+        for follower in followers.get(str(correlation["source_attribute_uuid"]), [])
+    ]
 
     if notifications:
         db.add_all(notifications)
@@ -496,11 +629,6 @@ def delete_notification(db: Session, notification_id: int, user_id: int):
     return {"status": "success"}
 
 
-def invalidate_follow_cache(entity_type: str, entity_uuid: str):
-    RedisClient = get_redis_client()
-    RedisClient.delete(f"notifications:followers:{entity_type}:{entity_uuid}")
-
-
 def _notification_email_subject(notification_type: str) -> str:
     prefixes = {
         "hunt.": "Hunt Results",
@@ -526,35 +654,41 @@ def _notification_email_body(notification: notification_models.Notification) ->
     return "\n".join(lines)
 
 
+def _notification_digest_email(from_addr: str, items: list[dict]) -> dict:
+    if len(items) == 1:
+        subject = _notification_email_subject(items[0]["type"])
+    else:
+        subject = f"[misp-workbench] {len(items)} New Notifications"
+
+    return {
+        "from": from_addr,
+        "to": items[-1]["to"],
+        "subject": subject,
+        "body": "\n\n".join(item["body"] for item in items),
+    }
+
+
 def _enqueue_notification_emails(
     db: Session, notifications: list[notification_models.Notification]
 ):
-    """Dispatch a send_email task for each notification's recipient.
-
-    Respects two controls:
-    - Per-user opt-out: user_settings namespace "notifications",
-      key "email_notifications" (bool, default True).
-    - Global rate limit: runtime setting "notifications.email_max_per_hour"
-      (int, default 10).  Tracked per-user in Redis with a 1-hour sliding
-      window.  Set to 0 to disable the limit.
+    """Queue each notification's email in its recipient's digest.
+
+    Respects the per-user opt-out: user_settings namespace "notifications",
+    key "email_notifications" (bool, default True). Queued emails are sent by
+    flush_notification_digests, which applies the hourly rate limit.
     """
     if not notifications:
         return
     # Lazy import to avoid circular dependency with tasks module
-    from app.worker.tasks import send_email  # noqa: PLC0415
     from app.services.runtime_settings_provider import get_runtime_settings  # noqa: PLC0415
 
-    app_settings = get_settings()
-    from_addr = app_settings.Mail.from_address
-
-    runtime = get_runtime_settings(db)
-    email_max_per_hour = runtime.get_value("notifications.email_max_per_hour", default=10)
-
-    RedisClient = get_redis_client()
-
     user_cache: dict[int, user_models.User] = {}
     email_enabled_cache: dict[int, bool] = {}
 
+    RedisClient = get_redis_client()
+    pipeline = RedisClient.pipeline()
+    queued_user_ids = set()
+
     for notification in notifications:
         user_id = notification.user_id
 
@@ -574,22 +708,124 @@ def _enqueue_notification_emails(
         if not email_enabled_cache[user_id]:
             continue
 
+        pipeline.rpush(
+            NOTIFICATION_DIGEST_KEY.format(user_id=user_id),
+            json.dumps(
+                {
+                    "to": user.email,
+                    "type": notification.type,
+                    "body": _notification_email_body(notification),
+                }
+            ),
+        )
+        queued_user_ids.add(user_id)
+
+    if not queued_user_ids:
+        return
+
+    for user_id in queued_user_ids:
+        pipeline.ltrim(
+            NOTIFICATION_DIGEST_KEY.format(user_id=user_id),
+            -NOTIFICATION_DIGEST_MAX_ITEMS,
+            -1,
+        )
+        pipeline.sadd(NOTIFICATION_DIGEST_PENDING_KEY, user_id)
+    pipeline.execute()
+
+    runtime = get_runtime_settings(db)
+    schedule_notification_digests_flush(
+        runtime.get_value(
+            "notifications.email_digest_interval", default=NOTIFICATION_DIGEST_INTERVAL
+        )
+    )
+
+
+def schedule_notification_digests_flush(interval: int):
+    """Schedule a digest flush in ``interval`` seconds unless one is pending."""
+    from app.worker.tasks import flush_notification_digests  # noqa: PLC0415
+
+    interval = max(0, interval)
+    RedisClient = get_redis_client()
+    # the marker expires on its own in case the scheduled flush is lost
+    if RedisClient.set(
+        NOTIFICATION_DIGEST_SCHEDULED_KEY, 1, nx=True, ex=interval + 300
+    ):
+        flush_notification_digests.apply_async(countdown=interval)
+
+
+def flush_notification_digests(db: Session) -> dict:
+    """Send one digest email per user with queued notifications.
+
+    Respects the global rate limit: runtime setting
+    "notifications.email_max_per_hour" (int, default 10), tracked per-user in
+    Redis with a 1-hour window where each digest counts as one email. Set to
+    0 to disable the limit. Digests of throttled users stay queued for a later
+    flush, as do digests that could not be delivered.
+    """
+    from app.services.runtime_settings_provider import get_runtime_settings  # noqa: PLC0415
+
+    RedisClient = get_redis_client()
+    RedisClient.delete(NOTIFICATION_DIGEST_SCHEDULED_KEY)
+
+    runtime = get_runtime_settings(db)
+    email_max_per_hour = runtime.get_value("notifications.email_max_per_hour", default=10)
+    interval = runtime.get_value(
+        "notifications.email_digest_interval", default=NOTIFICATION_DIGEST_INTERVAL
+    )
+    from_addr = get_settings().Mail.from_address
+
+    if not mail.is_mail_configured():
+        logger.warning("MAIL_SERVER not configured, skipping notification digests")
+        return {"sent": 0, "throttled": 0, "requeued": 0}
+
+    digests = []
+    throttled = 0
+    for user_id in RedisClient.smembers(NOTIFICATION_DIGEST_PENDING_KEY):
+        throttle_key = f"notifications:email_throttle:{user_id}"
+        if (
+            email_max_per_hour > 0
+            and int(RedisClient.get(throttle_key) or 0) >= email_max_per_hour
+        ):
+            throttled += 1
+            continue
+
+        digest_key = NOTIFICATION_DIGEST_KEY.format(user_id=user_id)
+        pipeline = RedisClient.pipeline()
+        pipeline.srem(NOTIFICATION_DIGEST_PENDING_KEY, user_id)
+        pipeline.lrange(digest_key, 0, -1)
+        pipeline.delete(digest_key)
+        _, items, _ = pipeline.execute()
+        if not items:
+            continue
+
         if email_max_per_hour > 0:
-            throttle_key = f"notifications:email_throttle:{user_id}"
             count = RedisClient.incr(throttle_key)
             if count == 1:
                 RedisClient.expire(throttle_key, 3600)
-            if count > email_max_per_hour:
-                continue
-
-        send_email.delay(
-            {
-                "from": from_addr,
-                "to": user.email,
-                "subject": _notification_email_subject(notification.type),
-                "body": _notification_email_body(notification),
-            }
+
+        email = _notification_digest_email(
+            from_addr, [json.loads(item) for item in items]
+        )
+        digests.append((user_id, items, email))
+
+    sent, unsent = mail.send_emails([email for _, _, email in digests])
+
+    # put undelivered digests back in front of anything queued meanwhile
+    unsent_digests = digests[len(digests) - len(unsent) :] if unsent else []
+    for user_id, items, _ in unsent_digests:
+        pipeline = RedisClient.pipeline()
+        pipeline.lpush(
+            NOTIFICATION_DIGEST_KEY.format(user_id=user_id), *reversed(items)
         )
+        pipeline.sadd(NOTIFICATION_DIGEST_PENDING_KEY, user_id)
+        if email_max_per_hour > 0:
+            pipeline.decr(f"notifications:email_throttle:{user_id}")
+        pipeline.execute()
+
+    if throttled or unsent_digests:
+        schedule_notification_digests_flush(interval)
+
+    return {"sent": sent, "throttled": throttled, "requeued": len(unsent_digests)}
 
 
 def create_hunt_notification(
@@ -4,6 +4,7 @@ from uuid import UUID
 
 from app.schemas import object_reference as object_reference_schemas
 from app.services.opensearch import get_opensearch_client
+from app.services.opensearch_refresh import get_refresh
 from opensearchpy.exceptions import NotFoundError
 from pymisp import MISPObjectReference
 from sqlalchemy.orm import Session
@@ -29,7 +30,7 @@ def create_object_reference(
         "deleted": object_reference.deleted or False,
     }
 
-    client.index(index="misp-object-references", id=ref_uuid, body=ref_doc, refresh=True)
+    client.index(index="misp-object-references", id=ref_uuid, body=ref_doc, refresh=get_refresh("object_references.create_object_reference", index="misp-object-references"))
 
     return object_reference_schemas.ObjectReference.model_validate(ref_doc)
 
@@ -51,7 +52,7 @@ def create_object_reference_from_pulled_object_reference(
         "deleted": False,
     }
 
-    client.index(index="misp-object-references", id=ref_uuid, body=ref_doc, refresh=True)
+    client.index(index="misp-object-references", id=ref_uuid, body=ref_doc, refresh=get_refresh("object_references.create_object_reference_from_pulled_object_reference", index="misp-object-references"))
 
     return object_reference_schemas.ObjectReference.model_validate(ref_doc)
 
@@ -86,6 +87,9 @@ def update_object_reference_from_pulled_object_reference(
         index="misp-object-references",
         id=str(db_object_reference.uuid),
         body={"doc": patch},
-        refresh=True,
+        refresh=get_refresh(
+            "object_references.update_object_reference_from_pulled_object_reference",
+            index="misp-object-references",
+        ),
     )
     return get_object_reference_by_uuid(db, db_object_reference.uuid)
@@ -16,6 +16,7 @@ from app.schemas import object_reference as object_reference_schemas
 from app.schemas import user as user_schemas
 from app.worker import tasks
 from app.services.opensearch import get_opensearch_client
+from app.services.opensearch_refresh import get_refresh
 from fastapi import HTTPException, status
 from fastapi_pagination import Page, Params
 from pymisp import MISPObject
@@ -268,7 +269,7 @@ def create_object(
         "@timestamp": _datetime.fromtimestamp(object.timestamp).isoformat(),
     }
 
-    client.index(index="misp-objects", id=object_uuid, body=obj_doc, refresh=True)
+    client.index(index="misp-objects", id=object_uuid, body=obj_doc, refresh=get_refresh("objects.create_object", index="misp-objects"))
 
     built_attrs = []
     for attr in (object.attributes or []):
@@ -278,7 +279,7 @@ def create_object(
             index="misp-attributes",
             id=str(attr_schema.uuid),
             body={"doc": {"object_uuid": object_uuid}},
-            refresh=True,
+            refresh=get_refresh("objects.create_object", index="misp-attributes"),
         )
         built_attrs.append(attr_schema)
 
@@ -332,7 +333,7 @@ def create_object_from_pulled_object(
         "@timestamp": _datetime.fromtimestamp(ts).isoformat(),
     }
 
-    client.index(index="misp-objects", id=object_uuid, body=obj_doc, refresh=True)
+    client.index(index="misp-objects", id=object_uuid, body=obj_doc, refresh=get_refresh("objects.create_object_from_pulled_object", index="misp-objects"))
 
     for pulled_attribute in pulled_object.attributes:
         local_attribute = attributes_repository.create_attribute_from_pulled_attribute(
@@ -343,7 +344,9 @@ def create_object_from_pulled_object(
                 index="misp-attributes",
                 id=str(local_attribute.uuid),
                 body={"doc": {"object_uuid": object_uuid}},
-                refresh=True,
+                refresh=get_refresh(
+                    "objects.create_object_from_pulled_object", index="misp-attributes"
+                ),
             )
 
     for pulled_object_reference in pulled_object.ObjectReference:
@@ -382,7 +385,10 @@ def update_object_from_pulled_object(
                         index="misp-attributes",
                         id=str(new_attr.uuid),
                         body={"doc": {"object_uuid": str(local_object.uuid)}},
-                        refresh=True,
+                        refresh=get_refresh(
+                            "objects.update_object_from_pulled_object",
+                            index="misp-attributes",
+                        ),
                     )
             else:
                 attributes_repository.update_attribute_from_pulled_attribute(
@@ -448,7 +454,7 @@ def update_object(
             patch[k] = v.value
 
     if patch:
-        client.update(index="misp-objects", id=str(os_obj.uuid), body={"doc": patch}, refresh=True)
+        client.update(index="misp-objects", id=str(os_obj.uuid), body={"doc": patch}, refresh=get_refresh("objects.update_object", index="misp-objects"))
 
     for attr in (object.new_attributes or []):
         attr.event_uuid = os_obj.event_uuid
@@ -457,7 +463,7 @@ def update_object(
             index="misp-attributes",
             id=str(attr_schema.uuid),
             body={"doc": {"object_uuid": str(os_obj.uuid)}},
-            refresh=True,
+            refresh=get_refresh("objects.update_object", index="misp-attributes"),
         )
 
     for attr in (object.update_attributes or []):
@@ -477,14 +483,14 @@ def delete_object(db: Session, object_uuid: UUID) -> None:
     if os_obj is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Object not found")
 
-    client.update(index="misp-objects", id=str(os_obj.uuid), body={"doc": {"deleted": True}}, refresh=True)
+    client.update(index="misp-objects", id=str(os_obj.uuid), body={"doc": {"deleted": True}}, refresh=get_refresh("objects.delete_object", index="misp-objects"))
 
     for attr in os_obj.attributes:
         client.update(
             index="misp-attributes",
             id=str(attr.uuid),
             body={"doc": {"deleted": True}},
-            refresh=True,
+            refresh=get_refresh("objects.delete_object", index="misp-attributes"),
         )
 
     tasks.handle_deleted_object.delay(str(os_obj.uuid), str(os_obj.event_uuid) if os_obj.event_uuid else None)
@@ -266,6 +266,37 @@ def dispatch_triggered_scripts(
     Returns the list of created run ids (mostly for tests).
     """
     candidates = reactor_triggers.list_active_scripts_for(db, resource_type, action)
+    return _dispatch_to_candidates(db, candidates, resource_type, action, payload)
+
+
+def dispatch_triggered_scripts_bulk(
+    db: Session,
+    resource_type: str,
+    action: str,
+    payloads: list[dict],
+) -> list[int]:
+    """Like ``dispatch_triggered_scripts`` for many payloads of the same
+    trigger, looking up the subscribed scripts only once.
+    """
+    candidates = reactor_triggers.list_active_scripts_for(db, resource_type, action)
+    if not candidates:
+        return []
+
+    run_ids: list[int] = []
+    for payload in payloads:
+        run_ids += _dispatch_to_candidates(
+            db, candidates, resource_type, action, payload
+        )
+    return run_ids
+
+
+def _dispatch_to_candidates(
+    db: Session,
+    candidates: list[reactor_models.ReactorScript],
+    resource_type: str,
+    action: str,
+    payload: dict,
+) -> list[int]:
     matching = [
         s
         for s in candidates
@@ -1,4 +1,5 @@
 from app.services.opensearch import get_opensearch_client
+from app.services.opensearch_refresh import get_refresh
 from app.schemas import event as event_schemas
 from app.models.event import DistributionLevel
 from opensearchpy.exceptions import NotFoundError
@@ -50,7 +51,7 @@ def create_event_report(event: event_schemas.Event, report: dict):
     }
 
     response = OpenSearchClient.index(
-        index="misp-event-reports", body=document, id=report_uuid, refresh=True
+        index="misp-event-reports", body=document, id=report_uuid, refresh=get_refresh("reports.create_event_report", index="misp-event-reports")
     )
 
     if response["result"] == "created":
@@ -0,0 +1,303 @@
+"""
+Event retention enforcement.
+
+Expired events are collected a page of UUIDs at a time. The children of a
+page are removed with one ``terms``-filtered ``delete_by_query`` per index,
+submitted as sliced, throttled OpenSearch tasks that run side by side; the
+events themselves are deleted once their children are gone, so a failed run
+leaves them in place for the next one.
+
+The progress of the current (or last) run is kept in Redis together with the
+OpenSearch task ids, so it can be checked while the purge is running. The days
+of the purged sightings are marked dirty so their rollups are recomputed.
+"""
+
+import json
+import logging
+import time
+from typing import Iterator, Optional
+
+from app.repositories import sighting_rollups
+from app.services import event_cache
+from app.services.opensearch import get_opensearch_client
+from app.services.redis import get_redis_client
+from opensearchpy import helpers as opensearch_helpers
+
+logger = logging.getLogger(__name__)
+
+RETENTION_PROGRESS_KEY = "retention:progress"
+RETENTION_LOCK_KEY = "retention:lock"
+RETENTION_LOCK_TIMEOUT = 60 * 60 * 24
+RETENTION_POLL_INTERVAL = 5
+
+# upper bound of attribute UUIDs per sightings terms filter
+SIGHTINGS_TERMS_CHUNK = 10_000
+
+PURGED_INDICES = (
+    "misp-sightings",
+    "misp-attribute-correlations",
+    "misp-attributes",
+    "misp-objects",
+    "misp-events",
+)
+
+
+class RetentionTaskError(Exception):
+    pass
+
+
+def expired_events_query(cutoff: int, exempt_tags: list[str]) -> dict:
+    """Non-deleted events last updated before ``cutoff`` without an exempt tag."""
+    must_not = (
+        [{"match_phrase": {"tags.name": tag}} for tag in exempt_tags]
+        if exempt_tags
+        else []
+    )
+    return {
+        "bool": {
+            "must": [
+                {"range": {"timestamp": {"lt": cutoff}}},
+                {"term": {"deleted": False}},
+            ],
+            "must_not": must_not,
+        }
+    }
+
+
+def iter_expired_event_uuid_pages(
+    client, query: dict, page_size: int
+) -> Iterator[list[str]]:
+    """Yield pages of expired event UUIDs, sorted by UUID.
+
+    Pages are fetched with ``search_after`` so events deleted between pages
+    do not shift the following ones.
+    """
+    search_after = None
+    while True:
+        body = {
+            "query": query,
+            "_source": ["uuid"],
+            "size": page_size,
+            "sort": [{"uuid.keyword": "asc"}],
+        }
+        if search_after:
+            body["search_after"] = search_after
+        response = client.search(index="misp-events", body=body)
+        hits = response["hits"]["hits"]
+        if not hits:
+            return
+        yield [hit["_source"]["uuid"] for hit in hits]
+        if len(hits) < page_size:
+            return
+        search_after = hits[-1]["sort"]
+
+
+def _get_attribute_uuids(client, event_uuids: list[str]) -> list[str]:
+    return [
+        hit["_source"]["uuid"]
+        for hit in opensearch_helpers.scan(
+            client,
+            index="misp-attributes",
+            query={
+                "query": {"terms": {"event_uuid": event_uuids}},
+                "_source": ["uuid"],
+            },
+            size=1000,
+        )
+    ]
+
+
+def _get_sighting_days(client, attribute_uuids: list[str]) -> list[int]:
+    """Start of each day holding sightings of ``attribute_uuids``."""
+    response = client.search(
+        index="misp-sightings",
+        body={
+            "size": 0,
+            "query": {"terms": {"attribute_uuid": attribute_uuids}},
+            "aggs": {
+                "days": {
+                    "date_histogram": {
+                        "field": "@timestamp",
+                        "fixed_interval": "1d",
+                        "min_doc_count": 1,
+                    }
+                }
+            },
+        },
+    )
+    return [
+        bucket["key"] // 1000 for bucket in response["aggregations"]["days"]["buckets"]
+    ]
+
+
+def _page_deletes(
+    client, event_uuids: list[str]
+) -> tuple[list[tuple[str, dict]], set[int]]:
+    """``(index, query)`` pairs removing the children of a page of events,
+    and the days of the sightings they remove."""
+    deletes = []
+    sighting_days = set()
+
+    # sightings only reference their attribute
+    attribute_uuids = _get_attribute_uuids(client, event_uuids)
+    for i in range(0, len(attribute_uuids), SIGHTINGS_TERMS_CHUNK):
+        chunk = attribute_uuids[i : i + SIGHTINGS_TERMS_CHUNK]
+        sighting_days.update(_get_sighting_days(client, chunk))
+        deletes.append(("misp-sightings", {"terms": {"attribute_uuid": chunk}}))
+
+    deletes.append(
+        (
+            "misp-attribute-correlations",
+            {
+                "bool": {
+                    "should": [
+                        {"terms": {"source_event_uuid.keyword": event_uuids}},
+                        {"terms": {"target_event_uuid.keyword": event_uuids}},
+                    ]
+                }
+            },
+        )
+    )
+    deletes.append(("misp-attributes", {"terms": {"event_uuid": event_uuids}}))
+    deletes.append(("misp-objects", {"terms": {"event_uuid": event_uuids}}))
+    return deletes, sighting_days
+
+
+def _submit_delete(client, index: str, query: dict, requests_per_second: int) -> str:
+    response = client.delete_by_query(
+        index=index,
+        body={"query": query},
+        wait_for_completion=False,
+        slices="auto",
+        requests_per_second=requests_per_second if requests_per_second > 0 else -1,
+        conflicts="proceed",
+        refresh=False,
+    )
+    return response["task"]
+
+
+def _wait_for_tasks(client, tasks: dict, on_poll) -> dict:
+    """Poll the submitted OpenSearch tasks until all of them completed.
+
+    ``tasks`` maps task ids to their index; ``on_poll`` is called with the
+    documents deleted so far per task after each poll.
+    """
+    deleted = {}
+    running = dict(tasks)
+    while True:
+        for task_id, index in list(running.items()):
+            result = client.tasks.get(task_id=task_id)
+            if not result.get("completed"):
+                deleted[task_id] = result["task"]["status"].get("deleted", 0)
+                continue
+
+            running.pop(task_id)
+            if "error" in result:
+                raise RetentionTaskError(
+                    f"delete_by_query on {index} failed: {result['error']}"
+                )
+            response = result.get("response", {})
+            if response.get("failures"):
+                raise RetentionTaskError(
+                    f"delete_by_query on {index} failed: {response['failures'][0]}"
+                )
+            deleted[task_id] = response.get("deleted", 0)
+
+        on_poll(deleted)
+        if not running:
+            return deleted
+        time.sleep(RETENTION_POLL_INTERVAL)
+
+
+def _save_progress(RedisClient, progress: dict) -> None:
+    RedisClient.set(RETENTION_PROGRESS_KEY, json.dumps(progress))
+
+
+def get_retention_progress() -> Optional[dict]:
+    """Progress of the current or last retention run, if any."""
+    progress = get_redis_client().get(RETENTION_PROGRESS_KEY)
+    return json.loads(progress) if progress else None
+
+
+def purge_expired_events(
+    period_days: int,
+    exempt_tags: list[str],
+    page_size: int = 500,
+    requests_per_second: int = 0,
+) -> dict:
+    """
+    Delete expired events and everything that belongs to them.
+
+    Returns a report with the number of events purged and of documents
+    removed from each index.
+    """
+    RedisClient = get_redis_client()
+    if not RedisClient.set(
+        RETENTION_LOCK_KEY, 1, nx=True, ex=RETENTION_LOCK_TIMEOUT
+    ):
+        logger.info("retention purge skipped: another run is active")
+        return {"status": "skipped"}
+
+    client = get_opensearch_client()
+    cutoff = int(time.time()) - period_days * 86400
+    query = expired_events_query(cutoff, exempt_tags)
+
+    progress = {
+        "status": "running",
+        "started_at": int(time.time()),
+        "finished_at": None,
+        "cutoff": cutoff,
+        "events": 0,
+        "deleted": {index: 0 for index in PURGED_INDICES},
+        "tasks": {},
+        "error": None,
+    }
+    _save_progress(RedisClient, progress)
+
+    def run_deletes(deletes: list[tuple[str, dict]]):
+        base = dict(progress["deleted"])
+        tasks = {
+            _submit_delete(client, index, delete_query, requests_per_second): index
+            for index, delete_query in deletes
+        }
+        progress["tasks"] = tasks
+
+        def on_poll(deleted):
+            progress["deleted"] = dict(base)
+            for task_id, count in deleted.items():
+                progress["deleted"][tasks[task_id]] += count
+            _save_progress(RedisClient, progress)
+
+        _wait_for_tasks(client, tasks, on_poll)
+
+    try:
+        for event_uuids in iter_expired_event_uuid_pages(client, query, page_size):
+            logger.info("retention purge: purging %s events", len(event_uuids))
+            deletes, sighting_days = _page_deletes(client, event_uuids)
+            run_deletes(deletes)
+            # the rollups of these days still count the purged sightings
+            sighting_rollups.mark_sightings_dirty(sighting_days)
+            run_deletes([("misp-events", {"terms": {"uuid.keyword": event_uuids}})])
+            event_cache.invalidate_events(event_uuids)
+            progress["events"] += len(event_uuids)
+            _save_progress(RedisClient, progress)
+
+        # deletes run without refresh, make the purge visible once
+        client.indices.refresh(index=",".join(PURGED_INDICES), ignore=[404])
+        progress["status"] = "finished"
+    except Exception as e:
+        progress["status"] = "failed"
+        progress["error"] = str(e)
+        raise
+    finally:
+        progress["tasks"] = {}
+        progress["finished_at"] = int(time.time())
+        _save_progress(RedisClient, progress)
+        RedisClient.delete(RETENTION_LOCK_KEY)
+
+    logger.info(
+        "retention purge finished: %s events purged, deleted documents %s",
+        progress["events"],
+        progress["deleted"],
+    )
+    return {"events": progress["events"], "deleted": progress["deleted"]}
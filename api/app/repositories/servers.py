@@ -1,7 +1,9 @@
 import os
 import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from types import SimpleNamespace
-from typing import Union
+from typing import Iterator, Union
 
 from app.models import server as server_models
 from app.models import user as user_models
@@ -9,9 +11,11 @@ from app.models.event import DistributionLevel
 from app.schemas import event as event_schemas
 from app.repositories import sync as sync_repository
 from app.repositories import events as events_repository
+from app.repositories import notifications as notifications_repository
 from app.repositories import sharing_groups as sharing_groups_repository
 from app.schemas import server as server_schemas
-from app.settings import Settings
+from app.services.runtime_settings import RuntimeSettings
+from app.settings import Settings, get_settings
 from fastapi import HTTPException, status
 from pymisp import (
     MISPAttribute,
@@ -20,11 +24,18 @@ from pymisp import (
     MISPSharingGroup,
     PyMISP,
 )
+from requests.adapters import HTTPAdapter
 from sqlalchemy.orm import Session
 from app.worker import tasks
 
 logger = logging.getLogger(__name__)
 
+SERVER_INDEX_PAGE_SIZE = 1000
+SERVER_PULL_PAGE_SIZE = 50
+SERVER_PULL_CONCURRENCY = 4
+SERVER_PUSH_CONCURRENCY = 4
+SERVER_PUSH_RATE_LIMIT = 10
+
 
 def get_servers(db: Session, skip: int = 0, limit: int = 100):
     return db.query(server_models.Server).offset(skip).limit(limit).all()
@@ -50,7 +61,9 @@ def create_server(db: Session, server: server_schemas.ServerCreate):
         push_galaxy_clusters=server.push_galaxy_clusters,
         pull_galaxy_clusters=server.pull_galaxy_clusters,
         last_pulled_id=server.last_pulled_id,
+        last_pulled_timestamp=server.last_pulled_timestamp,
         last_pushed_id=server.last_pushed_id,
+        last_pushed_timestamp=server.last_pushed_timestamp,
         organisation=server.organisation,
         remote_org_id=server.remote_org_id,
         publish_without_email=server.publish_without_email,
@@ -73,7 +86,11 @@ def create_server(db: Session, server: server_schemas.ServerCreate):
     return db_server
 
 
-def get_remote_misp_connection(server: server_models.Server):
+def get_remote_misp_connection(server: server_models.Server, pool_size: int = None):
+    """
+    Build a PyMISP connection and check the sync permissions once, pass
+    ``pool_size`` to keep enough connections alive for concurrent requests.
+    """
     verify_cert = not server.self_signed
 
     try:
@@ -84,6 +101,11 @@ def get_remote_misp_connection(server: server_models.Server):
             http_headers={
                 "User-Agent": "misp-workbench/" + os.environ.get("APP_VERSION", "")
             },
+            https_adapter=(
+                HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                if pool_size
+                else None
+            ),
         )
         remote_misp_version = remote_misp.misp_instance_version
     except Exception as ex:
@@ -109,8 +131,14 @@ def pull_server_by_id(
     if server is None:
         raise Exception("Server not found")
 
-    # get remote instance version
-    remote_misp = get_remote_misp_connection(server)
+    runtimeSettings = RuntimeSettings(db)
+    concurrency = max(
+        1,
+        runtimeSettings.get_value("servers.pullConcurrency", SERVER_PULL_CONCURRENCY),
+    )
+
+    # get remote instance version, the connection is shared by the whole pull
+    remote_misp = get_remote_misp_connection(server, pool_size=concurrency)
 
     if technique == "pull_relevant_clusters":
         # TODO implement pull_relevant_clusters server pull technique
@@ -119,11 +147,10 @@ def pull_server_by_id(
         )
 
     if technique == "update":
-        # TODO implement update server pull technique
-        raise Exception("Server pull technique `update` not implemented yet.")
+        return pull_server_by_id_update(db, server, remote_misp, user, runtimeSettings)
 
     if technique == "full":
-        return pull_server_by_id_full(db, server, remote_misp, user)
+        return pull_server_by_id_full(db, server, remote_misp, user, runtimeSettings)
 
     raise Exception(
         "Unknown server pull technique `%s` not implemented yet." % technique
@@ -135,54 +162,198 @@ def pull_server_by_id_full(
     server: server_schemas.Server,
     remote_misp: PyMISP,
     user: user_models.User,
+    runtimeSettings: RuntimeSettings = None,
 ):
 
     # get a list of the event_uuids on the server
-    event_uuids = get_event_uuids_from_server(server, remote_misp)
+    event_uuids = []
+    index_timestamps = {}
+    high_water_mark = None
+    for events in get_event_index_from_server(
+        server, remote_misp, timestamp=server.pull_rules.get("timestamp", None)
+    ):
+        event_uuids.extend(event["uuid"] for event in events)
+        index_timestamps.update(get_index_timestamps(events))
+        high_water_mark = get_index_high_water_mark(events, high_water_mark)
 
     # TODO apply MISP.enableEventBlocklisting / removeBlockedEvents
     # TODO apply MISP.enableOrgBlocklisting / removeBlockedEvents
 
-    # pull each of the events in different tasks
-    for event_uuid in event_uuids:
-        tasks.pull_event_by_uuid.delay(str(event_uuid), server.id, user.id)
+    result = pull_events_from_server(
+        db, event_uuids, server, remote_misp, user, get_settings(), runtimeSettings
+    )
+    record_server_pull_high_water_mark(
+        db, server, high_water_mark, result, index_timestamps
+    )
 
-    logger.info("server pull id=%s all event fetch tasks enqueued.", server.id)
-    return {
-        "result": "success",
-        "message": "All server id=%s events to pull enqueued." % server.id,
-    }
+    logger.info(
+        "server pull id=%s finished, %s events pulled, %s skipped, %s rejected, "
+        "%s failed.",
+        server.id,
+        result["processed"],
+        result["skipped"],
+        result["rejected"],
+        result["failed"],
+    )
+    return result
 
 
-def get_event_uuids_from_server(server: server_schemas.Server, remote_misp: PyMISP):
+def pull_server_by_id_update(
+    db: Session,
+    server: server_schemas.Server,
+    remote_misp: PyMISP,
+    user: user_models.User,
+    runtimeSettings: RuntimeSettings = None,
+):
     """
+    Pull only the remote events changed since the last successful pull,
+    events whose local copy is already as recent are not downloaded.
+    """
+
+    since = server.last_pulled_timestamp
+    if since is None:
+        since = server.pull_rules.get("timestamp", None)
+
+    event_uuids = []
+    index_timestamps = {}
+    high_water_mark = server.last_pulled_timestamp
+    for events in get_event_index_from_server(server, remote_misp, timestamp=since):
+        event_uuids.extend(get_events_newer_than_local(events))
+        index_timestamps.update(get_index_timestamps(events))
+        high_water_mark = get_index_high_water_mark(events, high_water_mark)
+
+    result = pull_events_from_server(
+        db, event_uuids, server, remote_misp, user, get_settings(), runtimeSettings
+    )
+    record_server_pull_high_water_mark(
+        db, server, high_water_mark, result, index_timestamps
+    )
+
+    logger.info(
+        "server update pull id=%s finished, %s events pulled, %s skipped, "
+        "%s rejected, %s failed.",
+        server.id,
+        result["processed"],
+        result["skipped"],
+        result["rejected"],
+        result["failed"],
+    )
+    return result
+
+
+def get_event_index_from_server(
+    server: server_schemas.Server,
+    remote_misp: PyMISP,
+    timestamp=None,
+    page_size: int = SERVER_INDEX_PAGE_SIZE,
+    published: bool = True,
+) -> Iterator[list]:
+    """
+    Yield the minimal remote event index page by page.
+
     see: app/Model/Server.php::getEventIndexFromServer()
     """
+    page = 1
+    while True:
+        events = remote_misp.search_index(
+            minimal=True,
+            published=published,
+            timestamp=timestamp,
+            page=page,
+            limit=page_size,
+        )
+        if events:
+            yield events
 
-    # TODO: use restSearch and pagination
+        if len(events) < page_size:
+            break
+        page += 1
 
+
+def get_event_uuids_from_server(
+    server: server_schemas.Server,
+    remote_misp: PyMISP,
+    page_size: int = SERVER_INDEX_PAGE_SIZE,
+):
     timestamp = server.pull_rules.get("timestamp", None)
 
-    events = remote_misp.search_index(minimal=True, published=True, timestamp=timestamp)
-    event_uuids = [event["uuid"] for event in events]
+    return [
+        event["uuid"]
+        for events in get_event_index_from_server(
+            server, remote_misp, timestamp=timestamp, page_size=page_size
+        )
+        for event in events
+    ]
+
 
-    return event_uuids
+def get_events_newer_than_local(events: list) -> list:
+    """Return the uuids of the indexed remote events newer than their local copy."""
+    local_timestamps = events_repository.get_event_timestamps_by_uuids(
+        [event["uuid"] for event in events]
+    )
 
+    return [
+        event["uuid"]
+        for event in events
+        if event["uuid"] not in local_timestamps
+        or int(event["timestamp"]) > (local_timestamps[event["uuid"]] or 0)
+    ]
 
-def pull_event_by_uuid(
+
+def get_index_high_water_mark(events: list, high_water_mark: int = None):
+    timestamps = [int(event["timestamp"]) for event in events if event.get("timestamp")]
+    if high_water_mark is not None:
+        timestamps.append(high_water_mark)
+    return max(timestamps, default=None)
+
+
+def get_index_timestamps(events: list) -> dict:
+    return {
+        event["uuid"]: int(event["timestamp"])
+        for event in events
+        if event.get("timestamp")
+    }
+
+
+def record_server_pull_high_water_mark(
     db: Session,
-    event_uuid: str,
-    server: server_schemas.Server,
-    user: user_models.User,
-    settings: Settings,
-) -> Union[event_schemas.Event, bool]:
+    server: server_models.Server,
+    high_water_mark: int,
+    result: dict,
+    index_timestamps: dict = None,
+):
     """
-    see: app/Model/Server.php::__pullEvent()
+    Advance ``last_pulled_timestamp`` to the newest pulled event.
+
+    When events failed, the mark stops right before the oldest failed one, so
+    the next update pull retries the failures without listing everything
+    pulled successfully since the previous mark again. Skipped and rejected
+    events do not hold the mark back, and the mark never moves backwards.
     """
+    if high_water_mark is None:
+        return
 
-    remote_misp = get_remote_misp_connection(server)
+    if result["failed"]:
+        failed_timestamps = [
+            (index_timestamps or {}).get(uuid)
+            for uuid in result.get("failed_uuids", [])
+        ]
+        # keep the previous mark when a failure cannot be placed in the index
+        if not failed_timestamps or None in failed_timestamps:
+            return
+        high_water_mark = min(high_water_mark, min(failed_timestamps) - 1)
 
-    # fetch event from remote server
+    if (
+        server.last_pulled_timestamp is not None
+        and high_water_mark <= server.last_pulled_timestamp
+    ):
+        return
+
+    server.last_pulled_timestamp = high_water_mark
+    db.commit()
+
+
+def build_pull_event_request(server: server_schemas.Server) -> dict:
     data = {
         "deleted": [0, 1],
         "excludeGalaxy": 1,
@@ -195,13 +366,183 @@ def pull_event_by_uuid(
     if server.internal:
         data["excludeLocalTags"] = 1
 
+    return data
+
+
+def download_remote_events_page(
+    remote_misp: PyMISP, server: server_schemas.Server, event_uuids: list
+) -> list:
+    """Download a page of full events through the remote `restSearch`."""
+    data = build_pull_event_request(server)
+    data.update(
+        {
+            "returnFormat": "json",
+            "uuid": event_uuids,
+            "limit": len(event_uuids),
+            "page": 1,
+        }
+    )
+
+    response = remote_misp._prepare_request("POST", "events/restSearch", data=data)
+    result = remote_misp._check_json_response(response)
+
+    if isinstance(result, dict):
+        if "errors" in result:
+            raise Exception(result["errors"])
+        result = result.get("response", [])
+
+    return result
+
+
+def iter_remote_events(
+    remote_misp: PyMISP,
+    server: server_schemas.Server,
+    event_uuids: list,
+    page_size: int,
+    concurrency: int,
+) -> Iterator[tuple]:
+    """Yield ``(page_uuids, events_raw, error)`` as event pages are downloaded.
+
+    Pages are downloaded on a thread pool sharing the session of
+    ``remote_misp``; at most ``concurrency`` pages are in flight so memory
+    stays bounded by the events waiting to be written.
+    """
+    pages = [
+        event_uuids[i : i + page_size] for i in range(0, len(event_uuids), page_size)
+    ]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {}
+        for page_uuids in pages:
+            pending[
+                executor.submit(
+                    download_remote_events_page, remote_misp, server, page_uuids
+                )
+            ] = page_uuids
+
+            if len(pending) >= concurrency:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield (pending.pop(future), *_remote_events_result(future))
+
+        for future in list(pending):
+            yield (pending.pop(future), *_remote_events_result(future))
+
+
+def _remote_events_result(future) -> tuple:
+    try:
+        return future.result(), None
+    except Exception as e:
+        return None, e
+
+
+def pull_events_from_server(
+    db: Session,
+    event_uuids: list,
+    server: server_schemas.Server,
+    remote_misp: PyMISP,
+    user: user_models.User,
+    settings: Settings,
+    runtimeSettings: RuntimeSettings = None,
+) -> dict:
+    """Download remote events in pages over one connection and store them."""
+    runtimeSettings = runtimeSettings or RuntimeSettings(db)
+    page_size = max(
+        1, runtimeSettings.get_value("servers.pullPageSize", SERVER_PULL_PAGE_SIZE)
+    )
+    concurrency = max(
+        1,
+        runtimeSettings.get_value("servers.pullConcurrency", SERVER_PULL_CONCURRENCY),
+    )
+
+    counts = {"pulled": 0, "skipped": 0, "rejected": 0}
+    failed_uuids = []
+    for page_uuids, events_raw, error in iter_remote_events(
+        remote_misp, server, event_uuids, page_size, concurrency
+    ):
+        if error is not None:
+            failed_uuids.extend(page_uuids)
+            logger.error(
+                "Failed downloading %s events from remote server %s: %s",
+                len(page_uuids),
+                server.id,
+                error,
+            )
+            continue
+
+        received = set()
+        for event_raw in events_raw:
+            event_uuid = event_raw.get("Event", event_raw).get("uuid")
+            received.add(event_uuid)
+            try:
+                outcome, db_event = process_pulled_event(
+                    db, event_raw, server, user, settings
+                )
+            except Exception as e:
+                db.rollback()
+                outcome, db_event = "failed", None
+                logger.error(
+                    "Failed storing a pulled event from remote server %s: %s",
+                    server.id,
+                    e,
+                )
+
+            if outcome == "failed":
+                failed_uuids.append(event_uuid)
+                continue
+
+            counts[outcome] += 1
+            if outcome == "pulled":
+                notifications_repository.create_event_notifications(
+                    db, "created", event=db_event
+                )
+
+        # events missing from the page were removed or are no longer visible,
+        # pulling them again would not change that
+        counts["rejected"] += sum(1 for uuid in page_uuids if uuid not in received)
+
+    return {
+        "result": "success",
+        "message": "%s events pulled from server id=%s, %s skipped, %s rejected, "
+        "%s failed."
+        % (
+            counts["pulled"],
+            server.id,
+            counts["skipped"],
+            counts["rejected"],
+            len(failed_uuids),
+        ),
+        "processed": counts["pulled"],
+        "skipped": counts["skipped"],
+        "rejected": counts["rejected"],
+        "failed": len(failed_uuids),
+        "failed_uuids": failed_uuids,
+    }
+
+
+def pull_event_by_uuid(
+    db: Session,
+    event_uuid: str,
+    server: server_schemas.Server,
+    user: user_models.User,
+    settings: Settings,
+    remote_misp: PyMISP = None,
+) -> Union[event_schemas.Event, bool]:
+    """
+    see: app/Model/Server.php::__pullEvent()
+    """
+
+    if remote_misp is None:
+        remote_misp = get_remote_misp_connection(server)
+
+    # fetch event from remote server
     try:
         response = remote_misp._prepare_request(
-            "POST", f"events/view/{event_uuid}", data=data
+            "POST",
+            f"events/view/{event_uuid}",
+            data=build_pull_event_request(server),
         )
         event_raw = remote_misp._check_json_response(response)
-        event = MISPEvent()
-        event.load(event_raw)
     except Exception as ex:
         logger.error(
             "Failed downloading the event {} from remote server {}".format(
@@ -211,24 +552,47 @@ def pull_event_by_uuid(
         )
         return False
 
+    _, db_event = process_pulled_event(db, event_raw, server, user, settings)
+    return db_event or False
+
+
+def process_pulled_event(
+    db: Session,
+    event_raw: dict,
+    server: server_schemas.Server,
+    user: user_models.User,
+    settings: Settings,
+) -> tuple[str, Union[event_schemas.Event, None]]:
+    """
+    Store a downloaded remote event, returns ``(outcome, event)``.
+
+    The outcome is ``pulled`` when the event was created or updated,
+    ``skipped`` when the local copy is already as recent, ``rejected`` when
+    the event can never be stored as it is and ``failed`` when storing it
+    failed and should be retried.
+    """
+    try:
+        event = MISPEvent()
+        event.load(event_raw)
+    except Exception as ex:
+        logger.error(
+            "Failed loading an event from remote server {}: {}".format(server.id, ex)
+        )
+        return "rejected", None
+
     if event is None:
         logger.error(
-            "Empty event returned from the event {} from remote server {}".format(
-                event_uuid, server.id
-            )
+            "Empty event returned from remote server {}".format(server.id)
         )
-        return False
+        return "rejected", None
 
     event = update_pulled_event_before_insert(db, settings, event, server, user)
 
     if not check_if_event_is_not_empty:
-        logger.info("Event %s is empty, skipping" % event_uuid)
-        return False
+        logger.info("Event %s is empty, skipping" % event.uuid)
+        return "rejected", None
 
-    db_event = create_or_update_pulled_event(db, event, server, user)
-
-    if not db_event:
-        return False
+    outcome, db_event = create_or_update_pulled_event(db, event, server, user)
 
     # TODO: process cryptographic keys, see app/Model/Event.php::_add()
 
@@ -236,7 +600,7 @@ def pull_event_by_uuid(
 
     # TODO: process tag collection, see app/Model/Event.php::_add()
 
-    return db_event
+    return outcome, db_event
 
 
 def update_pulled_event_before_insert(
@@ -366,8 +730,10 @@ def check_if_event_is_not_empty(event: MISPEvent) -> bool:
 
 def create_or_update_pulled_event(
     db: Session, event: MISPEvent, server: server_schemas.Server, user: user_models.User
-) -> Union[MISPEvent, bool]:
+) -> tuple[str, Union[event_schemas.Event, None]]:
     """
+    Returns ``(outcome, event)``, see ``process_pulled_event``.
+
     see: app/Model/Server.php::__checkIfPulledEventExistsAndAddOrUpdate()
     """
     existing_event = events_repository.get_event_by_uuid(db, event_uuid=event.uuid)
@@ -399,14 +765,14 @@ def create_or_update_pulled_event(
             )
 
             logger.info(f"Event {event.uuid} created")
-            return created
+            return "pulled", created
     else:
         # update event
         if not existing_event.locked and not server.internal:
             logger.warning(
                 "Blocked an edit to an event that was created locally. This can happen if a synchronised event that was created on this instance was modified by an administrator on the remote side."
             )
-            return False
+            return "rejected", None
 
         # TODO: handle protected event
 
@@ -416,7 +782,7 @@ def create_or_update_pulled_event(
                 logger.error(
                     "Event could not be saved: Sharing group chosen as the distribution level, but no sharing group specified. Make sure that the event includes a valid sharing_group_id or change to a different distribution level."
                 )
-                return False
+                return "rejected", None
 
             sharing_group_id = sharing_groups_repository.capture_sharing_group(
                 db, existing_event.sharing_group, user, server
@@ -428,7 +794,7 @@ def create_or_update_pulled_event(
                 event.sharing_group_id = None
 
         if event.timestamp.timestamp() <= existing_event.timestamp:
-            return
+            return "skipped", None
 
         updated = events_repository.update_event_from_pulled_event(
             db, existing_event, event
@@ -447,9 +813,9 @@ def create_or_update_pulled_event(
 
             # TODO: publish event update to ZMQ
             logger.info("Updated event %s" % event.uuid)
-            return updated
+            return "pulled", updated
 
-    return False
+    return "failed", None
 
 
 def create_pulled_event_sharing_group(
@@ -724,7 +1090,13 @@ def push_event_by_uuid(
     server: server_schemas.Server,
     user: user_models.User,
     settings: Settings,
+    remote_misp: PyMISP = None,
+    remote_index: dict = None,
 ) -> dict:
+    """
+    Push a local event to the remote server, ``remote_index`` maps the remote
+    event uuids to their timestamps and saves probing the remote for the event.
+    """
 
     db_event = events_repository.get_event_by_uuid(db, event_uuid=event_uuid, full=True)
     if db_event is None:
@@ -743,55 +1115,62 @@ def push_event_by_uuid(
         return {
             "status": 400,
             "message": "Event is not published, skipping.",
+            "skipped": True,
         }
 
-    remote_misp = get_remote_misp_connection(server)
+    if remote_misp is None:
+        remote_misp = get_remote_misp_connection(server)
 
-    # fetch event from remote server
-    data = {
-        "deleted": [0, 1],
-        "minimal": 1,
-    }
+    if remote_index is not None:
+        remote_exists = event_uuid in remote_index
+    else:
+        # fetch event from remote server
+        data = {
+            "deleted": [0, 1],
+            "minimal": 1,
+        }
 
-    if server.internal:
-        data["excludeLocalTags"] = 1
+        if server.internal:
+            data["excludeLocalTags"] = 1
 
-    try:
-        response = remote_misp._prepare_request(
-            "POST", f"events/view/{event_uuid}", data=data
-        )
+        try:
+            response = remote_misp._prepare_request(
+                "POST", f"events/view/{event_uuid}", data=data
+            )
 
-        if response.status_code == 200:
-            event_raw = remote_misp._check_json_response(response)
-            remote_event = MISPEvent()
-            remote_event.load(event_raw)
+            if response.status_code == 200:
+                event_raw = remote_misp._check_json_response(response)
+                remote_event = MISPEvent()
+                remote_event.load(event_raw)
 
-        if response.status_code == 404:
-            remote_event = None
-        elif response.status_code != 200:
-            logger.error(
-                "Failed fetching the event {} from remote server {}, status code: {}".format(
-                    event_uuid, server.id, response.status_code
+            if response.status_code == 404:
+                remote_event = None
+            elif response.status_code != 200:
+                logger.error(
+                    "Failed fetching the event {} from remote server {}, status code: {}".format(
+                        event_uuid, server.id, response.status_code
+                    )
                 )
+                return {
+                    "status": response.status_code,
+                    "message": "Failed fetching the event.",
+                    "response": response.json(),
+                }
+
+        except Exception as ex:
+            logger.warning(
+                "Failed downloading the event {} from remote server {}".format(
+                    event_uuid, server.id
+                ),
+                ex,
             )
             return {
                 "status": response.status_code,
-                "message": "Failed fetching the event.",
+                "message": "Failed downloading the event",
                 "response": response.json(),
             }
 
-    except Exception as ex:
-        logger.warning(
-            "Failed downloading the event {} from remote server {}".format(
-                event_uuid, server.id
-            ),
-            ex,
-        )
-        return {
-            "status": response.status_code,
-            "message": "Failed downloading the event",
-            "response": response.json(),
-        }
+        remote_exists = remote_event is not None
 
     # if remote_event and remote_event.timestamp.timestamp() >= db_event.timestamp:
     #     logger.info(
@@ -814,9 +1193,10 @@ def push_event_by_uuid(
             return {
                 "status": 400,
                 "message": "Cannot push a published event with no attributes or objects.",
+                "skipped": True,
             }
 
-        if remote_event is None:
+        if not remote_exists:
             response = remote_misp._prepare_request(
                 "POST", f"events/add/{event_uuid}", data=event_json
             )
@@ -861,6 +1241,34 @@ def push_event_by_uuid(
         }
 
 
+def build_pushable_events_query(since: int = None) -> dict:
+    query = {
+        "bool": {
+            "must": [
+                {"term": {"published": True}},
+                {
+                    "terms": {
+                        "distribution": [
+                            DistributionLevel.CONNECTED_COMMUNITIES.value,
+                            DistributionLevel.ALL_COMMUNITIES.value,
+                        ]
+                    }
+                },
+            ]
+        }
+    }
+
+    if since is not None:
+        # events edited or (re)published since the last push
+        query["bool"]["should"] = [
+            {"range": {"timestamp": {"gte": since}}},
+            {"range": {"publish_timestamp": {"gte": since}}},
+        ]
+        query["bool"]["minimum_should_match"] = 1
+
+    return query
+
+
 def push_server_by_id_full(
     db: Session,
     server: server_schemas.Server,
@@ -868,27 +1276,13 @@ def push_server_by_id_full(
 ):
 
     # get a list of the event UUIDs eligible to be pushed to the server
-    from app.services.opensearch import get_opensearch_client as _get_os_client
-    _os = _get_os_client()
-    _resp = _os.search(
-        index="misp-events",
-        body={
-            "query": {
-                "bool": {
-                    "must": [
-                        {"term": {"published": True}},
-                        {"terms": {"distribution": [
-                            DistributionLevel.CONNECTED_COMMUNITIES.value,
-                            DistributionLevel.ALL_COMMUNITIES.value,
-                        ]}},
-                    ]
-                }
-            },
-            "_source": ["uuid"],
-            "size": 10000,
-        },
-    )
-    event_uuids = [h["_source"]["uuid"] for h in _resp["hits"]["hits"]]
+    event_uuids = [
+        event["uuid"]
+        for events in events_repository.iter_events_from_opensearch(
+            build_pushable_events_query(), ["uuid"]
+        )
+        for event in events
+    ]
 
     # push each of the events in different tasks
     for event_uuid in event_uuids:
@@ -901,6 +1295,172 @@ def push_server_by_id_full(
     }
 
 
+def push_server_by_id_update(
+    db: Session,
+    server: server_schemas.Server,
+    remote_misp: PyMISP,
+    user: user_models.User,
+    runtimeSettings: RuntimeSettings = None,
+):
+    """
+    Push the local events changed since the last successful push which the
+    remote does not have yet, or only has an older version of.
+    """
+
+    remote_index = get_remote_event_timestamps(server, remote_misp)
+
+    event_uuids = []
+    cursor = server.last_pushed_timestamp
+    for events in events_repository.iter_events_from_opensearch(
+        build_pushable_events_query(server.last_pushed_timestamp),
+        ["uuid", "timestamp", "publish_timestamp"],
+    ):
+        event_uuids.extend(get_events_newer_than_remote(events, remote_index))
+        cursor = max(
+            [
+                cursor or 0,
+                *(event.get("timestamp") or 0 for event in events),
+                *(event.get("publish_timestamp") or 0 for event in events),
+            ]
+        )
+
+    result = push_events_to_server(
+        db,
+        event_uuids,
+        server,
+        remote_misp,
+        user,
+        get_settings(),
+        remote_index,
+        runtimeSettings,
+    )
+    record_server_push_cursor(db, server, cursor, result)
+
+    logger.info(
+        "server update push id=%s finished, %s events pushed, %s skipped, %s failed.",
+        server.id,
+        result["pushed"],
+        result["skipped"],
+        result["failed"],
+    )
+    return result
+
+
+def get_remote_event_timestamps(
+    server: server_schemas.Server, remote_misp: PyMISP
+) -> dict:
+    """Return ``{uuid: timestamp}`` for every event on the remote server."""
+    return {
+        event["uuid"]: int(event["timestamp"])
+        for events in get_event_index_from_server(
+            server, remote_misp, published=None
+        )
+        for event in events
+    }
+
+
+def get_events_newer_than_remote(events: list, remote_index: dict) -> list:
+    return [
+        event["uuid"]
+        for event in events
+        if event["uuid"] not in remote_index
+        or (event.get("timestamp") or 0) > remote_index[event["uuid"]]
+    ]
+
+
+def push_events_to_server(
+    db: Session,
+    event_uuids: list,
+    server: server_schemas.Server,
+    remote_misp: PyMISP,
+    user: user_models.User,
+    settings: Settings,
+    remote_index: dict,
+    runtimeSettings: RuntimeSettings = None,
+) -> dict:
+    """
+    Push events on a thread pool sharing the session of ``remote_misp``, at
+    most ``servers.pushConcurrency`` pushes are in flight and new pushes are
+    started at no more than ``servers.pushRateLimit`` per second.
+    """
+    runtimeSettings = runtimeSettings or RuntimeSettings(db)
+    concurrency = max(
+        1,
+        runtimeSettings.get_value("servers.pushConcurrency", SERVER_PUSH_CONCURRENCY),
+    )
+    rate_limit = runtimeSettings.get_value(
+        "servers.pushRateLimit", SERVER_PUSH_RATE_LIMIT
+    )
+    interval = 1.0 / rate_limit if rate_limit and rate_limit > 0 else 0
+
+    counts = {"pushed": 0, "skipped": 0, "failed": 0}
+    next_push_at = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {}
+        for event_uuid in event_uuids:
+            if interval:
+                delay = next_push_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_push_at = max(next_push_at, time.monotonic()) + interval
+
+            pending[
+                executor.submit(
+                    push_event_by_uuid,
+                    db,
+                    event_uuid,
+                    server,
+                    user,
+                    settings,
+                    remote_misp=remote_misp,
+                    remote_index=remote_index,
+                )
+            ] = event_uuid
+
+            if len(pending) >= concurrency:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    counts[_push_event_outcome(pending.pop(future), future)] += 1
+
+        for future in list(pending):
+            counts[_push_event_outcome(pending.pop(future), future)] += 1
+
+    return {
+        "result": "success",
+        "message": "%s events pushed to server id=%s, %s skipped, %s failed."
+        % (counts["pushed"], server.id, counts["skipped"], counts["failed"]),
+        **counts,
+    }
+
+
+def _push_event_outcome(event_uuid: str, future) -> str:
+    try:
+        result = future.result()
+    except Exception as e:
+        logger.error("Failed pushing the event %s: %s", event_uuid, e)
+        return "failed"
+
+    # only events this instance declines to push are skipped, any remote
+    # rejection is a failure so the update push cursor does not move past it
+    if result.get("skipped"):
+        return "skipped"
+    if result.get("status") == 200:
+        return "pushed"
+    return "failed"
+
+
+def record_server_push_cursor(
+    db: Session, server: server_models.Server, cursor: int, result: dict
+):
+    # keep the previous cursor if anything failed so the next update push retries it
+    if not cursor or result["failed"]:
+        return
+
+    server.last_pushed_timestamp = cursor
+    db.commit()
+
+
 def push_server_by_id(
     db: Session,
     server_id: int,
@@ -912,8 +1472,17 @@ def push_server_by_id(
         raise Exception("Server not found")
 
     if technique == "update":
-        # TODO implement update server push technique
-        raise Exception("Server push technique `update` not implemented yet.")
+        runtimeSettings = RuntimeSettings(db)
+        concurrency = max(
+            1,
+            runtimeSettings.get_value(
+                "servers.pushConcurrency", SERVER_PUSH_CONCURRENCY
+            ),
+        )
+        remote_misp = get_remote_misp_connection(server, pool_size=concurrency)
+        return push_server_by_id_update(
+            db, server, remote_misp, user, runtimeSettings
+        )
 
     if technique == "full":
         return push_server_by_id_full(db, server, user)
@@ -0,0 +1,219 @@
+"""
+Pre-aggregated sighting counts.
+
+Raw ``misp-sightings`` documents are rolled up into ``misp-sightings-rollup``
+documents holding the number of sightings of a value and sighting type per
+hour and per day. Rollups are recomputed a day at a time from the raw data,
+so recomputing is idempotent and late (backdated) sightings are picked up by
+marking their day dirty on ingest.
+
+Rollups are complete up to the watermark stored in Redis; readers query raw
+sightings from the watermark onwards.
+"""
+
+import hashlib
+import logging
+import time
+from typing import Iterable, Optional
+
+from app.services.opensearch import get_opensearch_client
+from app.services.redis import get_redis_client
+from opensearchpy import helpers as opensearch_helpers
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_INDEX = "misp-sightings-rollup"
+ROLLUP_WATERMARK_KEY = "sightings:rollup:watermark"
+ROLLUP_DIRTY_KEY = "sightings:rollup:dirty"
+ROLLUP_SCHEDULED_KEY = "sightings:rollup:scheduled"
+ROLLUP_DELAY = 300
+ROLLUP_PAGE_SIZE = 1000
+
+HOUR = 3600
+DAY = 86400
+
+
+def floor_timestamp(timestamp: float, step: int) -> int:
+    return int(timestamp // step * step)
+
+
+def get_rollup_watermark() -> Optional[int]:
+    """Epoch second up to which the rollups are complete, if built."""
+    watermark = get_redis_client().get(ROLLUP_WATERMARK_KEY)
+    return int(watermark) if watermark is not None else None
+
+
+def mark_sightings_dirty(timestamps: Iterable[float]) -> None:
+    """Flag the days of newly indexed sightings and schedule a rollup."""
+    from app.worker.tasks import rollup_sightings  # noqa: PLC0415
+
+    days = {floor_timestamp(timestamp, DAY) for timestamp in timestamps}
+    if not days:
+        return
+
+    RedisClient = get_redis_client()
+    RedisClient.sadd(ROLLUP_DIRTY_KEY, *days)
+    # the marker expires on its own in case the scheduled rollup is lost
+    if RedisClient.set(ROLLUP_SCHEDULED_KEY, 1, nx=True, ex=ROLLUP_DELAY + 300):
+        rollup_sightings.apply_async(countdown=ROLLUP_DELAY)
+
+
+def _rollup_doc(granularity: str, bucket: int, value: str, type: str, count: int, run: int):
+    digest = hashlib.sha1(value.encode()).hexdigest()
+    return {
+        "_index": ROLLUP_INDEX,
+        "_id": f"{granularity}:{type}:{bucket}:{digest}",
+        "_source": {
+            "value": value,
+            "type": type,
+            "granularity": granularity,
+            "@timestamp": bucket * 1000,
+            "count": count,
+            "rollup_run": run,
+        },
+    }
+
+
+def _iter_hourly_counts(client, start: int, end: int):
+    """Yield ``(value, type, hour, count)`` sorted by value, type and hour."""
+    query = {
+        "size": 0,
+        "query": {
+            "range": {
+                "@timestamp": {"gte": start, "lt": end, "format": "epoch_second"}
+            }
+        },
+        "aggs": {
+            "rollup": {
+                "composite": {
+                    "size": ROLLUP_PAGE_SIZE,
+                    "sources": [
+                        {"value": {"terms": {"field": "value.keyword"}}},
+                        {"type": {"terms": {"field": "type"}}},
+                        {
+                            "hour": {
+                                "date_histogram": {
+                                    "field": "@timestamp",
+                                    "fixed_interval": "1h",
+                                }
+                            }
+                        },
+                    ],
+                }
+            }
+        },
+    }
+
+    while True:
+        response = client.search(index="misp-sightings", body=query)
+        rollup = response["aggregations"]["rollup"]
+        for bucket in rollup["buckets"]:
+            key = bucket["key"]
+            yield key["value"], key["type"], key["hour"] // 1000, bucket["doc_count"]
+
+        after = rollup.get("after_key")
+        if not rollup["buckets"] or after is None:
+            return
+        query["aggs"]["rollup"]["composite"]["after"] = after
+
+
+def _iter_day_rollup_docs(client, day: int, end: int, run: int):
+    day_key, day_count = None, 0
+    for value, type, hour, count in _iter_hourly_counts(client, day, end):
+        if (value, type) != day_key:
+            if day_key is not None:
+                yield _rollup_doc("day", day, *day_key, day_count, run)
+            day_key, day_count = (value, type), 0
+        yield _rollup_doc("hour", hour, value, type, count, run)
+        day_count += count
+    if day_key is not None:
+        yield _rollup_doc("day", day, *day_key, day_count, run)
+
+
+def rollup_day(client, day: int, end: int, run: int) -> int:
+    """Recompute the rollups of ``[day, end)`` from the raw sightings."""
+    indexed, _ = opensearch_helpers.bulk(
+        client, _iter_day_rollup_docs(client, day, end, run)
+    )
+
+    # drop buckets of this day that are gone from the raw data (retention)
+    client.delete_by_query(
+        index=ROLLUP_INDEX,
+        body={
+            "query": {
+                "bool": {
+                    "filter": [
+                        {
+                            "range": {
+                                "@timestamp": {
+                                    "gte": day,
+                                    "lt": day + DAY,
+                                    "format": "epoch_second",
+                                }
+                            }
+                        },
+                        {"range": {"rollup_run": {"lt": run}}},
+                    ]
+                }
+            }
+        },
+        conflicts="proceed",
+        refresh=False,
+        ignore=[404],
+    )
+    return indexed
+
+
+def _first_sighting_day(client) -> Optional[int]:
+    response = client.search(
+        index="misp-sightings",
+        body={"size": 0, "aggs": {"first": {"min": {"field": "@timestamp"}}}},
+        ignore=[404],
+    )
+    first = response.get("aggregations", {}).get("first", {}).get("value")
+    return floor_timestamp(first / 1000, DAY) if first is not None else None
+
+
+def rollup_sightings(now: Optional[float] = None) -> dict:
+    """
+    Bring the sighting rollups up to the start of the current hour.
+
+    Recomputes the days between the previous watermark and now, plus the days
+    flagged dirty by ingestion. On the first run every day since the oldest
+    sighting is rolled up.
+    """
+    RedisClient = get_redis_client()
+    RedisClient.delete(ROLLUP_SCHEDULED_KEY)
+
+    client = get_opensearch_client()
+    cutoff = floor_timestamp(now if now is not None else time.time(), HOUR)
+    watermark = get_rollup_watermark()
+
+    pipeline = RedisClient.pipeline()
+    pipeline.smembers(ROLLUP_DIRTY_KEY)
+    pipeline.delete(ROLLUP_DIRTY_KEY)
+    dirty, _ = pipeline.execute()
+    days = {int(day) for day in dirty if int(day) < cutoff}
+
+    start = watermark if watermark is not None else _first_sighting_day(client)
+    if start is not None and start < cutoff:
+        days.update(range(floor_timestamp(start, DAY), cutoff, DAY))
+
+    run = time.time_ns()
+    pending = sorted(days)
+    buckets = 0
+    try:
+        while pending:
+            day = pending[0]
+            buckets += rollup_day(client, day, min(day + DAY, cutoff), run)
+            pending.pop(0)
+    except Exception:
+        # keep the days that were not rolled up for the next run
+        RedisClient.sadd(ROLLUP_DIRTY_KEY, *pending)
+        raise
+
+    if watermark is None or cutoff > watermark:
+        RedisClient.set(ROLLUP_WATERMARK_KEY, cutoff)
+
+    logger.info("rolled up sightings of %s days into %s buckets", len(days), buckets)
+    return {"days": len(days), "buckets": buckets, "watermark": cutoff}
@@ -1,6 +1,11 @@
+import copy
 import logging
 import datetime
-from typing import Union
+import re
+import time
+from typing import Optional, Union
+from app.repositories import sighting_rollups
+from app.repositories.sighting_rollups import DAY, HOUR, floor_timestamp
 from app.schemas import sighting as sighting_schemas
 from app.services.opensearch import get_opensearch_client
 from fastapi import HTTPException, status
@@ -9,6 +14,10 @@ from app.worker import tasks
 
 logger = logging.getLogger(__name__)
 
+SIGHTINGS_BATCH_SIZE = 1000
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": HOUR, "H": HOUR, "d": DAY, "w": 7 * DAY}
+
 
 def get_sightings(params: sighting_schemas.SightingQueryParams, page: int = 0, from_value: int = 0, size: int = 100):
     OpenSearchClient = get_opensearch_client()
@@ -81,15 +90,18 @@ def create_sightings(user, sightings: Union[list, dict]):
             body=sighting,
         )
 
+        timestamp = sighting.get("timestamp", datetime.datetime.now().timestamp())
         tasks.handle_created_sighting.delay(
             sighting["value"],
             sighting["observer"]["organisation"],
             sighting["type"],
-            sighting.get("timestamp", datetime.datetime.now().timestamp()),
+            timestamp,
         )
+        sighting_rollups.mark_sightings_dirty([timestamp])
 
         return {"result": "Sighting created successfully"}
 
+    created = []
     for sighting in sightings:
         if not sighting.get("value"):
             logger.warning("Sighting value is required, skipping sighting creation.")
@@ -103,25 +115,187 @@ def create_sightings(user, sightings: Union[list, dict]):
                 "_source": sighting,
             }
         )
-
-        tasks.handle_created_sighting.delay(
-            sighting["value"],
-            sighting["observer"]["organisation"],
-            sighting["type"],
-            sighting.get("timestamp", datetime.datetime.now().timestamp()),
+        created.append(
+            {
+                "value": sighting["value"],
+                "organisation": sighting["observer"]["organisation"],
+                "type": sighting["type"],
+                "timestamp": sighting.get(
+                    "timestamp", datetime.datetime.now().timestamp()
+                ),
+            }
         )
 
     try:
         response = opensearch_helpers.bulk(OpenSearchClient, docs)
-        return {"result": "Sightings created successfully", "response": response}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e),
         )
 
+    for i in range(0, len(created), SIGHTINGS_BATCH_SIZE):
+        tasks.handle_created_sightings.delay(created[i : i + SIGHTINGS_BATCH_SIZE])
+    sighting_rollups.mark_sightings_dirty(
+        sighting["timestamp"] for sighting in created
+    )
+
+    return {"result": "Sightings created successfully", "response": response}
+
+
+def parse_duration(expression: str) -> Optional[int]:
+    """Seconds of a single-unit duration such as ``7d`` or ``1h``, if parseable."""
+    match = re.fullmatch(r"(\d+)([smhHdw])", expression or "")
+    if not match:
+        return None
+    return int(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+
+def _positive_sightings_query(value: str, start: int, end: int, granularity=None) -> dict:
+    filters = [
+        {"term": {"value.keyword" if granularity is None else "value": value}},
+        {"term": {"type": "positive"}},
+        {"range": {"@timestamp": {"gte": start, "lt": end, "format": "epoch_second"}}},
+    ]
+    if granularity is not None:
+        filters.append({"term": {"granularity": granularity}})
+    return {"bool": {"filter": filters}}
+
+
+def _split_at_watermark(start: int, end: int, boundary: int):
+    """Split ``[start, end)`` into its rolled up and its raw parts."""
+    boundary = min(max(boundary, start), end)
+    return (start, boundary), (boundary, end)
+
+
+def _count_searches(value: str, start: int, end: int, boundary: int) -> list:
+    """msearch lines counting positive sightings of ``value`` in ``[start, end)``."""
+    rolled_up, raw = _split_at_watermark(start, end, boundary)
+    return [
+        {"index": sighting_rollups.ROLLUP_INDEX},
+        {
+            "size": 0,
+            "query": _positive_sightings_query(value, *rolled_up, granularity="day"),
+            "aggs": {"count": {"sum": {"field": "count"}}},
+        },
+        {"index": "misp-sightings"},
+        {
+            "size": 0,
+            "track_total_hits": True,
+            "query": _positive_sightings_query(value, *raw),
+        },
+    ]
+
+
+def _count_from_responses(rolled_up: dict, raw: dict) -> int:
+    return int(rolled_up["aggregations"]["count"]["value"] or 0) + int(
+        raw["hits"]["total"]["value"]
+    )
+
 
 def get_sightings_activity_by_value(params: sighting_schemas.SightingActivityParams):
+    """
+    Histogram of the positive sightings of a value.
+
+    Complete buckets come from the sighting rollups (hourly, or daily for
+    intervals of whole days) and only the part after the rollup watermark is
+    aggregated from raw sightings, both in one msearch round trip.
+    """
+    period = parse_duration(params.period)
+    interval = parse_duration(params.interval)
+    watermark = sighting_rollups.get_rollup_watermark()
+    if period is None or interval is None or interval % HOUR or watermark is None:
+        return get_raw_sightings_activity_by_value(params)
+
+    OpenSearchClient = get_opensearch_client()
+
+    now = int(time.time())
+    start = floor_timestamp(now - period, DAY)
+    granularity = "day" if interval % DAY == 0 else "hour"
+    boundary = watermark if granularity == "hour" else floor_timestamp(watermark, DAY)
+    rolled_up, raw = _split_at_watermark(start, now + 1, boundary)
+
+    def histogram(extra=None):
+        return {
+            "date_histogram": {
+                "field": "@timestamp",
+                "fixed_interval": params.interval,
+                "min_doc_count": 0,
+                "extended_bounds": {"min": start * 1000, "max": now * 1000},
+            },
+            **({"aggs": extra} if extra else {}),
+        }
+
+    responses = OpenSearchClient.msearch(
+        body=[
+            {"index": sighting_rollups.ROLLUP_INDEX},
+            {
+                "size": 0,
+                "query": _positive_sightings_query(
+                    params.value, *rolled_up, granularity=granularity
+                ),
+                "aggs": {
+                    "sightings_over_time": histogram(
+                        {"count": {"sum": {"field": "count"}}}
+                    )
+                },
+            },
+            {"index": "misp-sightings"},
+            {
+                "size": 0,
+                "query": _positive_sightings_query(params.value, *raw),
+                "aggs": {"sightings_over_time": histogram()},
+            },
+        ]
+    )["responses"]
+
+    raw_counts = {
+        bucket["key"]: bucket["doc_count"]
+        for bucket in responses[1]["aggregations"]["sightings_over_time"]["buckets"]
+    }
+    buckets = [
+        {
+            "key_as_string": bucket["key_as_string"],
+            "key": bucket["key"],
+            "doc_count": int(bucket["count"]["value"] or 0)
+            + raw_counts.get(bucket["key"], 0),
+        }
+        for bucket in responses[0]["aggregations"]["sightings_over_time"]["buckets"]
+    ]
+
+    return {"sightings_over_time": {"buckets": buckets}}
+
+
+def get_sightings_stats_by_value(params: sighting_schemas.SightingActivityParams):
+    """
+    Positive sightings of a value over the period and over the day before it.
+
+    Whole days are summed from the daily sighting rollups, the rest is
+    counted from raw sightings, all in one msearch round trip.
+    """
+    period = parse_duration(params.period)
+    watermark = sighting_rollups.get_rollup_watermark()
+    if period is None or watermark is None:
+        return get_raw_sightings_stats_by_value(params)
+
+    OpenSearchClient = get_opensearch_client()
+
+    now = int(time.time())
+    start = floor_timestamp(now - period, DAY)
+    boundary = floor_timestamp(watermark, DAY)
+
+    responses = OpenSearchClient.msearch(
+        body=_count_searches(params.value, start, now + 1, boundary)
+        + _count_searches(params.value, start - DAY, start, boundary)
+    )["responses"]
+
+    return {
+        "total": _count_from_responses(*responses[0:2]),
+        "previous_total": _count_from_responses(*responses[2:4]),
+    }
+
+
+def get_raw_sightings_activity_by_value(params: sighting_schemas.SightingActivityParams):
     OpenSearchClient = get_opensearch_client()
 
     value = params.value
@@ -159,7 +333,7 @@ def get_sightings_activity_by_value(params: sighting_schemas.SightingActivityPar
     return response["aggregations"]
 
 
-def get_sightings_stats_by_value(params: sighting_schemas.SightingActivityParams):
+def get_raw_sightings_stats_by_value(params: sighting_schemas.SightingActivityParams):
     OpenSearchClient = get_opensearch_client()
 
     value = params.value
@@ -183,14 +357,12 @@ def get_sightings_stats_by_value(params: sighting_schemas.SightingActivityParams
         body=query_total_period,
     )
 
-    query_prev_period = query_total_period.copy()
-    query_prev_period["query"]["bool"]["must"].append(
-        {
-            "range": {
-                "@timestamp": {"gte": f"now-{period}/d-1d", "lte": f"now-{period}/d"}
-            }
+    query_prev_period = copy.deepcopy(query_total_period)
+    query_prev_period["query"]["bool"]["must"][2] = {
+        "range": {
+            "@timestamp": {"gte": f"now-{period}/d-1d", "lt": f"now-{period}/d"}
         }
-    )
+    }
 
     total_prev_period = OpenSearchClient.search(
         index="misp-sightings",
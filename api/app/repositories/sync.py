@@ -18,6 +18,7 @@ from pymisp import (
 )
 from sqlalchemy.orm import Session
 from app.services.opensearch import get_opensearch_client
+from app.services.opensearch_refresh import get_refresh
 
 logger = logging.getLogger(__name__)
 
@@ -78,7 +79,9 @@ def create_pulled_event_reports(
             index="misp-event-reports",
             id=event_report.uuid,
             body=event_report_raw,
-            refresh=True,
+            refresh=get_refresh(
+                "sync.create_pulled_event_reports", index="misp-event-reports"
+            ),
         )
 
         if response["result"] not in ["created", "updated"]:
@@ -97,16 +100,19 @@ def create_pulled_event_attributes(
     user: user_models.User,
 ):
     hashes_dict = {}
+    unique_attributes = []
     for attribute in attributes:
         hash = sha1(
             (str(attribute.value) + attribute.type + attribute.category).encode("utf-8")
         ).hexdigest()
         if hash not in hashes_dict:
-            attributes_repository.create_attribute_from_pulled_attribute(
-                db, attribute, event_uuid, user
-            )
+            unique_attributes.append(attribute)
             hashes_dict[hash] = True
 
+    attributes_repository.create_attributes_from_pulled_attributes(
+        db, unique_attributes, event_uuid, user
+    )
+
     db.commit()
 
 
@@ -2,7 +2,9 @@ from app.auth.utils import role_has_scope
 from app.models import tag as tag_models
 from app.models import user as user_models
 from app.schemas import tag as tag_schemas
+from app.services import event_cache
 from app.services.opensearch import get_opensearch_client
+from app.services.opensearch_refresh import get_refresh
 from fastapi import HTTPException, Query, status
 from fastapi_pagination.ext.sqlalchemy import paginate
 from opensearchpy.exceptions import NotFoundError
@@ -157,7 +159,7 @@ def tag_attribute(
         index="misp-attributes",
         id=attr_uuid,
         body={"doc": {"tags": current_tags}},
-        refresh=True,
+        refresh=get_refresh("tags.tag_attribute", index="misp-attributes"),
     )
     return current_tags
 
@@ -184,7 +186,7 @@ def untag_attribute(
         index="misp-attributes",
         id=attr_uuid,
         body={"doc": {"tags": new_tags}},
-        refresh=True,
+        refresh=get_refresh("tags.untag_attribute", index="misp-attributes"),
     )
 
 
@@ -210,8 +212,9 @@ def tag_event(
         index="misp-events",
         id=event_uuid,
         body={"doc": {"tags": current_tags}},
-        refresh=True,
+        refresh=get_refresh("tags.tag_event", index="misp-events"),
     )
+    event_cache.invalidate_event(event_uuid)
     return current_tags
 
 
@@ -237,8 +240,9 @@ def untag_event(
         index="misp-events",
         id=event_uuid,
         body={"doc": {"tags": new_tags}},
-        refresh=True,
+        refresh=get_refresh("tags.untag_event", index="misp-events"),
     )
+    event_cache.invalidate_event(event_uuid)
 
 
 def capture_tag(db: Session, tag: MISPTag, user: user_models.User) -> tag_models.Tag:
@@ -1,4 +1,5 @@
 from app.models import user_setting as user_settings_models
+from app.services import follow_index
 from sqlalchemy.orm import Session
 
 
@@ -20,6 +21,7 @@ def get_user_setting(db: Session, user_id: int, namespace: str):
 
 def set_user_setting(db: Session, user_id: str, namespace: str, value: dict):
     setting = get_user_setting(db, user_id, namespace)
+    old_value = setting.value if setting else None
     if setting:
         setting.value = value
     else:
@@ -28,12 +30,21 @@ def set_user_setting(db: Session, user_id: str, namespace: str, value: dict):
     db.add(setting)
     db.commit()
     db.refresh(setting)
+
+    if namespace == "notifications":
+        follow_index.update_follow_index(user_id, old_value, value)
     
     return setting
 
 
 def delete_user_setting(db: Session, user_id: str, namespace: str):
+    setting = get_user_setting(db, user_id, namespace)
+    old_value = setting.value if setting else None
+
     db.query(user_settings_models.UserSetting).filter_by(
         user_id=user_id, namespace=namespace
     ).delete()
     db.commit()
+
+    if namespace == "notifications":
+        follow_index.update_follow_index(user_id, old_value, None)
@@ -103,11 +103,12 @@ def get_top_correlated_events(
     response_model=task_schemas.Task,
 )
 def run_correlations(
+    incremental: bool = Query(False),
     user: user_schemas.User = Security(
         get_current_active_user, scopes=["correlations:create"]
     ),
 ) -> task_schemas.Task:
-    task = tasks.generate_correlations.delay()
+    task = tasks.generate_correlations.delay(incremental=incremental)
     logger.info("Enqueued generate_correlations task with ID: %s", task.id)
 
     return task_schemas.Task(
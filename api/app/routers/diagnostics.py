@@ -8,6 +8,8 @@ from app.database import engine
 from app.opensearch import OpenSearchClient
 from app.rediscli import RedisClient
 from app.schemas import user as user_schemas
+from app.services import event_cache
+from app.services.opensearch_refresh import get_indexing_stats
 from app.settings import get_settings
 from fastapi import APIRouter, Response, Security
 from sqlalchemy import text
@@ -145,6 +147,7 @@ def get_opensearch_diagnostics(
         return {
             "connected": True,
             "cluster": health,
+            "indexing": get_indexing_stats(OpenSearchClient),
             "indices": indices,
             "nodes": _extract_node_stats(raw_nodes.get("nodes", {})),
             "shards": shards,
@@ -155,12 +158,21 @@ def get_opensearch_diagnostics(
             "connected": False,
             "error": str(e),
             "cluster": None,
+            "indexing": None,
             "indices": [],
             "nodes": [],
             "shards": [],
         }
 
 
+def _get_event_cache_stats():
+    try:
+        return event_cache.get_event_cache_stats()
+    except Exception as e:
+        logger.warning("Failed to fetch event cache stats: %s", e)
+        return None
+
+
 @router.get("/diagnostics/redis")
 def get_redis_diagnostics(
     user: user_schemas.User = Security(get_current_active_user, scopes=["tasks:read"]),
@@ -183,6 +195,7 @@ def get_redis_diagnostics(
             "keyspace_hits": info.get("keyspace_hits"),
             "keyspace_misses": info.get("keyspace_misses"),
             "keyspace": keyspace,
+            "event_cache": _get_event_cache_stats(),
         }
     except Exception as e:
         logger.error("Failed to fetch Redis diagnostics: %s", e)
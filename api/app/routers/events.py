@@ -8,6 +8,7 @@ from app.repositories import events as events_repository
 from app.repositories import tags as tags_repository
 from app.repositories import attachments as attachments_repository
 from app.repositories import objects as objects_repository
+from app.repositories import retention as retention_repository
 from app.schemas import event as event_schemas
 from app.schemas import user as user_schemas
 from app.schemas import object as object_schemas
@@ -165,6 +166,21 @@ def retention_status(
     }
 
 
+@router.get("/events/retention/progress")
+def retention_progress(
+    user: user_schemas.User = Security(
+        get_current_active_user, scopes=["settings:read"]
+    ),
+):
+    progress = retention_repository.get_retention_progress()
+    if progress is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Retention has not run yet",
+        )
+    return progress
+
+
 @router.get("/events/{event_uuid}", response_model=event_schemas.Event)
 def get_event_by_uuid(
     event_uuid: UUID,
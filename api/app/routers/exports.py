@@ -19,6 +19,7 @@ router = APIRouter()
 # Content type + filename extension to serve a stored artifact under, by format.
 DOWNLOAD_META = {
     "json": ("application/json", "json"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
     "csv": ("text/csv", "csv"),
     "stix": ("application/stix+json", "json"),
     "misp": ("application/json", "json"),
@@ -78,6 +78,13 @@ def get_default_feeds(
     return result
 
 
+@router.get("/feeds/cache/stats")
+def get_feed_cache_stats(
+    user: user_schemas.User = Security(get_current_active_user, scopes=["feeds:read"]),
+):
+    return feeds_repository.get_feed_http_cache_stats()
+
+
 @router.get("/feeds/{feed_id}", response_model=feed_schemas.Feed)
 def get_feed_by_id(
     feed_id: int,
@@ -7,7 +7,7 @@ from app.schemas import user as user_schemas
 from app.schemas import event as event_schemas
 from app.worker import tasks
 from app.settings import Settings
-from fastapi import APIRouter, Depends, HTTPException, Security, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Security, status
 from sqlalchemy.orm import Session
 
 router = APIRouter()
@@ -48,13 +48,13 @@ def get_server_by_id(
 )
 def pull_server(
     server_id: int,
+    technique: str = Query("full", pattern="^(full|update)$"),
     db: Session = Depends(get_db),
     user: user_schemas.User = Security(
         get_current_active_user, scopes=["servers:pull"]
     ),
 ):
-    # TODO: handle other techniques
-    task = tasks.server_pull_by_id.delay(server_id, user.id, "full")
+    task = tasks.server_pull_by_id.delay(server_id, user.id, technique)
 
     return task_schemas.Task(
         task_id=task.id,
@@ -254,13 +254,13 @@ def pull_remote_event_by_uuid(
 )
 def push_server(
     server_id: int,
+    technique: str = Query("full", pattern="^(full|update)$"),
     db: Session = Depends(get_db),
     user: user_schemas.User = Security(
         get_current_active_user, scopes=["servers:push"]
     ),
 ):
-    # TODO: handle other techniques
-    task = tasks.server_push_by_id.delay(server_id, user.id, "full")
+    task = tasks.server_push_by_id.delay(server_id, user.id, technique)
 
     return task_schemas.Task(
         task_id=task.id,
@@ -5,7 +5,7 @@ from pydantic import BaseModel, ConfigDict, model_validator
 
 from app.schemas.task import ScheduleTaskSchedule
 
-ExportFormat = Literal["json", "csv", "stix", "misp"]
+ExportFormat = Literal["json", "ndjson", "csv", "stix", "misp"]
 ExportIndexTarget = Literal["attributes", "events"]
 ExportStatus = Literal["queued", "running", "completed", "failed"]
 
@@ -48,6 +48,8 @@ class Export(ExportBase):
     storage_key: Optional[str] = None
     file_size: Optional[int] = None
     record_count: Optional[int] = None
+    progress_done: Optional[int] = None
+    progress_total: Optional[int] = None
     error: Optional[str] = None
     celery_task_id: Optional[str] = None
     schedule: Optional[ScheduleTaskSchedule] = None
@@ -14,7 +14,9 @@ class ServerBase(BaseModel):
     push_galaxy_clusters: bool
     pull_galaxy_clusters: bool
     last_pulled_id: Optional[int] = None
+    last_pulled_timestamp: Optional[int] = None
     last_pushed_id: Optional[int] = None
+    last_pushed_timestamp: Optional[int] = None
     organisation: Optional[str] = None
     remote_org_id: int
     publish_without_email: bool
@@ -50,7 +52,9 @@ class ServerUpdate(BaseModel):
     push_galaxy_clusters: Optional[bool] = None
     pull_galaxy_clusters: Optional[bool] = None
     last_pulled_id: Optional[int] = None
+    last_pulled_timestamp: Optional[int] = None
     last_pushed_id: Optional[int] = None
+    last_pushed_timestamp: Optional[int] = None
     organisation: Optional[str] = None
     remote_org_id: Optional[int] = None
     publish_without_email: Optional[bool] = None
@@ -3,6 +3,7 @@ from app.settings import Settings, get_settings
 from app.services.s3 import get_s3_client
 from app.services.object_templates import get_local_object_templates
 import base64
+from typing import BinaryIO, Iterator
 
 def get_attachment(
     attachment_uuid: str,
@@ -23,7 +24,54 @@ def get_attachment(
             raise Exception("not allowed")
         with open(fullpath, "rb") as f:
             return f.read()
-        
+
+
+def open_attachment(
+    attachment_uuid: str,
+    settings: Settings = get_settings(),
+) -> BinaryIO:
+    """Return a readable binary stream over an attachment; caller closes it."""
+    if settings.Storage.engine == "s3":
+        S3Client = get_s3_client()
+
+        data = S3Client.get_object(Bucket=settings.Storage.s3.bucket, Key=attachment_uuid)
+        return data["Body"]
+
+    if settings.Storage.engine == "local":
+        import os
+        base_path = "/tmp/attachments"
+        fullpath = os.path.normpath(os.path.join(base_path, attachment_uuid))
+        if not fullpath.startswith(base_path):
+            raise Exception("not allowed")
+        return open(fullpath, "rb")
+
+
+def iter_attachment_lines(
+    attachment_uuid: str,
+    settings: Settings = get_settings(),
+    chunk_size: int = 64 * 1024,
+) -> Iterator[bytes]:
+    """Yield an attachment line by line without loading it into memory."""
+    if settings.Storage.engine == "s3":
+        S3Client = get_s3_client()
+
+        data = S3Client.get_object(Bucket=settings.Storage.s3.bucket, Key=attachment_uuid)
+        try:
+            yield from data["Body"].iter_lines(chunk_size=chunk_size)
+        finally:
+            data["Body"].close()
+        return
+
+    if settings.Storage.engine == "local":
+        import os
+        base_path = "/tmp/attachments"
+        fullpath = os.path.normpath(os.path.join(base_path, attachment_uuid))
+        if not fullpath.startswith(base_path):
+            raise Exception("not allowed")
+        with open(fullpath, "rb") as f:
+            for line in f:
+                yield line.rstrip(b"\r\n")
+
 
 def get_b64_attachment(
     attachment_uuid: str,
@@ -0,0 +1,123 @@
+"""
+Read-through Redis cache of event documents.
+
+``events:cache:{uuid}`` holds the ``misp-events`` document of an event with
+its ``_seq_no`` / ``_primary_term`` and the generation of the event it was
+read at. Every write to an event bumps ``events:cache:gen:{uuid}`` and drops
+the entry, so an entry loaded concurrently with a write is never served:
+its generation no longer matches.
+
+The cache is controlled by the ``opensearch.eventCache`` runtime settings
+(``enabled`` kill switch and ``ttl`` in seconds); hits and misses are
+counted in ``events:cache:hits`` / ``events:cache:misses``.
+"""
+
+import json
+import logging
+from typing import Callable, Iterable, Optional
+
+from app.services.redis import get_redis_client
+from app.services.runtime_settings import get_cached_runtime_settings
+
+logger = logging.getLogger(__name__)
+
+EVENT_CACHE_KEY = "events:cache:{uuid}"
+EVENT_CACHE_GENERATION_KEY = "events:cache:gen:{uuid}"
+EVENT_CACHE_HITS_KEY = "events:cache:hits"
+EVENT_CACHE_MISSES_KEY = "events:cache:misses"
+DEFAULT_EVENT_CACHE_TTL = 300
+
+
+def _get_cache_settings() -> dict:
+    return (get_cached_runtime_settings().get("opensearch") or {}).get(
+        "eventCache"
+    ) or {}
+
+
+def is_event_cache_enabled() -> bool:
+    return bool(_get_cache_settings().get("enabled", True))
+
+
+def get_event_doc(uuid: str, load: Callable[[], Optional[dict]]) -> Optional[dict]:
+    """
+    Return the ``misp-events`` document of an event, from the cache or from
+    ``load``, which fetches it from OpenSearch (``None`` when not found).
+    """
+    settings = _get_cache_settings()
+    if not settings.get("enabled", True):
+        return load()
+
+    try:
+        RedisClient = get_redis_client()
+        cached, generation = RedisClient.mget(
+            EVENT_CACHE_KEY.format(uuid=uuid),
+            EVENT_CACHE_GENERATION_KEY.format(uuid=uuid),
+        )
+        generation = int(generation or 0)
+        if cached is not None:
+            entry = json.loads(cached)
+            if entry["generation"] == generation:
+                RedisClient.incr(EVENT_CACHE_HITS_KEY)
+                return entry["doc"]
+    except Exception as e:
+        logger.warning("Event cache unavailable: %s", e)
+        return load()
+
+    doc = load()
+    try:
+        pipeline = RedisClient.pipeline()
+        pipeline.incr(EVENT_CACHE_MISSES_KEY)
+        if doc is not None:
+            entry = {"generation": generation, "doc": doc}
+            pipeline.set(
+                EVENT_CACHE_KEY.format(uuid=uuid),
+                json.dumps(entry, default=str),
+                ex=int(settings.get("ttl") or DEFAULT_EVENT_CACHE_TTL),
+            )
+        pipeline.execute()
+    except Exception as e:
+        logger.warning("Failed to cache event %s: %s", uuid, e)
+    return doc
+
+
+def invalidate_events(uuids: Iterable) -> None:
+    """Drop the cached documents of events that were written."""
+    uuids = {str(uuid) for uuid in uuids if uuid}
+    if not uuids:
+        return
+
+    ttl = int(_get_cache_settings().get("ttl") or DEFAULT_EVENT_CACHE_TTL)
+    try:
+        pipeline = get_redis_client().pipeline()
+        for uuid in uuids:
+            generation_key = EVENT_CACHE_GENERATION_KEY.format(uuid=uuid)
+            pipeline.incr(generation_key)
+            # outlives any entry read at an older generation
+            pipeline.expire(generation_key, ttl * 2)
+            pipeline.delete(EVENT_CACHE_KEY.format(uuid=uuid))
+        pipeline.execute()
+    except Exception as e:
+        logger.error("Failed to invalidate cached events %s: %s", uuids, e)
+
+
+def invalidate_event(uuid) -> None:
+    invalidate_events([uuid])
+
+
+def clear_event_cache() -> None:
+    """Drop every cached event and reset the counters."""
+    RedisClient = get_redis_client()
+    keys = list(RedisClient.scan_iter(match="events:cache:*", count=1000))
+    if keys:
+        RedisClient.delete(*keys)
+
+
+def get_event_cache_stats() -> dict:
+    hits, misses = get_redis_client().mget(EVENT_CACHE_HITS_KEY, EVENT_CACHE_MISSES_KEY)
+    hits, misses = int(hits or 0), int(misses or 0)
+    return {
+        "enabled": is_event_cache_enabled(),
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+    }
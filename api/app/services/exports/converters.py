@@ -5,22 +5,45 @@ or events) plus the ``index_target`` and returns ``(bytes, file_extension,
 content_type)``. ``json`` is a passthrough dump; ``csv`` flattens the most
 useful fields; ``stix`` builds pymisp objects and runs the misp-stix
 MISP→STIX 2.1 converter.
+
+``json``, ``ndjson`` and ``csv`` also have streaming writers that encode the
+documents one at a time into a binary file object, so an export never holds
+all of its documents in memory. The ``stix`` writer converts fixed-size
+chunks of documents in a small pool of spawned processes and streams their
+objects into a single bundle.
 """
 
 import csv
 import io
 import json
 import logging
-from typing import Iterable
+import os
+import textwrap
+import time
+import uuid
+from collections import Counter, deque
+from typing import BinaryIO, Iterable, Iterator
+
+import billiard
 
 logger = logging.getLogger(__name__)
 
 # STIX 2.1 conversion (misp-stix + python-stix2 serialization) is pure-Python
 # and scales poorly: python-stix2's pretty serializer sorts every property via
 # a recursive scan of the whole bundle, so tens of thousands of attributes can
-# peg a CPU core for hours. Cap STIX exports well below the generic record cap.
+# peg a CPU core for hours. Cap in-memory STIX conversions well below the
+# generic record cap; streamed exports convert in chunks instead.
 MAX_STIX_RECORDS = 10_000
 
+# Documents converted together by one worker of a streamed STIX export.
+STIX_CHUNK_SIZE = 1_000
+# Conversion processes of a streamed STIX export unless configured otherwise;
+# kept small as several exports may run at once on the same worker host.
+STIX_DEFAULT_WORKERS = 2
+# Objects every chunk of the same event / organisation repeats: they are
+# de-duplicated (and their ``object_refs`` merged) and written last.
+STIX_SHARED_OBJECT_TYPES = ("identity", "marking-definition", "report", "grouping")
+
 
 def _tag_names(tags) -> list[str]:
     """Normalise the ``tags`` field (list of dicts or strings) to names."""
@@ -38,9 +61,39 @@ def _tag_names(tags) -> list[str]:
 # ── JSON ──────────────────────────────────────────────────────────────────
 
 
+def write_json(hits: Iterable[dict], index_target: str, out: BinaryIO) -> int:
+    """Write the documents as a JSON array, one element at a time."""
+    count = 0
+    for hit in hits:
+        element = textwrap.indent(json.dumps(hit, default=str, indent=2), "  ")
+        out.write(("[\n" if count == 0 else ",\n").encode("utf-8"))
+        out.write(element.encode("utf-8"))
+        count += 1
+    out.write(b"\n]" if count else b"[]")
+    return count
+
+
 def to_json(hits: list[dict], index_target: str) -> tuple[bytes, str, str]:
-    payload = json.dumps(hits, default=str, indent=2).encode("utf-8")
-    return payload, "json", "application/json"
+    buffer = io.BytesIO()
+    write_json(hits, index_target, buffer)
+    return buffer.getvalue(), "json", "application/json"
+
+
+# ── NDJSON ────────────────────────────────────────────────────────────────
+
+
+def write_ndjson(hits: Iterable[dict], index_target: str, out: BinaryIO) -> int:
+    count = 0
+    for hit in hits:
+        out.write(json.dumps(hit, default=str).encode("utf-8") + b"\n")
+        count += 1
+    return count
+
+
+def to_ndjson(hits: list[dict], index_target: str) -> tuple[bytes, str, str]:
+    buffer = io.BytesIO()
+    write_ndjson(hits, index_target, buffer)
+    return buffer.getvalue(), "ndjson", "application/x-ndjson"
 
 
 # ── CSV ───────────────────────────────────────────────────────────────────
@@ -75,16 +128,29 @@ EVENT_CSV_FIELDS = [
 ]
 
 
-def to_csv(hits: list[dict], index_target: str) -> tuple[bytes, str, str]:
+def write_csv(hits: Iterable[dict], index_target: str, out: BinaryIO) -> int:
     fields = EVENT_CSV_FIELDS if index_target == "events" else ATTRIBUTE_CSV_FIELDS
-    buffer = io.StringIO()
-    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
-    writer.writeheader()
-    for hit in hits:
-        row = {key: hit.get(key) for key in fields}
-        row["tags"] = "|".join(_tag_names(hit.get("tags")))
-        writer.writerow(row)
-    return buffer.getvalue().encode("utf-8"), "csv", "text/csv"
+    # newline="" lets the csv module emit its own \r\n row terminators
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    count = 0
+    try:
+        writer = csv.DictWriter(text, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for hit in hits:
+            row = {key: hit.get(key) for key in fields}
+            row["tags"] = "|".join(_tag_names(hit.get("tags")))
+            writer.writerow(row)
+            count += 1
+    finally:
+        # keep ``out`` open for the caller
+        text.detach()
+    return count
+
+
+def to_csv(hits: list[dict], index_target: str) -> tuple[bytes, str, str]:
+    buffer = io.BytesIO()
+    write_csv(hits, index_target, buffer)
+    return buffer.getvalue(), "csv", "text/csv"
 
 
 # ── STIX 2.1 ────────────────────────────────────────────────────────────────
@@ -122,26 +188,36 @@ def _build_misp_event(uuid_value: str | None, info: str, docs: Iterable[dict]):
     return event
 
 
-def _events_from_attribute_hits(hits: list[dict]) -> list:
-    """Group attribute docs by their parent event into MISPEvents."""
+def _attribute_event_uuids(hits: Iterable[dict], ungrouped_uuid: str) -> Iterator[str]:
+    """Event UUID each convertible attribute doc is grouped under; docs
+    without an event share ``ungrouped_uuid``."""
+    for hit in hits:
+        if hit.get("value") and hit.get("type"):
+            yield hit.get("event_uuid") or ungrouped_uuid
+
+
+def _report_name(attributes: int) -> str:
+    return f"Export of {attributes} attribute(s)"
+
+
+def _events_from_attribute_hits(
+    hits: list[dict], ungrouped_uuid: str | None = None
+) -> list:
+    """Group attribute docs by their parent event into MISPEvents.
+
+    Docs without an event go into one event with ``ungrouped_uuid`` (a new
+    UUID unless given).
+    """
+    ungrouped_uuid = ungrouped_uuid or str(uuid.uuid4())
     grouped: dict[str, list[dict]] = {}
-    order: list[str] = []
     for hit in hits:
         if not hit.get("value") or not hit.get("type"):
             continue
-        event_uuid = hit.get("event_uuid") or "__ungrouped__"
-        if event_uuid not in grouped:
-            grouped[event_uuid] = []
-            order.append(event_uuid)
-        grouped[event_uuid].append(hit)
+        grouped.setdefault(hit.get("event_uuid") or ungrouped_uuid, []).append(hit)
 
     events = []
-    for event_uuid in order:
-        docs = grouped[event_uuid]
-        real_uuid = None if event_uuid == "__ungrouped__" else event_uuid
-        event = _build_misp_event(
-            real_uuid, f"Export of {len(docs)} attribute(s)", docs
-        )
+    for event_uuid, docs in grouped.items():
+        event = _build_misp_event(event_uuid, _report_name(len(docs)), docs)
         for doc in docs:
             try:
                 event.attributes.append(_build_misp_attribute(doc))
@@ -188,14 +264,173 @@ def to_stix21(hits: list[dict], index_target: str) -> tuple[bytes, str, str]:
     return payload, "json", "application/stix+json"
 
 
+def convert_stix_chunk(
+    hits: list[dict], index_target: str, ungrouped_uuid: str | None = None
+) -> list[tuple[str, str, str]]:
+    """Convert a chunk of documents into ``(type, id, serialized)`` STIX objects.
+
+    Runs in the worker processes of a streamed STIX export; every chunk of an
+    export passes the same ``ungrouped_uuid`` so attributes without an event
+    end up in one report.
+    """
+    from misp_stix_converter import MISPtoSTIX21Parser
+
+    if index_target == "events":
+        events = _events_from_event_hits(hits)
+    else:
+        events = _events_from_attribute_hits(hits, ungrouped_uuid)
+
+    parser = MISPtoSTIX21Parser()
+    for event in events:
+        parser.parse_misp_event(event)
+
+    return [(obj.type, obj.id, obj.serialize()) for obj in parser.bundle.objects]
+
+
+def _iter_chunks(hits: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    chunk = []
+    for hit in hits:
+        chunk.append(hit)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _stix_pool(workers: int):
+    """Start the STIX conversion processes.
+
+    billiard (Celery's fork of multiprocessing) may start children from the
+    daemonic processes of a prefork worker, and the spawn start method never
+    forks a process whose scroll threads may hold locks.
+    """
+    return billiard.get_context("spawn").Pool(processes=workers)
+
+
+def write_stix21(
+    hits: Iterable[dict], index_target: str, out: BinaryIO, workers: int | None = None
+) -> int:
+    """Write the documents as one STIX 2.1 bundle, converting chunks of
+    ``STIX_CHUNK_SIZE`` documents in ``workers`` processes (at most
+    ``STIX_DEFAULT_WORKERS`` by default).
+
+    The reports of attribute exports are renamed after the attributes of the
+    whole export once every chunk is converted.
+    """
+    workers = workers or min(STIX_DEFAULT_WORKERS, os.cpu_count() or 1)
+    started = time.monotonic()
+    ungrouped_uuid = str(uuid.uuid4())
+    attribute_counts: Counter = Counter()
+    shared: dict[str, dict] = {}
+    count = 0
+    written = 0
+
+    def add_chunk(chunk: list[dict]) -> tuple:
+        nonlocal count
+        count += len(chunk)
+        if index_target != "events":
+            attribute_counts.update(_attribute_event_uuids(chunk, ungrouped_uuid))
+        return chunk, index_target, ungrouped_uuid
+
+    def write_object(serialized: str) -> None:
+        nonlocal written
+        out.write(b"\n" if written == 0 else b",\n")
+        out.write(serialized.encode("utf-8"))
+        written += 1
+
+    def emit(objects: list[tuple[str, str, str]]) -> None:
+        for type, id, serialized in objects:
+            if type not in STIX_SHARED_OBJECT_TYPES:
+                write_object(serialized)
+                continue
+            obj = json.loads(serialized)
+            if id not in shared:
+                shared[id] = obj
+            elif "object_refs" in obj:
+                refs = shared[id].get("object_refs", [])
+                shared[id]["object_refs"] = list(
+                    dict.fromkeys(refs + obj["object_refs"])
+                )
+
+    header = f'{{"type": "bundle", "id": "bundle--{uuid.uuid4()}", "objects": ['
+    out.write(header.encode("utf-8"))
+
+    if workers > 1:
+        # started before ``hits`` is first read, each chunk is a list that is
+        # pickled to a worker, never a view of the iterator
+        pool = _stix_pool(workers)
+        try:
+            pending = deque()
+            for chunk in _iter_chunks(hits, STIX_CHUNK_SIZE):
+                pending.append(pool.apply_async(convert_stix_chunk, add_chunk(chunk)))
+                # keep a bounded number of chunks in flight
+                if len(pending) >= workers * 2:
+                    emit(pending.popleft().get())
+            while pending:
+                emit(pending.popleft().get())
+        except BaseException:
+            pool.terminate()
+            raise
+        else:
+            pool.close()
+        finally:
+            pool.join()
+    else:
+        for chunk in _iter_chunks(hits, STIX_CHUNK_SIZE):
+            emit(convert_stix_chunk(*add_chunk(chunk)))
+
+    for id, obj in shared.items():
+        # a report merged from several chunks is named after the first one
+        type, _, event_uuid = id.partition("--")
+        if type in ("report", "grouping") and event_uuid in attribute_counts:
+            obj["name"] = _report_name(attribute_counts[event_uuid])
+        write_object(json.dumps(obj))
+    out.write(b"\n]}" if written else b"]}")
+
+    elapsed = max(time.monotonic() - started, 1e-6)
+    logger.info(
+        "STIX export converted %s records in %.1fs: %.0f records/s per core on %s core(s)",
+        count,
+        elapsed,
+        count / elapsed / workers,
+        workers,
+    )
+    return count
+
+
 CONVERTERS = {
     "json": to_json,
+    "ndjson": to_ndjson,
     "csv": to_csv,
     "stix": to_stix21,
 }
 
+# Formats that can be written incrementally: writer, extension, content type.
+STREAMING_WRITERS = {
+    "json": (write_json, "json", "application/json"),
+    "ndjson": (write_ndjson, "ndjson", "application/x-ndjson"),
+    "csv": (write_csv, "csv", "text/csv"),
+    "stix": (write_stix21, "json", "application/stix+json"),
+}
+
 
 def convert(fmt: str, hits: list[dict], index_target: str) -> tuple[bytes, str, str]:
     if fmt not in CONVERTERS:
         raise ValueError(f"Unsupported export format: {fmt}")
     return CONVERTERS[fmt](hits, index_target)
+
+
+def write(
+    fmt: str, hits: Iterable[dict], index_target: str, out: BinaryIO, **options
+) -> tuple[int, str, str]:
+    """Stream the documents into ``out``; ``options`` are passed to the
+    format's writer (e.g. ``workers`` for ``stix``).
+
+    Returns:
+        Tuple of (documents written, file extension, content type).
+    """
+    if fmt not in STREAMING_WRITERS:
+        raise ValueError(f"Format {fmt} cannot be streamed")
+    writer, extension, content_type = STREAMING_WRITERS[fmt]
+    return writer(hits, index_target, out, **options), extension, content_type
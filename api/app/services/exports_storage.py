@@ -8,6 +8,8 @@ namespaced under ``exports/`` so they never collide with attachment keys.
 
 import logging
 import os
+import shutil
+from typing import BinaryIO
 
 from app.services.s3 import get_s3_client
 from app.settings import Settings, get_settings
@@ -53,6 +55,36 @@ def store_export(
     return stored_key
 
 
+def store_export_file(
+    key: str,
+    fileobj: BinaryIO,
+    settings: Settings = None,
+) -> str:
+    """Persist an export written to ``fileobj`` under ``key`` without reading
+    it into memory: S3 uploads go through boto3's managed (multipart) transfer
+    and local copies are written chunk by chunk. Returns the stored key."""
+    settings = settings or get_settings()
+    stored_key = _namespaced_key(key)
+    fileobj.seek(0)
+
+    if settings.Storage.engine == "s3":
+        get_s3_client().upload_fileobj(
+            fileobj,
+            settings.Storage.s3.bucket,
+            stored_key,
+        )
+    else:
+        fullpath = _local_path(stored_key)
+        os.makedirs(os.path.dirname(fullpath), exist_ok=True)
+        partial = f"{fullpath}.part"
+        with open(partial, "wb") as f:
+            shutil.copyfileobj(fileobj, f)
+        # replace the previous run's file only once the new one is complete
+        os.replace(partial, fullpath)
+
+    return stored_key
+
+
 def get_export(key: str, settings: Settings = None) -> bytes:
     settings = settings or get_settings()
     stored_key = _namespaced_key(key)
@@ -0,0 +1,106 @@
+"""
+Redis index of the users following organisations, events, objects and
+attributes.
+
+Each followed entity has a set ``notifications:follow:{follow_key}:{uuid}``
+holding the ids of its followers. The sets are updated on every write of the
+``notifications`` user settings and rebuilt from ``user_settings`` whenever
+the ready marker is missing (first use, Redis flush or eviction).
+"""
+
+from sqlalchemy import text
+
+from app.services.redis import get_redis_client
+
+FOLLOW_KEYS = ("organisations", "events", "objects", "attributes")
+FOLLOW_INDEX_KEY = "notifications:follow:{follow_key}:{uuid}"
+FOLLOW_INDEX_PATTERN = "notifications:follow:*:*"
+FOLLOW_INDEX_READY_KEY = "notifications:follow:ready"
+
+
+def _follow_index_key(follow_key: str, uuid: str) -> str:
+    return FOLLOW_INDEX_KEY.format(follow_key=follow_key, uuid=uuid)
+
+
+def get_follows(value: dict) -> set[tuple[str, str]]:
+    """Return the ``(follow_key, uuid)`` pairs of a notifications setting value."""
+    follow = (value or {}).get("follow") or {}
+    return {
+        (follow_key, str(uuid))
+        for follow_key in FOLLOW_KEYS
+        for uuid in follow.get(follow_key) or []
+    }
+
+
+def rebuild_follow_index(db) -> None:
+    RedisClient = get_redis_client()
+    result = db.execute(
+        text(
+            """
+            SELECT user_id, value
+            FROM user_settings
+            WHERE namespace = 'notifications'
+            """
+        )
+    )
+
+    pipeline = RedisClient.pipeline()
+    for key in RedisClient.scan_iter(match=FOLLOW_INDEX_PATTERN, count=1000):
+        pipeline.delete(key)
+    for row in result:
+        for follow_key, uuid in get_follows(row.value):
+            pipeline.sadd(_follow_index_key(follow_key, uuid), row.user_id)
+    pipeline.set(FOLLOW_INDEX_READY_KEY, 1)
+    pipeline.execute()
+
+
+def update_follow_index(user_id: int, old_value: dict, new_value: dict) -> None:
+    """Apply the follow / unfollow difference between two setting values."""
+    RedisClient = get_redis_client()
+    if not RedisClient.exists(FOLLOW_INDEX_READY_KEY):
+        # not built yet, the next lookup rebuilds it from the database
+        return
+
+    old_follows = get_follows(old_value)
+    new_follows = get_follows(new_value)
+    if old_follows == new_follows:
+        return
+
+    pipeline = RedisClient.pipeline()
+    for follow_key, uuid in new_follows - old_follows:
+        pipeline.sadd(_follow_index_key(follow_key, uuid), user_id)
+    for follow_key, uuid in old_follows - new_follows:
+        pipeline.srem(_follow_index_key(follow_key, uuid), user_id)
+    pipeline.execute()
+
+
+def get_followers(db, lookups) -> dict[tuple[str, str], list[int]]:
+    """
+    Resolve the followers of several ``(follow_key, uuid)`` pairs in one
+    Redis round trip.
+
+    Returns:
+        Dict of (follow_key, uuid) -> list of user ids, only for the pairs
+        that have followers.
+    """
+    lookups = list(dict.fromkeys((key, str(uuid)) for key, uuid in lookups))
+    if not lookups:
+        return {}
+
+    RedisClient = get_redis_client()
+    for _ in range(2):
+        pipeline = RedisClient.pipeline(transaction=False)
+        pipeline.exists(FOLLOW_INDEX_READY_KEY)
+        for follow_key, uuid in lookups:
+            pipeline.smembers(_follow_index_key(follow_key, uuid))
+        ready, *members = pipeline.execute()
+
+        if ready:
+            break
+        rebuild_follow_index(db)
+
+    return {
+        lookup: sorted(int(user_id) for user_id in user_ids)
+        for lookup, user_ids in zip(lookups, members)
+        if user_ids
+    }
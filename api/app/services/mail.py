@@ -0,0 +1,62 @@
+import logging
+import os
+import smtplib
+from email.message import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+
+def is_mail_configured() -> bool:
+    return bool(os.environ.get("MAIL_SERVER"))
+
+
+def build_email_message(email: dict) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = email["subject"]
+    msg["From"] = email["from"]
+    msg["To"] = email["to"]
+    msg.set_content(email["body"])
+    return msg
+
+
+def send_emails(emails: list[dict]) -> tuple[int, list[dict]]:
+    """
+    Send several emails over a single SMTP session.
+
+    Messages rejected by the server are logged and dropped. If the connection
+    fails or is lost, the remaining messages are returned so the caller can
+    retry them later.
+
+    Returns:
+        Tuple of (number of emails sent, emails left unsent).
+    """
+    if not emails:
+        return 0, []
+
+    sent = 0
+    attempted = 0
+    try:
+        with smtplib.SMTP(
+            os.environ.get("MAIL_SERVER"), os.environ.get("MAIL_PORT")
+        ) as server:
+            username = os.environ.get("MAIL_USERNAME")
+            password = os.environ.get("MAIL_PASSWORD")
+            if username and password:
+                server.login(username, password)
+
+            for email in emails:
+                try:
+                    server.send_message(build_email_message(email))
+                    sent += 1
+                except (
+                    smtplib.SMTPRecipientsRefused,
+                    smtplib.SMTPSenderRefused,
+                    smtplib.SMTPDataError,
+                ) as e:
+                    logger.error("Failed to send email to %s: %s", email["to"], e)
+                attempted += 1
+    except (smtplib.SMTPException, OSError) as e:
+        logger.error("Failed to send emails: %s", e)
+        return sent, emails[attempted:]
+
+    return sent, []
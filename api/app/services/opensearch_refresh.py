@@ -0,0 +1,111 @@
+"""
+Write-consistency policy of the OpenSearch write paths.
+
+Every write passes ``refresh=get_refresh("<module>.<function>", index=...)``
+instead of a hard-coded ``refresh=True``. The value comes from the ``opensearch``
+runtime settings namespace:
+
+- ``refresh.interactive``: writes made while serving an API request,
+  ``wait_for`` by default so the caller reads its own writes without forcing
+  a refresh per write.
+- ``refresh.background``: writes made by Celery tasks (feeds, sync,
+  correlations, ...), ``false`` by default; the indices the task wrote to
+  are refreshed once when it ends.
+- ``refresh.overrides``: per call site policies, e.g.
+  ``{"attributes.create_attribute": "true"}``.
+
+Policies are ``true``, ``wait_for`` or ``false``.
+"""
+
+import logging
+import threading
+from typing import Union
+
+from app.services.opensearch import get_opensearch_client
+from app.services.runtime_settings import get_cached_runtime_settings
+
+logger = logging.getLogger(__name__)
+
+REFRESH_POLICIES = {"true": True, "wait_for": "wait_for", "false": False}
+DEFAULT_REFRESH = {"interactive": "wait_for", "background": "false"}
+
+# indices of the write load reported by ``get_indexing_stats``, and refreshed
+# after deferred writes of call sites that do not name their index
+REFRESHED_INDICES = "misp-*"
+
+# Celery worker processes only run background jobs; the indices of writes
+# whose refresh was skipped are collected so the task that made them
+# refreshes each of them once.
+_background = {"enabled": False, "deferred": set()}
+_background_lock = threading.Lock()
+
+
+def _get_refresh_settings() -> dict:
+    return (get_cached_runtime_settings().get("opensearch") or {}).get("refresh") or {}
+
+
+def _parse_policy(value) -> Union[bool, str, None]:
+    if isinstance(value, bool):
+        return value
+    return REFRESH_POLICIES.get(str(value).lower()) if value is not None else None
+
+
+def get_refresh(
+    call_site: str, index: str = None, by_query: bool = False
+) -> Union[bool, str]:
+    """``refresh`` argument of the write made at ``call_site`` into ``index``.
+
+    ``_by_query`` APIs do not support ``wait_for`` and refresh instead.
+    """
+    settings = _get_refresh_settings()
+    context = "background" if _background["enabled"] else "interactive"
+
+    policy = _parse_policy((settings.get("overrides") or {}).get(call_site))
+    if policy is None:
+        policy = _parse_policy(settings.get(context, DEFAULT_REFRESH[context]))
+    if policy is None:
+        policy = REFRESH_POLICIES[DEFAULT_REFRESH[context]]
+    if policy == "wait_for" and by_query:
+        policy = True
+
+    if policy is False and _background["enabled"]:
+        with _background_lock:
+            _background["deferred"].add(index or REFRESHED_INDICES)
+    return policy
+
+
+def get_indexing_stats(client, index: str = REFRESHED_INDICES) -> dict:
+    """Indexing, refresh and merge totals of ``index``, to compare the write
+    load of a refresh policy before and after a change."""
+    stats = client.indices.stats(
+        index=index, metric=["indexing", "refresh", "merge", "segments"]
+    )["_all"]["primaries"]
+    return {
+        "index_total": stats["indexing"]["index_total"],
+        "index_time_in_millis": stats["indexing"]["index_time_in_millis"],
+        "refresh_total": stats["refresh"]["total"],
+        "refresh_time_in_millis": stats["refresh"]["total_time_in_millis"],
+        "merges_total": stats["merges"]["total"],
+        "merges_time_in_millis": stats["merges"]["total_time_in_millis"],
+        "segments_count": stats["segments"]["count"],
+    }
+
+
+def enable_background_writes() -> None:
+    """Apply the background policy to the writes of this process."""
+    _background["enabled"] = True
+
+
+def refresh_deferred_writes() -> None:
+    """Refresh the indices written since the last call without a refresh."""
+    with _background_lock:
+        deferred, _background["deferred"] = _background["deferred"], set()
+    if not deferred:
+        return
+
+    try:
+        get_opensearch_client().indices.refresh(
+            index=",".join(sorted(deferred)), ignore_unavailable=True
+        )
+    except Exception as e:
+        logger.error("Failed to refresh indices after background job: %s", e)
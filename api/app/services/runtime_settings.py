@@ -1,7 +1,18 @@
+import copy
+import logging
+import time
+
 from app.repositories import runtime_settings as runtime_settings_repository
 from app.services.base_settings import BaseSettings
 from app.defaults.runtime_settings_defaults import DEFAULT_SETTINGS
 
+logger = logging.getLogger(__name__)
+
+# seconds the settings read by get_cached_runtime_settings are reused for
+CACHED_SETTINGS_TTL = 30
+
+_cached_settings = {"loaded_at": 0.0, "settings": None}
+
 class RuntimeSettings(BaseSettings):
     def __init__(self, db):
         super().__init__(db, default_settings=DEFAULT_SETTINGS)
@@ -17,3 +28,30 @@ class RuntimeSettings(BaseSettings):
 
     def _delete_from_repository(self, namespace: str):
         runtime_settings_repository.delete_setting(self.db, namespace)
+
+
+def get_cached_runtime_settings() -> dict:
+    """
+    Runtime settings for hot code paths without a database session.
+
+    The settings are re-read at most every ``CACHED_SETTINGS_TTL`` seconds;
+    if the database cannot be reached the defaults are used meanwhile.
+    """
+    now = time.monotonic()
+    if (
+        _cached_settings["settings"] is None
+        or now - _cached_settings["loaded_at"] > CACHED_SETTINGS_TTL
+    ):
+        from app.database import SessionLocal  # noqa: PLC0415
+
+        try:
+            db = SessionLocal()
+            try:
+                settings = RuntimeSettings(db).all()
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning("Failed to load runtime settings: %s", e)
+            settings = copy.deepcopy(DEFAULT_SETTINGS)
+        _cached_settings.update(loaded_at=now, settings=settings)
+    return _cached_settings["settings"]
@@ -736,6 +736,43 @@ class TestEventsResource(ApiTester):
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
+    # ---- GET /events/retention/progress ----
+
+    @pytest.mark.parametrize("scopes", [["settings:read"]])
+    def test_retention_progress(
+        self,
+        client: TestClient,
+        auth_token: auth.Token,
+    ):
+        progress = {"status": "running", "events": 500, "deleted": {}, "tasks": {}}
+        with patch(
+            "app.repositories.retention.get_retention_progress",
+            return_value=progress,
+        ):
+            response = client.get(
+                "/events/retention/progress",
+                headers={"Authorization": "Bearer " + auth_token},
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == progress
+
+    @pytest.mark.parametrize("scopes", [["settings:read"]])
+    def test_retention_progress_not_run(
+        self,
+        client: TestClient,
+        auth_token: auth.Token,
+    ):
+        with patch(
+            "app.repositories.retention.get_retention_progress", return_value=None
+        ):
+            response = client.get(
+                "/events/retention/progress",
+                headers={"Authorization": "Bearer " + auth_token},
+            )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
     # ---- GET /events/histogram ----
 
     @pytest.mark.parametrize("scopes", [["events:read"]])
@@ -272,9 +272,11 @@ class TestExportsResource(ApiTester):
         ]
         try:
             with patch(
-                "app.repositories.exports._fetch_hits", return_value=hits
+                "app.repositories.exports._count_hits", return_value=len(hits)
             ), patch(
-                "app.repositories.exports.store_export",
+                "app.repositories.exports._iter_hits", return_value=iter(hits)
+            ), patch(
+                "app.repositories.exports.store_export_file",
                 return_value="exports/export-run.json",
             ) as mock_store:
                 exports_repository.run_export(db, export.id)
@@ -314,7 +316,7 @@ class TestExportsResource(ApiTester):
 
         try:
             with patch(
-                "app.repositories.exports._fetch_hits",
+                "app.repositories.exports._count_hits",
                 side_effect=RuntimeError("opensearch down"),
             ):
                 exports_repository.run_export(db, export.id)
@@ -372,7 +374,9 @@ class TestExportsResource(ApiTester):
 
         try:
             with patch(
-                "app.repositories.exports._fetch_hits", return_value=hits
+                "app.repositories.exports._count_hits", return_value=len(hits)
+            ), patch(
+                "app.repositories.exports._iter_hits", return_value=iter(hits)
             ), patch(
                 "app.repositories.exports.store_export",
                 return_value="exports/export-misp.json",
@@ -545,6 +549,34 @@ class TestExportsResource(ApiTester):
         mock_unregister.assert_called_once_with("del-uuid")
 
 
+def _fake_stix_chunk(hits, index_target, ungrouped_uuid=None):
+    """Stand-in for the misp-stix conversion of a chunk, importable by the
+    worker processes."""
+    import json
+
+    objects = [("identity", "identity--org", json.dumps({"type": "identity", "id": "identity--org"}))]
+    refs = {}
+    for hit in hits:
+        indicator = f"indicator--{hit['uuid']}"
+        objects.append(
+            ("indicator", indicator, json.dumps({"type": "indicator", "id": indicator}))
+        )
+        event_uuid = hit.get("event_uuid") or ungrouped_uuid
+        refs.setdefault(f"report--{event_uuid}", []).append(indicator)
+    for report, object_refs in refs.items():
+        name = f"Export of {len(object_refs)} attribute(s)"
+        objects.append(
+            (
+                "report",
+                report,
+                json.dumps(
+                    {"type": "report", "id": report, "name": name, "object_refs": object_refs}
+                ),
+            )
+        )
+    return objects
+
+
 class TestExportConverters:
     SAMPLE_ATTRIBUTES = [
         {
@@ -609,3 +641,261 @@ class TestExportConverters:
     def test_unsupported_format(self):
         with pytest.raises(ValueError):
             converters.convert("pdf", self.SAMPLE_ATTRIBUTES, "attributes")
+
+    def test_to_ndjson(self):
+        import json
+
+        data, ext, ct = converters.convert("ndjson", self.SAMPLE_ATTRIBUTES, "attributes")
+        assert ext == "ndjson"
+        assert ct == "application/x-ndjson"
+        lines = data.decode().splitlines()
+        assert [json.loads(line)["value"] for line in lines] == ["1.2.3.4", "evil.com"]
+
+    @pytest.mark.parametrize("fmt", ["json", "ndjson", "csv"])
+    def test_streaming_writer_matches_converter(self, fmt):
+        import io
+
+        out = io.BytesIO()
+        count, ext, ct = converters.write(
+            fmt, iter(self.SAMPLE_ATTRIBUTES), "attributes", out
+        )
+
+        assert count == 2
+        assert (out.getvalue(), ext, ct) == converters.convert(
+            fmt, self.SAMPLE_ATTRIBUTES, "attributes"
+        )
+        assert not out.closed
+
+    def test_misp_cannot_be_streamed(self):
+        import io
+
+        with pytest.raises(ValueError):
+            converters.write("misp", [], "attributes", io.BytesIO())
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_stix_chunks_stream_into_one_bundle(self, workers):
+        import io
+        import json
+
+        hits = [
+            {"uuid": f"{i:032x}", "event_uuid": f"e-{i % 2}", "value": str(i)}
+            for i in range(5)
+        ]
+        out = io.BytesIO()
+        with patch.object(converters, "STIX_CHUNK_SIZE", 2), patch.object(
+            converters, "convert_stix_chunk", _fake_stix_chunk
+        ):
+            count, ext, ct = converters.write(
+                "stix", iter(hits), "attributes", out, workers=workers
+            )
+
+        bundle = json.loads(out.getvalue())
+        ids = [obj["id"] for obj in bundle["objects"]]
+        assert (count, ext, ct) == (5, "json", "application/stix+json")
+        assert bundle["type"] == "bundle"
+        assert len(ids) == len(set(ids))
+        assert sum(obj["type"] == "indicator" for obj in bundle["objects"]) == 5
+        reports = {o["id"]: o for o in bundle["objects"] if o["type"] == "report"}
+        assert sorted(len(r["object_refs"]) for r in reports.values()) == [2, 3]
+
+    def test_stix_reports_span_chunks(self):
+        import io
+        import json
+
+        hits = [
+            {
+                "uuid": f"{i:032x}",
+                "event_uuid": "e-1" if i % 2 else None,
+                "type": "ip-dst",
+                "value": str(i),
+            }
+            for i in range(5)
+        ]
+        out = io.BytesIO()
+        with patch.object(converters, "STIX_CHUNK_SIZE", 2), patch.object(
+            converters, "convert_stix_chunk", _fake_stix_chunk
+        ):
+            converters.write("stix", iter(hits), "attributes", out, workers=1)
+
+        reports = [
+            obj for obj in json.loads(out.getvalue())["objects"] if obj["type"] == "report"
+        ]
+        # the attributes without an event share one report across chunks
+        assert len(reports) == 2
+        names = {obj["id"]: obj["name"] for obj in reports}
+        assert names.pop("report--e-1") == "Export of 2 attribute(s)"
+        assert list(names.values()) == ["Export of 3 attribute(s)"]
+
+    def test_attributes_without_event_use_the_given_uuid(self):
+        hits = [
+            {"uuid": "11111111-1111-4111-8111-111111111111", "type": "ip-dst",
+             "value": "1.2.3.4", "category": "Network activity"},
+            {"uuid": "33333333-3333-4333-8333-333333333333", "type": "domain",
+             "value": "evil.com", "category": "Network activity"},
+        ]
+        ungrouped = "44444444-4444-4444-8444-444444444444"
+
+        events = converters._events_from_attribute_hits(hits, ungrouped)
+
+        assert [event.uuid for event in events] == [ungrouped]
+        assert len(events[0].attributes) == 2
+
+    def test_stix_default_workers_are_bounded(self):
+        import io
+
+        with patch.object(converters.os, "cpu_count", return_value=32), patch.object(
+            converters, "_stix_pool", side_effect=RuntimeError("pool started")
+        ) as mock_pool:
+            with pytest.raises(RuntimeError):
+                converters.write("stix", iter([]), "attributes", io.BytesIO())
+
+        mock_pool.assert_called_once_with(converters.STIX_DEFAULT_WORKERS)
+
+
+class TestStreamingExport:
+    def _run(self, hits, total, runtime_values=None, fmt="ndjson"):
+        from types import SimpleNamespace
+        from unittest.mock import MagicMock
+
+        from app.repositories import exports as exports_repository
+
+        db_export = SimpleNamespace(
+            id=7,
+            query="type:ip-dst",
+            index_target="attributes",
+            format=fmt,
+            name="Export",
+            distribution=None,
+        )
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = db_export
+        values = runtime_values or {}
+        runtime = MagicMock()
+        runtime.get_value.side_effect = lambda key, default=None: values.get(
+            key, default
+        )
+        stored = {}
+
+        def store(key, fileobj):
+            fileobj.seek(0)
+            stored[key] = fileobj.read()
+            return f"exports/{key}"
+
+        with patch(
+            "app.repositories.exports._count_hits", return_value=total
+        ), patch(
+            "app.repositories.exports._iter_hits", return_value=iter(hits)
+        ) as mock_hits, patch(
+            "app.repositories.exports.store_export_file", side_effect=store
+        ), patch(
+            "app.repositories.exports.RuntimeSettings", return_value=runtime
+        ):
+            exports_repository.run_export(db, 7)
+
+        return db_export, stored, mock_hits
+
+    def test_streams_documents_to_storage(self):
+        hits = [{"value": f"10.0.0.{i}"} for i in range(3)]
+
+        db_export, stored, mock_hits = self._run(hits, total=3)
+
+        assert db_export.status == "completed"
+        assert db_export.storage_key == "exports/export-7.ndjson"
+        assert db_export.record_count == 3
+        assert db_export.file_size == len(stored["export-7.ndjson"])
+        assert stored["export-7.ndjson"].count(b"\n") == 3
+        assert (db_export.progress_done, db_export.progress_total) == (3, 3)
+        # small exports use a single scroll and no cap
+        mock_hits.assert_called_once_with("misp-attributes", "type:ip-dst", None, 1)
+
+    def test_large_exports_use_sliced_scrolls_and_the_record_cap(self):
+        db_export, _, mock_hits = self._run(
+            [],
+            total=50_000,
+            runtime_values={"exports.maxRecords": 20_000, "exports.scrollSlices": 6},
+        )
+
+        assert db_export.progress_total == 20_000
+        mock_hits.assert_called_once_with("misp-attributes", "type:ip-dst", 20_000, 6)
+
+    def test_iter_hits_stops_at_the_limit(self):
+        from app.repositories import exports as exports_repository
+
+        docs = [{"_source": {"value": str(i)}} for i in range(5)]
+        docs.insert(1, {"_source": {"value": "gone", "deleted": True}})
+        with patch("app.repositories.exports.get_opensearch_client"), patch(
+            "app.repositories.exports.opensearch_helpers.scan", return_value=iter(docs)
+        ):
+            hits = list(exports_repository._iter_hits("misp-attributes", "*", 3))
+
+        assert [hit["value"] for hit in hits] == ["0", "1", "2"]
+
+    def test_sliced_scan_reads_every_slice(self):
+        from app.repositories import exports as exports_repository
+
+        def scan(client, index, query, scroll, size):
+            slice_id = query["slice"]["id"]
+            assert query["slice"]["max"] == 3
+            return iter({"_source": {"value": f"{slice_id}-{i}"}} for i in range(100))
+
+        with patch("app.repositories.exports.get_opensearch_client"), patch(
+            "app.repositories.exports.opensearch_helpers.scan", side_effect=scan
+        ):
+            hits = list(exports_repository._iter_hits("misp-attributes", "*", slices=3))
+
+        assert len(hits) == 300
+        assert {hit["value"].split("-")[0] for hit in hits} == {"0", "1", "2"}
+
+    def test_sliced_scan_stops_slices_early_and_surfaces_errors(self):
+        from app.repositories import exports as exports_repository
+
+        def endless(client, index, query, scroll, size):
+            i = 0
+            while True:
+                yield {"_source": {"value": str(i)}}
+                i += 1
+
+        with patch("app.repositories.exports.get_opensearch_client"), patch(
+            "app.repositories.exports.opensearch_helpers.scan", side_effect=endless
+        ):
+            hits = list(exports_repository._iter_hits("misp-attributes", "*", 10, 4))
+        assert len(hits) == 10
+
+        def failing(client, index, query, scroll, size):
+            if query["slice"]["id"] == 1:
+                raise RuntimeError("scroll expired")
+            return iter([])
+
+        with patch("app.repositories.exports.get_opensearch_client"), patch(
+            "app.repositories.exports.opensearch_helpers.scan", side_effect=failing
+        ), pytest.raises(RuntimeError, match="scroll expired"):
+            list(exports_repository._iter_hits("misp-attributes", "*", slices=2))
+
+    def test_misp_export_of_events_includes_every_attribute(self):
+        import json
+
+        from app.repositories import exports as exports_repository
+
+        def pages(event_uuid, exclude_deleted=False):
+            assert exclude_deleted is True
+            return iter(
+                [
+                    [
+                        {"type": "ip-dst", "category": "Network activity",
+                         "value": f"{event_uuid}-{i}", "timestamp": 1}
+                        for i in range(start, start + 2)
+                    ]
+                    for start in (0, 2)
+                ]
+            )
+
+        with patch(
+            "app.repositories.events.iter_event_attribute_pages", side_effect=pages
+        ) as mock_pages:
+            content, _, _, count = exports_repository._to_misp_json(
+                None, [{"uuid": "e-1"}, {"uuid": "e-2"}, {"uuid": "e-1"}], "events", "x"
+            )
+
+        assert count == 8
+        assert [call.args[0] for call in mock_pages.call_args_list] == ["e-1", "e-2"]
+        assert len(json.loads(content)["Event"]["Attribute"]) == 8
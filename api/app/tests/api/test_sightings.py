@@ -9,6 +9,9 @@ from fastapi.testclient import TestClient
 
 OPENSEARCH_PATCH = "app.repositories.sightings.get_opensearch_client"
 TASKS_PATCH = "app.repositories.sightings.tasks.handle_created_sighting"
+BATCH_TASKS_PATCH = "app.repositories.sightings.tasks.handle_created_sightings"
+ROLLUP_DIRTY_PATCH = "app.repositories.sightings.sighting_rollups.mark_sightings_dirty"
+WATERMARK_PATCH = "app.repositories.sightings.sighting_rollups.get_rollup_watermark"
 
 MOCK_SEARCH_RESPONSE = {
     "hits": {
@@ -130,7 +133,8 @@ class TestSightingsResource(ApiTester):
     ):
         mock_os = make_opensearch_mock()
         with patch(OPENSEARCH_PATCH, return_value=mock_os), \
-             patch(TASKS_PATCH) as mock_task:
+             patch(TASKS_PATCH) as mock_task, \
+             patch(ROLLUP_DIRTY_PATCH) as mock_dirty:
             response = client.post(
                 "/sightings/",
                 json={"value": "1.2.3.4", "type": "positive"},
@@ -142,6 +146,7 @@ class TestSightingsResource(ApiTester):
         assert data["result"] == "Sighting created successfully"
         mock_os.index.assert_called_once()
         mock_task.delay.assert_called_once()
+        mock_dirty.assert_called_once()
 
     @pytest.mark.parametrize("scopes", [["sightings:create"]])
     def test_create_sighting_sets_default_type(
@@ -149,7 +154,8 @@ class TestSightingsResource(ApiTester):
     ):
         mock_os = make_opensearch_mock()
         with patch(OPENSEARCH_PATCH, return_value=mock_os), \
-             patch(TASKS_PATCH):
+             patch(TASKS_PATCH), \
+             patch(ROLLUP_DIRTY_PATCH):
             response = client.post(
                 "/sightings/",
                 json={"value": "evil.com"},
@@ -166,7 +172,8 @@ class TestSightingsResource(ApiTester):
     ):
         mock_os = make_opensearch_mock()
         with patch(OPENSEARCH_PATCH, return_value=mock_os), \
-             patch(TASKS_PATCH) as mock_task, \
+             patch(BATCH_TASKS_PATCH) as mock_task, \
+             patch(ROLLUP_DIRTY_PATCH), \
              patch("app.repositories.sightings.opensearch_helpers.bulk", return_value=(2, [])):
             response = client.post(
                 "/sightings/",
@@ -180,7 +187,9 @@ class TestSightingsResource(ApiTester):
 
         assert response.status_code == status.HTTP_201_CREATED
         assert data["result"] == "Sightings created successfully"
-        assert mock_task.delay.call_count == 2
+        mock_task.delay.assert_called_once()
+        batch = mock_task.delay.call_args.args[0]
+        assert [s["value"] for s in batch] == ["1.2.3.4", "5.6.7.8"]
 
     @pytest.mark.parametrize("scopes", [["sightings:create"]])
     def test_create_sighting_missing_value(
@@ -211,7 +220,8 @@ class TestSightingsResource(ApiTester):
         self, client: TestClient, auth_token: auth.Token
     ):
         mock_os = make_opensearch_mock(MOCK_HISTOGRAM_RESPONSE)
-        with patch(OPENSEARCH_PATCH, return_value=mock_os):
+        with patch(OPENSEARCH_PATCH, return_value=mock_os), \
+             patch(WATERMARK_PATCH, return_value=None):
             response = client.get(
                 "/sightings/histogram",
                 params={"value": "1.2.3.4"},
@@ -229,7 +239,8 @@ class TestSightingsResource(ApiTester):
         self, client: TestClient, auth_token: auth.Token
     ):
         mock_os = make_opensearch_mock(MOCK_HISTOGRAM_RESPONSE)
-        with patch(OPENSEARCH_PATCH, return_value=mock_os):
+        with patch(OPENSEARCH_PATCH, return_value=mock_os), \
+             patch(WATERMARK_PATCH, return_value=None):
             response = client.get(
                 "/sightings/histogram",
                 params={"value": "evil.com", "period": "30d", "interval": "1d"},
@@ -271,7 +282,8 @@ class TestSightingsResource(ApiTester):
     ):
         mock_os = make_opensearch_mock()
         mock_os.search.side_effect = [MOCK_STATS_RESPONSE, MOCK_PREV_STATS_RESPONSE]
-        with patch(OPENSEARCH_PATCH, return_value=mock_os):
+        with patch(OPENSEARCH_PATCH, return_value=mock_os), \
+             patch(WATERMARK_PATCH, return_value=None):
             response = client.get(
                 "/sightings/stats",
                 params={"value": "1.2.3.4"},
@@ -283,6 +295,33 @@ class TestSightingsResource(ApiTester):
         assert data["total"] == 10
         assert data["previous_total"] == 5
 
+    @pytest.mark.parametrize("scopes", [["sightings:read"]])
+    def test_get_sighting_stats_from_rollups(
+        self, client: TestClient, auth_token: auth.Token
+    ):
+        mock_os = make_opensearch_mock()
+        mock_os.msearch.return_value = {
+            "responses": [
+                {"aggregations": {"count": {"value": 8.0}}},
+                {"hits": {"total": {"value": 2}}},
+                {"aggregations": {"count": {"value": 5.0}}},
+                {"hits": {"total": {"value": 0}}},
+            ]
+        }
+        with patch(OPENSEARCH_PATCH, return_value=mock_os), \
+             patch(WATERMARK_PATCH, return_value=1704067200):
+            response = client.get(
+                "/sightings/stats",
+                params={"value": "1.2.3.4"},
+                headers={"Authorization": "Bearer " + auth_token},
+            )
+        data = response.json()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert data == {"total": 10, "previous_total": 5}
+        mock_os.search.assert_not_called()
+        mock_os.msearch.assert_called_once()
+
     @pytest.mark.parametrize("scopes", [["sightings:read"]])
     def test_get_sighting_stats_missing_value(
         self, client: TestClient, auth_token: auth.Token
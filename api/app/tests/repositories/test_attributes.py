@@ -0,0 +1,239 @@
+from unittest.mock import MagicMock, patch
+
+from app.repositories.attributes import (
+    create_attributes_bulk,
+    delete_attributes_bulk,
+    get_attributes_by_values,
+    get_attributes_from_opensearch_by_uuids,
+)
+from app.schemas.attribute import AttributeCreate
+
+PATCH = "app.repositories.attributes.get_opensearch_client"
+BULK_PATCH = "app.repositories.attributes.opensearch_helpers.streaming_bulk"
+TASKS_PATCH = "app.repositories.attributes.tasks"
+
+EVENT_A = "11111111-1111-1111-1111-111111111111"
+EVENT_B = "22222222-2222-2222-2222-222222222222"
+
+
+def _create(value, event_uuid=EVENT_A, **kwargs):
+    return AttributeCreate(
+        event_uuid=event_uuid,
+        type="ip-src",
+        category="Network activity",
+        value=value,
+        **kwargs,
+    )
+
+
+def _streaming_bulk(failed_ids=()):
+    def fake(client, actions, **kwargs):
+        for action in actions:
+            item = {"index": {"_id": action["_id"]}}
+            if action["_id"] in failed_ids:
+                item["index"]["error"] = "mapper_parsing_exception"
+                yield False, item
+            else:
+                yield True, item
+
+    return fake
+
+
+class TestCreateAttributesBulk:
+    def test_indexes_batch_with_single_refresh(self):
+        mock_os = MagicMock()
+
+        with patch(PATCH, return_value=mock_os), patch(
+            BULK_PATCH, side_effect=_streaming_bulk()
+        ) as mock_bulk, patch(TASKS_PATCH):
+            created = create_attributes_bulk(
+                None, [_create("1.2.3.4"), _create("5.6.7.8")], chunk_size=50
+            )
+
+        assert [str(attr.value) for attr in created] == ["1.2.3.4", "5.6.7.8"]
+        assert mock_bulk.call_args.kwargs["chunk_size"] == 50
+        mock_os.index.assert_not_called()
+        mock_os.indices.refresh.assert_called_once_with(index="misp-attributes")
+
+    def test_enqueues_one_task_per_event(self):
+        with patch(PATCH, return_value=MagicMock()), patch(
+            BULK_PATCH, side_effect=_streaming_bulk()
+        ), patch(TASKS_PATCH) as mock_tasks:
+            created = create_attributes_bulk(
+                None,
+                [_create("1.2.3.4"), _create("5.6.7.8"), _create("9.9.9.9", EVENT_B)],
+            )
+
+        delay = mock_tasks.handle_created_attributes.delay
+        assert delay.call_count == 2
+        queued = {call.args[1]: call.args[0] for call in delay.call_args_list}
+        assert queued[EVENT_A] == [str(created[0].uuid), str(created[1].uuid)]
+        assert queued[EVENT_B] == [str(created[2].uuid)]
+        mock_tasks.handle_created_attribute.delay.assert_not_called()
+
+    def test_large_events_are_split_into_chunked_tasks(self):
+        with patch(PATCH, return_value=MagicMock()), patch(
+            BULK_PATCH, side_effect=_streaming_bulk()
+        ), patch(TASKS_PATCH) as mock_tasks:
+            created = create_attributes_bulk(
+                None,
+                [_create("1.2.3.4"), _create("5.6.7.8"), _create("9.9.9.9")],
+                chunk_size=2,
+            )
+
+        queued = [
+            call.args for call in mock_tasks.handle_created_attributes.delay.call_args_list
+        ]
+        assert queued == [
+            ([str(created[0].uuid), str(created[1].uuid)], EVENT_A),
+            ([str(created[2].uuid)], EVENT_A),
+        ]
+
+    def test_failed_documents_are_left_out(self):
+        failed = _create("5.6.7.8", uuid="33333333-3333-3333-3333-333333333333")
+
+        with patch(PATCH, return_value=MagicMock()), patch(
+            BULK_PATCH, side_effect=_streaming_bulk({str(failed.uuid)})
+        ), patch(TASKS_PATCH) as mock_tasks:
+            created = create_attributes_bulk(None, [_create("1.2.3.4"), failed])
+
+        assert [str(attr.value) for attr in created] == ["1.2.3.4"]
+        queued = mock_tasks.handle_created_attributes.delay.call_args.args[0]
+        assert str(failed.uuid) not in queued
+
+    def test_empty_batch_skips_opensearch(self):
+        mock_os = MagicMock()
+
+        with patch(PATCH, return_value=mock_os), patch(BULK_PATCH) as mock_bulk:
+            assert create_attributes_bulk(None, []) == []
+
+        mock_bulk.assert_not_called()
+        mock_os.indices.refresh.assert_not_called()
+
+
+class TestDeleteAttributesBulk:
+    def test_soft_deletes_and_enqueues_per_chunk(self):
+        mock_os = MagicMock()
+
+        def fake(client, actions, **kwargs):
+            for action in actions:
+                assert action["_op_type"] == "update"
+                assert action["doc"] == {"deleted": True}
+                yield True, {"update": {"_id": action["_id"]}}
+
+        with patch(PATCH, return_value=mock_os), patch(
+            BULK_PATCH, side_effect=fake
+        ), patch(TASKS_PATCH) as mock_tasks:
+            deleted = delete_attributes_bulk(None, ["a", "b", "c"], EVENT_A, chunk_size=2)
+
+        assert deleted == ["a", "b", "c"]
+        mock_os.indices.refresh.assert_called_once_with(index="misp-attributes")
+        calls = mock_tasks.handle_deleted_attributes.delay.call_args_list
+        assert [call.args for call in calls] == [(["a", "b"], EVENT_A), (["c"], EVENT_A)]
+
+
+class TestGetAttributesByUuids:
+    def test_returns_found_documents_only(self):
+        mock_os = MagicMock()
+        mock_os.mget.return_value = {
+            "docs": [
+                {
+                    "_id": "a",
+                    "found": True,
+                    "_source": {
+                        "uuid": "44444444-4444-4444-4444-444444444444",
+                        "event_uuid": EVENT_A,
+                        "type": "ip-src",
+                        "category": "Network activity",
+                        "value": "1.2.3.4",
+                        "timestamp": 0,
+                    },
+                },
+                {"_id": "b", "found": False},
+            ]
+        }
+
+        with patch(PATCH, return_value=mock_os):
+            attributes = get_attributes_from_opensearch_by_uuids(["a", "b"])
+
+        assert [attr.value for attr in attributes] == ["1.2.3.4"]
+        assert mock_os.mget.call_args.kwargs["body"] == {"ids": ["a", "b"]}
+
+    def test_large_batches_are_fetched_in_chunks(self):
+        mock_os = MagicMock()
+        mock_os.mget.return_value = {"docs": []}
+
+        with patch(PATCH, return_value=mock_os), patch(
+            "app.repositories.attributes.ATTRIBUTES_BULK_SIZE", 2
+        ):
+            get_attributes_from_opensearch_by_uuids(["a", "b", "c"])
+
+        assert [call.kwargs["body"] for call in mock_os.mget.call_args_list] == [
+            {"ids": ["a", "b"]},
+            {"ids": ["c"]},
+        ]
+
+
+class TestGetAttributesByValues:
+    @staticmethod
+    def _response(value, uuids):
+        return {
+            "hits": {
+                "hits": [{"_source": {"uuid": uuid, "value": value}} for uuid in uuids]
+            }
+        }
+
+    def test_resolves_all_values_in_one_msearch(self):
+        client = MagicMock()
+        client.msearch.return_value = {
+            "responses": [
+                self._response("1.2.3.4", ["a-1", "a-2", "a-3"]),
+                self._response("evil.com", ["a-4"]),
+            ]
+        }
+
+        with patch(PATCH, return_value=client):
+            matches = get_attributes_by_values(
+                ["1.2.3.4", "evil.com", "1.2.3.4"], max_per_value=2
+            )
+
+        client.msearch.assert_called_once()
+        body = client.msearch.call_args.kwargs["body"]
+        assert len(body) == 4
+        assert {"term": {"value.keyword": "1.2.3.4"}} in body[1]["query"]["bool"]["filter"]
+        assert {"term": {"value.keyword": "evil.com"}} in body[3]["query"]["bool"]["filter"]
+        assert [h["_source"]["uuid"] for h in matches["1.2.3.4"]] == ["a-1", "a-2"]
+        assert [h["_source"]["uuid"] for h in matches["evil.com"]] == ["a-4"]
+
+    def test_caps_hits_per_value_in_the_search(self):
+        client = MagicMock()
+        client.msearch.return_value = {"responses": [self._response("1.2.3.4", [])]}
+
+        with patch(PATCH, return_value=client):
+            assert get_attributes_by_values(["1.2.3.4"], max_per_value=5) == {}
+
+        # one extra hit tells a truncated value apart
+        assert client.msearch.call_args.kwargs["body"][1]["size"] == 6
+
+    def test_long_values_fall_back_to_phrase_match(self):
+        long_value = "a" * 300
+        client = MagicMock()
+        client.msearch.return_value = {
+            "responses": [
+                {
+                    "hits": {
+                        "hits": [
+                            {"_source": {"uuid": "a-1", "value": long_value}},
+                            {"_source": {"uuid": "a-2", "value": long_value + " b"}},
+                        ]
+                    }
+                }
+            ]
+        }
+
+        with patch(PATCH, return_value=client):
+            matches = get_attributes_by_values([long_value])
+
+        filters = client.msearch.call_args.kwargs["body"][1]["query"]["bool"]["filter"]
+        assert {"match_phrase": {"value": long_value}} in filters
+        assert [h["_source"]["uuid"] for h in matches[long_value]] == ["a-1"]
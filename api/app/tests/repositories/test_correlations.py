@@ -1,15 +1,27 @@
+import ipaddress
 from unittest.mock import MagicMock, patch
 
 import pytest
 from app.repositories.correlations import (
     build_cidr_query,
+    build_msearch_block,
     build_query,
+    correlate_attribute,
+    correlate_attributes_incrementally,
+    correlate_documents,
+    correlate_value_group,
     delete_correlations,
     delete_event_correlations,
+    flush_bulk_correlations,
+    get_attributes,
     get_correlations,
     get_correlations_stats,
+    get_duplicated_values,
     get_top_correlated_events,
     get_total_correlations,
+    run_correlations,
+    run_incremental_correlations,
+    store_correlations_bulk,
 )
 from app.schemas.correlation import CorrelationQueryParams
 from fastapi import HTTPException
@@ -113,6 +125,520 @@ class TestBuildCidrQuery:
         assert {"term": {"event_uuid": "event-1"}} in query["query"]["bool"]["must_not"]
 
 
+# ── msearch correlation engine ────────────────────────────────────────────────
+
+def _settings(**overrides):
+    values = {"correlations.matchTypes": ["term", "cidr"], **overrides}
+    settings = MagicMock()
+    settings.get_value.side_effect = lambda key, default=None: values.get(key, default)
+    return settings
+
+
+def _attr(uuid, value, type_="ip-src", event_uuid="event-1"):
+    return {
+        "_id": uuid,
+        "_source": {"type": type_, "value": value, "event_uuid": event_uuid},
+    }
+
+
+def _hit(uuid, value, event_uuid="event-2", type_="ip-src"):
+    return {
+        "_id": uuid,
+        "_score": 1.0,
+        "_source": {"type": type_, "value": value, "event_uuid": event_uuid},
+    }
+
+
+class TestBuildMsearchBlock:
+    def test_one_search_per_doc_and_match_type(self):
+        docs = [_attr("attr-1", "10.0.0.0/8"), _attr("attr-2", "1.2.3.4")]
+
+        searches, body = build_msearch_block(docs, _settings())
+
+        # attr-1 gets term + cidr, attr-2 only term (no slash)
+        assert [(doc["_id"], match_type) for doc, match_type in searches] == [
+            ("attr-1", "term"),
+            ("attr-1", "cidr"),
+            ("attr-2", "term"),
+        ]
+        assert len(body) == 6
+        assert body[0] == {"index": "misp-attributes"}
+        assert body[1]["query"]["bool"]["must"] == [{"term": {"value.keyword": "10.0.0.0/8"}}]
+
+    def test_size_comes_from_max_correlations_per_doc(self):
+        searches, body = build_msearch_block(
+            [_attr("attr-1", "1.2.3.4")],
+            _settings(**{"correlations.maxCorrelationsPerDoc": 7}),
+        )
+
+        assert body[1]["size"] == 7
+
+    def test_skips_docs_without_value_or_event(self):
+        docs = [_attr("attr-1", ""), _attr("attr-2", "1.2.3.4", event_uuid=None)]
+
+        searches, body = build_msearch_block(docs, _settings())
+
+        assert searches == []
+        assert body == []
+
+
+class TestCorrelateDocuments:
+    def test_stores_hits_from_each_response(self):
+        mock_os = MagicMock()
+        mock_os.msearch.return_value = {
+            "responses": [
+                {"hits": {"hits": [_hit("attr-9", "1.2.3.4")]}},
+                {"hits": {"hits": []}},
+            ]
+        }
+        docs = [_attr("attr-1", "1.2.3.4"), _attr("attr-2", "5.6.7.8")]
+
+        with patch(PATCH, return_value=mock_os), patch(
+            "app.repositories.correlations.store_correlations_bulk"
+        ) as mock_store:
+            correlate_documents(docs, _settings())
+
+        mock_os.msearch.assert_called_once()
+        assert mock_os.search.call_count == 0
+        assert mock_store.call_count == 2
+        args = mock_store.call_args_list[0].args
+        assert args[0] == "attr-1"
+        assert args[1] == "event-1"
+        assert args[2][0]["_id"] == "attr-9"
+        assert args[3] == "term"
+
+    def test_failed_response_is_skipped(self):
+        mock_os = MagicMock()
+        mock_os.msearch.return_value = {
+            "responses": [{"error": {"type": "search_phase_execution_exception"}}]
+        }
+
+        with patch(PATCH, return_value=mock_os), patch(
+            "app.repositories.correlations.store_correlations_bulk"
+        ) as mock_store:
+            correlate_documents([_attr("attr-1", "1.2.3.4")], _settings())
+
+        mock_store.assert_not_called()
+
+
+class TestRunCorrelations:
+    def test_sends_one_msearch_per_block(self):
+        docs = [_attr(f"attr-{i}", f"1.2.3.{i}") for i in range(5)]
+        mock_os = MagicMock()
+        mock_os.msearch.side_effect = lambda body: {
+            "responses": [{"hits": {"hits": []}} for _ in range(len(body) // 2)]
+        }
+
+        with patch(PATCH, return_value=mock_os), patch(
+            "app.repositories.correlations.get_attributes", return_value=iter(docs)
+        ), patch("app.repositories.correlations.flush_bulk_correlations") as mock_flush:
+            run_correlations(
+                _settings(
+                    **{
+                        "correlations.msearchBlockSize": 2,
+                        "correlations.msearchConcurrency": 2,
+                    }
+                )
+            )
+
+        assert mock_os.msearch.call_count == 3
+        mock_flush.assert_called_once()
+
+
+class TestTermAggregation:
+    def test_get_duplicated_values_pages_and_drops_single_values(self):
+        mock_os = MagicMock()
+        mock_os.search.side_effect = [
+            {
+                "aggregations": {
+                    "values": {
+                        "buckets": [
+                            {"key": {"value": "1.2.3.4"}, "doc_count": 3},
+                            {"key": {"value": "5.6.7.8"}, "doc_count": 1},
+                        ],
+                        "after_key": {"value": "5.6.7.8"},
+                    }
+                }
+            },
+            {"aggregations": {"values": {"buckets": []}}},
+        ]
+
+        with patch(PATCH, return_value=mock_os):
+            pages = list(get_duplicated_values())
+
+        assert pages == [["1.2.3.4"]]
+        second_body = mock_os.search.call_args_list[1].kwargs["body"]
+        assert second_body["aggs"]["values"]["composite"]["after"] == {"value": "5.6.7.8"}
+
+    def test_correlate_value_group_emits_cross_event_pairs(self):
+        docs = [
+            _attr("attr-1", "1.2.3.4", event_uuid="event-1"),
+            _attr("attr-2", "1.2.3.4", event_uuid="event-1"),
+            _attr("attr-3", "1.2.3.4", event_uuid="event-2"),
+        ]
+
+        with patch("app.repositories.correlations.store_correlations_bulk") as mock_store:
+            correlate_value_group(docs, _settings())
+
+        pairs = {
+            call.args[0]: [hit["_id"] for hit in call.args[2]]
+            for call in mock_store.call_args_list
+        }
+        assert pairs == {
+            "attr-1": ["attr-3"],
+            "attr-2": ["attr-3"],
+            "attr-3": ["attr-1", "attr-2"],
+        }
+        assert all(call.args[3] == "term" for call in mock_store.call_args_list)
+
+    def test_correlate_value_group_skips_disabled_sources(self):
+        disabled = _attr("attr-1", "1.2.3.4", event_uuid="event-1")
+        disabled["_source"]["disable_correlation"] = True
+        docs = [disabled, _attr("attr-2", "1.2.3.4", event_uuid="event-2")]
+
+        with patch("app.repositories.correlations.store_correlations_bulk") as mock_store:
+            correlate_value_group(docs, _settings())
+
+        assert [call.args[0] for call in mock_store.call_args_list] == ["attr-2"]
+        assert mock_store.call_args.args[2][0]["_id"] == "attr-1"
+
+    def test_full_run_skips_per_document_term_lookups(self):
+        settings = _settings(**{"correlations.matchTypes": ["term_aggregation"]})
+
+        with patch(
+            "app.repositories.correlations.run_term_aggregation_correlations"
+        ) as mock_aggregation, patch(
+            "app.repositories.correlations.run_document_correlations"
+        ) as mock_documents:
+            run_correlations(settings)
+
+        mock_aggregation.assert_called_once_with(settings)
+        mock_documents.assert_not_called()
+
+    def test_event_run_falls_back_to_term_lookups(self):
+        settings = _settings(**{"correlations.matchTypes": ["term_aggregation", "cidr"]})
+
+        with patch(
+            "app.repositories.correlations.run_term_aggregation_correlations"
+        ) as mock_aggregation, patch(
+            "app.repositories.correlations.run_document_correlations", return_value=0
+        ) as mock_documents:
+            run_correlations(settings, filters={"event_uuid": "event-1"})
+
+        mock_aggregation.assert_not_called()
+        assert mock_documents.call_args.args[2] == ["term", "cidr"]
+
+
+# ── created correlation batching ──────────────────────────────────────────────
+
+class TestCreatedCorrelationBatching:
+    @pytest.fixture(autouse=True)
+    def _empty_buffers(self, monkeypatch):
+        monkeypatch.setattr("app.repositories.correlations.BULK_BUFFER", [])
+        monkeypatch.setattr(
+            "app.repositories.correlations.CREATED_CORRELATIONS_BUFFER", []
+        )
+
+    def test_one_task_per_batch(self):
+        settings = _settings(
+            **{
+                "correlations.opensearchFlushBulkSize": 2,
+                "correlations.notificationBatchSize": 3,
+            }
+        )
+        hits = [_hit(f"attr-{i}", "1.2.3.4") for i in range(7)]
+
+        with patch(PATCH, return_value=MagicMock()), patch(
+            "app.repositories.correlations.opensearch_helpers"
+        ) as mock_helpers, patch("app.repositories.correlations.tasks") as mock_tasks:
+            store_correlations_bulk("attr-src", "event-1", hits, "term", settings)
+
+            assert mock_tasks.handle_created_correlations.delay.call_count == 2
+            assert mock_tasks.handle_created_correlation.delay.call_count == 0
+
+            flush_bulk_correlations()
+
+        batches = [
+            call.args[0]
+            for call in mock_tasks.handle_created_correlations.delay.call_args_list
+        ]
+        assert [len(batch) for batch in batches] == [3, 3, 1]
+        assert batches[0][0] == {
+            "source_attribute_uuid": "attr-src",
+            "source_event_uuid": "event-1",
+            "target_event_uuid": "event-2",
+            "target_attribute_uuid": "attr-0",
+            "target_attribute_type": "ip-src",
+            "target_attribute_value": "1.2.3.4",
+        }
+        # every correlation was indexed before its batch was enqueued
+        indexed = sum(len(call.args[1]) for call in mock_helpers.bulk.call_args_list)
+        assert indexed == 7
+
+
+# ── incremental correlations ──────────────────────────────────────────────────
+
+class TestIncrementalCorrelations:
+    def test_correlate_attribute_replaces_and_mirrors_term_matches(self):
+        mock_os = MagicMock()
+        mock_os.get.return_value = _attr("attr-1", "1.2.3.4")
+        mock_os.msearch.return_value = {
+            "responses": [{"hits": {"hits": [_hit("attr-9", "1.2.3.4")]}}]
+        }
+
+        with patch(PATCH, return_value=mock_os), patch(
+            "app.repositories.correlations.store_correlations_bulk"
+        ) as mock_store, patch("app.repositories.correlations.flush_bulk_correlations"):
+            assert correlate_attribute(_settings(), "attr-1") is True
+
+        should = mock_os.delete_by_query.call_args.kwargs["body"]["query"]["bool"]["should"]
+        assert {"terms": {"source_attribute_uuid.keyword": ["attr-1"]}} in should
+        assert {"terms": {"target_attribute_uuid.keyword": ["attr-1"]}} in should
+
+        stored = [(call.args[0], call.args[2][0]["_id"]) for call in mock_store.call_args_list]
+        assert stored == [("attr-1", "attr-9"), ("attr-9", "attr-1")]
+
+    def test_correlate_attribute_does_not_mirror_cidr_matches(self):
+        mock_os = MagicMock()
+        mock_os.get.return_value = _attr("attr-1", "10.0.0.0/8")
+        mock_os.msearch.return_value = {
+            "responses": [
+                {"hits": {"hits": []}},
+                {"hits": {"hits": [_hit("attr-9", "10.1.2.3")]}},
+            ]
+        }
+
+        with patch(PATCH, return_value=mock_os), patch(
+            "app.repositories.correlations.store_correlations_bulk"
+        ) as mock_store, patch("app.repositories.correlations.flush_bulk_correlations"):
+            correlate_attribute(_settings(), "attr-1")
+
+        assert [call.args[0] for call in mock_store.call_args_list if call.args[2]] == ["attr-1"]
+
+    def test_disabled_attribute_only_drops_correlations(self):
+        doc = _attr("attr-1", "1.2.3.4")
+        doc["_source"]["disable_correlation"] = True
+        mock_os = MagicMock()
+        mock_os.get.return_value = doc
+
+        with patch(PATCH, return_value=mock_os), patch(
+            "app.repositories.correlations.flush_bulk_correlations"
+        ):
+            correlate_attribute(_settings(), "attr-1")
+
+        mock_os.delete_by_query.assert_called_once()
+        mock_os.msearch.assert_not_called()
+
+    def test_incremental_run_without_mark_runs_full(self):
+        with patch(
+            "app.repositories.correlations.get_high_water_mark", return_value=None
+        ), patch(
+            "app.repositories.correlations.run_full_correlations", return_value=True
+        ) as mock_full:
+            run_incremental_correlations(_settings())
+
+        mock_full.assert_called_once()
+
+    def test_incremental_run_processes_delta_and_moves_mark(self):
+        docs = [_attr("attr-1", "1.2.3.4"), _attr("attr-2", "5.6.7.8")]
+
+        with patch(
+            "app.repositories.correlations.get_high_water_mark",
+            return_value="2026-01-01T00:00:00.000Z",
+        ), patch(
+            "app.repositories.correlations.get_indexed_cutoff",
+            return_value="2026-02-01T00:00:00.000Z",
+        ), patch(
+            "app.repositories.correlations.get_attributes", return_value=iter(docs)
+        ) as mock_get, patch(
+            "app.repositories.correlations.correlate_attributes_incrementally"
+        ) as mock_correlate, patch(
+            "app.repositories.correlations.set_high_water_mark"
+        ) as mock_set:
+            run_incremental_correlations(_settings())
+
+        assert mock_get.call_args.args[0] == {
+            "since": "2026-01-01T00:00:00.000Z",
+            "until": "2026-02-01T00:00:00.000Z",
+        }
+        assert mock_correlate.call_args.args[0] == docs
+        mock_set.assert_called_once_with("2026-02-01T00:00:00.000Z")
+
+    def test_delta_is_selected_by_local_write_time(self):
+        # pulled and feed attributes keep their remote @timestamp
+        with patch(PATCH, return_value=MagicMock()), patch(
+            "app.repositories.correlations.opensearch_helpers.scan",
+            return_value=iter([]),
+        ) as mock_scan:
+            list(get_attributes({"since": "2026-01-01T00:00:00.000Z"}))
+
+        must = mock_scan.call_args.kwargs["query"]["query"]["bool"]["must"]
+        assert {
+            "range": {"indexed_at": {"gt": "2026-01-01T00:00:00.000Z"}}
+        } in must
+
+
+class _FakeCluster:
+    """Attributes and correlations indices answering the queries built by
+    the correlation engine."""
+
+    def __init__(self, attributes):
+        self.attributes = {doc["_id"]: doc for doc in attributes}
+        self.correlations = {}
+
+    @staticmethod
+    def _field(source, path):
+        for part in path.split("."):
+            if part != "keyword":
+                source = (source or {}).get(part)
+        return source
+
+    def _matches(self, source, query):
+        (kind, clause), = query.items()
+        if kind == "bool":
+            required = clause.get("must", []) + clause.get("filter", [])
+            if not all(self._matches(source, q) for q in required):
+                return False
+            if any(self._matches(source, q) for q in clause.get("must_not", [])):
+                return False
+            should = clause.get("should", [])
+            return not should or any(self._matches(source, q) for q in should)
+        (field, expected), = clause.items()
+        value = self._field(source, field)
+        if value is None:
+            return False
+        if kind == "term" and field == "expanded.ip":
+            return ipaddress.ip_address(value) in ipaddress.ip_network(expected)
+        if kind == "term" and field == "expanded.ip_range":
+            return ipaddress.ip_address(expected) in ipaddress.ip_network(value)
+        if kind == "term":
+            return value == expected
+        if kind == "terms":
+            return value in expected
+        if kind == "prefix":
+            return value.startswith(expected)
+        if kind == "wildcard":
+            return "/" in value
+        raise AssertionError(f"unsupported query {query}")
+
+    def msearch(self, body):
+        responses = []
+        for search in body[1::2]:
+            hits = [
+                {"_id": uuid, "_score": 1.0, "_source": doc["_source"]}
+                for uuid, doc in self.attributes.items()
+                if self._matches(doc["_source"], search["query"])
+            ]
+            responses.append({"hits": {"hits": hits}})
+        return {"responses": responses}
+
+    def delete_by_query(self, index, body, **kwargs):
+        self.correlations = {
+            id_: doc
+            for id_, doc in self.correlations.items()
+            if not self._matches(doc, body["query"])
+        }
+
+    def bulk(self, client, actions, **kwargs):
+        for action in actions:
+            self.correlations[action["_id"]] = action["_source"]
+
+
+def _ip_attr(uuid, value, event_uuid):
+    expanded = {"ip_range": value} if "/" in value else {"ip": value}
+    return {
+        "_id": uuid,
+        "_source": {
+            "uuid": uuid,
+            "type": "ip-src",
+            "value": value,
+            "event_uuid": event_uuid,
+            "disable_correlation": False,
+            "expanded": expanded,
+        },
+    }
+
+
+def _text_attr(uuid, value, event_uuid):
+    doc = _attr(uuid, value, event_uuid=event_uuid)
+    doc["_source"].update(uuid=uuid, disable_correlation=False)
+    return doc
+
+
+class TestIncrementalMatchesFullRun:
+    @pytest.fixture(autouse=True)
+    def _empty_buffers(self, monkeypatch):
+        monkeypatch.setattr("app.repositories.correlations.BULK_BUFFER", [])
+        monkeypatch.setattr(
+            "app.repositories.correlations.CREATED_CORRELATIONS_BUFFER", []
+        )
+
+    def _run(self, cluster, docs=None, match_type="cidr"):
+        settings = _settings(
+            **{"correlations.matchTypes": [match_type], "correlations.prefixLength": 4}
+        )
+        with patch(PATCH, return_value=cluster), patch(
+            "app.repositories.correlations.opensearch_helpers.bulk",
+            side_effect=cluster.bulk,
+        ), patch("app.repositories.correlations.tasks"), patch(
+            "app.repositories.correlations.get_attributes",
+            side_effect=lambda filters: iter(list(cluster.attributes.values())),
+        ):
+            if docs is None:
+                cluster.correlations = {}
+                run_correlations(settings)
+            else:
+                correlate_attributes_incrementally(docs, settings)
+        return set(cluster.correlations)
+
+    def test_cidr_correlations_towards_changed_attributes(self):
+        cluster = _FakeCluster(
+            [
+                _ip_attr("net", "10.0.0.0/24", "event-1"),
+                _ip_attr("moved", "10.0.0.5", "event-2"),
+                _ip_attr("joined", "192.168.1.1", "event-3"),
+            ]
+        )
+        assert self._run(cluster) == {"net|moved|cidr"}
+
+        changes = [
+            _ip_attr("new", "10.0.0.9", "event-4"),
+            _ip_attr("moved", "172.16.0.1", "event-2"),
+            _ip_attr("joined", "10.0.0.77", "event-3"),
+        ]
+        for doc in changes:
+            cluster.attributes[doc["_id"]] = doc
+            incremental = self._run(cluster, [doc])
+
+        assert incremental == {"net|new|cidr", "net|joined|cidr"}
+        assert incremental == self._run(cluster)
+
+    def test_prefix_correlations_towards_changed_attributes(self):
+        cluster = _FakeCluster(
+            [
+                _text_attr("long", "abcdef", "event-1"),
+                _text_attr("other", "abcxyz", "event-2"),
+            ]
+        )
+        assert self._run(cluster, match_type="prefix") == set()
+
+        for doc in [
+            _text_attr("same", "abcd12", "event-3"),
+            _text_attr("short", "abc", "event-4"),
+        ]:
+            cluster.attributes[doc["_id"]] = doc
+            incremental = self._run(cluster, [doc], match_type="prefix")
+
+        assert incremental == {
+            "long|same|prefix",
+            "same|long|prefix",
+            "short|long|prefix",
+            "short|other|prefix",
+            "short|same|prefix",
+        }
+        assert incremental == self._run(cluster, match_type="prefix")
+
+
 # ── get_correlations ──────────────────────────────────────────────────────────
 
 class TestGetCorrelations:
@@ -0,0 +1,199 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.repositories import event_counters as event_counters_repository
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        return [
+            getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.commands
+        ]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = str(value)
+        return True
+
+    def delete(self, key):
+        self.values.pop(key, None)
+        self.hashes.pop(key, None)
+
+    def hincrby(self, key, field, delta):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = str(int(fields.get(field, 0)) + delta)
+        return int(fields[field])
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+
+@pytest.fixture
+def redis():
+    redis = _FakeRedis()
+    with patch.object(
+        event_counters_repository, "get_redis_client", return_value=redis
+    ), patch.object(event_counters_repository, "event_cache"):
+        yield redis
+
+
+def _event_hit(uuid, attribute_count, object_count):
+    return {
+        "_source": {
+            "uuid": uuid,
+            "attribute_count": attribute_count,
+            "object_count": object_count,
+        },
+        "sort": [uuid],
+    }
+
+
+class TestAddEventCounterDeltas:
+    def test_deltas_accumulate_and_schedule_one_flush(self, redis):
+        with patch("app.worker.tasks.flush_event_counters.apply_async") as flush:
+            for _ in range(3):
+                event_counters_repository.add_event_counter_deltas(
+                    "e-1", attribute_count=1
+                )
+            event_counters_repository.add_event_counter_deltas(
+                "e-1", attribute_count=-1, object_count=2
+            )
+
+        assert redis.hashes[event_counters_repository.EVENT_COUNTERS_KEY] == {
+            "e-1:attribute_count": "2",
+            "e-1:object_count": "2",
+        }
+        flush.assert_called_once()
+
+
+class TestFlushEventCounters:
+    def _flush(self, errors=()):
+        actions = []
+
+        def bulk(client, items, **kwargs):
+            actions.extend(items)
+            return len(actions) - len(errors), list(errors)
+
+        with patch.object(
+            event_counters_repository, "get_opensearch_client"
+        ), patch.object(
+            event_counters_repository.opensearch_helpers, "bulk", side_effect=bulk
+        ):
+            result = event_counters_repository.flush_event_counters()
+        return result, actions
+
+    def test_applies_one_scripted_update_per_event(self, redis):
+        key = event_counters_repository.EVENT_COUNTERS_KEY
+        redis.hashes[key] = {
+            "e-1:attribute_count": "50000",
+            "e-1:object_count": "3",
+            "e-2:object_count": "-1",
+            "e-3:attribute_count": "0",
+        }
+
+        result, actions = self._flush()
+
+        assert result == {"events": 2, "failed": 0}
+        assert [
+            (action["_id"], action["script"]["params"]["deltas"]) for action in actions
+        ] == [
+            ("e-1", {"attribute_count": 50000, "object_count": 3}),
+            ("e-2", {"object_count": -1}),
+        ]
+        assert key not in redis.hashes
+        assert event_counters_repository.EVENT_COUNTERS_LOCK_KEY not in redis.values
+
+    def test_failed_updates_are_queued_again(self, redis):
+        redis.hashes[event_counters_repository.EVENT_COUNTERS_KEY] = {
+            "e-1:attribute_count": "2",
+            "e-2:attribute_count": "5",
+        }
+
+        result, _ = self._flush(
+            errors=[
+                {"update": {"_id": "e-1", "status": 429}},
+                {"update": {"_id": "e-2", "status": 404}},
+            ]
+        )
+
+        assert result == {"events": 1, "failed": 1}
+        assert redis.hashes[event_counters_repository.EVENT_COUNTERS_KEY] == {
+            "e-1:attribute_count": "2"
+        }
+
+    def test_skips_while_another_flush_runs(self, redis):
+        redis.values[event_counters_repository.EVENT_COUNTERS_LOCK_KEY] = "1"
+
+        with patch("app.worker.tasks.flush_event_counters.apply_async") as flush:
+            result, actions = self._flush()
+
+        assert result == {"status": "skipped"}
+        assert actions == []
+        flush.assert_called_once()
+
+
+class TestRepairEventCounters:
+    def test_fixes_drifted_events_only(self, redis):
+        redis.hashes[event_counters_repository.EVENT_COUNTERS_KEY] = {
+            "e-3:attribute_count": "1"
+        }
+        events = [("e-1", 4, 1), ("e-2", 9, 0), ("e-3", 0, 0)]
+        client = MagicMock()
+
+        def search(index, body):
+            if index == "misp-events":
+                return {"hits": {"hits": [_event_hit(*event) for event in events]}}
+            counts = {
+                "misp-attributes": {"e-1": 4, "e-2": 7, "e-3": 2},
+                "misp-objects": {"e-1": 1, "e-2": 1},
+            }[index]
+            return {
+                "aggregations": {
+                    "events": {
+                        "buckets": [
+                            {"key": key, "doc_count": count}
+                            for key, count in counts.items()
+                        ]
+                    }
+                }
+            }
+
+        client.search.side_effect = search
+
+        with patch.object(
+            event_counters_repository, "get_opensearch_client", return_value=client
+        ), patch.object(event_counters_repository.opensearch_helpers, "bulk") as bulk:
+            result = event_counters_repository.repair_event_counters()
+
+        assert result == {"checked": 3, "repaired": 1}
+        actions = bulk.call_args.args[1]
+        assert actions == [
+            {
+                "_op_type": "update",
+                "_index": "misp-events",
+                "_id": "e-2",
+                "doc": {"attribute_count": 7, "object_count": 1},
+            }
+        ]
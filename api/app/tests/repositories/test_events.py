@@ -0,0 +1,124 @@
+from unittest.mock import MagicMock, patch
+
+from app.repositories import events as events_repository
+
+PATCH = "app.repositories.events.get_opensearch_client"
+
+EVENT_UUID = "11111111-1111-1111-1111-111111111111"
+OBJECT_UUID = "22222222-2222-2222-2222-222222222222"
+
+
+def _attribute(i, object_uuid=None):
+    return {
+        "uuid": f"00000000-0000-0000-0000-{i:012d}",
+        "event_uuid": EVENT_UUID,
+        "object_uuid": object_uuid,
+        "type": "ip-dst",
+        "category": "Network activity",
+        "value": f"10.0.0.{i % 250}",
+        "timestamp": 1700000000,
+    }
+
+
+def _client(docs_by_index):
+    """OpenSearch client serving ``docs_by_index`` through PIT searches."""
+    client = MagicMock()
+    client.get.return_value = {"_source": {"uuid": EVENT_UUID, "info": "big event"}}
+    pits = {}
+
+    def create_pit(index, keep_alive):
+        pit_id = f"pit-{len(pits)}"
+        pits[pit_id] = index
+        return {"pit_id": pit_id}
+
+    def search(body):
+        assert "index" not in body
+        docs = sorted(docs_by_index[pits[body["pit"]["id"]]], key=lambda d: d["uuid"])
+        must_not = body["query"].get("bool", {}).get("must_not", [])
+        if {"term": {"deleted": True}} in must_not:
+            docs = [d for d in docs if not d.get("deleted")]
+        after = body.get("search_after", [""])[0]
+        page = [d for d in docs if d["uuid"] > after][: body["size"]]
+        return {
+            "pit_id": body["pit"]["id"],
+            "hits": {"hits": [{"_source": d, "sort": [d["uuid"]]} for d in page]},
+        }
+
+    client.create_pit.side_effect = create_pit
+    client.search.side_effect = search
+    return client
+
+
+class TestGetFullEvent:
+    def test_loads_every_attribute_and_object_past_one_page(self):
+        attributes = [_attribute(i) for i in range(25)] + [
+            _attribute(100 + i, OBJECT_UUID) for i in range(7)
+        ]
+        objects = [
+            {
+                "uuid": OBJECT_UUID,
+                "event_uuid": EVENT_UUID,
+                "name": "ip-port",
+                "template_version": 1,
+                "timestamp": 1700000000,
+            }
+        ]
+        client = _client({"misp-attributes": attributes, "misp-objects": objects})
+
+        with patch(PATCH, return_value=client):
+            event = events_repository.get_event_from_opensearch(
+                EVENT_UUID, full=True, page_size=10
+            )
+
+        assert len(event.attributes) == 25
+        assert len(event.objects) == 1
+        assert len(event.objects[0].attributes) == 7
+        # objects (1 page) + attributes (4 pages)
+        assert client.search.call_count == 5
+        assert client.delete_pit.call_count == 2
+
+    def test_pages_are_bounded_and_projected(self):
+        client = _client({"misp-attributes": [_attribute(i) for i in range(5)]})
+
+        with patch(PATCH, return_value=client):
+            pages = list(
+                events_repository.iter_event_attribute_pages(
+                    EVENT_UUID, source=["uuid", "value"], page_size=2
+                )
+            )
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert client.search.call_args.kwargs["body"]["_source"] == ["uuid", "value"]
+        client.delete_pit.assert_called_once_with(body={"pit_id": ["pit-0"]})
+
+    def test_point_in_time_is_released_when_the_reader_stops(self):
+        client = _client({"misp-attributes": [_attribute(i) for i in range(5)]})
+
+        with patch(PATCH, return_value=client):
+            pages = events_repository.iter_event_attribute_pages(EVENT_UUID, page_size=2)
+            next(pages)
+            pages.close()
+
+        client.delete_pit.assert_called_once()
+
+    def test_deleted_attributes_are_excluded_on_request(self):
+        attributes = [_attribute(i) for i in range(3)]
+        attributes[1]["deleted"] = True
+        client = _client({"misp-attributes": attributes})
+
+        with patch(PATCH, return_value=client):
+            kept = [
+                doc["uuid"]
+                for page in events_repository.iter_event_attribute_pages(
+                    EVENT_UUID, exclude_deleted=True
+                )
+                for doc in page
+            ]
+            every = [
+                doc["uuid"]
+                for page in events_repository.iter_event_attribute_pages(EVENT_UUID)
+                for doc in page
+            ]
+
+        assert kept == [attributes[0]["uuid"], attributes[2]["uuid"]]
+        assert len(every) == 3
@@ -1,7 +1,12 @@
+import io
+import json
 from unittest.mock import MagicMock, patch
 
 from uuid import UUID
 
+import httpx
+import pytest
+
 from app.models import feed as feed_models
 from app.models import tag as tag_models
 from app.models import user as user_models
@@ -12,6 +17,7 @@ from app.repositories import object_references as object_references_repository
 from app.repositories import objects as objects_repository
 from app.tests.api_tester import ApiTester
 from app.tests.scenarios import feed_fetch_scenarios
+from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
 
@@ -116,14 +122,23 @@ class TestFeedsRepository(ApiTester):
                 json=MagicMock(
                     return_value=feed_fetch_scenarios.feed_update_event_manifest
                 ),
+                content=json.dumps(
+                    feed_fetch_scenarios.feed_update_event_manifest
+                ).encode(),
+                headers={},
                 status_code=200,
             )
             # mock remote Feed API calls
             mock_fetch_event_by_uuid.return_value = (
                 feed_fetch_scenarios.feed_update_event
             )
+            mock_redis = MagicMock()
+            mock_redis.hgetall.return_value = {}
 
-            feeds_repository.fetch_feed(db, feed_1.id, user_1)
+            with patch(
+                "app.repositories.feeds.get_redis_client", return_value=mock_redis
+            ):
+                feeds_repository.fetch_feed(db, feed_1.id, user_1)
             feeds_repository.process_feed_event(
                 db, "ba4b11b6-dcce-4315-8fd0-67b69160ea76", feed_1, user_1
             )
@@ -187,3 +202,526 @@ class TestFeedsRepository(ApiTester):
                         all_attribute_tag_names.add(t.name)
             assert "ATTRIBUTE_EVENT_FEED_ADDED_TAG" in all_attribute_tag_names
             assert "OBJECT_ATTRIBUTE_EVENT_FEED_ADDED_TAG" in all_attribute_tag_names
+
+
+class TestStreamingCsvFeed:
+    def _response(self, lines, status_code=200):
+        response = MagicMock(status_code=status_code, text="nope")
+        response.__enter__.return_value = response
+        response.iter_lines.return_value = iter(lines)
+        return response
+
+    def test_network_stream_is_lazy_and_filters_comments(self):
+        response = self._response([b"# header comment", b"1.2.3.4", b"", b"example.com"])
+
+        with patch(
+            "app.repositories.feeds.requests.get", return_value=response
+        ) as mock_get:
+            lines = feeds_repository.stream_csv_content_from_network("http://feed")
+            mock_get.assert_not_called()
+
+            assert list(lines) == ["1.2.3.4", "example.com"]
+
+        assert mock_get.call_args.kwargs["stream"] is True
+        response.__exit__.assert_called_once()
+
+    def test_network_stream_raises_on_http_error(self):
+        with patch(
+            "app.repositories.feeds.requests.get",
+            return_value=self._response([], status_code=404),
+        ):
+            with pytest.raises(HTTPException) as exc:
+                list(feeds_repository.stream_csv_content_from_network("http://feed"))
+
+        assert exc.value.status_code == 404
+
+    def test_fetch_with_limit_stops_reading(self):
+        response = self._response([b"1.2.3.4", b"5.6.7.8", b"9.9.9.9"])
+
+        with patch("app.repositories.feeds.requests.get", return_value=response):
+            lines = feeds_repository.fetch_csv_content_from_network(
+                "http://feed", limit=2
+            )
+
+        assert lines == ["1.2.3.4", "5.6.7.8"]
+        assert next(response.iter_lines.return_value) == b"9.9.9.9"
+
+    def test_local_stream_reads_attachment_lines(self):
+        with patch(
+            "app.repositories.feeds.iter_attachment_lines",
+            return_value=iter([b"1.2.3.4", b"#skip", b"example.com"]),
+        ) as mock_iter:
+            lines = list(
+                feeds_repository.stream_csv_content_from_local("feed-uploads/x")
+            )
+
+        assert lines == ["1.2.3.4", "example.com"]
+        assert mock_iter.call_args.args[0] == "feed-uploads/x"
+
+    def test_iter_csv_feed_rows_yields_stripped_rows(self):
+        settings = {"csvConfig": {"delimiter": ","}}
+        rows = feeds_repository.iter_csv_feed_rows(
+            settings, iter(["1.2.3.4 , ip-dst", "example.com,domain"])
+        )
+
+        assert next(rows) == ["1.2.3.4", "ip-dst"]
+        assert list(rows) == [["example.com", "domain"]]
+
+
+class _FakeRedis:
+    """Minimal hash-only Redis stand-in for the feed HTTP cache."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(
+            {field: str(value) for field, value in mapping.items()}
+        )
+
+    def hincrby(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = str(int(fields.get(field, 0)) + amount)
+        return int(fields[field])
+
+    def expire(self, key, ttl):
+        pass
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+
+
+class TestFeedHttpCache:
+    def _feed(self):
+        return MagicMock(id=7, url="http://feed/iocs.csv", headers=None)
+
+    def _response(self, body=b"", status_code=200, headers=None):
+        response = MagicMock(status_code=status_code, text="", headers=headers or {})
+        response.__enter__.return_value = response
+        response.raw = io.BytesIO(body)
+        return response
+
+    def _download(self, redis, response):
+        with patch(
+            "app.repositories.feeds.get_redis_client", return_value=redis
+        ), patch(
+            "app.repositories.feeds.requests.get", return_value=response
+        ) as mock_get:
+            download = feeds_repository.download_feed_content(self._feed())
+        return download, mock_get.call_args.kwargs["headers"]
+
+    def test_first_download_returns_content_and_validators(self):
+        redis = _FakeRedis()
+        download, headers = self._download(
+            redis, self._response(b"1.2.3.4\n", headers={"ETag": '"v1"'})
+        )
+
+        assert download["unchanged"] is False
+        assert download["content"].read() == b"1.2.3.4\n"
+        assert download["cache"]["etag"] == '"v1"'
+        assert download["cache"]["bytes"] == 8
+        assert "If-None-Match" not in headers
+
+    def test_not_modified_counts_bytes_and_rows_saved(self):
+        redis = _FakeRedis()
+        with patch("app.repositories.feeds.get_redis_client", return_value=redis):
+            feeds_repository.store_feed_http_cache(
+                7,
+                {"etag": '"v1"', "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+                 "sha256": "abc", "bytes": 2048},
+                rows=120,
+            )
+
+        download, headers = self._download(redis, self._response(status_code=304))
+
+        assert download["unchanged"] is True
+        assert headers["If-None-Match"] == '"v1"'
+        assert headers["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+        with patch("app.repositories.feeds.get_redis_client", return_value=redis):
+            assert feeds_repository.get_feed_http_cache_stats() == {
+                "unchanged": 1, "bytes_saved": 2048, "rows_saved": 120,
+            }
+
+    def test_identical_body_is_unchanged_without_validators(self):
+        redis = _FakeRedis()
+        first, _ = self._download(redis, self._response(b"1.2.3.4\n"))
+        with patch("app.repositories.feeds.get_redis_client", return_value=redis):
+            feeds_repository.store_feed_http_cache(7, first["cache"], rows=1)
+
+        download, _ = self._download(redis, self._response(b"1.2.3.4\n"))
+
+        assert download["unchanged"] is True
+        with patch("app.repositories.feeds.get_redis_client", return_value=redis):
+            assert feeds_repository.get_feed_http_cache_stats() == {
+                "unchanged": 1, "bytes_saved": 0, "rows_saved": 1,
+            }
+
+    def test_changed_body_is_processed(self):
+        redis = _FakeRedis()
+        first, _ = self._download(redis, self._response(b"1.2.3.4\n"))
+        with patch("app.repositories.feeds.get_redis_client", return_value=redis):
+            feeds_repository.store_feed_http_cache(7, first["cache"], rows=1)
+
+        download, _ = self._download(redis, self._response(b"1.2.3.4\r\n# new\n5.6.7.8"))
+
+        assert download["unchanged"] is False
+        assert list(feeds_repository.iter_feed_content_lines(download["content"])) == [
+            "1.2.3.4",
+            "5.6.7.8",
+        ]
+
+    def _fetch_misp_feed(self, redis, manifest_body):
+        db_feed = MagicMock(
+            id=7, enabled=True, source_format="misp", input_source="network", rules={}
+        )
+        manifest = MagicMock(status_code=200, content=manifest_body, headers={})
+        manifest.json.return_value = json.loads(manifest_body)
+        settings = MagicMock()
+        settings.get_value.side_effect = lambda key, default: (
+            1 if key == "feeds.eventsBatchSize" else default
+        )
+
+        with patch(
+            "app.repositories.feeds.get_redis_client", return_value=redis
+        ), patch(
+            "app.repositories.feeds.get_feed_by_id", return_value=db_feed
+        ), patch(
+            "app.repositories.feeds.get_feed_manifest", return_value=manifest
+        ), patch.object(
+            feeds_repository.events_repository, "get_events_by_uuids", return_value=[]
+        ), patch(
+            "app.repositories.feeds.RuntimeSettings", return_value=settings
+        ), patch("app.repositories.feeds.tasks") as mock_tasks:
+            result = feeds_repository.fetch_feed(MagicMock(), 7, MagicMock(id=1))
+        return result, mock_tasks.fetch_feed_events.delay.call_args_list
+
+    def _complete(self, redis, batch, failed=False):
+        with patch("app.repositories.feeds.get_redis_client", return_value=redis):
+            feeds_repository.complete_feed_http_cache_batch(
+                batch.args[1], batch.args[3], failed=failed
+            )
+
+    def test_misp_manifest_is_cached_after_all_batches_succeed(self):
+        redis = _FakeRedis()
+        body = b'{"uuid-1": {"timestamp": 1}, "uuid-2": {"timestamp": 1}}'
+        _, batches = self._fetch_misp_feed(redis, body)
+
+        assert len(batches) == 2
+        self._complete(redis, batches[0])
+        assert "feeds:http_cache:7" not in redis.hashes
+
+        self._complete(redis, batches[1])
+        assert redis.hashes["feeds:http_cache:7"]["rows"] == "2"
+
+        result, batches = self._fetch_misp_feed(redis, body)
+        assert result["unchanged"] is True
+        assert batches == []
+
+    def test_failed_batch_keeps_misp_manifest_uncached(self):
+        redis = _FakeRedis()
+        body = b'{"uuid-1": {"timestamp": 1}, "uuid-2": {"timestamp": 1}}'
+        _, batches = self._fetch_misp_feed(redis, body)
+
+        self._complete(redis, batches[0], failed=True)
+        self._complete(redis, batches[1])
+
+        assert redis.hashes == {}
+        _, batches = self._fetch_misp_feed(redis, body)
+        assert len(batches) == 2
+
+    def test_unchanged_csv_feed_skips_processing(self):
+        from app.worker import tasks as worker_tasks
+
+        db_feed = MagicMock(id=7, input_source="network")
+        db_feed.name = "blocklist"
+        with patch.object(
+            worker_tasks.feeds_repository, "get_feed_by_id", return_value=db_feed
+        ), patch.object(worker_tasks.users_repository, "get_user_by_id"), patch.object(
+            worker_tasks.feeds_repository,
+            "download_feed_content",
+            return_value={"unchanged": True, "content": None, "cache": {}},
+        ), patch.object(
+            worker_tasks.feeds_repository, "get_or_create_feed_event"
+        ) as get_event:
+            result = worker_tasks.fetch_csv_feed(7, 1)
+
+        assert result["unchanged"] is True
+        get_event.assert_not_called()
+
+    def _fetch_csv_feed_creating(self, created):
+        from app.worker import tasks as worker_tasks
+
+        db_feed = MagicMock(id=7, input_source="network", fixed_event=False)
+        db_feed.name = "blocklist"
+        db_feed.settings = {"csvConfig": {"header": False}}
+        rows = [["1.2.3.4"], ["5.6.7.8"]]
+        with patch.object(
+            worker_tasks.feeds_repository, "get_feed_by_id", return_value=db_feed
+        ), patch.object(worker_tasks.users_repository, "get_user_by_id"), patch.object(
+            worker_tasks.feeds_repository,
+            "download_feed_content",
+            return_value={"unchanged": False, "content": MagicMock(), "cache": {"etag": "v1"}},
+        ), patch.object(worker_tasks.feeds_repository, "iter_feed_content_lines"), patch.object(
+            worker_tasks.feeds_repository, "iter_csv_feed_rows", return_value=iter(rows)
+        ), patch.object(
+            worker_tasks.feeds_repository,
+            "process_csv_feed_row",
+            side_effect=lambda row, settings: {"type": "ip-dst", "value": row[0]},
+        ), patch.object(
+            worker_tasks.feeds_repository,
+            "get_or_create_feed_event",
+            return_value=MagicMock(uuid="11111111-1111-1111-1111-111111111111"),
+        ), patch.object(
+            worker_tasks.attributes_repository,
+            "create_attributes_bulk",
+            side_effect=lambda db, attributes: attributes[:created],
+        ), patch.object(
+            worker_tasks.feeds_repository, "store_feed_http_cache"
+        ) as store_cache:
+            result = worker_tasks.fetch_csv_feed(7, 1)
+
+        return result, store_cache
+
+    def test_partial_bulk_failure_does_not_store_validators(self):
+        result, store_cache = self._fetch_csv_feed_creating(1)
+
+        assert "1 attributes created" in result["message"]
+        assert "1 rows failed" in result["message"]
+        store_cache.assert_not_called()
+
+    def test_fully_indexed_feed_stores_validators(self):
+        result, store_cache = self._fetch_csv_feed_creating(2)
+
+        assert "2 attributes created" in result["message"]
+        store_cache.assert_called_once_with(7, {"etag": "v1"}, rows=2)
+
+
+class TestFeedDeltaMerge:
+    EVENT_UUID = "11111111-1111-1111-1111-111111111111"
+
+    def _feed(self):
+        return MagicMock(id=7, fixed_event=True, delta_merge=True)
+
+    def _attr(self, value, type_="ip-dst"):
+        from app.schemas.attribute import AttributeCreate
+
+        return AttributeCreate(
+            event_uuid=self.EVENT_UUID, type=type_, value=value, category="Network activity"
+        )
+
+    def _fp(self, value, type_="ip-dst"):
+        return feeds_repository.feed_attribute_fingerprint(type_, value)
+
+    def test_requires_fixed_event(self):
+        assert feeds_repository.uses_feed_delta_merge(self._feed()) is True
+        assert feeds_repository.uses_feed_delta_merge(
+            MagicMock(fixed_event=False, delta_merge=True)
+        ) is False
+
+    def test_rebuilds_fingerprints_from_fixed_event(self):
+        hits = [{"_source": {"uuid": "a-1", "type": "ip-dst", "value": "1.2.3.4"}}]
+        with patch(
+            "app.repositories.feeds.get_redis_client", return_value=_FakeRedis()
+        ), patch("app.repositories.feeds.get_opensearch_client"), patch(
+            "app.repositories.feeds.opensearch_helpers.scan", return_value=iter(hits)
+        ) as mock_scan:
+            delta = feeds_repository.start_feed_delta(self._feed(), self.EVENT_UUID)
+
+        assert delta["previous"] == {self._fp("1.2.3.4"): "a-1"}
+        assert delta["persisted"] is False
+        must = mock_scan.call_args.kwargs["query"]["query"]["bool"]["must"]
+        assert {"term": {"event_uuid": self.EVENT_UUID}} in must
+
+    def test_only_new_values_are_created_and_missing_ones_deleted(self):
+        redis = _FakeRedis()
+        key = feeds_repository.FEED_DELTA_KEY.format(feed_id=7, event_uuid=self.EVENT_UUID)
+        redis.hset(key, {self._fp("1.2.3.4"): "a-1", self._fp("5.6.7.8"): "a-2"})
+
+        with patch("app.repositories.feeds.get_redis_client", return_value=redis):
+            delta = feeds_repository.start_feed_delta(self._feed(), self.EVENT_UUID)
+
+            kept = self._attr("1.2.3.4")
+            new = self._attr("9.9.9.9")
+            assert feeds_repository.is_new_feed_attribute(delta, kept) is False
+            assert feeds_repository.is_new_feed_attribute(delta, new) is True
+            assert feeds_repository.is_new_feed_attribute(delta, self._attr("9.9.9.9")) is False
+
+            created = MagicMock(type="ip-dst", value="9.9.9.9", uuid="a-3")
+            feeds_repository.record_feed_delta_created(delta, [created])
+
+            with patch.object(
+                feeds_repository.attributes_repository,
+                "delete_attributes_bulk",
+                return_value=["a-2"],
+            ) as mock_delete:
+                assert feeds_repository.finish_feed_delta(None, delta) == 1
+
+        assert mock_delete.call_args.args[1:] == (["a-2"], self.EVENT_UUID)
+        assert redis.hgetall(key) == {self._fp("1.2.3.4"): "a-1", self._fp("9.9.9.9"): "a-3"}
+
+    def test_failed_deletes_stay_tracked(self):
+        redis = _FakeRedis()
+        key = feeds_repository.FEED_DELTA_KEY.format(feed_id=7, event_uuid=self.EVENT_UUID)
+        redis.hset(key, {self._fp("5.6.7.8"): "a-2"})
+
+        with patch("app.repositories.feeds.get_redis_client", return_value=redis):
+            delta = feeds_repository.start_feed_delta(self._feed(), self.EVENT_UUID)
+            with patch.object(
+                feeds_repository.attributes_repository,
+                "delete_attributes_bulk",
+                return_value=[],
+            ):
+                assert feeds_repository.finish_feed_delta(None, delta) == 0
+
+        assert redis.hgetall(key) == {self._fp("5.6.7.8"): "a-2"}
+
+
+class TestParallelFeedEventFetch:
+    def _feed(self, input_source="network"):
+        return MagicMock(
+            id=3, url="http://feed", headers=None, input_source=input_source
+        )
+
+    def _client(self, handler):
+        return httpx.Client(transport=httpx.MockTransport(handler))
+
+    def test_download_retries_throttled_responses(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            if len(calls) < 3:
+                return httpx.Response(503, text="busy")
+            return httpx.Response(200, json={"Event": {"uuid": "e-1"}})
+
+        with patch("app.repositories.feeds.time.sleep") as mock_sleep:
+            event = feeds_repository.download_feed_event(
+                self._client(handler), self._feed(), "e-1", retries=3
+            )
+
+        assert event == {"Event": {"uuid": "e-1"}}
+        assert calls == ["/e-1.json"] * 3
+        assert mock_sleep.call_count == 2
+
+    def test_download_retries_connection_errors(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            raise httpx.ConnectError("refused", request=request)
+
+        with patch("app.repositories.feeds.time.sleep"), pytest.raises(
+            httpx.ConnectError
+        ):
+            feeds_repository.download_feed_event(
+                self._client(handler), self._feed(), "e-1", retries=2
+            )
+
+        assert len(calls) == 3
+
+    def test_client_transport_does_not_retry(self):
+        client = feeds_repository.build_feed_http_client(self._feed(), 4)
+
+        assert client._transport._pool._retries == 0
+        client.close()
+
+    def test_download_does_not_retry_client_errors(self):
+        handler = MagicMock(return_value=httpx.Response(404, text="gone"))
+
+        with pytest.raises(HTTPException) as exc:
+            feeds_repository.download_feed_event(
+                self._client(handler), self._feed(), "e-1", retries=3
+            )
+
+        assert exc.value.status_code == 404
+        assert handler.call_count == 1
+
+    def test_iter_feed_events_downloads_concurrently_and_reports_errors(self):
+        def handler(request):
+            if request.url.path == "/bad.json":
+                return httpx.Response(404, text="gone")
+            return httpx.Response(200, json={"uuid": request.url.path[1:-5]})
+
+        with patch(
+            "app.repositories.feeds.build_feed_http_client",
+            return_value=self._client(handler),
+        ) as mock_build:
+            results = list(
+                feeds_repository.iter_feed_events(
+                    self._feed(), ["a", "bad", "b", "c"], concurrency=2, retries=0
+                )
+            )
+
+        assert mock_build.call_count == 1
+        by_uuid = {uuid: (raw, error) for uuid, raw, error in results}
+        assert by_uuid["a"] == ({"uuid": "a"}, None)
+        assert by_uuid["c"] == ({"uuid": "c"}, None)
+        assert isinstance(by_uuid["bad"][1], HTTPException)
+
+    def test_process_feed_events_shares_orgc_cache_and_counts_failures(self):
+        db = MagicMock()
+        settings = MagicMock()
+        settings.get_value.side_effect = lambda key, default: default
+        downloaded = [
+            ("a", {"Event": {}}, None),
+            ("b", None, Exception("timeout")),
+            ("c", {"Event": {}}, None),
+        ]
+
+        with patch(
+            "app.repositories.feeds.iter_feed_events", return_value=iter(downloaded)
+        ), patch(
+            "app.repositories.feeds.process_feed_event",
+            side_effect=[None, Exception("bad event")],
+        ) as mock_process:
+            result = feeds_repository.process_feed_events(
+                db, ["a", "b", "c"], self._feed(), MagicMock(), settings
+            )
+
+        assert (result["processed"], result["failed"]) == (1, 2)
+        caches = [call.kwargs["orgc_cache"] for call in mock_process.call_args_list]
+        assert caches[0] is caches[1]
+        db.rollback.assert_called_once()
+
+    def test_fetch_feed_enqueues_event_batches(self):
+        db_feed = MagicMock(
+            id=3, enabled=True, source_format="misp", input_source="local", rules={}
+        )
+        manifest = {f"uuid-{i}": {"timestamp": 1} for i in range(5)}
+        settings = MagicMock()
+        settings.get_value.side_effect = lambda key, default: (
+            2 if key == "feeds.eventsBatchSize" else default
+        )
+
+        with patch(
+            "app.repositories.feeds.get_feed_by_id", return_value=db_feed
+        ), patch(
+            "app.repositories.feeds.get_feed_manifest",
+            return_value=MagicMock(status_code=200, json=MagicMock(return_value=manifest)),
+        ), patch(
+            "app.repositories.feeds.filter_feed_by_rules", side_effect=lambda r, m: m
+        ), patch.object(
+            feeds_repository.events_repository, "get_events_by_uuids", return_value=[]
+        ), patch(
+            "app.repositories.feeds.RuntimeSettings", return_value=settings
+        ), patch("app.repositories.feeds.tasks") as mock_tasks:
+            feeds_repository.fetch_feed(MagicMock(), 3, MagicMock(id=1))
+
+        batches = [
+            call.args[0] for call in mock_tasks.fetch_feed_events.delay.call_args_list
+        ]
+        assert batches == [["uuid-0", "uuid-1"], ["uuid-2", "uuid-3"], ["uuid-4"]]
+        mock_tasks.fetch_feed_event.delay.assert_not_called()
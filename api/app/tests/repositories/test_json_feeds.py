@@ -1,8 +1,11 @@
+import io
 import json
 
 import pytest
+from app.repositories import feeds as feeds_repository
 from app.repositories.feeds import (
     get_json_path,
+    iter_json_feed_items,
     parse_json_feed_items,
     process_json_item_to_attribute,
 )
@@ -117,6 +120,63 @@ class TestParseJsonFeedItems:
         assert items == [{"v": "x"}]
 
 
+# ── iter_json_feed_items ──────────────────────────────────────────────────────
+
+
+def _stream(content: str):
+    return io.BytesIO(content.encode("utf-8"))
+
+
+class TestIterJsonFeedItems:
+    @pytest.mark.parametrize(
+        "content,json_cfg",
+        [
+            (json.dumps([{"v": "1.2.3.4"}, {"v": "5.6.7.8"}]), {"items_path": ""}),
+            (
+                json.dumps({"meta": {"n": 2}, "data": {"iocs": [{"v": "a"}, {"v": "b"}]}}),
+                {"items_path": "data.iocs"},
+            ),
+            (json.dumps({"indicator": "1.2.3.4", "score": 0.5}), {"format": "object"}),
+            (json.dumps({"data": {"tags": ["x"], "n": None}}), {"items_path": "data"}),
+            (json.dumps(["1.2.3.4", 7, 1.5, True, None, [1, 2]]), {}),
+            ('# c\n{"v":"ok"}\n\nnot-json\n["no"]\n{"v":"also-ok"}', {"format": "ndjson"}),
+        ],
+    )
+    def test_matches_parse_json_feed_items(self, content, json_cfg):
+        assert list(iter_json_feed_items(_stream(content), json_cfg)) == (
+            parse_json_feed_items(content, json_cfg)
+        )
+
+    def test_ndjson_lines_split_across_chunks(self, monkeypatch):
+        monkeypatch.setattr(feeds_repository, "FEED_STREAM_CHUNK_SIZE", 4)
+        content = '{"v":"1.2.3.4"}\n{"v":"5.6.7.8"}'
+        items = iter_json_feed_items(_stream(content), {"format": "ndjson"})
+        assert list(items) == [{"v": "1.2.3.4"}, {"v": "5.6.7.8"}]
+
+    def test_yields_items_before_reading_whole_payload(self):
+        content = '[{"v": "a"}, {"v": "b"}, not-json'
+        items = iter_json_feed_items(_stream(content), {"items_path": ""})
+        assert next(items) == {"v": "a"}
+        assert next(items) == {"v": "b"}
+        with pytest.raises(HTTPException) as exc_info:
+            next(items)
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.parametrize(
+        "content,items_path",
+        [
+            ("not-json", ""),
+            (json.dumps({"a": 1}), "missing"),
+            (json.dumps({"data": None}), "data"),
+            (json.dumps({"data": "string-not-array"}), "data"),
+        ],
+    )
+    def test_invalid_payloads_raise(self, content, items_path):
+        with pytest.raises(HTTPException) as exc_info:
+            list(iter_json_feed_items(_stream(content), {"items_path": items_path}))
+        assert exc_info.value.status_code == 400
+
+
 # ── process_json_item_to_attribute ────────────────────────────────────────────
 
 
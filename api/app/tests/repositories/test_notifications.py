@@ -0,0 +1,224 @@
+import json
+import smtplib
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.repositories import notifications as notifications_repository
+from app.services import mail
+
+
+class _FakeRedis:
+    """Minimal list / set / counter Redis stand-in for the email digests."""
+
+    def __init__(self):
+        self.lists = {}
+        self.sets = {}
+        self.values = {}
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = str(value)
+        return True
+
+    def delete(self, key):
+        self.lists.pop(key, None)
+        self.values.pop(key, None)
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+
+    def decr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) - 1)
+        return int(self.values[key])
+
+    def expire(self, key, seconds):
+        pass
+
+    def rpush(self, key, *items):
+        self.lists.setdefault(key, []).extend(items)
+
+    def lpush(self, key, *items):
+        for item in items:
+            self.lists.setdefault(key, []).insert(0, item)
+
+    def ltrim(self, key, start, end):
+        items = self.lists.get(key, [])
+        self.lists[key] = items[start:] if end == -1 else items[start : end + 1]
+
+    def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(str(member))
+
+    def srem(self, key, member):
+        self.sets.get(key, set()).discard(str(member))
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def command(*args):
+            self.commands.append((name, args))
+            return self
+
+        return command
+
+    def execute(self):
+        results = [getattr(self.redis, name)(*args) for name, args in self.commands]
+        self.commands = []
+        return results
+
+
+def _runtime(**values):
+    values = {
+        "notifications.email_max_per_hour": 10,
+        "notifications.email_digest_interval": 60,
+        **values,
+    }
+    runtime = MagicMock()
+    runtime.get_value.side_effect = lambda key, default=None: values.get(key, default)
+    return runtime
+
+
+def _notification(user_id, type="event.updated"):
+    return SimpleNamespace(user_id=user_id, type=type, payload={"event_uuid": "e-1"})
+
+
+class TestNotificationEmailDigests:
+    def _patches(self, redis, runtime=None):
+        return (
+            patch(
+                "app.repositories.notifications.get_redis_client", return_value=redis
+            ),
+            patch(
+                "app.services.runtime_settings_provider.get_runtime_settings",
+                return_value=runtime or _runtime(),
+            ),
+        )
+
+    def _enqueue(self, redis, notifications, runtime=None):
+        db = MagicMock()
+        db.get.side_effect = lambda model, user_id: SimpleNamespace(
+            id=user_id, email=f"user{user_id}@example.com"
+        )
+        redis_patch, runtime_patch = self._patches(redis, runtime)
+        with redis_patch, runtime_patch, patch(
+            "app.repositories.notifications.user_settings_repository.get_user_setting",
+            return_value=None,
+        ), patch("app.worker.tasks.flush_notification_digests") as flush_task:
+            notifications_repository._enqueue_notification_emails(db, notifications)
+        return flush_task
+
+    def _flush(self, redis, runtime=None, send_result=None):
+        redis_patch, runtime_patch = self._patches(redis, runtime)
+        with redis_patch, runtime_patch, patch.object(
+            mail, "is_mail_configured", return_value=True
+        ), patch.object(
+            mail, "send_emails", side_effect=send_result or (lambda emails: (len(emails), []))
+        ) as send, patch(
+            "app.worker.tasks.flush_notification_digests"
+        ) as flush_task:
+            result = notifications_repository.flush_notification_digests(MagicMock())
+        return result, send, flush_task
+
+    def test_enqueue_queues_per_recipient_and_schedules_one_flush(self):
+        redis = _FakeRedis()
+
+        flush_task = self._enqueue(
+            redis, [_notification(1), _notification(1), _notification(2)]
+        )
+        self._enqueue(redis, [_notification(1)])
+
+        assert len(redis.lists["notifications:email_digest:1"]) == 3
+        assert len(redis.lists["notifications:email_digest:2"]) == 1
+        assert redis.sets["notifications:email_digest:pending"] == {"1", "2"}
+        flush_task.apply_async.assert_called_once_with(countdown=60)
+
+    def test_flush_sends_one_digest_per_user_in_one_session(self):
+        redis = _FakeRedis()
+        self._enqueue(redis, [_notification(1), _notification(1), _notification(2)])
+
+        result, send, _ = self._flush(redis)
+
+        send.assert_called_once()
+        emails = sorted(send.call_args.args[0], key=lambda email: email["to"])
+        assert [email["to"] for email in emails] == [
+            "user1@example.com",
+            "user2@example.com",
+        ]
+        assert emails[0]["subject"] == "[misp-workbench] 2 New Notifications"
+        assert emails[1]["subject"] == "[misp-workbench] Event Update"
+        assert result == {"sent": 2, "throttled": 0, "requeued": 0}
+        assert redis.sets["notifications:email_digest:pending"] == set()
+        assert redis.values["notifications:email_throttle:1"] == "1"
+
+    def test_flush_keeps_throttled_digests_queued(self):
+        redis = _FakeRedis()
+        self._enqueue(redis, [_notification(1)])
+        redis.values["notifications:email_throttle:1"] = "10"
+
+        result, send, flush_task = self._flush(redis)
+
+        assert send.call_args.args[0] == []
+        assert result["throttled"] == 1
+        assert len(redis.lists["notifications:email_digest:1"]) == 1
+        flush_task.apply_async.assert_called_once_with(countdown=60)
+
+    def test_flush_requeues_undelivered_digests(self):
+        redis = _FakeRedis()
+        self._enqueue(redis, [_notification(1, "event.created"), _notification(1)])
+
+        result, _, flush_task = self._flush(
+            redis, send_result=lambda emails: (0, emails)
+        )
+
+        items = [json.loads(i) for i in redis.lists["notifications:email_digest:1"]]
+        assert [item["type"] for item in items] == ["event.created", "event.updated"]
+        assert result["requeued"] == 1
+        assert redis.values["notifications:email_throttle:1"] == "0"
+        flush_task.apply_async.assert_called_once()
+
+
+class TestSendEmails:
+    def _email(self, to):
+        return {"from": "a@example.com", "to": to, "subject": "s", "body": "b"}
+
+    def test_sends_all_emails_over_one_connection(self):
+        with patch("app.services.mail.smtplib.SMTP") as smtp:
+            server = smtp.return_value.__enter__.return_value
+            sent, unsent = mail.send_emails(
+                [self._email("x@example.com"), self._email("y@example.com")]
+            )
+
+        smtp.assert_called_once()
+        assert server.send_message.call_count == 2
+        assert (sent, unsent) == (2, [])
+
+    def test_returns_remaining_emails_when_the_connection_drops(self):
+        emails = [self._email(f"{i}@example.com") for i in range(3)]
+
+        with patch("app.services.mail.smtplib.SMTP") as smtp:
+            server = smtp.return_value.__enter__.return_value
+            server.send_message.side_effect = [
+                None,
+                smtplib.SMTPServerDisconnected("gone"),
+            ]
+            sent, unsent = mail.send_emails(emails)
+
+        assert sent == 1
+        assert unsent == emails[1:]
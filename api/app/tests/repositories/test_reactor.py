@@ -90,6 +90,48 @@ class TestDispatchTriggeredScripts:
         mock_task.apply_async.assert_not_called()
 
 
+class TestDispatchTriggeredScriptsBulk:
+    def test_looks_up_scripts_once_for_all_payloads(self):
+        script = MagicMock(spec=reactor_models.ReactorScript)
+        script.id = 3
+        script.status = "active"
+        script.triggers = [
+            {
+                "resource_type": "correlation",
+                "action": "created",
+            }
+        ]
+        db = _fake_db_with([script])
+        run_ids = iter([10, 11])
+
+        def _capture_add(obj):
+            if isinstance(obj, reactor_models.ReactorRun):
+                obj.id = next(run_ids)
+
+        db.add.side_effect = _capture_add
+
+        with patch("app.worker.tasks.run_reactor_script") as mock_task:
+            ids = reactor_repository.dispatch_triggered_scripts_bulk(
+                db,
+                "correlation",
+                "created",
+                [{"source_attribute_uuid": "a"}, {"source_attribute_uuid": "b"}],
+            )
+
+        assert ids == [10, 11]
+        assert db.query.call_count == 1
+        assert mock_task.apply_async.call_count == 2
+
+    def test_no_scripts_returns_empty(self):
+        db = _fake_db_with([])
+        with patch("app.worker.tasks.run_reactor_script") as mock_task:
+            ids = reactor_repository.dispatch_triggered_scripts_bulk(
+                db, "correlation", "created", [{"source_attribute_uuid": "a"}]
+            )
+        assert ids == []
+        mock_task.apply_async.assert_not_called()
+
+
 class TestSourceStorage:
     def test_store_source_writes_local_file(self):
         uri, sha = reactor_repository._store_source("print('hi')\n")
@@ -0,0 +1,208 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.repositories import retention as retention_repository
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = str(value)
+        return True
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+def _event_page(uuids):
+    return {
+        "hits": {
+            "hits": [{"_source": {"uuid": uuid}, "sort": [uuid]} for uuid in uuids]
+        }
+    }
+
+
+def _client(event_pages, deleted, sighting_days=()):
+    """OpenSearch client whose delete_by_query tasks complete on first poll,
+    deleting ``deleted[index]`` documents."""
+    client = MagicMock()
+    pages = iter([_event_page(page) for page in event_pages] + [_event_page([])])
+
+    def search(index, body):
+        if index == "misp-sightings":
+            buckets = [{"key": day * 1000, "doc_count": 1} for day in sighting_days]
+            return {"aggregations": {"days": {"buckets": buckets}}}
+        return next(pages)
+
+    client.search.side_effect = search
+    submitted = {}
+
+    def delete_by_query(index, body, **kwargs):
+        task_id = f"node:{len(submitted)}"
+        submitted[task_id] = (index, body, kwargs)
+        return {"task": task_id}
+
+    def get_task(task_id):
+        index = submitted[task_id][0]
+        return {"completed": True, "response": {"deleted": deleted[index]}}
+
+    client.delete_by_query.side_effect = delete_by_query
+    client.tasks.get.side_effect = get_task
+    return client, submitted
+
+
+class TestPurgeExpiredEvents:
+    def _purge(self, client, redis, attribute_uuids, mark_dirty=None, **kwargs):
+        with patch.object(
+            retention_repository.sighting_rollups,
+            "mark_sightings_dirty",
+            mark_dirty or MagicMock(),
+        ), patch.object(
+            retention_repository, "get_opensearch_client", return_value=client
+        ), patch.object(
+            retention_repository, "get_redis_client", return_value=redis
+        ), patch.object(
+            retention_repository.opensearch_helpers,
+            "scan",
+            side_effect=lambda *args, **kw: iter(
+                {"_source": {"uuid": uuid}} for uuid in attribute_uuids
+            ),
+        ):
+            return retention_repository.purge_expired_events(
+                365, ["retention:exempt"], **kwargs
+            )
+
+    def test_deletes_each_page_with_one_task_per_index(self):
+        deleted = {
+            "misp-sightings": 1,
+            "misp-attribute-correlations": 2,
+            "misp-attributes": 3,
+            "misp-objects": 4,
+            "misp-events": 2,
+        }
+        client, submitted = _client(
+            [["e-1", "e-2"], ["e-3"]], deleted, sighting_days=[86400, 3 * 86400]
+        )
+        redis = _FakeRedis()
+        mark_dirty = MagicMock()
+
+        result = self._purge(
+            client,
+            redis,
+            ["a-1", "a-2"],
+            mark_dirty=mark_dirty,
+            page_size=2,
+            requests_per_second=100,
+        )
+
+        indices = [index for index, _, _ in submitted.values()]
+        assert indices == [
+            "misp-sightings",
+            "misp-attribute-correlations",
+            "misp-attributes",
+            "misp-objects",
+            "misp-events",
+        ] * 2
+        index, body, kwargs = submitted["node:2"]
+        assert body == {"query": {"terms": {"event_uuid": ["e-1", "e-2"]}}}
+        assert kwargs["wait_for_completion"] is False
+        assert kwargs["slices"] == "auto"
+        assert kwargs["requests_per_second"] == 100
+        assert kwargs["refresh"] is False
+        # misp-sightings maps attribute_uuid as a plain keyword
+        assert submitted["node:0"][1] == {
+            "query": {"terms": {"attribute_uuid": ["a-1", "a-2"]}}
+        }
+        days_search = next(
+            call for call in client.search.call_args_list
+            if call.kwargs["index"] == "misp-sightings"
+        )
+        assert days_search.kwargs["body"]["query"] == {
+            "terms": {"attribute_uuid": ["a-1", "a-2"]}
+        }
+        assert [call.args[0] for call in mark_dirty.call_args_list] == [
+            {86400, 3 * 86400}
+        ] * 2
+        assert submitted["node:9"][1] == {
+            "query": {"terms": {"uuid.keyword": ["e-3"]}}
+        }
+        event_searches = [
+            call for call in client.search.call_args_list
+            if call.kwargs["index"] == "misp-events"
+        ]
+        assert event_searches[1].kwargs["body"]["search_after"] == ["e-2"]
+        client.indices.refresh.assert_called_once()
+
+        assert result == {
+            "events": 3,
+            "deleted": {index: count * 2 for index, count in deleted.items()},
+        }
+        progress = json.loads(redis.values[retention_repository.RETENTION_PROGRESS_KEY])
+        assert progress["status"] == "finished"
+        assert progress["events"] == 3
+        assert progress["tasks"] == {}
+        assert retention_repository.RETENTION_LOCK_KEY not in redis.values
+
+    def test_skips_sightings_without_attributes(self):
+        client, submitted = _client([["e-1"]], dict.fromkeys(
+            retention_repository.PURGED_INDICES, 0
+        ))
+
+        self._purge(client, _FakeRedis(), [])
+
+        indices = [index for index, _, _ in submitted.values()]
+        assert "misp-sightings" not in indices
+        assert submitted["node:0"][2]["requests_per_second"] == -1
+
+    def test_failed_task_keeps_events_and_records_error(self):
+        client, submitted = _client([["e-1"]], {})
+        client.tasks.get.side_effect = lambda task_id: {
+            "completed": True,
+            "error": {"type": "search_phase_execution_exception"},
+        }
+        redis = _FakeRedis()
+
+        with pytest.raises(retention_repository.RetentionTaskError):
+            self._purge(client, redis, [])
+
+        assert "misp-events" not in [index for index, _, _ in submitted.values()]
+        progress = json.loads(redis.values[retention_repository.RETENTION_PROGRESS_KEY])
+        assert progress["status"] == "failed"
+        assert retention_repository.RETENTION_LOCK_KEY not in redis.values
+
+    def test_skips_when_another_run_is_active(self):
+        client = MagicMock()
+        redis = _FakeRedis()
+        redis.values[retention_repository.RETENTION_LOCK_KEY] = "1"
+
+        result = self._purge(client, redis, [])
+
+        assert result == {"status": "skipped"}
+        client.search.assert_not_called()
+
+
+class TestWaitForTasks:
+    def test_reports_running_task_progress(self):
+        client = MagicMock()
+        client.tasks.get.side_effect = [
+            {"completed": False, "task": {"status": {"deleted": 10}}},
+            {"completed": True, "response": {"deleted": 25}},
+        ]
+        polls = []
+
+        with patch.object(retention_repository.time, "sleep"):
+            deleted = retention_repository._wait_for_tasks(
+                client, {"node:1": "misp-attributes"}, lambda d: polls.append(dict(d))
+            )
+
+        assert polls == [{"node:1": 10}, {"node:1": 25}]
+        assert deleted == {"node:1": 25}
@@ -152,3 +152,412 @@ class TestServersRepository(ApiTester):
             for attribute_tag in scenario["expected_result"]["attribute_tags"]:
                 for tag_name in attribute_tag["tags"]:
                     assert tag_name in all_attribute_tag_names
+
+
+class TestPullEngine:
+    def _server(self, internal=False):
+        return MagicMock(id=7, internal=internal, pull_rules={})
+
+    def _remote_misp(self, pages):
+        def check_json_response(response):
+            return response
+
+        def prepare_request(method, url, data=None):
+            if "bad" in data["uuid"]:
+                raise Exception("remote error")
+            return {
+                "response": [
+                    {"Event": {"uuid": uuid}} for uuid in data["uuid"] if uuid in pages
+                ]
+            }
+
+        return MagicMock(
+            _prepare_request=MagicMock(side_effect=prepare_request),
+            _check_json_response=MagicMock(side_effect=check_json_response),
+        )
+
+    def test_get_event_uuids_from_server_pages_through_the_index(self):
+        remote_misp = MagicMock()
+        remote_misp.search_index.side_effect = [
+            [{"uuid": "a"}, {"uuid": "b"}],
+            [{"uuid": "c"}],
+        ]
+
+        uuids = servers_repository.get_event_uuids_from_server(
+            self._server(), remote_misp, page_size=2
+        )
+
+        assert uuids == ["a", "b", "c"]
+        assert [c.kwargs["page"] for c in remote_misp.search_index.call_args_list] == [
+            1,
+            2,
+        ]
+
+    def test_download_remote_events_page_uses_rest_search(self):
+        remote_misp = self._remote_misp(pages={"a", "b"})
+
+        events = servers_repository.download_remote_events_page(
+            remote_misp, self._server(internal=True), ["a", "b"]
+        )
+
+        assert events == [{"Event": {"uuid": "a"}}, {"Event": {"uuid": "b"}}]
+        method, url = remote_misp._prepare_request.call_args.args
+        data = remote_misp._prepare_request.call_args.kwargs["data"]
+        assert (method, url) == ("POST", "events/restSearch")
+        assert data["uuid"] == ["a", "b"]
+        assert data["limit"] == 2
+        assert data["excludeLocalTags"] == 1
+
+    def test_iter_remote_events_reports_failed_pages(self):
+        remote_misp = self._remote_misp(pages={"a", "b", "c"})
+
+        results = list(
+            servers_repository.iter_remote_events(
+                remote_misp, self._server(), ["a", "b", "bad", "c"], 2, 2
+            )
+        )
+
+        by_page = {tuple(uuids): (events, error) for uuids, events, error in results}
+        assert by_page[("a", "b")][1] is None
+        assert len(by_page[("a", "b")][0]) == 2
+        assert by_page[("bad", "c")][0] is None
+        assert str(by_page[("bad", "c")][1]) == "remote error"
+
+    def test_pull_events_from_server_reuses_connection_and_counts_failures(self):
+        remote_misp = self._remote_misp(pages={"a", "b", "c"})
+        runtime_settings = MagicMock()
+        runtime_settings.get_value.side_effect = lambda key, default: {
+            "servers.pullPageSize": 2,
+            "servers.pullConcurrency": 2,
+        }[key]
+        db = MagicMock()
+        stored = MagicMock()
+
+        with patch(
+            "app.repositories.servers.get_remote_misp_connection"
+        ) as mock_connection, patch(
+            "app.repositories.servers.process_pulled_event",
+            side_effect=[
+                ("pulled", stored),
+                ("failed", None),
+                ("pulled", stored),
+            ],
+        ) as mock_process, patch(
+            "app.repositories.servers.notifications_repository.create_event_notifications"
+        ) as mock_notify:
+            result = servers_repository.pull_events_from_server(
+                db,
+                ["a", "b", "c", "gone"],
+                self._server(),
+                remote_misp,
+                MagicMock(),
+                Settings(),
+                runtime_settings,
+            )
+
+        mock_connection.assert_not_called()
+        assert remote_misp._prepare_request.call_count == 2
+        assert mock_process.call_count == 3
+        assert mock_notify.call_count == 2
+        assert result["processed"] == 2
+        assert (result["skipped"], result["rejected"], result["failed"]) == (0, 1, 1)
+        assert result["failed_uuids"] == ["b"]
+
+    def test_get_events_newer_than_local_skips_up_to_date_events(self):
+        index = [
+            {"uuid": "new", "timestamp": "100"},
+            {"uuid": "stale", "timestamp": "200"},
+            {"uuid": "current", "timestamp": "300"},
+        ]
+
+        with patch(
+            "app.repositories.servers.events_repository.get_event_timestamps_by_uuids",
+            return_value={"stale": 150, "current": 300},
+        ) as mock_lookup:
+            uuids = servers_repository.get_events_newer_than_local(index)
+
+        mock_lookup.assert_called_once_with(["new", "stale", "current"])
+        assert uuids == ["new", "stale"]
+
+    def test_update_pull_uses_and_advances_the_high_water_mark(self):
+        server = self._server()
+        server.last_pulled_timestamp = 1000
+        remote_misp = MagicMock()
+        remote_misp.search_index.return_value = [
+            {"uuid": "a", "timestamp": "1200"},
+            {"uuid": "b", "timestamp": "1100"},
+        ]
+        db = MagicMock()
+
+        with patch(
+            "app.repositories.servers.get_events_newer_than_local",
+            return_value=["a"],
+        ), patch(
+            "app.repositories.servers.pull_events_from_server",
+            return_value={"processed": 1, "skipped": 0, "rejected": 0, "failed": 0},
+        ) as mock_pull:
+            servers_repository.pull_server_by_id_update(
+                db, server, remote_misp, MagicMock(), MagicMock()
+            )
+
+        assert remote_misp.search_index.call_args.kwargs["timestamp"] == 1000
+        assert mock_pull.call_args.args[1] == ["a"]
+        assert server.last_pulled_timestamp == 1200
+        db.commit.assert_called_once()
+
+    def test_update_pull_keeps_the_high_water_mark_on_failures(self):
+        server = self._server()
+        server.last_pulled_timestamp = 1000
+        remote_misp = MagicMock()
+        remote_misp.search_index.return_value = [{"uuid": "a", "timestamp": "1200"}]
+        db = MagicMock()
+
+        with patch(
+            "app.repositories.servers.get_events_newer_than_local",
+            return_value=["a"],
+        ), patch(
+            "app.repositories.servers.pull_events_from_server",
+            return_value={"processed": 0, "skipped": 0, "rejected": 0, "failed": 1},
+        ):
+            servers_repository.pull_server_by_id_update(
+                db, server, remote_misp, MagicMock(), MagicMock()
+            )
+
+        assert server.last_pulled_timestamp == 1000
+        db.commit.assert_not_called()
+
+    def test_update_pull_stops_the_high_water_mark_before_failures(self):
+        server = self._server()
+        server.last_pulled_timestamp = 1000
+        remote_misp = MagicMock()
+        remote_misp.search_index.return_value = [
+            {"uuid": "a", "timestamp": "1400"},
+            {"uuid": "b", "timestamp": "1300"},
+            {"uuid": "c", "timestamp": "1200"},
+        ]
+        db = MagicMock()
+
+        with patch(
+            "app.repositories.servers.get_events_newer_than_local",
+            return_value=["a", "b", "c"],
+        ), patch(
+            "app.repositories.servers.pull_events_from_server",
+            return_value={
+                "processed": 1,
+                "skipped": 0,
+                "rejected": 0,
+                "failed": 2,
+                "failed_uuids": ["a", "b"],
+            },
+        ):
+            servers_repository.pull_server_by_id_update(
+                db, server, remote_misp, MagicMock(), MagicMock()
+            )
+
+        assert server.last_pulled_timestamp == 1299
+        db.commit.assert_called_once()
+
+    def test_full_pull_over_up_to_date_events(self):
+        server = self._server()
+        server.last_pulled_timestamp = 2000
+        remote_misp = self._remote_misp(pages={"a", "b"})
+        remote_misp.search_index.return_value = [
+            {"uuid": "a", "timestamp": "1500"},
+            {"uuid": "b", "timestamp": "1400"},
+        ]
+        runtime_settings = MagicMock()
+        runtime_settings.get_value.side_effect = lambda key, default: default
+        db = MagicMock()
+
+        with patch(
+            "app.repositories.servers.process_pulled_event",
+            return_value=("skipped", None),
+        ), patch(
+            "app.repositories.servers.notifications_repository.create_event_notifications"
+        ) as mock_notify:
+            result = servers_repository.pull_server_by_id_full(
+                db, server, remote_misp, MagicMock(), runtime_settings
+            )
+
+        assert (result["processed"], result["skipped"], result["failed"]) == (0, 2, 0)
+        mock_notify.assert_not_called()
+        assert server.last_pulled_timestamp == 2000
+        db.commit.assert_not_called()
+
+    def test_up_to_date_event_is_skipped(self):
+        existing = MagicMock(locked=True, distribution=0, timestamp=1500)
+        event = MagicMock(uuid="a")
+        event.timestamp.timestamp.return_value = 1500
+
+        with patch(
+            "app.repositories.servers.events_repository.get_event_by_uuid",
+            return_value=existing,
+        ), patch(
+            "app.repositories.servers.events_repository.update_event_from_pulled_event"
+        ) as mock_update:
+            outcome = servers_repository.create_or_update_pulled_event(
+                MagicMock(), event, self._server(), MagicMock()
+            )
+
+        assert outcome == ("skipped", None)
+        mock_update.assert_not_called()
+
+    def test_blocked_local_event_is_rejected_and_does_not_hold_the_mark(self):
+        existing = MagicMock(locked=False)
+        with patch(
+            "app.repositories.servers.events_repository.get_event_by_uuid",
+            return_value=existing,
+        ):
+            outcome = servers_repository.create_or_update_pulled_event(
+                MagicMock(), MagicMock(uuid="a"), self._server(), MagicMock()
+            )
+        assert outcome == ("rejected", None)
+
+        server = self._server()
+        server.last_pulled_timestamp = 1000
+        remote_misp = self._remote_misp(pages={"a"})
+        remote_misp.search_index.return_value = [{"uuid": "a", "timestamp": "1200"}]
+        runtime_settings = MagicMock()
+        runtime_settings.get_value.side_effect = lambda key, default: default
+        db = MagicMock()
+
+        with patch(
+            "app.repositories.servers.get_events_newer_than_local",
+            return_value=["a"],
+        ), patch(
+            "app.repositories.servers.process_pulled_event",
+            return_value=("rejected", None),
+        ):
+            result = servers_repository.pull_server_by_id_update(
+                db, server, remote_misp, MagicMock(), runtime_settings
+            )
+
+        assert (result["rejected"], result["failed"]) == (1, 0)
+        assert server.last_pulled_timestamp == 1200
+
+
+class TestPushEngine:
+    def _server(self):
+        return MagicMock(id=7, internal=False, last_pushed_timestamp=1000)
+
+    def _runtime_settings(self, **values):
+        values = {"servers.pushConcurrency": 2, "servers.pushRateLimit": 0, **values}
+        runtime_settings = MagicMock()
+        runtime_settings.get_value.side_effect = lambda key, default: values[key]
+        return runtime_settings
+
+    def test_get_events_newer_than_remote(self):
+        events = [
+            {"uuid": "missing", "timestamp": 100},
+            {"uuid": "older", "timestamp": 300},
+            {"uuid": "same", "timestamp": 300},
+        ]
+
+        uuids = servers_repository.get_events_newer_than_remote(
+            events, {"older": 200, "same": 300}
+        )
+
+        assert uuids == ["missing", "older"]
+
+    def test_push_event_by_uuid_skips_probe_with_remote_index(self):
+        remote_misp = MagicMock()
+        remote_misp._prepare_request.return_value = MagicMock(status_code=200)
+        db_event = MagicMock(published=True, attributes=[MagicMock()])
+
+        with patch(
+            "app.repositories.servers.events_repository.get_event_by_uuid",
+            return_value=db_event,
+        ):
+            result = servers_repository.push_event_by_uuid(
+                MagicMock(),
+                "e-1",
+                self._server(),
+                MagicMock(),
+                Settings(),
+                remote_misp=remote_misp,
+                remote_index={"e-1": 100},
+            )
+
+        assert result["status"] == 200
+        remote_misp._prepare_request.assert_called_once()
+        assert remote_misp._prepare_request.call_args.args[1] == "events/edit/e-1"
+
+    def test_push_events_to_server_counts_outcomes(self):
+        outcomes = {
+            "a": {"status": 200},
+            "b": {"status": 400, "skipped": True},
+            "c": {"status": 403},
+            "d": {"status": 400},
+        }
+
+        with patch(
+            "app.repositories.servers.push_event_by_uuid",
+            side_effect=lambda db, uuid, *args, **kwargs: outcomes[uuid],
+        ) as mock_push, patch(
+            "app.repositories.servers.get_remote_misp_connection"
+        ) as mock_connection:
+            result = servers_repository.push_events_to_server(
+                MagicMock(),
+                ["a", "b", "c", "d"],
+                self._server(),
+                MagicMock(),
+                MagicMock(),
+                Settings(),
+                {},
+                self._runtime_settings(),
+            )
+
+        mock_connection.assert_not_called()
+        assert mock_push.call_count == 4
+        assert (result["pushed"], result["skipped"], result["failed"]) == (1, 1, 2)
+
+    def test_push_events_to_server_rate_limits_pushes(self):
+        with patch(
+            "app.repositories.servers.push_event_by_uuid",
+            return_value={"status": 200},
+        ), patch("app.repositories.servers.time.sleep") as mock_sleep, patch(
+            "app.repositories.servers.time.monotonic", return_value=0.0
+        ):
+            servers_repository.push_events_to_server(
+                MagicMock(),
+                ["a", "b", "c"],
+                self._server(),
+                MagicMock(),
+                MagicMock(),
+                Settings(),
+                {},
+                self._runtime_settings(**{"servers.pushRateLimit": 2}),
+            )
+
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.5, 1.0]
+
+    def test_update_push_diffs_against_remote_index_and_advances_cursor(self):
+        server = self._server()
+        db = MagicMock()
+
+        with patch(
+            "app.repositories.servers.get_remote_event_timestamps",
+            return_value={"a": 900, "b": 1500},
+        ), patch(
+            "app.repositories.servers.events_repository.iter_events_from_opensearch",
+            return_value=iter(
+                [
+                    [
+                        {"uuid": "a", "timestamp": 1200, "publish_timestamp": 1300},
+                        {"uuid": "b", "timestamp": 1100, "publish_timestamp": 1100},
+                    ]
+                ]
+            ),
+        ) as mock_iter, patch(
+            "app.repositories.servers.push_events_to_server",
+            return_value={"pushed": 1, "skipped": 0, "failed": 0},
+        ) as mock_push:
+            servers_repository.push_server_by_id_update(
+                db, server, MagicMock(), MagicMock(), MagicMock()
+            )
+
+        query = mock_iter.call_args.args[0]
+        assert query["bool"]["minimum_should_match"] == 1
+        assert mock_push.call_args.args[1] == ["a"]
+        assert server.last_pushed_timestamp == 1300
+        db.commit.assert_called_once()
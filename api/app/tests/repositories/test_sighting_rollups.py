@@ -0,0 +1,216 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.repositories import sighting_rollups
+from app.repositories import sightings as sightings_repository
+from app.repositories.sighting_rollups import DAY, HOUR
+
+DAY_1 = 1704067200  # 2024-01-01T00:00:00Z
+
+
+class _FakeRedis:
+    def __init__(self, values=None, sets=None):
+        self.values = dict(values or {})
+        self.sets = {key: set(members) for key, members in (sets or {}).items()}
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = str(value)
+        return True
+
+    def delete(self, key):
+        self.values.pop(key, None)
+        self.sets.pop(key, None)
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(str(member) for member in members)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def command(*args):
+            self.commands.append((name, args))
+            return self
+
+        return command
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args) for name, args in self.commands]
+
+
+def _composite_page(buckets, after_key=None):
+    rollup = {
+        "buckets": [
+            {
+                "key": {"value": value, "type": type, "hour": hour * 1000},
+                "doc_count": count,
+            }
+            for value, type, hour, count in buckets
+        ]
+    }
+    if after_key:
+        rollup["after_key"] = after_key
+    return {"aggregations": {"rollup": rollup}}
+
+
+class TestRollupDay:
+    def test_writes_hourly_and_daily_buckets_across_pages(self):
+        client = MagicMock()
+        client.search.side_effect = [
+            _composite_page(
+                [
+                    ("1.2.3.4", "positive", DAY_1, 2),
+                    ("1.2.3.4", "positive", DAY_1 + HOUR, 3),
+                ],
+                after_key={"value": "1.2.3.4"},
+            ),
+            _composite_page([("evil.com", "negative", DAY_1 + 2 * HOUR, 1)]),
+        ]
+        written = []
+
+        def bulk(client, actions):
+            written.extend(actions)
+            return len(written), []
+
+        with patch.object(sighting_rollups.opensearch_helpers, "bulk", side_effect=bulk):
+            indexed = sighting_rollups.rollup_day(client, DAY_1, DAY_1 + DAY, run=7)
+
+        docs = [
+            (doc["_source"]["granularity"], doc["_source"]["value"], doc["_source"]["count"])
+            for doc in written
+        ]
+        assert docs == [
+            ("hour", "1.2.3.4", 2),
+            ("hour", "1.2.3.4", 3),
+            ("day", "1.2.3.4", 5),
+            ("hour", "evil.com", 1),
+            ("day", "evil.com", 1),
+        ]
+        assert indexed == 5
+        assert client.search.call_args_list[1].kwargs["body"]["aggs"]["rollup"][
+            "composite"
+        ]["after"] == {"value": "1.2.3.4"}
+        stale = client.delete_by_query.call_args.kwargs["body"]["query"]["bool"]["filter"]
+        assert {"range": {"rollup_run": {"lt": 7}}} in stale
+
+
+class TestRollupSightings:
+    def test_rolls_up_days_since_watermark_and_dirty_days(self):
+        redis = _FakeRedis(
+            values={sighting_rollups.ROLLUP_WATERMARK_KEY: str(DAY_1 + DAY + HOUR)},
+            sets={sighting_rollups.ROLLUP_DIRTY_KEY: {str(DAY_1 - 3 * DAY)}},
+        )
+        now = DAY_1 + 2 * DAY + 90 * 60
+
+        with patch.object(sighting_rollups, "get_redis_client", return_value=redis), \
+                patch.object(sighting_rollups, "get_opensearch_client"), \
+                patch.object(sighting_rollups, "rollup_day", return_value=1) as rollup_day:
+            result = sighting_rollups.rollup_sightings(now=now)
+
+        cutoff = DAY_1 + 2 * DAY + HOUR
+        assert [call.args[1:3] for call in rollup_day.call_args_list] == [
+            (DAY_1 - 3 * DAY, DAY_1 - 2 * DAY),
+            (DAY_1 + DAY, DAY_1 + 2 * DAY),
+            (DAY_1 + 2 * DAY, cutoff),
+        ]
+        assert result == {"days": 3, "buckets": 3, "watermark": cutoff}
+        assert redis.values[sighting_rollups.ROLLUP_WATERMARK_KEY] == str(cutoff)
+        assert redis.sets == {}
+
+    def test_failed_days_stay_dirty(self):
+        redis = _FakeRedis(values={sighting_rollups.ROLLUP_WATERMARK_KEY: str(DAY_1)})
+
+        with patch.object(sighting_rollups, "get_redis_client", return_value=redis), \
+                patch.object(sighting_rollups, "get_opensearch_client"), \
+                patch.object(
+                    sighting_rollups, "rollup_day", side_effect=[1, RuntimeError("down")]
+                ):
+            with pytest.raises(RuntimeError):
+                sighting_rollups.rollup_sightings(now=DAY_1 + 2 * DAY)
+
+        assert redis.sets[sighting_rollups.ROLLUP_DIRTY_KEY] == {str(DAY_1 + DAY)}
+        assert redis.values[sighting_rollups.ROLLUP_WATERMARK_KEY] == str(DAY_1)
+
+    def test_marking_dirty_schedules_a_single_rollup(self):
+        redis = _FakeRedis()
+
+        with patch.object(sighting_rollups, "get_redis_client", return_value=redis), \
+                patch("app.worker.tasks.rollup_sightings") as task:
+            sighting_rollups.mark_sightings_dirty([DAY_1 + 10, DAY_1 + HOUR])
+            sighting_rollups.mark_sightings_dirty([DAY_1 - 10])
+
+        assert redis.sets[sighting_rollups.ROLLUP_DIRTY_KEY] == {
+            str(DAY_1),
+            str(DAY_1 - DAY),
+        }
+        task.apply_async.assert_called_once_with(
+            countdown=sighting_rollups.ROLLUP_DELAY
+        )
+
+
+class TestSightingsActivityFromRollups:
+    def test_merges_rolled_up_and_raw_buckets(self):
+        client = MagicMock()
+        client.msearch.return_value = {
+            "responses": [
+                {
+                    "aggregations": {
+                        "sightings_over_time": {
+                            "buckets": [
+                                {"key_as_string": "a", "key": 1000, "doc_count": 1, "count": {"value": 4.0}},
+                                {"key_as_string": "b", "key": 2000, "doc_count": 0, "count": {"value": 0.0}},
+                            ]
+                        }
+                    }
+                },
+                {
+                    "aggregations": {
+                        "sightings_over_time": {
+                            "buckets": [{"key": 2000, "doc_count": 3}]
+                        }
+                    }
+                },
+            ]
+        }
+        params = SimpleNamespace(value="1.2.3.4", period="7d", interval="1h")
+
+        with patch.object(sightings_repository, "get_opensearch_client", return_value=client), \
+                patch.object(
+                    sightings_repository.sighting_rollups,
+                    "get_rollup_watermark",
+                    return_value=DAY_1,
+                ):
+            result = sightings_repository.get_sightings_activity_by_value(params)
+
+        assert [b["doc_count"] for b in result["sightings_over_time"]["buckets"]] == [4, 3]
+        rollup_query = client.msearch.call_args.kwargs["body"][1]["query"]
+        assert {"term": {"granularity": "hour"}} in rollup_query["bool"]["filter"]
+        client.search.assert_not_called()
+
+    def test_falls_back_to_raw_sightings_without_rollups(self):
+        params = SimpleNamespace(value="1.2.3.4", period="7d", interval="1h")
+
+        with patch.object(
+            sightings_repository.sighting_rollups, "get_rollup_watermark", return_value=None
+        ), patch.object(
+            sightings_repository, "get_raw_sightings_activity_by_value"
+        ) as raw:
+            sightings_repository.get_sightings_activity_by_value(params)
+
+        raw.assert_called_once_with(params)
@@ -0,0 +1,139 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services import event_cache
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        return [
+            getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.commands
+        ]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def mget(self, *keys):
+        return [self.values.get(key) for key in keys]
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def expire(self, key, ttl):
+        pass
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def scan_iter(self, match=None, count=None):
+        prefix = match.rstrip("*")
+        return [key for key in self.values if key.startswith(prefix)]
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+
+@pytest.fixture
+def redis():
+    redis = _FakeRedis()
+    with patch.object(event_cache, "get_redis_client", return_value=redis):
+        yield redis
+
+
+def _settings(enabled=True):
+    return patch.object(
+        event_cache,
+        "get_cached_runtime_settings",
+        return_value={"opensearch": {"eventCache": {"enabled": enabled, "ttl": 60}}},
+    )
+
+
+class TestEventCache:
+    def test_second_read_is_served_from_cache(self, redis):
+        load = MagicMock(return_value={"_source": {"uuid": "e-1"}})
+
+        with _settings():
+            first = event_cache.get_event_doc("e-1", load)
+            second = event_cache.get_event_doc("e-1", load)
+
+            assert first == second == {"_source": {"uuid": "e-1"}}
+            load.assert_called_once()
+            stats = event_cache.get_event_cache_stats()
+
+        assert stats == {"enabled": True, "hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+    def test_write_invalidates_cached_event(self, redis):
+        load = MagicMock(side_effect=[{"_seq_no": 1}, {"_seq_no": 2}])
+
+        with _settings():
+            event_cache.get_event_doc("e-1", load)
+            event_cache.invalidate_event("e-1")
+
+            assert event_cache.get_event_doc("e-1", load) == {"_seq_no": 2}
+
+    def test_entry_loaded_during_write_is_not_served(self, redis):
+        def load_racing_a_write():
+            # the write lands after the read but before the entry is cached
+            event_cache.invalidate_event("e-1")
+            return {"_seq_no": 1}
+
+        with _settings():
+            event_cache.get_event_doc("e-1", load_racing_a_write)
+            fresh = event_cache.get_event_doc("e-1", lambda: {"_seq_no": 2})
+
+        assert fresh == {"_seq_no": 2}
+
+    def test_missing_events_are_not_cached(self, redis):
+        load = MagicMock(return_value=None)
+
+        with _settings():
+            assert event_cache.get_event_doc("e-1", load) is None
+            assert event_cache.get_event_doc("e-1", load) is None
+
+        assert load.call_count == 2
+
+    def test_kill_switch_bypasses_cache(self, redis):
+        load = MagicMock(return_value={"_seq_no": 1})
+
+        with _settings(enabled=False):
+            event_cache.get_event_doc("e-1", load)
+            event_cache.get_event_doc("e-1", load)
+
+        assert load.call_count == 2
+        assert redis.values == {}
+
+    def test_redis_errors_fall_back_to_opensearch(self):
+        client = MagicMock()
+        client.mget.side_effect = ConnectionError("redis down")
+
+        with _settings(), patch.object(
+            event_cache, "get_redis_client", return_value=client
+        ):
+            assert event_cache.get_event_doc("e-1", lambda: {"_seq_no": 1}) == {
+                "_seq_no": 1
+            }
+
+    def test_clear_drops_entries_and_counters(self, redis):
+        with _settings():
+            event_cache.get_event_doc("e-1", lambda: {"_seq_no": 1})
+            redis.values["other"] = "kept"
+
+            event_cache.clear_event_cache()
+
+        assert redis.values == {"other": "kept"}
@@ -0,0 +1,164 @@
+import fnmatch
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.repositories import notifications as notifications_repository
+from app.services import follow_index
+
+
+class _FakeRedis:
+    """Minimal set-only Redis stand-in with buffered pipelines."""
+
+    def __init__(self):
+        self.sets = {}
+        self.values = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def exists(self, key):
+        self.round_trips += 1
+        return int(key in self.values or bool(self.sets.get(key)))
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def delete(self, key):
+        self.sets.pop(key, None)
+        self.values.pop(key, None)
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(str(member))
+
+    def srem(self, key, member):
+        self.sets.get(key, set()).discard(str(member))
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def scan_iter(self, match, count=None):
+        return [key for key in list(self.sets) if fnmatch.fnmatch(key, match)]
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def command(*args):
+            self.commands.append((name, args))
+            return self
+
+        return command
+
+    def execute(self):
+        self.redis.round_trips += 1
+        results = []
+        for name, args in self.commands:
+            if name == "exists":
+                results.append(
+                    int(args[0] in self.redis.values or bool(self.redis.sets.get(args[0])))
+                )
+            else:
+                results.append(getattr(self.redis, name)(*args))
+        self.commands = []
+        return results
+
+
+def _db(rows):
+    db = MagicMock()
+    db.execute.return_value = [
+        SimpleNamespace(user_id=user_id, value=value) for user_id, value in rows
+    ]
+    return db
+
+
+class TestFollowIndex:
+    def test_lookup_rebuilds_missing_index_from_user_settings(self):
+        redis = _FakeRedis()
+        db = _db(
+            [
+                (1, {"follow": {"events": ["e-1"], "attributes": ["a-1"]}}),
+                (2, {"follow": {"events": ["e-1"]}}),
+                (3, {"email_notifications": False}),
+            ]
+        )
+
+        with patch("app.services.follow_index.get_redis_client", return_value=redis):
+            followers = follow_index.get_followers(
+                db, [("events", "e-1"), ("attributes", "a-1"), ("objects", "o-1")]
+            )
+
+        assert followers == {("events", "e-1"): [1, 2], ("attributes", "a-1"): [1]}
+        db.execute.assert_called_once()
+
+    def test_lookup_of_built_index_is_one_round_trip(self):
+        redis = _FakeRedis()
+        redis.set(follow_index.FOLLOW_INDEX_READY_KEY, 1)
+        redis.sadd("notifications:follow:attributes:a-1", 4)
+        redis.sadd("notifications:follow:attributes:a-2", 5)
+        db = MagicMock()
+
+        with patch("app.services.follow_index.get_redis_client", return_value=redis):
+            followers = follow_index.get_followers(
+                db, [("attributes", f"a-{i}") for i in range(1000)]
+            )
+
+        assert followers == {("attributes", "a-1"): [4], ("attributes", "a-2"): [5]}
+        assert redis.round_trips == 1
+        db.execute.assert_not_called()
+
+    def test_update_applies_follow_and_unfollow_precisely(self):
+        redis = _FakeRedis()
+        redis.set(follow_index.FOLLOW_INDEX_READY_KEY, 1)
+        redis.sadd("notifications:follow:events:e-1", 1)
+        redis.sadd("notifications:follow:events:e-1", 2)
+
+        with patch("app.services.follow_index.get_redis_client", return_value=redis):
+            follow_index.update_follow_index(
+                1,
+                {"follow": {"events": ["e-1"]}},
+                {"follow": {"events": ["e-2"]}},
+            )
+
+        assert redis.sets["notifications:follow:events:e-1"] == {"2"}
+        assert redis.sets["notifications:follow:events:e-2"] == {"1"}
+
+    def test_update_is_skipped_until_the_index_is_built(self):
+        redis = _FakeRedis()
+
+        with patch("app.services.follow_index.get_redis_client", return_value=redis):
+            follow_index.update_follow_index(1, None, {"follow": {"events": ["e-1"]}})
+
+        assert redis.sets == {}
+
+
+class TestBatchedNotifications:
+    def test_sightings_notifications_resolve_followers_once(self):
+        attributes = [
+            {"_source": {"uuid": f"a-{i}", "type": "ip-src"}} for i in range(3)
+        ]
+        sighting = {"value": "1.2.3.4", "observer": {"organisation": "ORG"}}
+        db = MagicMock()
+
+        with patch.object(
+            notifications_repository.follow_index,
+            "get_followers",
+            return_value={("attributes", "a-0"): [1, 2], ("attributes", "a-2"): [2]},
+        ) as mock_followers, patch.object(
+            notifications_repository, "_enqueue_notification_emails"
+        ):
+            notifications = notifications_repository.create_sightings_notifications(
+                db, "created", attributes, sighting
+            )
+
+        mock_followers.assert_called_once()
+        assert [(n.user_id, n.entity_uuid) for n in notifications] == [
+            (1, "a-0"),
+            (2, "a-0"),
+            (2, "a-2"),
+        ]
+        db.add_all.assert_called_once()
+        db.commit.assert_called_once()
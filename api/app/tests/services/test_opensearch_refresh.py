@@ -0,0 +1,120 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services import opensearch_refresh
+
+
+@pytest.fixture(autouse=True)
+def _reset_background():
+    opensearch_refresh._background.update(enabled=False, deferred=set())
+    yield
+    opensearch_refresh._background.update(enabled=False, deferred=set())
+
+
+def _settings(refresh):
+    return patch.object(
+        opensearch_refresh,
+        "get_cached_runtime_settings",
+        return_value={"opensearch": {"refresh": refresh}},
+    )
+
+
+class TestGetRefresh:
+    def test_interactive_writes_wait_for_refresh(self):
+        with _settings({}):
+            assert opensearch_refresh.get_refresh("events.create_event") == "wait_for"
+
+    def test_by_query_writes_refresh_instead_of_waiting(self):
+        with _settings({}):
+            refresh = opensearch_refresh.get_refresh(
+                "events.increment_object_count", by_query=True
+            )
+
+        assert refresh is True
+
+    def test_call_site_override(self):
+        with _settings(
+            {"interactive": "wait_for", "overrides": {"tags.tag_event": "false"}}
+        ):
+            assert opensearch_refresh.get_refresh("tags.tag_event") is False
+            assert opensearch_refresh.get_refresh("tags.tag_attribute") == "wait_for"
+
+    def test_unknown_policy_falls_back_to_default(self):
+        with _settings({"interactive": "sometimes"}):
+            assert opensearch_refresh.get_refresh("events.create_event") == "wait_for"
+
+
+class TestBackgroundWrites:
+    def test_background_writes_refresh_once_at_the_end(self):
+        client = MagicMock()
+        opensearch_refresh.enable_background_writes()
+
+        with _settings({}), patch.object(
+            opensearch_refresh, "get_opensearch_client", return_value=client
+        ):
+            for call_site, index in [
+                ("tasks.delete_indexed_event", "misp-events"),
+                ("tasks.delete_indexed_event", "misp-attributes"),
+                ("events.create_event", "misp-events"),
+            ]:
+                assert opensearch_refresh.get_refresh(call_site, index=index) is False
+            opensearch_refresh.refresh_deferred_writes()
+            opensearch_refresh.refresh_deferred_writes()
+
+        client.indices.refresh.assert_called_once_with(
+            index="misp-attributes,misp-events", ignore_unavailable=True
+        )
+
+    def test_unnamed_index_refreshes_all_indices(self):
+        client = MagicMock()
+        opensearch_refresh.enable_background_writes()
+
+        with _settings({}), patch.object(
+            opensearch_refresh, "get_opensearch_client", return_value=client
+        ):
+            opensearch_refresh.get_refresh("events.create_event")
+            opensearch_refresh.refresh_deferred_writes()
+
+        client.indices.refresh.assert_called_once_with(
+            index="misp-*", ignore_unavailable=True
+        )
+
+    def test_no_refresh_without_deferred_writes(self):
+        client = MagicMock()
+        opensearch_refresh.enable_background_writes()
+
+        with _settings({"background": "wait_for"}), patch.object(
+            opensearch_refresh, "get_opensearch_client", return_value=client
+        ):
+            assert opensearch_refresh.get_refresh("events.create_event") == "wait_for"
+            opensearch_refresh.refresh_deferred_writes()
+
+        client.indices.refresh.assert_not_called()
+
+
+class TestIndexingStats:
+    def test_reads_primaries_totals(self):
+        client = MagicMock()
+        client.indices.stats.return_value = {
+            "_all": {
+                "primaries": {
+                    "indexing": {"index_total": 10, "index_time_in_millis": 5},
+                    "refresh": {"total": 3, "total_time_in_millis": 2},
+                    "merges": {"total": 1, "total_time_in_millis": 7},
+                    "segments": {"count": 4},
+                }
+            }
+        }
+
+        stats = opensearch_refresh.get_indexing_stats(client)
+
+        assert stats == {
+            "index_total": 10,
+            "index_time_in_millis": 5,
+            "refresh_total": 3,
+            "refresh_time_in_millis": 2,
+            "merges_total": 1,
+            "merges_time_in_millis": 7,
+            "segments_count": 4,
+        }
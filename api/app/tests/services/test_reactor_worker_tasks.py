@@ -289,6 +289,16 @@ class TestAttributeHandlerWiring:
         assert args[:2] == ("attribute", "deleted")
         assert args[2]["attribute_uuid"] == ATTR_UUID
 
+    def test_handle_deleted_attribute_deletes_correlations(self):
+        with patch.object(worker_tasks.reactor_dispatch, "delay"), \
+                patch.object(
+                    worker_tasks.correlations_repository,
+                    "delete_attributes_correlations",
+                ) as delete_correlations, \
+                self._patch_attr_lookup(), self._patch_notifications():
+            worker_tasks.handle_deleted_attribute(ATTR_UUID, OBJ_UUID, EVENT_UUID)
+        delete_correlations.assert_called_once_with([ATTR_UUID])
+
     def test_skips_dispatch_when_attribute_missing(self):
         with patch.object(worker_tasks.reactor_dispatch, "delay") as delay, \
                 patch.object(
@@ -299,6 +309,93 @@ class TestAttributeHandlerWiring:
             worker_tasks.handle_updated_attribute(ATTR_UUID, None, None)
         delay.assert_not_called()
 
+    def test_handle_updated_attribute_correlates_attribute(self):
+        with patch.object(worker_tasks.reactor_dispatch, "delay"), \
+                patch.object(worker_tasks, "get_runtime_settings"), \
+                patch.object(
+                    worker_tasks.correlations_repository, "correlate_attribute"
+                ) as correlate, \
+                self._patch_attr_lookup(), self._patch_notifications():
+            worker_tasks.handle_updated_attribute(ATTR_UUID, OBJ_UUID, EVENT_UUID)
+        assert correlate.call_args.args[1] == ATTR_UUID
+
+    def test_correlation_failure_does_not_block_dispatch(self):
+        with patch.object(worker_tasks.reactor_dispatch, "delay") as delay, \
+                patch.object(worker_tasks, "get_runtime_settings"), \
+                patch.object(
+                    worker_tasks.correlations_repository,
+                    "correlate_attribute",
+                    side_effect=Exception("opensearch down"),
+                ), \
+                self._patch_attr_lookup(), self._patch_notifications():
+            worker_tasks.handle_updated_attribute(ATTR_UUID, OBJ_UUID, EVENT_UUID)
+        assert delay.call_args.args[:2] == ("attribute", "updated")
+
+    def test_handle_created_attributes_aggregates_batch(self):
+        standalone = MagicMock(uuid=ATTR_UUID, object_uuid=None)
+        standalone.model_dump.return_value = {"type": "ip-src"}
+        in_object = MagicMock(uuid="44444444-4444-4444-4444-444444444444", object_uuid=OBJ_UUID)
+        in_object.model_dump.return_value = {"type": "ip-dst"}
+
+        with patch.object(worker_tasks, "get_runtime_settings"), \
+                patch.object(
+                    worker_tasks.correlations_repository, "correlate_attributes"
+                ) as correlate, \
+                patch.object(
+                    worker_tasks.attributes_repository,
+                    "get_attributes_from_opensearch_by_uuids",
+                    return_value=[standalone, in_object],
+                ), \
+                patch.object(
+                    worker_tasks.events_repository, "increment_attribute_count"
+                ) as increment, \
+                patch.object(
+                    worker_tasks.reactor_repository, "dispatch_triggered_scripts_bulk"
+                ) as dispatch, \
+                patch.object(
+                    worker_tasks.notifications_repository,
+                    "create_attributes_notifications",
+                ) as notify:
+            worker_tasks.handle_created_attributes(
+                [ATTR_UUID, str(in_object.uuid)], EVENT_UUID
+            )
+
+        assert correlate.call_args.args[1] == [ATTR_UUID, str(in_object.uuid)]
+        assert notify.call_args.args[1:] == ("created", [standalone, in_object])
+        assert increment.call_args.args[1:] == (EVENT_UUID, 1)
+        args = dispatch.call_args.args
+        assert args[1:3] == ("attribute", "created")
+        assert [p["object_uuid"] for p in args[3]] == [None, OBJ_UUID]
+
+    def test_handle_deleted_attributes_aggregates_batch(self):
+        standalone = MagicMock(uuid=ATTR_UUID, object_uuid=None)
+        standalone.model_dump.return_value = {"type": "ip-src"}
+
+        with patch.object(
+            worker_tasks.correlations_repository, "delete_attributes_correlations"
+        ) as delete_correlations, \
+                patch.object(
+                    worker_tasks.attributes_repository,
+                    "get_attributes_from_opensearch_by_uuids",
+                    return_value=[standalone],
+                ), \
+                patch.object(
+                    worker_tasks.events_repository, "decrement_attribute_count"
+                ) as decrement, \
+                patch.object(
+                    worker_tasks.reactor_repository, "has_active_subscriber",
+                    return_value=False,
+                ), \
+                patch.object(
+                    worker_tasks.notifications_repository,
+                    "create_attributes_notifications",
+                ) as notify:
+            worker_tasks.handle_deleted_attributes([ATTR_UUID], EVENT_UUID)
+
+        delete_correlations.assert_called_once_with([ATTR_UUID])
+        assert notify.call_args.args[1:] == ("deleted", [standalone])
+        assert decrement.call_args.args[1:] == (EVENT_UUID, 1)
+
 
 class TestObjectHandlerWiring:
     def _patch_obj_lookup(self):
@@ -355,13 +452,13 @@ class TestObjectHandlerWiring:
 
 class TestSightingHandlerWiring:
     def test_handle_created_sighting_dispatches(self):
-        # search_events drives the surrounding loop; force an empty result so
-        # we don't need full attribute fixtures.
+        # the attribute lookup drives the notifications; force an empty result
+        # so we don't need full attribute fixtures.
         with patch.object(worker_tasks.reactor_dispatch, "delay") as delay, \
                 patch.object(
-                    worker_tasks.events_repository,
-                    "search_events",
-                    return_value={"total": 0, "results": []},
+                    worker_tasks.attributes_repository,
+                    "get_attributes_by_values",
+                    return_value={},
                 ):
             worker_tasks.handle_created_sighting(
                 value="1.2.3.4",
@@ -380,6 +477,36 @@ class TestSightingHandlerWiring:
         }
 
 
+    def test_handle_created_sightings_resolves_values_once(self):
+        hit = {"_source": {"uuid": ATTR_UUID, "type": "ip-src", "value": "1.2.3.4"}}
+        sightings = [
+            {"value": "1.2.3.4", "organisation": "ACME", "type": "positive", "timestamp": 1.0},
+            {"value": "1.2.3.4", "organisation": "ACME", "type": "negative", "timestamp": 2.0},
+            {"value": "evil.com", "organisation": "ACME", "type": "positive", "timestamp": 3.0},
+        ]
+
+        with patch.object(
+            worker_tasks.attributes_repository,
+            "get_attributes_by_values",
+            return_value={"1.2.3.4": [hit]},
+        ) as lookup, patch.object(
+            worker_tasks.notifications_repository,
+            "create_sightings_batch_notifications",
+        ) as notify, patch.object(
+            worker_tasks.reactor_repository, "has_active_subscriber", return_value=True
+        ), patch.object(
+            worker_tasks.reactor_repository, "dispatch_triggered_scripts_bulk"
+        ) as dispatch:
+            worker_tasks.handle_created_sightings(sightings)
+
+        lookup.assert_called_once_with({"1.2.3.4", "evil.com"})
+        matches = notify.call_args.args[2]
+        assert [attributes for _, attributes in matches] == [[hit], [hit], []]
+        args = dispatch.call_args.args
+        assert args[1:3] == ("sighting", "created")
+        assert [p["type"] for p in args[3]] == ["positive", "negative", "positive"]
+
+
 class TestCorrelationHandlerWiring:
     def test_handle_created_correlation_dispatches(self):
         with patch.object(worker_tasks.reactor_dispatch, "delay") as delay, \
@@ -406,3 +533,35 @@ class TestCorrelationHandlerWiring:
             "target_attribute_type": "ip-src",
             "target_attribute_value": "1.2.3.4",
         }
+
+    def test_handle_created_correlations_resolves_batch_at_once(self):
+        correlations = [
+            {"source_attribute_uuid": "src-1", "target_attribute_uuid": "tgt-1"},
+            {"source_attribute_uuid": "src-2", "target_attribute_uuid": "tgt-2"},
+        ]
+        with patch.object(
+            worker_tasks.reactor_repository, "has_active_subscriber", return_value=True
+        ), patch.object(
+            worker_tasks.reactor_repository, "dispatch_triggered_scripts_bulk"
+        ) as dispatch, patch.object(
+            worker_tasks.notifications_repository,
+            "create_correlations_notifications",
+        ) as notify:
+            worker_tasks.handle_created_correlations(correlations)
+
+        notify.assert_called_once()
+        assert notify.call_args.kwargs["correlations"] == correlations
+        assert dispatch.call_args.args[1:] == ("correlation", "created", correlations)
+
+    def test_handle_created_correlations_skips_reactor_without_subscribers(self):
+        with patch.object(
+            worker_tasks.reactor_repository, "has_active_subscriber", return_value=False
+        ), patch.object(
+            worker_tasks.reactor_repository, "dispatch_triggered_scripts_bulk"
+        ) as dispatch, patch.object(
+            worker_tasks.notifications_repository,
+            "create_correlations_notifications",
+        ):
+            worker_tasks.handle_created_correlations([{"source_attribute_uuid": "src-1"}])
+
+        dispatch.assert_not_called()
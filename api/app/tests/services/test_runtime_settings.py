@@ -0,0 +1,31 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.defaults.runtime_settings_defaults import DEFAULT_SETTINGS
+from app.services import runtime_settings
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache():
+    runtime_settings._cached_settings.update(loaded_at=0.0, settings=None)
+    yield
+    runtime_settings._cached_settings.update(loaded_at=0.0, settings=None)
+
+
+class TestCachedRuntimeSettings:
+    def test_settings_are_read_once_per_ttl(self):
+        with patch("app.database.SessionLocal", return_value=MagicMock()), patch.object(
+            runtime_settings.RuntimeSettings, "all", return_value={"exports": {}}
+        ) as read:
+            assert runtime_settings.get_cached_runtime_settings() == {"exports": {}}
+            runtime_settings.get_cached_runtime_settings()
+
+        read.assert_called_once()
+
+    def test_defaults_are_used_without_database(self):
+        with patch("app.database.SessionLocal", side_effect=RuntimeError("down")):
+            settings = runtime_settings.get_cached_runtime_settings()
+
+        assert settings == DEFAULT_SETTINGS
+        assert settings is not DEFAULT_SETTINGS
@@ -1,13 +1,14 @@
 import logging
 import os
-import smtplib
 import time
-from email.message import EmailMessage
 from datetime import datetime
 from uuid import UUID
 
 from app.database import SQLALCHEMY_DATABASE_URL
 from app.services.opensearch import get_opensearch_client
+from app.services import event_cache
+from app.services import opensearch_refresh
+from app.services import mail
 from app.services.redis import get_redis_client
 from app.settings import get_settings
 from app.services.runtime_settings_provider import get_runtime_settings
@@ -23,12 +24,16 @@ from app.repositories import notifications as notifications_repository
 from app.repositories import galaxies as galaxies_repository
 from app.repositories import hunts as hunts_repository
 from app.repositories import reactor as reactor_repository
+from app.repositories import retention as retention_repository
+from app.repositories import event_counters as event_counters_repository
+from app.repositories import sighting_rollups as sighting_rollups_repository
 from app.repositories import taxonomies as taxonomies_repository
 from app.schemas import attribute as attribute_schemas
 from app.services.tech_lab.reactor import runner as reactor_runner
 from app.services.tech_lab.lab import executor as lab_executor
 from app.services.tech_lab.lab import kernel_manager as lab_kernel_manager
 from celery import Celery
+from celery.signals import task_postrun, worker_init
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 
@@ -55,6 +60,17 @@ logger = logging.getLogger(__name__)
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
 
 
+@worker_init.connect
+def _enable_background_refresh(**kwargs):
+    # tasks index without refreshing, see app.services.opensearch_refresh
+    opensearch_refresh.enable_background_writes()
+
+
+@task_postrun.connect
+def _refresh_after_task(**kwargs):
+    opensearch_refresh.refresh_deferred_writes()
+
+
 def _reactor_event_payload(os_event, event_uuid: str) -> dict:
     if os_event is None:
         return {"event_uuid": event_uuid}
@@ -103,6 +119,80 @@ def _dispatch_if_subscribed(resource_type: str, action: str, payload: dict) -> N
         reactor_dispatch.delay(resource_type, action, payload)
 
 
+def _correlate_attribute(db: Session, attribute_uuid: str) -> None:
+    """Refresh the correlations of a single attribute, never failing the caller."""
+    try:
+        correlations_repository.correlate_attribute(
+            get_runtime_settings(db), attribute_uuid
+        )
+    except Exception as e:
+        logger.error(
+            "Failed to correlate attribute uuid=%s: %s", attribute_uuid, str(e)
+        )
+
+
+def _delete_attributes_correlations(attribute_uuids: list[str]) -> None:
+    """Drop the correlations of deleted attributes, never failing the caller."""
+    try:
+        correlations_repository.delete_attributes_correlations(attribute_uuids)
+    except Exception as e:
+        logger.error(
+            "Failed to delete correlations of %s attributes: %s",
+            len(attribute_uuids),
+            str(e),
+        )
+
+
+def _handle_attributes_batch(
+    db: Session, action: str, attribute_uuids: list[str], event_uuid: str | None
+) -> None:
+    """Notifications, event counter and reactor dispatch of a batch of
+    ``created`` or ``deleted`` attributes of one event."""
+    logger.info(
+        "handling %s %s attributes for event uuid=%s job started",
+        len(attribute_uuids),
+        action,
+        event_uuid,
+    )
+
+    os_attrs = attributes_repository.get_attributes_from_opensearch_by_uuids(
+        attribute_uuids
+    )
+    notifications_repository.create_attributes_notifications(db, action, os_attrs)
+
+    payloads = []
+    standalone = 0
+    for os_attr in os_attrs:
+        if os_attr.object_uuid is None:
+            standalone += 1
+        payloads.append(
+            _reactor_attribute_payload(
+                os_attr,
+                str(os_attr.uuid),
+                str(os_attr.object_uuid) if os_attr.object_uuid else None,
+                event_uuid,
+            )
+        )
+
+    if event_uuid and standalone:
+        if action == "created":
+            events_repository.increment_attribute_count(db, event_uuid, standalone)
+        else:
+            events_repository.decrement_attribute_count(db, event_uuid, standalone)
+
+    if payloads and reactor_repository.has_active_subscriber("attribute", action):
+        reactor_repository.dispatch_triggered_scripts_bulk(
+            db, "attribute", action, payloads
+        )
+
+    logger.info(
+        "handling %s %s attributes for event uuid=%s job finished",
+        len(attribute_uuids),
+        action,
+        event_uuid,
+    )
+
+
 @celery_app.task
 def server_pull_by_id(server_id: int, user_id: int, technique: str):
     logger.info("pull server_id=%s job started", server_id)
@@ -213,8 +303,11 @@ def handle_updated_event(event_uuid: str):
             index="misp-events",
             id=event_uuid,
             body={"doc": {"timestamp": int(datetime.now().timestamp())}},
-            refresh=True,
+            refresh=opensearch_refresh.get_refresh(
+                "tasks.handle_updated_event", index="misp-events"
+            ),
         )
+        event_cache.invalidate_event(event_uuid)
         with Session(engine) as db:
             notifications_repository.create_event_notifications(db, "updated", event=os_event)
         _dispatch_if_subscribed("event", "updated", _reactor_event_payload(os_event, event_uuid))
@@ -244,6 +337,8 @@ def handle_created_attribute(attribute_uuid: str, object_uuid, event_uuid: str |
         if object_uuid is None and event_uuid:
             events_repository.increment_attribute_count(db, event_uuid)
 
+        _correlate_attribute(db, attribute_uuid)
+
         os_attr = attributes_repository.get_attribute_from_opensearch(UUID(attribute_uuid))
         if os_attr is not None:
             notifications_repository.create_attribute_notifications(db, "created", attribute=os_attr)
@@ -256,10 +351,30 @@ def handle_created_attribute(attribute_uuid: str, object_uuid, event_uuid: str |
     return True
 
 
+@celery_app.task
+def handle_created_attributes(attribute_uuids: list[str], event_uuid: str | None):
+    """Aggregated counterpart of ``handle_created_attribute`` for bulk inserts."""
+    with Session(engine) as db:
+        try:
+            correlations_repository.correlate_attributes(
+                get_runtime_settings(db), attribute_uuids
+            )
+        except Exception as e:
+            logger.error(
+                "Failed to correlate %s attributes: %s", len(attribute_uuids), str(e)
+            )
+
+        _handle_attributes_batch(db, "created", attribute_uuids, event_uuid)
+
+    return True
+
+
 @celery_app.task
 def handle_updated_attribute(attribute_uuid: str, object_uuid, event_uuid: str | None):
     logger.info("handling updated attribute uuid=%s job started", attribute_uuid)
     with Session(engine) as db:
+        _correlate_attribute(db, attribute_uuid)
+
         os_attr = attributes_repository.get_attribute_from_opensearch(UUID(attribute_uuid))
         if os_attr is not None:
             notifications_repository.create_attribute_notifications(db, "updated", attribute=os_attr)
@@ -275,6 +390,8 @@ def handle_updated_attribute(attribute_uuid: str, object_uuid, event_uuid: str |
 @celery_app.task
 def handle_deleted_attribute(attribute_uuid: str, object_uuid, event_uuid: str | None):
     logger.info("handling deleted attribute uuid=%s job started", attribute_uuid)
+    _delete_attributes_correlations([attribute_uuid])
+
     with Session(engine) as db:
         if object_uuid is None and event_uuid:
             events_repository.decrement_attribute_count(db, event_uuid)
@@ -291,6 +408,17 @@ def handle_deleted_attribute(attribute_uuid: str, object_uuid, event_uuid: str |
     return True
 
 
+@celery_app.task
+def handle_deleted_attributes(attribute_uuids: list[str], event_uuid: str | None):
+    """Aggregated counterpart of ``handle_deleted_attribute`` for bulk deletes."""
+    _delete_attributes_correlations(attribute_uuids)
+
+    with Session(engine) as db:
+        _handle_attributes_batch(db, "deleted", attribute_uuids, event_uuid)
+
+    return True
+
+
 @celery_app.task
 def handle_created_object(object_uuid: str, event_uuid: str | None):
     logger.info("handling created object uuid=%s job started", object_uuid)
@@ -346,30 +474,23 @@ def handle_deleted_object(object_uuid: str, event_uuid: str | None):
 def send_email(email: dict):
     logger.info("sending email job started")
 
-    mail_server = os.environ.get("MAIL_SERVER")
-    mail_port = os.environ.get("MAIL_PORT")
-    if not mail_server:
+    if not mail.is_mail_configured():
         logger.warning("MAIL_SERVER not configured, skipping email send")
         return False
 
-    msg = EmailMessage()
-    msg["Subject"] = email["subject"]
-    msg["From"] = email["from"]
-    msg["To"] = email["to"]
-    msg.set_content(email["body"])
+    sent, _ = mail.send_emails([email])
+    return sent == 1
 
-    try:
-        with smtplib.SMTP(mail_server, mail_port) as server:
-            username = os.environ.get("MAIL_USERNAME")
-            password = os.environ.get("MAIL_PASSWORD")
-            if username and password:
-                server.login(username, password)
-            server.send_message(msg)
-    except (smtplib.SMTPException, OSError) as e:
-        logger.error("Failed to send email: %s", e)
-        return False
 
-    return True
+@celery_app.task
+def flush_notification_digests():
+    logger.info("flush notification digests job started")
+
+    with Session(engine) as db:
+        result = notifications_repository.flush_notification_digests(db)
+
+    logger.info("flush notification digests job finished")
+    return result
 
 
 @celery_app.task
@@ -403,30 +524,78 @@ def fetch_feed_event(event_uuid: str, feed_id: int, user_id: int):
     return result
 
 
+@celery_app.task
+def fetch_feed_events(
+    event_uuids: list[str], feed_id: int, user_id: int, cache_token: str = None
+):
+    logger.info(
+        "fetch %s feed events of feed id=%s job started", len(event_uuids), feed_id
+    )
+
+    with Session(engine) as db:
+        user = users_repository.get_user_by_id(db, user_id)
+        db_feed = feeds_repository.get_feed_by_id(db, feed_id=feed_id)
+
+        result = feeds_repository.process_feed_events(db, event_uuids, db_feed, user)
+
+    feeds_repository.complete_feed_http_cache_batch(
+        feed_id, cache_token, failed=result["failed"] > 0
+    )
+
+    logger.info(
+        "fetch %s feed events of feed id=%s job finished", len(event_uuids), feed_id
+    )
+    return result
+
+
+def _create_feed_attributes_bulk(
+    db: Session, attributes: list, delta: dict = None
+) -> tuple[int, int]:
+    """Bulk index a batch of feed attributes, returns (created, failed)."""
+    if not attributes:
+        return 0, 0
+    created = attributes_repository.create_attributes_bulk(db, attributes)
+    if delta is not None:
+        feeds_repository.record_feed_delta_created(delta, created)
+    return len(created), len(attributes) - len(created)
+
+
+def _start_feed_delta(db_feed, db_event):
+    if not feeds_repository.uses_feed_delta_merge(db_feed):
+        return None
+    return feeds_repository.start_feed_delta(db_feed, str(db_event.uuid))
+
+
 @celery_app.task
 def fetch_csv_feed(feed_id: int, user_id: int):
     logger.info("fetch csv feed id=%s job started", feed_id)
 
-    index = 0
     rows_parsed = 0
     attributes_created = 0
+    attributes_deleted = 0
     failed_rows = 0
+    # rows the bulk index rejected, possibly transiently
+    index_failures = 0
 
     with Session(engine) as db:
         user = users_repository.get_user_by_id(db, user_id)
         db_feed = feeds_repository.get_feed_by_id(db, feed_id=feed_id)
 
-        db_event = feeds_repository.get_or_create_feed_event(db, db_feed, user)
-
+        download = None
         if db_feed.input_source == "local":
-            lines = feeds_repository.fetch_csv_content_from_local(db_feed.url)
+            lines = feeds_repository.stream_csv_content_from_local(db_feed.url)
         else:
-            lines = feeds_repository.fetch_csv_content_from_network(
-                db_feed.url, extra_headers=db_feed.headers
-            )
-        rows = feeds_repository.parse_csv_feed_lines(db_feed.settings, lines)
+            download = feeds_repository.download_feed_content(db_feed)
+            if download["unchanged"]:
+                return feeds_repository.unchanged_feed_result(db_feed)
+            lines = feeds_repository.iter_feed_content_lines(download["content"])
+        rows = feeds_repository.iter_csv_feed_rows(db_feed.settings, lines)
+
+        db_event = feeds_repository.get_or_create_feed_event(db, db_feed, user)
+        delta = _start_feed_delta(db_feed, db_event)
 
-        for row in rows:
+        batch = []
+        for index, row in enumerate(rows):
             if db_feed.settings["csvConfig"]["header"] and index == 0:
                 continue  # skip the first line if header is present
 
@@ -450,21 +619,46 @@ def fetch_csv_feed(feed_id: int, user_id: int):
                 if "to_ids" in attribute:
                     db_attribute.to_ids = attribute["to_ids"]
 
-                attributes_repository.create_attribute(db, db_attribute)
-                attributes_created += 1
+                if delta is not None and not feeds_repository.is_new_feed_attribute(
+                    delta, db_attribute
+                ):
+                    continue
+
+                batch.append(db_attribute)
 
             except Exception as e:
                 failed_rows += 1
                 logger.error("Error processing CSV feed row: %s", e)
 
-            index += 1
+            if len(batch) >= attributes_repository.ATTRIBUTES_BULK_SIZE:
+                created, failed = _create_feed_attributes_bulk(db, batch, delta)
+                attributes_created += created
+                failed_rows += failed
+                index_failures += failed
+                batch = []
+
+        created, failed = _create_feed_attributes_bulk(db, batch, delta)
+        attributes_created += created
+        failed_rows += failed
+        index_failures += failed
+
+        if delta is not None:
+            attributes_deleted = feeds_repository.finish_feed_delta(db, delta)
+
+        if download is not None:
+            download["content"].close()
+            # keep processing the unchanged feed until every row is indexed
+            if not index_failures:
+                feeds_repository.store_feed_http_cache(
+                    db_feed.id, download["cache"], rows=rows_parsed
+                )
 
     logger.info("fetch csv feed id=%s job finished", feed_id)
 
     return {
         "result": "success",
-        "message": "CSV feed=%s processed, %s rows parsed, %s attributes created, %s rows failed."
-        % (db_feed.name, rows_parsed, attributes_created, failed_rows),
+        "message": "CSV feed=%s processed, %s rows parsed, %s attributes created, %s attributes deleted, %s rows failed."
+        % (db_feed.name, rows_parsed, attributes_created, attributes_deleted, failed_rows),
     }
 
 
@@ -474,25 +668,32 @@ def fetch_freetext_feed(feed_id: int, user_id: int):
 
     rows_parsed = 0
     attributes_created = 0
+    attributes_deleted = 0
     failed_rows = 0
+    # rows the bulk index rejected, possibly transiently
+    index_failures = 0
 
     with Session(engine) as db:
         user = users_repository.get_user_by_id(db, user_id)
         db_feed = feeds_repository.get_feed_by_id(db, feed_id=feed_id)
 
-        db_event = feeds_repository.get_or_create_feed_event(db, db_feed, user)
-
+        download = None
         if db_feed.input_source == "local":
-            lines = feeds_repository.fetch_csv_content_from_local(db_feed.url)
+            lines = feeds_repository.stream_csv_content_from_local(db_feed.url)
         else:
-            lines = feeds_repository.fetch_csv_content_from_network(
-                db_feed.url, extra_headers=db_feed.headers
-            )
+            download = feeds_repository.download_feed_content(db_feed)
+            if download["unchanged"]:
+                return feeds_repository.unchanged_feed_result(db_feed)
+            lines = feeds_repository.iter_feed_content_lines(download["content"])
+
+        db_event = feeds_repository.get_or_create_feed_event(db, db_feed, user)
+        delta = _start_feed_delta(db_feed, db_event)
 
         freetext_config = (db_feed.settings or {}).get("freetextConfig", {})
         type_detection = freetext_config.get("type_detection", "automatic")
         fixed_type = freetext_config.get("fixed_type")
 
+        batch = []
         for line in lines:
             value = line.strip()
             if not value:
@@ -512,19 +713,46 @@ def fetch_freetext_feed(feed_id: int, user_id: int):
                     value=value,
                     category="External analysis",
                 )
-                attributes_repository.create_attribute(db, db_attribute)
-                attributes_created += 1
+                if delta is not None and not feeds_repository.is_new_feed_attribute(
+                    delta, db_attribute
+                ):
+                    continue
+
+                batch.append(db_attribute)
 
             except Exception as e:
                 failed_rows += 1
                 logger.error("Error processing freetext feed line: %s", e)
 
+            if len(batch) >= attributes_repository.ATTRIBUTES_BULK_SIZE:
+                created, failed = _create_feed_attributes_bulk(db, batch, delta)
+                attributes_created += created
+                failed_rows += failed
+                index_failures += failed
+                batch = []
+
+        created, failed = _create_feed_attributes_bulk(db, batch, delta)
+        attributes_created += created
+        failed_rows += failed
+        index_failures += failed
+
+        if delta is not None:
+            attributes_deleted = feeds_repository.finish_feed_delta(db, delta)
+
+        if download is not None:
+            download["content"].close()
+            # keep processing the unchanged feed until every row is indexed
+            if not index_failures:
+                feeds_repository.store_feed_http_cache(
+                    db_feed.id, download["cache"], rows=rows_parsed
+                )
+
     logger.info("fetch freetext feed id=%s job finished", feed_id)
 
     return {
         "result": "success",
-        "message": "Freetext feed=%s processed, %s rows parsed, %s attributes created, %s rows failed."
-        % (db_feed.name, rows_parsed, attributes_created, failed_rows),
+        "message": "Freetext feed=%s processed, %s rows parsed, %s attributes created, %s attributes deleted, %s rows failed."
+        % (db_feed.name, rows_parsed, attributes_created, attributes_deleted, failed_rows),
     }
 
 
@@ -534,23 +762,31 @@ def fetch_json_feed(feed_id: int, user_id: int):
 
     items_processed = 0
     attributes_created = 0
+    attributes_deleted = 0
     failed_items = 0
+    # rows the bulk index rejected, possibly transiently
+    index_failures = 0
 
     with Session(engine) as db:
         user = users_repository.get_user_by_id(db, user_id)
         db_feed = feeds_repository.get_feed_by_id(db, feed_id=feed_id)
 
-        db_event = feeds_repository.get_or_create_feed_event(db, db_feed, user)
-
+        json_cfg = (db_feed.settings or {}).get("jsonConfig") or {}
+        download = None
         if db_feed.input_source == "local":
-            content = feeds_repository.fetch_json_content_from_local(db_feed.url)
-        else:
-            content = feeds_repository.fetch_json_content_from_network(
-                db_feed.url, extra_headers=db_feed.headers
+            items = feeds_repository.stream_json_feed_items_from_local(
+                db_feed.url, json_cfg
             )
-        json_cfg = (db_feed.settings or {}).get("jsonConfig") or {}
-        items = feeds_repository.parse_json_feed_items(content, json_cfg)
+        else:
+            download = feeds_repository.download_feed_content(db_feed)
+            if download["unchanged"]:
+                return feeds_repository.unchanged_feed_result(db_feed)
+            items = feeds_repository.iter_json_feed_items(download["content"], json_cfg)
 
+        db_event = feeds_repository.get_or_create_feed_event(db, db_feed, user)
+        delta = _start_feed_delta(db_feed, db_event)
+
+        batch = []
         for item in items:
             try:
                 items_processed += 1
@@ -575,25 +811,57 @@ def fetch_json_feed(feed_id: int, user_id: int):
                 if "to_ids" in attribute:
                     db_attribute.to_ids = attribute["to_ids"]
 
-                attributes_repository.create_attribute(db, db_attribute)
-                attributes_created += 1
+                if delta is not None and not feeds_repository.is_new_feed_attribute(
+                    delta, db_attribute
+                ):
+                    continue
+
+                batch.append(db_attribute)
 
             except Exception as e:
                 failed_items += 1
                 logger.error("Error processing JSON feed item: %s", e)
 
+            if len(batch) >= attributes_repository.ATTRIBUTES_BULK_SIZE:
+                created, failed = _create_feed_attributes_bulk(db, batch, delta)
+                attributes_created += created
+                failed_items += failed
+                index_failures += failed
+                batch = []
+
+        created, failed = _create_feed_attributes_bulk(db, batch, delta)
+        attributes_created += created
+        failed_items += failed
+        index_failures += failed
+
+        if delta is not None:
+            attributes_deleted = feeds_repository.finish_feed_delta(db, delta)
+
+        if download is not None:
+            download["content"].close()
+            # keep processing the unchanged feed until every row is indexed
+            if not index_failures:
+                feeds_repository.store_feed_http_cache(
+                    db_feed.id, download["cache"], rows=items_processed
+                )
+
     logger.info("fetch json feed id=%s job finished", feed_id)
 
     return {
         "result": "success",
-        "message": "JSON feed=%s processed, %s items, %s attributes created, %s failed."
-        % (db_feed.name, items_processed, attributes_created, failed_items),
+        "message": "JSON feed=%s processed, %s items, %s attributes created, %s attributes deleted, %s failed."
+        % (db_feed.name, items_processed, attributes_created, attributes_deleted, failed_items),
     }
 
 
 @celery_app.task
-def generate_correlations():
-    logger.info("generate correlations job started")
+def generate_correlations(incremental: bool = False, **kwargs):
+    """Rebuild the correlations index, or only correlate the attributes
+    indexed since the previous run when ``incremental`` is set.
+
+    ``**kwargs`` absorbs scheduler-injected arguments (e.g. ``user_id``).
+    """
+    logger.info("generate correlations job started, incremental=%s", incremental)
 
     with Session(engine) as db:
         runtimeSettings = get_runtime_settings(db)
@@ -623,8 +891,10 @@ def generate_correlations():
 
     try:
         try:
-            correlations_repository.delete_correlations()
-            correlations_repository.run_correlations(runtimeSettings)
+            if incremental:
+                correlations_repository.run_incremental_correlations(runtimeSettings)
+            else:
+                correlations_repository.run_full_correlations(runtimeSettings)
         except Exception as e:
             logger.error("Failed to generate correlations: %s", str(e))
             return False
@@ -652,127 +922,114 @@ def enforce_retention():
         logger.info("enforce_retention skipped: retention disabled")
         return True
 
-    period_days = retention.get("period_days", 365)
-    exempt_tags = retention.get("exempt_tags", ["retention:exempt"])
-    cutoff = int(datetime.now().timestamp()) - period_days * 86400
-    client = get_opensearch_client()
-
-    must_not = (
-        [{"match_phrase": {"tags.name": tag}} for tag in exempt_tags]
-        if exempt_tags
-        else []
+    result = retention_repository.purge_expired_events(
+        retention.get("period_days", 365),
+        retention.get("exempt_tags", ["retention:exempt"]),
+        page_size=retention.get("purge_page_size", 500),
+        requests_per_second=retention.get("purge_requests_per_second", 0),
     )
 
-    # Collect all event UUIDs eligible for retention
-    event_uuids = []
-    search_after = None
-    while True:
-        body = {
-            "query": {
-                "bool": {
-                    "must": [
-                        {"range": {"timestamp": {"lt": cutoff}}},
-                        {"term": {"deleted": False}},
-                    ],
-                    "must_not": must_not,
-                }
-            },
-            "_source": ["uuid"],
-            "size": 500,
-            "sort": [{"uuid.keyword": "asc"}],
-        }
-        if search_after:
-            body["search_after"] = search_after
-        response = client.search(index="misp-events", body=body)
-        hits = response["hits"]["hits"]
-        if not hits:
-            break
-        event_uuids.extend(hit["_source"]["uuid"] for hit in hits)
-        if len(hits) < 500:
-            break
-        search_after = hits[-1]["sort"]
-
-    if not event_uuids:
-        logger.info("enforce_retention finished: no events to purge")
-        return True
+    logger.info("enforce_retention finished: %s", result)
+    return result
 
-    logger.info("enforce_retention: purging %s events", len(event_uuids))
 
-    for event_uuid in event_uuids:
-        logger.info("enforce_retention: purging event uuid=%s", event_uuid)
+@celery_app.task
+def rollup_sightings():
+    logger.info("rollup sightings job started")
 
-        # Collect attribute UUIDs for sighting cleanup
-        attr_resp = client.search(
-            index="misp-attributes",
-            body={
-                "query": {"term": {"event_uuid": event_uuid}},
-                "_source": ["uuid"],
-                "size": 10000,
-            },
-        )
-        attr_uuids = [h["_source"]["uuid"] for h in attr_resp["hits"]["hits"]]
-
-        # Delete sightings for these attributes
-        if attr_uuids:
-            client.delete_by_query(
-                index="misp-sightings",
-                body={"query": {"terms": {"attribute_uuid.keyword": attr_uuids}}},
-                refresh=False,
-                ignore=[404],
-            )
+    result = sighting_rollups_repository.rollup_sightings()
 
-        # Delete correlations
-        correlations_repository.delete_event_correlations(event_uuid)
+    logger.info("rollup sightings job finished")
+    return result
 
-        # Delete event, attributes, and objects
-        delete_indexed_event(event_uuid)
 
-    logger.info("enforce_retention finished: %s events purged", len(event_uuids))
-    return True
+@celery_app.task
+def flush_event_counters():
+    logger.info("flush event counters job started")
+
+    result = event_counters_repository.flush_event_counters()
+
+    logger.info("flush event counters job finished: %s", result)
+    return result
+
+
+@celery_app.task
+def repair_event_counters(event_uuids: list[str] | None = None):
+    logger.info("repair event counters job started")
+
+    result = event_counters_repository.repair_event_counters(event_uuids)
+
+    logger.info("repair event counters job finished: %s", result)
+    return result
 
 
 @celery_app.task
 def handle_created_sighting(
     value: str, organisation: str, sighting_type: str, timestamp: float = None
 ):
-    logger.info("handling created sighting value=%s job started", value)
-
-    attributes = events_repository.search_events(
-        page=0,
-        from_value=0,
-        size=1000,
-        query="value: %s" % value,
-        searchAttributes=True,
+    return handle_created_sightings(
+        [
+            {
+                "value": value,
+                "organisation": organisation,
+                "type": sighting_type,
+                "timestamp": timestamp,
+            }
+        ]
     )
 
-    if attributes["total"] > 1000:
-        logger.warning(
-            "Too many attributes found for value=%s, only the first 1000 will be processed.",
-            value,
-        )
 
-    sighting = {
-        "value": value,
-        "type": sighting_type,
-        "observer": {"organisation": organisation},
-        "timestamp": timestamp or datetime.now().timestamp(),
-    }
+@celery_app.task
+def handle_created_sightings(sightings: list[dict]):
+    """Aggregated counterpart of ``handle_created_sighting`` for bulk uploads.
+
+    Sightings are grouped by value and the matching attributes of all values
+    are resolved with a single query.
+    """
+    logger.info("handling %s created sightings job started", len(sightings))
+
+    sightings = [
+        {
+            "value": sighting["value"],
+            "type": sighting["type"],
+            "observer": {"organisation": sighting["organisation"]},
+            "timestamp": sighting.get("timestamp") or datetime.now().timestamp(),
+        }
+        for sighting in sightings
+    ]
+
+    attributes_by_value = attributes_repository.get_attributes_by_values(
+        {sighting["value"] for sighting in sightings}
+    )
 
     with Session(engine) as db:
-        for attribute in attributes["results"]:
-            notifications_repository.create_sighting_notifications(
-                db, "created", attribute=attribute, sighting=sighting
-            )
-        _dispatch_if_subscribed(
-            "sighting",
+        notifications_repository.create_sightings_batch_notifications(
+            db,
             "created",
+            [
+                (sighting, attributes_by_value.get(sighting["value"], []))
+                for sighting in sightings
+            ],
+        )
+
+        payloads = [
             {
-                "value": value,
-                "type": sighting_type,
-                "organisation": organisation,
+                "value": sighting["value"],
+                "type": sighting["type"],
+                "organisation": sighting["observer"]["organisation"],
                 "timestamp": sighting["timestamp"],
-            },
-        )
+            }
+            for sighting in sightings
+        ]
+        if len(payloads) == 1:
+            _dispatch_if_subscribed("sighting", "created", payloads[0])
+        elif reactor_repository.has_active_subscriber("sighting", "created"):
+            reactor_repository.dispatch_triggered_scripts_bulk(
+                db, "sighting", "created", payloads
+            )
+
+    logger.info("handling %s created sightings job finished", len(sightings))
+    return True
 
 
 @celery_app.task
@@ -805,6 +1062,34 @@ def handle_created_correlation(
     return True
 
 
+@celery_app.task
+def handle_created_correlations(correlations: list[dict]):
+    """Batched counterpart of ``handle_created_correlation``.
+
+    Correlation runs buffer created correlations and enqueue one of these per
+    batch, so followers and reactor subscribers are resolved once per batch
+    instead of once per correlation.
+    """
+    logger.info(
+        "handling %s created correlations job started", len(correlations)
+    )
+
+    with Session(engine) as db:
+        notifications_repository.create_correlations_notifications(
+            db, "created", correlations=correlations
+        )
+
+        if reactor_repository.has_active_subscriber("correlation", "created"):
+            reactor_repository.dispatch_triggered_scripts_bulk(
+                db, "correlation", "created", correlations
+            )
+
+    logger.info(
+        "handling %s created correlations job finished", len(correlations)
+    )
+    return True
+
+
 @celery_app.task
 def handle_published_event(event_uuid: str):
     logger.info("handling published event uuid=%s job started", event_uuid)
@@ -861,8 +1146,9 @@ def delete_indexed_event(event_uuid: str):
     OpenSearchClient = get_opensearch_client()
 
     response = OpenSearchClient.delete(
-        index="misp-events", id=event_uuid, refresh=True, ignore=[404]
+        index="misp-events", id=event_uuid, refresh=opensearch_refresh.get_refresh("tasks.delete_indexed_event", index="misp-events"), ignore=[404]
     )
+    event_cache.invalidate_event(event_uuid)
 
     if response.get("result") == "not_found":
         logger.info("event uuid=%s not found in index, nothing to delete", event_uuid)
@@ -873,7 +1159,7 @@ def delete_indexed_event(event_uuid: str):
     query = {"query": {"bool": {"must": [{"term": {"event_uuid": str(event_uuid)}}]}}}
 
     response = OpenSearchClient.delete_by_query(
-        index="misp-attributes", body=query, refresh=True, ignore=[404]
+        index="misp-attributes", body=query, refresh=opensearch_refresh.get_refresh("tasks.delete_indexed_event", index="misp-attributes", by_query=True), ignore=[404]
     )
     logger.info(
         "deleted %s indexed attributes for event uuid=%s",
@@ -883,7 +1169,7 @@ def delete_indexed_event(event_uuid: str):
 
     # delete indexed objects
     response = OpenSearchClient.delete_by_query(
-        index="misp-objects", body=query, refresh=True, ignore=[404]
+        index="misp-objects", body=query, refresh=opensearch_refresh.get_refresh("tasks.delete_indexed_event", index="misp-objects", by_query=True), ignore=[404]
     )
     logger.info(
         "deleted %s indexed objects for event uuid=%s",
@@ -903,7 +1189,7 @@ def delete_indexed_attribute(attribute_uuid: str):
     OpenSearchClient = get_opensearch_client()
 
     response = OpenSearchClient.delete(
-        index="misp-attributes", id=attribute_uuid, refresh=True, ignore=[404]
+        index="misp-attributes", id=attribute_uuid, refresh=opensearch_refresh.get_refresh("tasks.delete_indexed_attribute", index="misp-attributes"), ignore=[404]
     )
 
     if response.get("result") == "not_found":
@@ -974,7 +1260,7 @@ def delete_indexed_object(object_uuid: str):
     OpenSearchClient = get_opensearch_client()
 
     response = OpenSearchClient.delete(
-        index="misp-objects", id=object_uuid, refresh=True, ignore=[404]
+        index="misp-objects", id=object_uuid, refresh=opensearch_refresh.get_refresh("tasks.delete_indexed_object", index="misp-objects"), ignore=[404]
     )
 
     if response.get("result") == "not_found":
@@ -74,14 +74,14 @@ export const useServersStore = defineStore({
         .post(`${baseUrl}/preview-pull`, serverConfig)
         .finally(() => (this.status.previewing = false));
     },
-    async pull(id) {
+    async pull(id, technique = "full") {
       return await fetchWrapper
-        .post(`${baseUrl}/${id}/pull`)
+        .post(`${baseUrl}/${id}/pull?technique=${technique}`)
         .catch((error) => (this.status = { error }));
     },
-    async push(id) {
+    async push(id, technique = "full") {
       return await fetchWrapper
-        .post(`${baseUrl}/${id}/push`)
+        .post(`${baseUrl}/${id}/push?technique=${technique}`)
         .catch((error) => (this.status = { error }));
     },
     async pushEvent(serverId, eventUuid) {